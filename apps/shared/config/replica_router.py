@@ -0,0 +1,448 @@
+"""
+Read/write splitting across local SQLite read replicas.
+
+Writes go to the primary file. Reads go to replica files kept next to it,
+refreshed with the SQLite online backup API, so read-heavy render traffic
+does not contend with the writer's locks and can spread across files and
+processes.
+
+Consistency model:
+- Staleness bound: replicas older than max_staleness_seconds do not serve
+  reads; the primary does while they are refreshed in the background
+- Read-your-writes: a session that just wrote is served by the primary
+  until some replica has caught up with its write
+
+The named-statement pool (query_registry) routes its reads through here
+when MULTICARDZ_READ_REPLICAS is set. Direct use:
+
+    >>> router = get_replica_router(Path("/data/app.db"), replica_count=2)
+    >>> with router.read_connection(session_id) as conn:
+    ...     rows = conn.execute("SELECT ...").fetchall()
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# Number of local read replicas per primary file (0 disables replica reads)
+READ_REPLICA_COUNT = int(os.getenv("MULTICARDZ_READ_REPLICAS", "0"))
+
+# Maximum age of a replica snapshot before it is refreshed on read
+REPLICA_MAX_STALENESS_SECONDS = float(os.getenv("MULTICARDZ_REPLICA_MAX_STALENESS", "2.0"))
+
+# Statements that never write (leading keyword, comments stripped)
+_READ_QUERY_PATTERN = re.compile(r"^\s*(SELECT|EXPLAIN)\b", re.IGNORECASE)
+_WRITE_KEYWORD_PATTERN = re.compile(
+    r"\b(INSERT|UPDATE|DELETE|REPLACE|CREATE|DROP|ALTER)\b", re.IGNORECASE
+)
+_SQL_COMMENT_PATTERN = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+
+
+class ReplicaRole(str, Enum):
+    """Where a routed statement runs."""
+    PRIMARY = "primary"
+    REPLICA = "replica"
+
+
+class RouteDecision(NamedTuple):
+    """Result of routing a single read or write."""
+    role: str
+    path: Path
+    reason: str
+
+
+@dataclass
+class ReplicaState:
+    """Bookkeeping for one local replica file."""
+    path: Path
+    synced_write_seq: int = -1
+    refreshed_at: float = 0.0
+    refresh_count: int = 0
+    refresh_lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+
+def is_read_query(query: str) -> bool:
+    """
+    Classify a statement as read-only.
+
+    SELECT/EXPLAIN statements (including CTEs that only select) are reads;
+    everything else, including PRAGMA and transaction control, is a write.
+
+    Example:
+        >>> is_read_query("SELECT * FROM cards")
+        True
+        >>> is_read_query("WITH x AS (SELECT 1) DELETE FROM cards")
+        False
+    """
+    stripped = _SQL_COMMENT_PATTERN.sub(" ", query)
+    if _READ_QUERY_PATTERN.match(stripped):
+        return True
+    if re.match(r"^\s*WITH\b", stripped, re.IGNORECASE):
+        return not _WRITE_KEYWORD_PATTERN.search(stripped)
+    return False
+
+
+def replica_paths_for(primary_path: Path, count: int) -> list[Path]:
+    """
+    Replica file locations next to the primary.
+
+    Example:
+        >>> [p.name for p in replica_paths_for(Path("/data/app.db"), 2)]
+        ['app.replica1.db', 'app.replica2.db']
+    """
+    return [
+        primary_path.with_name(f"{primary_path.stem}.replica{i}{primary_path.suffix}")
+        for i in range(1, count + 1)
+    ]
+
+
+class ReadReplicaRouter:
+    """
+    Split reads and writes between a primary SQLite file and local replicas.
+
+    Replicas are whole-file copies refreshed with the SQLite online backup
+    API, so readers never contend with the writer's locks. Consistency:
+
+    - Staleness bound: a replica older than max_staleness_seconds does not
+      serve reads.
+    - Read-your-writes: every write through the router bumps a write
+      sequence; a session that wrote at sequence N only reads from replicas
+      synced to N or later, and from the primary until one is.
+
+    A read never waits for a copy: when no replica qualifies it goes to the
+    primary and a background thread refreshes the lagging replicas
+    (start_refresher=False leaves refreshing to the caller).
+    """
+
+    def __init__(
+        self,
+        primary_path: Path,
+        replica_paths: list[Path],
+        *,
+        max_staleness_seconds: float = REPLICA_MAX_STALENESS_SECONDS,
+        clock=time.monotonic,
+        start_refresher: bool = True
+    ):
+        self.primary_path = Path(primary_path)
+        self.max_staleness_seconds = max_staleness_seconds
+        self._clock = clock
+        self._replicas = [ReplicaState(path=Path(p)) for p in replica_paths]
+        self._lock = threading.Lock()
+        self._write_seq = 0
+        self._session_write_seq: dict[str, int] = {}
+        self._next_replica = 0
+        self._metrics = {"primary_reads": 0, "replica_reads": 0, "writes": 0, "refreshes": 0}
+        self._refresh_wanted = threading.Event()
+        self._closed = threading.Event()
+        self._start_refresher = start_refresher
+        self._refresher: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Replica refresh
+    # ------------------------------------------------------------------
+
+    def refresh_replica(self, replica: ReplicaState) -> None:
+        """Copy the primary into a replica file with the backup API."""
+        with replica.refresh_lock:
+            self._refresh_locked(replica)
+
+    def refresh_all(self) -> None:
+        """Refresh every replica (startup / periodic background task)."""
+        for replica in self._replicas:
+            self.refresh_replica(replica)
+
+    def refresh_lagging(self) -> int:
+        """
+        Refresh only replicas that are stale or behind the write sequence.
+
+        Returns:
+            Number of replicas refreshed
+        """
+        refreshed = 0
+        for replica in self._replicas:
+            with self._lock:
+                behind = replica.synced_write_seq < self._write_seq
+            stale = (self._clock() - replica.refreshed_at) > self.max_staleness_seconds
+            if behind or stale:
+                self.refresh_replica(replica)
+                refreshed += 1
+        return refreshed
+
+    def _refresh_locked(self, replica: ReplicaState) -> None:
+        # Capture the sequence first: writes committed during the copy may
+        # or may not be included, so the replica only claims what it surely has
+        with self._lock:
+            seq = self._write_seq
+
+        source = sqlite3.connect(self.primary_path)
+        target = sqlite3.connect(replica.path)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+
+        with self._lock:
+            replica.synced_write_seq = max(replica.synced_write_seq, seq)
+            replica.refreshed_at = self._clock()
+            replica.refresh_count += 1
+            self._metrics["refreshes"] += 1
+            self._prune_sessions_locked()
+
+        logger.debug(f"Refreshed replica {replica.path} at write_seq {seq}")
+
+    def request_refresh(self) -> None:
+        """Ask the background refresher to bring lagging replicas up to date."""
+        if self._refresher is None and self._start_refresher:
+            with self._lock:
+                if self._refresher is None and not self._closed.is_set():
+                    self._refresher = threading.Thread(
+                        target=self._refresh_loop, name="replica-refresh", daemon=True
+                    )
+                    self._refresher.start()
+        self._refresh_wanted.set()
+
+    def _refresh_loop(self) -> None:
+        while not self._closed.is_set():
+            self._refresh_wanted.wait()
+            self._refresh_wanted.clear()
+            if self._closed.is_set():
+                return
+            try:
+                self.refresh_lagging()
+            except Exception as e:
+                logger.warning(f"Background replica refresh failed: {e}")
+
+    def close(self) -> None:
+        """Stop the background refresher."""
+        self._closed.set()
+        self._refresh_wanted.set()
+        refresher, self._refresher = self._refresher, None
+        if refresher is not None:
+            refresher.join(timeout=5)
+
+    def _prune_sessions_locked(self) -> None:
+        """Forget session pins every replica has already caught up with."""
+        if not self._replicas:
+            return
+        floor = min(r.synced_write_seq for r in self._replicas)
+        for session_id in [s for s, seq in self._session_write_seq.items() if seq <= floor]:
+            del self._session_write_seq[session_id]
+
+    # ------------------------------------------------------------------
+    # Routing
+    # ------------------------------------------------------------------
+
+    def route_read(self, session_id: Optional[str] = None) -> RouteDecision:
+        """
+        Pick the file that serves a read.
+
+        Args:
+            session_id: Session to honour read-your-writes for
+
+        Returns:
+            RouteDecision naming the primary or a replica
+        """
+        decision = self._choose_route(session_id)
+        with self._lock:
+            key = "replica_reads" if decision.role == ReplicaRole.REPLICA else "primary_reads"
+            self._metrics[key] += 1
+        return decision
+
+    def _choose_route(self, session_id: Optional[str]) -> RouteDecision:
+        if not self._replicas:
+            return RouteDecision(ReplicaRole.PRIMARY, self.primary_path, "no_replicas")
+
+        with self._lock:
+            required_seq = self._session_write_seq.get(session_id, -1) if session_id else -1
+            start = self._next_replica
+            self._next_replica = (start + 1) % len(self._replicas)
+
+        now = self._clock()
+        lagging = False
+        for offset in range(len(self._replicas)):
+            replica = self._replicas[(start + offset) % len(self._replicas)]
+
+            fresh = (now - replica.refreshed_at) <= self.max_staleness_seconds
+            caught_up = replica.synced_write_seq >= required_seq
+            if fresh and caught_up:
+                if lagging:
+                    self.request_refresh()
+                return RouteDecision(ReplicaRole.REPLICA, replica.path, "fresh")
+            lagging = True
+
+        # Serve from the primary rather than copying the database inline
+        self.request_refresh()
+        reason = "read_your_writes" if required_seq >= 0 else "replicas_stale"
+        return RouteDecision(ReplicaRole.PRIMARY, self.primary_path, reason)
+
+    def record_write(self, session_id: Optional[str] = None) -> int:
+        """
+        Advance the write sequence after a committed write.
+
+        Returns:
+            The new write sequence number
+        """
+        with self._lock:
+            self._write_seq += 1
+            self._metrics["writes"] += 1
+            if session_id:
+                self._session_write_seq[session_id] = self._write_seq
+            return self._write_seq
+
+    @contextmanager
+    def open_route(self, decision: RouteDecision) -> Generator[sqlite3.Connection, None, None]:
+        """
+        Open a read-only connection on a routed file.
+
+        Yields:
+            sqlite3.Connection opened with mode=ro
+        """
+        conn = sqlite3.connect(f"file:{decision.path}?mode=ro", uri=True)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def read_connection(self, session_id: Optional[str] = None) -> Generator[sqlite3.Connection, None, None]:
+        """
+        Route a read and open a read-only connection on the chosen file.
+
+        Args:
+            session_id: Session to honour read-your-writes for
+
+        Yields:
+            sqlite3.Connection on a replica or the primary
+        """
+        with self.open_route(self.route_read(session_id)) as conn:
+            yield conn
+
+    @contextmanager
+    def write_connection(self, session_id: Optional[str] = None) -> Generator[sqlite3.Connection, None, None]:
+        """
+        Open a connection on the primary; commits on success, rolls back on error.
+
+        Yields:
+            sqlite3.Connection to the primary file
+        """
+        conn = sqlite3.connect(self.primary_path)
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        self.record_write(session_id)
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Routing counters and per-replica lag.
+
+        Returns:
+            Dict with read/write/refresh counters, the current write
+            sequence, pinned session count and, per replica, its age in
+            seconds and how many writes it is behind
+        """
+        now = self._clock()
+        with self._lock:
+            return {
+                **self._metrics,
+                "write_seq": self._write_seq,
+                "pinned_sessions": len(self._session_write_seq),
+                "replicas": [
+                    {
+                        "path": str(r.path),
+                        "age_seconds": now - r.refreshed_at if r.refresh_count else None,
+                        "writes_behind": self._write_seq - max(r.synced_write_seq, 0),
+                        "refresh_count": r.refresh_count,
+                    }
+                    for r in self._replicas
+                ],
+            }
+
+
+def execute_routed(
+    router: ReadReplicaRouter,
+    query: str,
+    params: tuple = (),
+    *,
+    session_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Execute one statement through a ReadReplicaRouter.
+
+    Args:
+        router: Router for the target database
+        query: SQL statement
+        params: Statement parameters
+        session_id: Session for read-your-writes pinning
+
+    Returns:
+        Dict with success, rows, rowcount and the role that served it
+    """
+    if is_read_query(query):
+        decision = router.route_read(session_id)
+        with router.open_route(decision) as conn:
+            rows = conn.execute(query, params).fetchall()
+        return {"success": True, "rows": rows, "rowcount": len(rows), "role": decision.role.value}
+
+    with router.write_connection(session_id) as conn:
+        cursor = conn.execute(query, params)
+        rows = cursor.fetchall()
+        rowcount = cursor.rowcount
+    return {"success": True, "rows": rows, "rowcount": rowcount, "role": ReplicaRole.PRIMARY.value}
+
+
+_ROUTERS: dict[str, ReadReplicaRouter] = {}
+_ROUTERS_LOCK = threading.Lock()
+
+
+def get_replica_router(
+    primary_path: Path,
+    replica_count: int = READ_REPLICA_COUNT
+) -> ReadReplicaRouter:
+    """
+    Get the process-wide router for a primary database file.
+
+    Args:
+        primary_path: Primary SQLite file
+        replica_count: Replicas to maintain next to it (first call only)
+
+    Returns:
+        Shared ReadReplicaRouter for that file
+    """
+    # Fast path on the path as given; resolve() only on first use
+    alias = str(primary_path)
+    router = _ROUTERS.get(alias)
+    if router is not None:
+        return router
+
+    key = str(Path(primary_path).resolve())
+    with _ROUTERS_LOCK:
+        router = _ROUTERS.get(key)
+        if router is None:
+            router = ReadReplicaRouter(
+                Path(primary_path), replica_paths_for(Path(primary_path), replica_count)
+            )
+            _ROUTERS[key] = router
+        _ROUTERS[alias] = router
+        return router
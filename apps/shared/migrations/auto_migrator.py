@@ -20,6 +20,9 @@ from .fast_detector import mark_migration_applied
 
 logger = logging.getLogger(__name__)
 
+# Repository-level directory holding the NNN_*.sql migration files
+MIGRATIONS_DIR = Path(__file__).resolve().parents[3] / "migrations"
+
 
 # ============================================================================
 # MIGRATION DEFINITIONS (immutable registry)
@@ -35,6 +38,14 @@ MIGRATIONS: Tuple[Migration, ...] = (
         version=2,
         sql_file="002_add_bitmap_sequences.sql"
     ),
+    Migration(
+        version=3,
+        sql_file="003_add_group_tags.sql"
+    ),
+    Migration(
+        version=4,
+        sql_file="004_add_card_keyset_indexes.sql"
+    ),
 )
 
 
@@ -281,6 +292,58 @@ def apply_migration_with_dependencies(
     return (True, results)
 
 
+def apply_pending_migrations(
+    connection: sqlite3.Connection,
+    sql_base_dir: Path = MIGRATIONS_DIR
+) -> Tuple[bool, list[MigrationResult]]:
+    """
+    Apply registered migrations newer than the database's schema version.
+
+    Error detection only finds migrations whose absence breaks a query (a
+    missing table or trigger). Index-only migrations never raise, so
+    existing databases pick them up here instead.
+
+    Databases without a recorded schema_version are left untouched:
+    migration 001 rebuilds the schema from scratch and must not run
+    against a database of unknown history.
+
+    Args:
+        connection: SQLite database connection
+        sql_base_dir: Base directory containing SQL files
+
+    Returns:
+        Tuple of (success: bool, results: list[MigrationResult])
+        results is empty when the schema is already current
+
+    Examples:
+        >>> success, results = apply_pending_migrations(conn)
+        >>> [r.version for r in results]
+        [4]
+    """
+    try:
+        row = connection.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    except sqlite3.OperationalError:
+        return (True, [])
+
+    current = row[0] if row else None
+    if current is None:
+        return (True, [])
+
+    results = []
+    for migration in MIGRATIONS:
+        if migration.version <= current:
+            continue
+
+        result = apply_migration_with_result(connection, migration.version, sql_base_dir)
+        results.append(result)
+        log_migration_event(result)
+
+        if not result.success:
+            return (False, results)
+
+    return (True, results)
+
+
 # ============================================================================
 # EVENT LOGGING (pure function for event construction)
 # ============================================================================
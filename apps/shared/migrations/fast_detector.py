@@ -49,6 +49,13 @@ ERROR_TO_MIGRATION: Final[dict[Tuple[str, str], MigrationVersion]] = {
     ("table", "bitmap_sequences"): 2,
     ("trigger", "auto_calculate_card_bitmap"): 2,
     ("trigger", "auto_calculate_tag_bitmap"): 2,
+
+    # Group tags (migration 003)
+    ("table", "group_tags"): 3,
+    ("table", "group_memberships"): 3,
+
+    # Migration 004 only adds indexes; a missing index never raises, so it
+    # is applied by version check (auto_migrator.apply_pending_migrations)
 }
 
 # ============================================================================
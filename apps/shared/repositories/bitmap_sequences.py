@@ -0,0 +1,54 @@
+"""
+Bitmap sequence block reservation using pure functions.
+
+The auto_calculate_*_bitmap triggers assign one ordinal per inserted row,
+costing three writes per insert and serializing on the sequence row.
+Batch inserts reserve a contiguous block of ordinals with one UPDATE and
+write them directly, so the triggers (WHEN NEW.*_bitmap = 0) only fire
+for ad-hoc inserts that do not supply a bitmap.
+"""
+import sqlite3
+
+from apps.shared.repositories.query_registry import register_statement, run_statement
+
+CARD_BITMAP_SEQUENCE = "card_bitmap_seq"
+TAG_BITMAP_SEQUENCE = "tag_bitmap_seq"
+
+RESERVE_BITMAP_BLOCK = register_statement("bitmap_sequences.reserve_block", """
+    UPDATE bitmap_sequences
+    SET current_value = current_value + ?
+    WHERE sequence_name = ?
+    RETURNING current_value
+""")
+
+
+def reserve_bitmap_block(conn: sqlite3.Connection, sequence_name: str, count: int) -> range:
+    """
+    Reserve `count` consecutive bitmap ordinals in a single statement.
+
+    Must run inside the caller's write transaction so the reservation and
+    the rows that use it commit (or roll back) together.
+
+    Args:
+        conn: Open database connection
+        sequence_name: Row in bitmap_sequences (card_bitmap_seq or tag_bitmap_seq)
+        count: Number of ordinals to reserve
+
+    Returns:
+        range of reserved ordinals (empty when count is 0)
+
+    Raises:
+        ValueError: If count is negative or the sequence does not exist
+    """
+    if count < 0:
+        raise ValueError(f"Cannot reserve a negative block size: {count}")
+    if count == 0:
+        return range(0)
+
+    row = run_statement(conn, RESERVE_BITMAP_BLOCK, (count, sequence_name)).fetchone()
+
+    if row is None:
+        raise ValueError(f"Bitmap sequence not found: {sequence_name}")
+
+    end = row[0]
+    return range(end - count + 1, end + 1)
@@ -2,12 +2,79 @@
 Card repository using pure functions for card operations.
 Following Zero-Trust UUID Architecture Phase 2 requirements.
 """
+import base64
+import json
 import sqlite3
 from typing import Optional
 from pathlib import Path
 from contextlib import contextmanager
 
 from apps.shared.config.database import DATABASE_PATH
+from apps.shared.repositories.bitmap_sequences import CARD_BITMAP_SEQUENCE, reserve_bitmap_block
+from apps.shared.repositories.query_registry import (
+    execute_command,
+    pooled_connection,
+    query_all,
+    query_one,
+    register_statement,
+    run_statement_many,
+)
+
+
+# Named statements (registered once, executed on pooled connections)
+CARD_COLUMNS = "card_id, name, workspace_id, tags, created, modified, deleted"
+
+GET_CARD_BY_ID = register_statement("cards.get_by_id", f"""
+    SELECT {CARD_COLUMNS}
+    FROM cards
+    WHERE card_id = ? AND workspace_id = ? AND deleted IS NULL
+""")
+
+LIST_CARDS_FIRST_PAGE = register_statement("cards.list_first_page", f"""
+    SELECT {CARD_COLUMNS}
+    FROM cards
+    WHERE workspace_id = ? AND deleted IS NULL
+    ORDER BY created DESC, card_id DESC
+    LIMIT ?
+""")
+
+LIST_CARDS_AFTER_CURSOR = register_statement("cards.list_after_cursor", f"""
+    SELECT {CARD_COLUMNS}
+    FROM cards
+    WHERE workspace_id = ? AND deleted IS NULL
+      AND (created, card_id) < (?, ?)
+    ORDER BY created DESC, card_id DESC
+    LIMIT ?
+""")
+
+INSERT_CARD = register_statement("cards.insert", """
+    INSERT INTO cards (card_id, name, workspace_id, tags, card_bitmap, user_id, created, modified)
+    VALUES (?, ?, ?, ?, ?, 'default-user', datetime('now'), datetime('now'))
+""")
+
+UPDATE_CARD_TITLE = register_statement("cards.update_title", """
+    UPDATE cards
+    SET name = ?
+    WHERE card_id = ? AND workspace_id = ? AND deleted IS NULL
+""")
+
+UPDATE_CARD_CONTENT = register_statement("cards.update_content", """
+    UPDATE cards
+    SET description = ?
+    WHERE card_id = ? AND workspace_id = ? AND deleted IS NULL
+""")
+
+UPDATE_CARD_TAGS = register_statement("cards.update_tags", """
+    UPDATE cards
+    SET tags = ?
+    WHERE card_id = ? AND workspace_id = ? AND deleted IS NULL
+""")
+
+SOFT_DELETE_CARD = register_statement("cards.soft_delete", """
+    UPDATE cards
+    SET deleted = datetime('now')
+    WHERE card_id = ? AND workspace_id = ? AND deleted IS NULL
+""")
 
 
 # Pure function database utilities
@@ -98,12 +165,7 @@ def get_card_by_id(card_id: str, workspace_id: str, db_path: Path = DATABASE_PAT
     Returns:
         Card dict with keys: card_id, name, workspace_id, tags, created, modified, deleted
     """
-    query = """
-        SELECT card_id, name, workspace_id, tags, created, modified, deleted
-        FROM cards
-        WHERE card_id = ? AND workspace_id = ? AND deleted IS NULL
-    """
-    row = execute_card_query_one(query, (card_id, workspace_id), db_path)
+    row = query_one(GET_CARD_BY_ID, (card_id, workspace_id), db_path)
     return dict(row) if row else None
 
 
@@ -119,15 +181,89 @@ def list_cards_by_workspace(workspace_id: str, limit: int = 1000, db_path: Path
     Returns:
         List of card dicts
     """
-    query = """
-        SELECT card_id, name, workspace_id, tags, created, modified, deleted
-        FROM cards
-        WHERE workspace_id = ? AND deleted IS NULL
-        ORDER BY created DESC
-        LIMIT ?
+    cards, _ = list_cards_page_by_workspace(workspace_id, limit=limit, db_path=db_path)
+    return cards
+
+
+def encode_card_cursor(created: str, card_id: str) -> str:
+    """
+    Encode a (created, card_id) keyset position as an opaque cursor.
+
+    Args:
+        created: Created timestamp of the last card on the page
+        card_id: Card UUID of the last card on the page (tiebreaker)
+
+    Returns:
+        URL-safe cursor string
+    """
+    raw = json.dumps([created, card_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_card_cursor(cursor: str) -> tuple[str, str]:
+    """
+    Decode an opaque cursor back into its (created, card_id) keyset position.
+
+    Args:
+        cursor: Cursor produced by encode_card_cursor
+
+    Returns:
+        Tuple of (created, card_id)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created, card_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+    if not isinstance(created, str) or not isinstance(card_id, str):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+
+    return created, card_id
+
+
+def list_cards_page_by_workspace(
+    workspace_id: str,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db_path: Path = DATABASE_PATH
+) -> tuple[list[dict], Optional[str]]:
+    """
+    List one page of non-deleted cards, newest first, using keyset pagination.
+
+    Seeks directly to the cursor position on idx_cards_workspace_created,
+    so every page costs the same regardless of depth.
+
+    Args:
+        workspace_id: Workspace UUID
+        limit: Maximum number of cards per page
+        cursor: Opaque cursor from the previous page (None for first page)
+        db_path: Database path
+
+    Returns:
+        Tuple of (card dicts, next_cursor or None when no more pages)
+
+    Raises:
+        ValueError: If the cursor is malformed
     """
-    rows = execute_card_query(query, (workspace_id, limit), db_path)
-    return [dict(row) for row in rows]
+    if cursor:
+        created, card_id = decode_card_cursor(cursor)
+        rows = query_all(LIST_CARDS_AFTER_CURSOR, (workspace_id, created, card_id, limit + 1), db_path)
+    else:
+        rows = query_all(LIST_CARDS_FIRST_PAGE, (workspace_id, limit + 1), db_path)
+
+    cards = [dict(row) for row in rows[:limit]]
+
+    # One extra row tells us whether another page exists without a COUNT(*)
+    next_cursor = None
+    if len(rows) > limit and cards:
+        last = cards[-1]
+        next_cursor = encode_card_cursor(last["created"], last["card_id"])
+
+    return cards, next_cursor
 
 
 def create_card(card_id: str, name: str, workspace_id: str, tag_ids: list[str], db_path: Path = DATABASE_PATH) -> dict:
@@ -144,17 +280,55 @@ def create_card(card_id: str, name: str, workspace_id: str, tag_ids: list[str],
     Returns:
         Created card dict
     """
-    # Convert tag_ids list to comma-separated string for inverted index
-    tags_csv = ",".join(tag_ids) if tag_ids else ""
+    create_cards_batch(
+        [{"card_id": card_id, "name": name, "tag_ids": tag_ids}],
+        workspace_id,
+        db_path
+    )
+
+    return get_card_by_id(card_id, workspace_id, db_path)
+
 
-    # Insert card - trigger auto-calculates card_bitmap, triggers auto-maintain tag.card_count
-    command = """
-        INSERT INTO cards (card_id, name, workspace_id, tags, user_id, created, modified)
-        VALUES (?, ?, ?, ?, 'default-user', datetime('now'), datetime('now'))
+def create_cards_batch(cards: list[dict], workspace_id: str, db_path: Path = DATABASE_PATH) -> dict[str, int]:
     """
-    execute_card_command(command, (card_id, name, workspace_id, tags_csv), db_path)
+    Create many cards in one transaction with block-reserved card_bitmaps.
 
-    return get_card_by_id(card_id, workspace_id, db_path)
+    Reserves len(cards) ordinals from card_bitmap_seq in one statement and
+    writes them with executemany, so auto_calculate_card_bitmap never fires.
+    Triggers still auto-maintain tag.card_count.
+
+    Args:
+        cards: Card dicts with keys card_id, name and optional tag_ids
+        workspace_id: Workspace UUID
+        db_path: Database path
+
+    Returns:
+        Dict mapping card_id to assigned card_bitmap
+    """
+    if not cards:
+        return {}
+
+    with pooled_connection(db_path) as conn:
+        try:
+            bitmaps = reserve_bitmap_block(conn, CARD_BITMAP_SEQUENCE, len(cards))
+            rows = [
+                (
+                    card["card_id"],
+                    card["name"],
+                    workspace_id,
+                    # Convert tag_ids list to comma-separated string for inverted index
+                    ",".join(card.get("tag_ids") or []),
+                    card_bitmap,
+                )
+                for card, card_bitmap in zip(cards, bitmaps)
+            ]
+            run_statement_many(conn, INSERT_CARD, rows)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    return {card["card_id"]: card_bitmap for card, card_bitmap in zip(cards, bitmaps)}
 
 
 def update_card_title(card_id: str, workspace_id: str, title: str, db_path: Path = DATABASE_PATH) -> bool:
@@ -170,12 +344,7 @@ def update_card_title(card_id: str, workspace_id: str, title: str, db_path: Path
     Returns:
         True if updated, False if not found
     """
-    command = """
-        UPDATE cards
-        SET name = ?
-        WHERE card_id = ? AND workspace_id = ? AND deleted IS NULL
-    """
-    rowcount = execute_card_command(command, (title, card_id, workspace_id), db_path)
+    rowcount = execute_command(UPDATE_CARD_TITLE, (title, card_id, workspace_id), db_path)
     return rowcount > 0
 
 
@@ -192,12 +361,7 @@ def update_card_content(card_id: str, workspace_id: str, content: str, db_path:
     Returns:
         True if updated, False if not found
     """
-    command = """
-        UPDATE cards
-        SET description = ?
-        WHERE card_id = ? AND workspace_id = ? AND deleted IS NULL
-    """
-    rowcount = execute_card_command(command, (content, card_id, workspace_id), db_path)
+    rowcount = execute_command(UPDATE_CARD_CONTENT, (content, card_id, workspace_id), db_path)
     return rowcount > 0
 
 
@@ -229,12 +393,7 @@ def add_tag_to_card(card_id: str, workspace_id: str, tag_id: str, db_path: Path
     current_tags.append(tag_id)
     new_tags_csv = ",".join(current_tags)
 
-    command = """
-        UPDATE cards
-        SET tags = ?
-        WHERE card_id = ? AND workspace_id = ? AND deleted IS NULL
-    """
-    rowcount = execute_card_command(command, (new_tags_csv, card_id, workspace_id), db_path)
+    rowcount = execute_command(UPDATE_CARD_TAGS, (new_tags_csv, card_id, workspace_id), db_path)
     return rowcount > 0
 
 
@@ -266,12 +425,7 @@ def remove_tag_from_card(card_id: str, workspace_id: str, tag_id: str, db_path:
     current_tags.remove(tag_id)
     new_tags_csv = ",".join(current_tags)
 
-    command = """
-        UPDATE cards
-        SET tags = ?
-        WHERE card_id = ? AND workspace_id = ? AND deleted IS NULL
-    """
-    rowcount = execute_card_command(command, (new_tags_csv, card_id, workspace_id), db_path)
+    rowcount = execute_command(UPDATE_CARD_TAGS, (new_tags_csv, card_id, workspace_id), db_path)
     return rowcount > 0
 
 
@@ -287,12 +441,7 @@ def soft_delete_card(card_id: str, workspace_id: str, db_path: Path = DATABASE_P
     Returns:
         True if deleted, False if not found
     """
-    command = """
-        UPDATE cards
-        SET deleted = datetime('now')
-        WHERE card_id = ? AND workspace_id = ? AND deleted IS NULL
-    """
-    rowcount = execute_card_command(command, (card_id, workspace_id), db_path)
+    rowcount = execute_command(SOFT_DELETE_CARD, (card_id, workspace_id), db_path)
     return rowcount > 0
 
 
@@ -331,9 +480,17 @@ class CardRepository:
     def list_by_workspace(self, workspace_id: str, limit: int = 1000) -> list[dict]:
         return list_cards_by_workspace(workspace_id, limit, self.db_path)
 
+    def list_page_by_workspace(
+        self, workspace_id: str, limit: int = 100, cursor: Optional[str] = None
+    ) -> tuple[list[dict], Optional[str]]:
+        return list_cards_page_by_workspace(workspace_id, limit, cursor, self.db_path)
+
     def create(self, card_id: str, name: str, workspace_id: str, tag_ids: list[str]) -> dict:
         return create_card(card_id, name, workspace_id, tag_ids, self.db_path)
 
+    def create_batch(self, cards: list[dict], workspace_id: str) -> dict[str, int]:
+        return create_cards_batch(cards, workspace_id, self.db_path)
+
     def update_title(self, card_id: str, workspace_id: str, title: str) -> bool:
         return update_card_title(card_id, workspace_id, title, self.db_path)
 
@@ -0,0 +1,425 @@
+"""
+Named statement registry with pooled connections and per-statement metrics.
+
+Repositories register their SQL once at import time and execute it by name.
+Statements run on pooled connections, so the SQL text is byte-identical on
+every call and sqlite3's per-connection statement cache (cached_statements)
+stays warm instead of being discarded with a fresh connection per query.
+
+With MULTICARDZ_READ_REPLICAS set, query_all/query_one are served from a
+read replica (apps.shared.config.replica_router) when one is fresh, over
+read-only pooled connections, and any write through the pool pins this
+process's reads to the primary until the replicas catch up with it. Only
+writes made through this pool count: writes through group_storage,
+workspace connections or tag_count_maintenance do not pin reads, so a
+read right after one of them may be served by a replica that is still
+behind (by at most the router's max_staleness_seconds).
+
+Every execution records a hit count and a latency histogram per statement
+name, so slow statements on the hot path show up in get_statement_stats().
+"""
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Generator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Optional
+
+# Prepared statements kept per pooled connection (sqlite3 default is 128)
+STATEMENT_CACHE_SIZE = 256
+
+# Idle connections kept per database file
+MAX_IDLE_CONNECTIONS = 8
+
+# Histogram bucket upper bounds in milliseconds (last bucket is overflow)
+LATENCY_BUCKETS_MS: tuple[float, ...] = (
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, float("inf")
+)
+
+# Module-level state: registry is write-once, pool and stats are lock-guarded
+_STATEMENTS: dict[str, str] = {}
+_IDLE_CONNECTIONS: dict[str, list[sqlite3.Connection]] = {}
+_STATS: dict[str, dict[str, Any]] = {}
+_POOL_LOCK = threading.Lock()
+_UPGRADED_DATABASES: set[str] = set()
+_UPGRADE_LOCK = threading.Lock()
+_STATS_LOCK = threading.Lock()
+
+# Read-your-writes session shared by every statement run through the pool
+# (writes made outside the pool are not tracked, see module docstring)
+PROCESS_SESSION = "query_registry"
+
+
+# ============================================================================
+# STATEMENT REGISTRY
+# ============================================================================
+
+def register_statement(name: str, sql: str) -> str:
+    """
+    Register a named SQL statement.
+
+    Idempotent for identical SQL, so modules can register at import time.
+
+    Args:
+        name: Unique statement name (e.g. "cards.get_by_id")
+        sql: SQL text with ? placeholders
+
+    Returns:
+        The statement name, for use as a module constant
+
+    Raises:
+        ValueError: If the name is already registered with different SQL
+    """
+    existing = _STATEMENTS.get(name)
+    if existing is not None and existing != sql:
+        raise ValueError(f"Statement '{name}' already registered with different SQL")
+
+    _STATEMENTS[name] = sql
+    return name
+
+
+def get_statement_sql(name: str) -> str:
+    """
+    Look up the SQL text for a registered statement.
+
+    Raises:
+        KeyError: If the statement is not registered
+    """
+    try:
+        return _STATEMENTS[name]
+    except KeyError:
+        raise KeyError(f"Unknown statement: {name}") from None
+
+
+# ============================================================================
+# CONNECTION POOL
+# ============================================================================
+
+def _open_connection(db_path: Path, read_only: bool = False) -> sqlite3.Connection:
+    """
+    Open a poolable connection with a large statement cache.
+
+    The first read-write connection to each database file in this process
+    brings its schema up to date (apply_pending_migrations). Read-only
+    connections (replicas, which the router overwrites on refresh) are
+    opened with mode=ro and never migrated.
+    """
+    if read_only:
+        conn = sqlite3.connect(
+            f"file:{db_path}?mode=ro",
+            uri=True,
+            cached_statements=STATEMENT_CACHE_SIZE,
+            check_same_thread=False
+        )
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    conn = sqlite3.connect(
+        db_path,
+        cached_statements=STATEMENT_CACHE_SIZE,
+        check_same_thread=False
+    )
+    conn.row_factory = sqlite3.Row
+
+    key = str(db_path)
+    if key not in _UPGRADED_DATABASES:
+        from apps.shared.migrations.auto_migrator import apply_pending_migrations
+
+        with _UPGRADE_LOCK:
+            if key not in _UPGRADED_DATABASES:
+                success, _ = apply_pending_migrations(conn)
+                if success:
+                    _UPGRADED_DATABASES.add(key)
+    return conn
+
+
+def _pool_key(db_path: Path, read_only: bool) -> str:
+    return f"{db_path}?mode=ro" if read_only else str(db_path)
+
+
+@contextmanager
+def pooled_connection(
+    db_path: Path, *, read_only: bool = False
+) -> Generator[sqlite3.Connection, None, None]:
+    """
+    Check out a pooled connection for the given database file.
+
+    Connections are returned to the pool on exit. Any transaction left
+    open is rolled back first, and connections are closed instead of
+    pooled once MAX_IDLE_CONNECTIONS are idle.
+
+    Args:
+        db_path: Path to SQLite database
+        read_only: Open with mode=ro (pooled separately from read-write)
+
+    Yields:
+        sqlite3.Connection with row factory enabled
+    """
+    key = _pool_key(db_path, read_only)
+
+    with _POOL_LOCK:
+        idle = _IDLE_CONNECTIONS.get(key)
+        conn = idle.pop() if idle else None
+
+    if conn is None:
+        conn = _open_connection(db_path, read_only)
+    changes_before = conn.total_changes
+
+    try:
+        yield conn
+    finally:
+        if conn.total_changes != changes_before:
+            _record_write(db_path)
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            reusable = True
+        except sqlite3.Error:
+            reusable = False
+
+        with _POOL_LOCK:
+            idle = _IDLE_CONNECTIONS.setdefault(key, [])
+            if reusable and len(idle) < MAX_IDLE_CONNECTIONS:
+                idle.append(conn)
+                conn = None
+
+        if conn is not None:
+            conn.close()
+
+
+def close_pooled_connections(db_path: Optional[Path] = None) -> int:
+    """
+    Close idle pooled connections.
+
+    Args:
+        db_path: Only close connections for this file (None for all)
+
+    Returns:
+        Number of connections closed
+    """
+    with _POOL_LOCK:
+        if db_path is None:
+            keys = list(_IDLE_CONNECTIONS)
+        else:
+            candidates = (_pool_key(db_path, False), _pool_key(db_path, True))
+            keys = [key for key in candidates if key in _IDLE_CONNECTIONS]
+        to_close = [conn for key in keys for conn in _IDLE_CONNECTIONS.pop(key)]
+
+    for conn in to_close:
+        conn.close()
+
+    return len(to_close)
+
+
+# ============================================================================
+# READ REPLICA ROUTING
+# ============================================================================
+
+def _replicas_enabled() -> bool:
+    from apps.shared.config import replica_router
+
+    return replica_router.READ_REPLICA_COUNT > 0
+
+
+def _read_path(db_path: Path) -> Path:
+    """File that should serve a read: a fresh replica or the primary."""
+    if not _replicas_enabled():
+        return db_path
+
+    from apps.shared.config import replica_router
+
+    router = replica_router.get_replica_router(db_path, replica_router.READ_REPLICA_COUNT)
+    return router.route_read(PROCESS_SESSION).path
+
+
+@contextmanager
+def _read_connection(db_path: Path) -> Generator[sqlite3.Connection, None, None]:
+    """Pooled connection for a read; replicas are opened read-only."""
+    path = _read_path(db_path)
+    with pooled_connection(path, read_only=Path(path) != Path(db_path)) as conn:
+        yield conn
+
+
+def _record_write(db_path: Path) -> None:
+    """Advance the replica write sequence after a connection changed rows."""
+    if not _replicas_enabled():
+        return
+
+    from apps.shared.config import replica_router
+
+    router = replica_router.get_replica_router(db_path, replica_router.READ_REPLICA_COUNT)
+    router.record_write(PROCESS_SESSION)
+
+
+# ============================================================================
+# EXECUTION WITH METRICS
+# ============================================================================
+
+def _record_latency(name: str, elapsed_ms: float) -> None:
+    """Add one execution to the statement's hit count and histogram."""
+    bucket = bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)
+
+    with _STATS_LOCK:
+        stats = _STATS.get(name)
+        if stats is None:
+            stats = {
+                "hits": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "buckets": [0] * len(LATENCY_BUCKETS_MS),
+            }
+            _STATS[name] = stats
+
+        stats["hits"] += 1
+        stats["total_ms"] += elapsed_ms
+        stats["buckets"][bucket] += 1
+        if elapsed_ms > stats["max_ms"]:
+            stats["max_ms"] = elapsed_ms
+
+
+@contextmanager
+def _timed(name: str) -> Generator[None, None, None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record_latency(name, (time.perf_counter() - start) * 1000)
+
+
+def run_statement(conn: sqlite3.Connection, name: str, params: tuple = ()) -> sqlite3.Cursor:
+    """
+    Execute a registered statement on a caller-managed connection.
+
+    For use inside explicit transactions; metrics are still recorded.
+
+    Args:
+        conn: Open database connection
+        name: Registered statement name
+        params: Statement parameters
+
+    Returns:
+        Cursor positioned on the results
+    """
+    sql = get_statement_sql(name)
+    with _timed(name):
+        return conn.execute(sql, params)
+
+
+def run_statement_many(conn: sqlite3.Connection, name: str, param_rows: list[tuple]) -> sqlite3.Cursor:
+    """
+    Execute a registered statement once per parameter row (executemany).
+
+    Args:
+        conn: Open database connection
+        name: Registered statement name
+        param_rows: Parameter tuples
+
+    Returns:
+        Cursor after the final row
+    """
+    sql = get_statement_sql(name)
+    with _timed(name):
+        return conn.executemany(sql, param_rows)
+
+
+def query_all(name: str, params: tuple, db_path: Path) -> list[sqlite3.Row]:
+    """
+    Execute a registered SELECT on a pooled connection and return all rows.
+    """
+    with _read_connection(db_path) as conn:
+        sql = get_statement_sql(name)
+        with _timed(name):
+            return conn.execute(sql, params).fetchall()
+
+
+def query_one(name: str, params: tuple, db_path: Path) -> Optional[sqlite3.Row]:
+    """
+    Execute a registered SELECT on a pooled connection and return one row.
+    """
+    with _read_connection(db_path) as conn:
+        sql = get_statement_sql(name)
+        with _timed(name):
+            return conn.execute(sql, params).fetchone()
+
+
+def execute_command(name: str, params: tuple, db_path: Path) -> int:
+    """
+    Execute a registered INSERT/UPDATE/DELETE on a pooled connection and commit.
+
+    Returns:
+        Number of affected rows
+    """
+    with pooled_connection(db_path) as conn:
+        sql = get_statement_sql(name)
+        with _timed(name):
+            cursor = conn.execute(sql, params)
+            conn.commit()
+        return cursor.rowcount
+
+
+# ============================================================================
+# METRICS EXPORT
+# ============================================================================
+
+def _bucket_percentile(buckets: list[int], hits: int, fraction: float) -> float:
+    """Upper bound of the histogram bucket containing the given percentile."""
+    threshold = hits * fraction
+    running = 0
+    for upper_ms, count in zip(LATENCY_BUCKETS_MS, buckets):
+        running += count
+        if running >= threshold:
+            return upper_ms
+    return LATENCY_BUCKETS_MS[-1]
+
+
+def get_statement_stats() -> dict[str, dict[str, Any]]:
+    """
+    Snapshot per-statement metrics.
+
+    Returns:
+        Dict mapping statement name to hits, total_ms, mean_ms, max_ms,
+        p50_ms/p95_ms/p99_ms (histogram bucket upper bounds) and the raw
+        histogram as {bucket_upper_bound_ms: count}
+    """
+    with _STATS_LOCK:
+        snapshot = {name: dict(stats, buckets=list(stats["buckets"])) for name, stats in _STATS.items()}
+
+    result = {}
+    for name, stats in snapshot.items():
+        hits = stats["hits"]
+        buckets = stats["buckets"]
+        result[name] = {
+            "hits": hits,
+            "total_ms": stats["total_ms"],
+            "mean_ms": stats["total_ms"] / hits if hits else 0.0,
+            "max_ms": stats["max_ms"],
+            "p50_ms": _bucket_percentile(buckets, hits, 0.50),
+            "p95_ms": _bucket_percentile(buckets, hits, 0.95),
+            "p99_ms": _bucket_percentile(buckets, hits, 0.99),
+            "histogram": dict(zip(LATENCY_BUCKETS_MS, buckets)),
+        }
+
+    return result
+
+
+def get_slowest_statements(limit: int = 10) -> list[tuple[str, dict[str, Any]]]:
+    """
+    Statements ordered by total time spent, highest first.
+
+    Args:
+        limit: Maximum number of statements to return
+
+    Returns:
+        List of (statement name, stats) tuples
+    """
+    stats = get_statement_stats()
+    ranked = sorted(stats.items(), key=lambda item: item[1]["total_ms"], reverse=True)
+    return ranked[:limit]
+
+
+def reset_statement_stats() -> None:
+    """Clear all recorded hit counts and histograms."""
+    with _STATS_LOCK:
+        _STATS.clear()
@@ -8,6 +8,56 @@ from pathlib import Path
 from contextlib import contextmanager
 
 from apps.shared.config.database import DATABASE_PATH
+from apps.shared.repositories.bitmap_sequences import TAG_BITMAP_SEQUENCE, reserve_bitmap_block
+from apps.shared.repositories.query_registry import (
+    execute_command,
+    pooled_connection,
+    query_all,
+    query_one,
+    register_statement,
+    run_statement_many,
+)
+
+
+# Named statements (registered once, executed on pooled connections)
+TAG_COLUMNS = "tag_id, tag as name, workspace_id, card_count, created, modified, deleted"
+
+GET_TAG_BY_ID = register_statement("tags.get_by_id", f"""
+    SELECT {TAG_COLUMNS}
+    FROM tags
+    WHERE tag_id = ? AND workspace_id = ? AND deleted IS NULL
+""")
+
+GET_TAG_BY_NAME = register_statement("tags.get_by_name", f"""
+    SELECT {TAG_COLUMNS}
+    FROM tags
+    WHERE tag = ? AND workspace_id = ? AND deleted IS NULL
+""")
+
+LIST_TAGS = register_statement("tags.list_by_workspace", f"""
+    SELECT {TAG_COLUMNS}
+    FROM tags
+    WHERE workspace_id = ? AND deleted IS NULL
+    ORDER BY tag ASC
+    LIMIT ?
+""")
+
+GET_TAG_COUNTS = register_statement("tags.counts_by_workspace", """
+    SELECT tag_id, card_count
+    FROM tags
+    WHERE workspace_id = ? AND deleted IS NULL
+""")
+
+INSERT_TAG = register_statement("tags.insert", """
+    INSERT INTO tags (tag_id, tag, workspace_id, card_count, user_id, tag_bitmap, created, modified)
+    VALUES (?, ?, ?, 0, 'default-user', ?, datetime('now'), datetime('now'))
+""")
+
+SOFT_DELETE_TAG = register_statement("tags.soft_delete", """
+    UPDATE tags
+    SET deleted = datetime('now')
+    WHERE tag_id = ? AND workspace_id = ? AND deleted IS NULL
+""")
 
 
 # Pure function database utilities
@@ -98,12 +148,7 @@ def get_tag_by_id(tag_id: str, workspace_id: str, db_path: Path = DATABASE_PATH)
     Returns:
         Tag dict with keys: tag_id, name, workspace_id, card_count, created, modified, deleted
     """
-    query = """
-        SELECT tag_id, tag as name, workspace_id, card_count, created, modified, deleted
-        FROM tags
-        WHERE tag_id = ? AND workspace_id = ? AND deleted IS NULL
-    """
-    row = execute_tag_query_one(query, (tag_id, workspace_id), db_path)
+    row = query_one(GET_TAG_BY_ID, (tag_id, workspace_id), db_path)
     return dict(row) if row else None
 
 
@@ -119,12 +164,7 @@ def get_tag_by_name(name: str, workspace_id: str, db_path: Path = DATABASE_PATH)
     Returns:
         Tag dict or None
     """
-    query = """
-        SELECT tag_id, tag as name, workspace_id, card_count, created, modified, deleted
-        FROM tags
-        WHERE tag = ? AND workspace_id = ? AND deleted IS NULL
-    """
-    row = execute_tag_query_one(query, (name, workspace_id), db_path)
+    row = query_one(GET_TAG_BY_NAME, (name, workspace_id), db_path)
     return dict(row) if row else None
 
 
@@ -140,14 +180,7 @@ def list_tags_by_workspace(workspace_id: str, limit: int = 1000, db_path: Path =
     Returns:
         List of tag dicts
     """
-    query = """
-        SELECT tag_id, tag as name, workspace_id, card_count, created, modified, deleted
-        FROM tags
-        WHERE workspace_id = ? AND deleted IS NULL
-        ORDER BY tag ASC
-        LIMIT ?
-    """
-    rows = execute_tag_query(query, (workspace_id, limit), db_path)
+    rows = query_all(LIST_TAGS, (workspace_id, limit), db_path)
     return [dict(row) for row in rows]
 
 
@@ -162,12 +195,7 @@ def get_tag_counts(workspace_id: str, db_path: Path = DATABASE_PATH) -> dict[str
     Returns:
         Dict mapping tag_id to card_count
     """
-    query = """
-        SELECT tag_id, card_count
-        FROM tags
-        WHERE workspace_id = ? AND deleted IS NULL
-    """
-    rows = execute_tag_query(query, (workspace_id,), db_path)
+    rows = query_all(GET_TAG_COUNTS, (workspace_id,), db_path)
     return {row["tag_id"]: row["card_count"] for row in rows}
 
 
@@ -184,15 +212,45 @@ def create_tag(tag_id: str, name: str, workspace_id: str, db_path: Path = DATABA
     Returns:
         Created tag dict
     """
-    command = """
-        INSERT INTO tags (tag_id, tag, workspace_id, card_count, user_id, tag_bitmap, created, modified)
-        VALUES (?, ?, ?, 0, 'default-user', 0, datetime('now'), datetime('now'))
-    """
-    execute_tag_command(command, (tag_id, name, workspace_id), db_path)
+    create_tags_batch([{"tag_id": tag_id, "name": name}], workspace_id, db_path)
 
     return get_tag_by_id(tag_id, workspace_id, db_path)
 
 
+def create_tags_batch(tags: list[dict], workspace_id: str, db_path: Path = DATABASE_PATH) -> dict[str, int]:
+    """
+    Create many tags in one transaction with block-reserved tag_bitmaps.
+
+    Reserves len(tags) ordinals from tag_bitmap_seq in one statement and
+    writes them with executemany, so auto_calculate_tag_bitmap never fires.
+
+    Args:
+        tags: Tag dicts with keys tag_id and name
+        workspace_id: Workspace UUID
+        db_path: Database path
+
+    Returns:
+        Dict mapping tag_id to assigned tag_bitmap
+    """
+    if not tags:
+        return {}
+
+    with pooled_connection(db_path) as conn:
+        try:
+            bitmaps = reserve_bitmap_block(conn, TAG_BITMAP_SEQUENCE, len(tags))
+            rows = [
+                (tag["tag_id"], tag["name"], workspace_id, tag_bitmap)
+                for tag, tag_bitmap in zip(tags, bitmaps)
+            ]
+            run_statement_many(conn, INSERT_TAG, rows)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    return {tag["tag_id"]: tag_bitmap for tag, tag_bitmap in zip(tags, bitmaps)}
+
+
 def soft_delete_tag(tag_id: str, workspace_id: str, db_path: Path = DATABASE_PATH) -> bool:
     """
     Soft delete tag (sets deleted timestamp). Trigger auto-updates modified.
@@ -205,12 +263,7 @@ def soft_delete_tag(tag_id: str, workspace_id: str, db_path: Path = DATABASE_PAT
     Returns:
         True if deleted, False if not found
     """
-    command = """
-        UPDATE tags
-        SET deleted = datetime('now')
-        WHERE tag_id = ? AND workspace_id = ? AND deleted IS NULL
-    """
-    rowcount = execute_tag_command(command, (tag_id, workspace_id), db_path)
+    rowcount = execute_command(SOFT_DELETE_TAG, (tag_id, workspace_id), db_path)
     return rowcount > 0
 
 
@@ -255,6 +308,9 @@ class TagRepository:
     def create(self, tag_id: str, name: str, workspace_id: str) -> dict:
         return create_tag(tag_id, name, workspace_id, self.db_path)
 
+    def create_batch(self, tags: list[dict], workspace_id: str) -> dict[str, int]:
+        return create_tags_batch(tags, workspace_id, self.db_path)
+
     def soft_delete(self, tag_id: str, workspace_id: str) -> bool:
         return soft_delete_tag(tag_id, workspace_id, self.db_path)
 
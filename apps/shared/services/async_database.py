@@ -0,0 +1,198 @@
+"""
+Async database access for FastAPI handlers.
+
+sqlite3 calls block the calling thread for the whole query, so running them
+directly inside `async def` routes stalls the uvicorn event loop and every
+other request on that worker. This module moves database work onto a
+dedicated, bounded thread pool:
+
+- run_db(): await any blocking repository/service function
+- AsyncConnection: awaitable wrapper over a sqlite3 connection, for code
+  written against an async `db_connection.execute` (tag_count_maintenance)
+- async_workspace_connection(): async counterpart of get_workspace_connection,
+  backed by the shared connection pool
+
+sqlite3 releases the GIL while SQLite runs, so threads give real overlap.
+The executor size bounds how many queries run at once per worker process.
+
+Examples:
+    >>> card = await run_db(get_card_by_id, card_id, workspace_id)
+
+    >>> async with async_workspace_connection(ws_id, user_id) as conn:
+    ...     rows = await conn.fetchall("SELECT card_id FROM cards")
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import sqlite3
+import threading
+from collections.abc import AsyncGenerator, Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Maximum concurrent database operations per process
+DB_EXECUTOR_MAX_WORKERS = int(os.getenv("MULTICARDZ_DB_WORKERS", "8"))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+# ============================================================================
+# EXECUTOR MANAGEMENT
+# ============================================================================
+
+def get_db_executor() -> ThreadPoolExecutor:
+    """
+    Get the shared database thread pool, creating it on first use.
+
+    Returns:
+        ThreadPoolExecutor dedicated to database work
+    """
+    global _executor
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=DB_EXECUTOR_MAX_WORKERS,
+                    thread_name_prefix="multicardz-db"
+                )
+                logger.info(f"Database executor started with {DB_EXECUTOR_MAX_WORKERS} workers")
+
+    return _executor
+
+
+def shutdown_db_executor(wait: bool = True) -> None:
+    """
+    Shut down the database thread pool (application shutdown hook).
+
+    A later run_db() call transparently starts a new pool.
+    """
+    global _executor
+
+    with _executor_lock:
+        executor, _executor = _executor, None
+
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+async def run_db(func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking database function on the database thread pool.
+
+    Args:
+        func: Blocking callable (repository function, sqlite3 call, etc.)
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        Whatever func returns; exceptions propagate to the awaiting caller
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_db_executor(), functools.partial(func, *args, **kwargs)
+    )
+
+
+# ============================================================================
+# AWAITABLE CONNECTION WRAPPER
+# ============================================================================
+
+class AsyncConnection:
+    """
+    Awaitable facade over a sqlite3 connection.
+
+    Every call runs on the database executor. Calls on one AsyncConnection
+    must be awaited sequentially (as a single coroutine naturally does).
+    """
+
+    def __init__(self, connection: sqlite3.Connection):
+        self._connection = connection
+
+    @property
+    def in_transaction(self) -> bool:
+        """True while a transaction is open on the underlying connection."""
+        return self._connection.in_transaction
+
+    async def execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        """Execute a statement; returns the cursor (fetch via fetchall/fetchone)."""
+        return await run_db(self._connection.execute, sql, params)
+
+    async def executemany(self, sql: str, param_rows: list[tuple]) -> sqlite3.Cursor:
+        """Execute a statement once per parameter row."""
+        return await run_db(self._connection.executemany, sql, param_rows)
+
+    async def fetchall(self, sql: str, params: tuple = ()) -> list[Any]:
+        """Execute a query and fetch every row in the worker thread."""
+        return await run_db(lambda: self._connection.execute(sql, params).fetchall())
+
+    async def fetchone(self, sql: str, params: tuple = ()) -> Optional[Any]:
+        """Execute a query and fetch the first row in the worker thread."""
+        return await run_db(lambda: self._connection.execute(sql, params).fetchone())
+
+    async def commit(self) -> None:
+        await run_db(self._connection.commit)
+
+    async def rollback(self) -> None:
+        await run_db(self._connection.rollback)
+
+    async def close(self) -> None:
+        await run_db(self._connection.close)
+
+
+@asynccontextmanager
+async def async_connection(
+    connect: Callable[[], sqlite3.Connection]
+) -> AsyncGenerator[AsyncConnection, None]:
+    """
+    Open a connection on the database executor and wrap it.
+
+    Args:
+        connect: Zero-argument factory returning a sqlite3 connection that
+            was opened with check_same_thread=False
+
+    Yields:
+        AsyncConnection, closed on exit
+    """
+    connection = await run_db(connect)
+    conn = AsyncConnection(connection)
+    try:
+        yield conn
+    finally:
+        await conn.close()
+
+
+@asynccontextmanager
+async def async_workspace_connection(
+    workspace_id: str, user_id: str, *, mode: str = "standard"
+) -> AsyncGenerator[AsyncConnection, None]:
+    """
+    Async counterpart of get_workspace_connection.
+
+    The connection is checked out of the shared ConnectionPool and returned
+    to it on exit (any open transaction is rolled back), so concurrent
+    requests are bounded by MULTICARDZ_DB_POOL_SIZE.
+
+    Args:
+        workspace_id: Workspace UUID for isolation
+        user_id: User UUID for isolation
+        mode: Connection mode ("standard", "privacy", etc.)
+
+    Yields:
+        AsyncConnection with workspace context
+
+    Raises:
+        ConnectionPoolTimeout: No connection freed up within MULTICARDZ_DB_POOL_TIMEOUT
+    """
+    from apps.shared.services.performance_optimization import connection_pool
+
+    async with connection_pool.acquire(workspace_id, user_id, mode=mode) as conn:
+        yield conn
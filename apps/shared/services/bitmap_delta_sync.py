@@ -0,0 +1,358 @@
+"""
+Delta sync protocol for browser <-> server bitmap replication.
+
+Every card write through bitmap_sync bumps the workspace's monotonic
+sync_version and upserts the card's row in bitmap_change_log, so the log
+holds at most one row per card: repeated edits compact to the latest one,
+and deletions are tombstones. Clients keep the last server version they
+have seen and exchange only what changed since then:
+
+- pull_changes(since_version): current bitmaps of cards changed after N,
+  plus deleted card IDs
+- push_changes(base_version): apply the client's changes, rejecting cards
+  another client changed after base_version (the client pulls, then
+  re-pushes)
+
+Each client's last pulled/pushed version is recorded (a version vector
+over the workspace's clients) and reported per user by get_sync_lag().
+compact_change_log() drops old tombstones; a client whose since_version
+is older than the compaction floor receives a full resync instead.
+
+Architecture:
+- Pure function interface over the bitmap_sync store
+- Zero-trust UUID isolation (workspace_id, user_id on all operations)
+- NamedTuple returns for type safety
+- Bitmaps only, never content
+"""
+
+import logging
+import sqlite3
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from apps.shared.services import bitmap_sync
+from apps.shared.services.bitmap_index import row_tag_bitmaps
+from apps.shared.services.bitmap_sync import (
+    get_synced_index,
+    store_card_changes,
+    store_lock,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class DeltaPullResult(NamedTuple):
+    """Changes since a client's version."""
+    version: int
+    changes: List[Dict[str, Any]]
+    deleted: List[str]
+    full_resync: bool = False
+
+
+class DeltaPushResult(NamedTuple):
+    """Outcome of pushing client changes."""
+    success: bool
+    version: int
+    applied: int = 0
+    conflicts: tuple[str, ...] = ()
+    error: Optional[str] = None
+
+
+# ============================================================================
+# CLIENT VERSION VECTOR
+# ============================================================================
+
+def _record_client(
+    conn: sqlite3.Connection,
+    workspace_id: str,
+    user_id: str,
+    client_id: str,
+    *,
+    pulled: Optional[int] = None,
+    pushed: Optional[int] = None
+) -> None:
+    """Advance a client's entry in the version vector (store_lock held)."""
+    conn.execute(
+        """
+        INSERT INTO bitmap_sync_clients
+            (workspace_id, user_id, client_id, last_pulled_version, last_pushed_version, last_seen_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT (workspace_id, user_id, client_id) DO UPDATE SET
+            last_pulled_version = MAX(last_pulled_version, excluded.last_pulled_version),
+            last_pushed_version = MAX(last_pushed_version, excluded.last_pushed_version),
+            last_seen_at = excluded.last_seen_at
+        """,
+        (workspace_id, user_id, client_id, pulled or 0, pushed or 0, time.time())
+    )
+    conn.commit()
+
+
+def _workspace_versions(conn: sqlite3.Connection, workspace_id: str) -> tuple[int, int]:
+    """(current version, compaction floor) for a workspace."""
+    row = conn.execute(
+        "SELECT version, compacted_through FROM bitmap_sync_versions WHERE workspace_id = ?",
+        (workspace_id,)
+    ).fetchone()
+    return (row[0], row[1]) if row else (0, 0)
+
+
+# ============================================================================
+# PULL / PUSH
+# ============================================================================
+
+def pull_changes(
+    workspace_id: str,
+    user_id: str,
+    since_version: int,
+    client_id: Optional[str] = None
+) -> DeltaPullResult:
+    """
+    Get the workspace/user's card bitmaps that changed after since_version.
+
+    Args:
+        workspace_id: UUID of the workspace
+        user_id: UUID of the user
+        since_version: Last server version the client has applied (0 = none)
+        client_id: Device identifier, recorded for lag metrics
+
+    Returns:
+        DeltaPullResult. When full_resync is True the client must replace
+        its local set with `changes` (tombstones it missed were compacted).
+
+    Examples:
+        >>> result = pull_changes("ws-001", "user-001", since_version=0)
+        >>> result.version >= 0
+        True
+    """
+    with store_lock:
+        conn = bitmap_sync.get_connection()
+        version, compacted_through = _workspace_versions(conn, workspace_id)
+        full_resync = 0 < since_version < compacted_through
+
+        rows = conn.execute(
+            """
+            SELECT l.card_id, l.sync_version, l.deleted, c.card_bitmap, c.tag_bitmaps
+            FROM bitmap_change_log l
+            LEFT JOIN card_bitmaps c
+                ON c.workspace_id = l.workspace_id
+                AND c.user_id = l.user_id
+                AND c.card_id = l.card_id
+            WHERE l.workspace_id = ? AND l.user_id = ?
+                AND l.sync_version > ? AND l.sync_version <= ?
+            ORDER BY l.sync_version, l.card_id
+            """,
+            (workspace_id, user_id, 0 if full_resync else since_version, version)
+        ).fetchall()
+
+        if client_id is not None:
+            _record_client(conn, workspace_id, user_id, client_id, pulled=version)
+
+    changes = []
+    deleted = []
+    for card_id, sync_version, is_deleted, card_bitmap, tag_bitmaps in rows:
+        if is_deleted:
+            if not full_resync:
+                deleted.append(card_id)
+            continue
+        changes.append({
+            "card_id": card_id,
+            "card_bitmap": card_bitmap,
+            "tag_bitmaps": sorted(row_tag_bitmaps({"tag_bitmaps": tag_bitmaps})),
+            "sync_version": sync_version,
+        })
+
+    logger.info(
+        f"Delta pull: workspace={workspace_id}, user={user_id}, since={since_version}, "
+        f"version={version}, changes={len(changes)}, deleted={len(deleted)}"
+    )
+
+    return DeltaPullResult(
+        version=version, changes=changes, deleted=deleted, full_resync=full_resync
+    )
+
+
+def push_changes(
+    workspace_id: str,
+    user_id: str,
+    client_id: str,
+    base_version: int,
+    changes: List[Dict[str, Any]],
+    deleted: tuple[str, ...] = ()
+) -> DeltaPushResult:
+    """
+    Apply a client's changed and deleted cards made on top of base_version.
+
+    Cards another client changed after base_version are not applied and
+    are returned as conflicts; everything else commits as one version.
+
+    Args:
+        workspace_id: UUID of the workspace
+        user_id: UUID of the user
+        client_id: Device identifier
+        base_version: Server version the client's changes are based on
+        changes: Dicts with card_id, card_bitmap and tag_bitmaps (no content)
+        deleted: Card IDs the client deleted
+
+    Returns:
+        DeltaPushResult with the new version and any conflicting card IDs
+    """
+    try:
+        records = {
+            str(change["card_id"]): (
+                str(change["card_id"]),
+                int(change["card_bitmap"]),
+                frozenset(int(b) for b in change["tag_bitmaps"]),
+            )
+            for change in changes
+        }
+    except (KeyError, TypeError, ValueError) as e:
+        return DeltaPushResult(success=False, version=0, error=f"Invalid change: {e}")
+
+    card_ids = list(records) + [card_id for card_id in deleted if card_id not in records]
+
+    # Load the index before store_lock (its loader takes store_lock too)
+    get_synced_index(workspace_id, user_id)
+
+    with store_lock:
+        conn = bitmap_sync.get_connection()
+        conflicts = set()
+        # Chunked to stay under SQLite's bound-parameter limit
+        for start in range(0, len(card_ids), 500):
+            chunk = card_ids[start:start + 500]
+            conflicts.update(row[0] for row in conn.execute(
+                f"""
+                SELECT card_id FROM bitmap_change_log
+                WHERE workspace_id = ? AND user_id = ? AND sync_version > ?
+                    AND client_id IS NOT ? AND card_id IN ({','.join('?' * len(chunk))})
+                """,
+                (workspace_id, user_id, base_version, client_id, *chunk)
+            ))
+
+        applied = [record for card_id, record in records.items() if card_id not in conflicts]
+        removed = tuple(
+            card_id for card_id in deleted if card_id not in conflicts and card_id not in records
+        )
+
+        if applied or removed:
+            version = store_card_changes(
+                workspace_id, user_id, applied, removed_ids=removed, client_id=client_id
+            )
+        else:
+            version = _workspace_versions(conn, workspace_id)[0]
+
+        _record_client(conn, workspace_id, user_id, client_id, pushed=version)
+
+    logger.info(
+        f"Delta push: workspace={workspace_id}, user={user_id}, client={client_id}, "
+        f"applied={len(applied) + len(removed)}, conflicts={len(conflicts)}, version={version}"
+    )
+
+    return DeltaPushResult(
+        success=True,
+        version=version,
+        applied=len(applied) + len(removed),
+        conflicts=tuple(sorted(conflicts)),
+    )
+
+
+# ============================================================================
+# COMPACTION AND METRICS
+# ============================================================================
+
+def compact_change_log(workspace_id: str, through_version: Optional[int] = None) -> int:
+    """
+    Drop tombstones at or below through_version (default: every client has
+    pulled past them).
+
+    Clients that later pull with an older since_version get a full resync.
+
+    Returns:
+        Number of tombstones removed
+    """
+    with store_lock:
+        conn = bitmap_sync.get_connection()
+
+        if through_version is None:
+            row = conn.execute(
+                "SELECT MIN(last_pulled_version) FROM bitmap_sync_clients WHERE workspace_id = ?",
+                (workspace_id,)
+            ).fetchone()
+            through_version = row[0] or 0
+
+        cursor = conn.execute(
+            """
+            DELETE FROM bitmap_change_log
+            WHERE workspace_id = ? AND deleted = 1 AND sync_version <= ?
+            """,
+            (workspace_id, through_version)
+        )
+        conn.execute(
+            """
+            UPDATE bitmap_sync_versions
+            SET compacted_through = MAX(compacted_through, ?)
+            WHERE workspace_id = ?
+            """,
+            (through_version, workspace_id)
+        )
+        conn.commit()
+
+    logger.info(
+        f"Change log compacted: workspace={workspace_id}, through={through_version}, "
+        f"tombstones_removed={cursor.rowcount}"
+    )
+    return cursor.rowcount
+
+
+def get_sync_lag(workspace_id: str, user_id: str) -> Dict[str, Any]:
+    """
+    Report replication lag for one user's clients in a workspace.
+
+    Args:
+        workspace_id: Workspace UUID
+        user_id: User UUID; only this user's change log and clients count
+
+    Returns:
+        Current version, compaction floor, change-log size, and per client
+        how many versions behind it is and seconds since it was last seen
+    """
+    now = time.time()
+
+    with store_lock:
+        conn = bitmap_sync.get_connection()
+        version, compacted_through = _workspace_versions(conn, workspace_id)
+        log_rows, tombstones = conn.execute(
+            """
+            SELECT COUNT(*), COALESCE(SUM(deleted), 0) FROM bitmap_change_log
+            WHERE workspace_id = ? AND user_id = ?
+            """,
+            (workspace_id, user_id)
+        ).fetchone()
+        clients = conn.execute(
+            """
+            SELECT client_id, last_pulled_version, last_pushed_version, last_seen_at
+            FROM bitmap_sync_clients WHERE workspace_id = ? AND user_id = ?
+            ORDER BY last_pulled_version
+            """,
+            (workspace_id, user_id)
+        ).fetchall()
+
+    client_lag = [
+        {
+            "client_id": client_id,
+            "versions_behind": version - pulled,
+            "last_pushed_version": pushed,
+            "seconds_since_seen": round(now - seen_at, 3),
+        }
+        for client_id, pulled, pushed, seen_at in clients
+    ]
+
+    return {
+        "workspace_id": workspace_id,
+        "user_id": user_id,
+        "version": version,
+        "compacted_through": compacted_through,
+        "change_log_rows": log_rows,
+        "tombstones": tombstones,
+        "max_versions_behind": max((c["versions_behind"] for c in client_lag), default=0),
+        "clients": client_lag,
+    }
@@ -10,12 +10,24 @@ Architecture:
 - Zero-trust UUID enforcement (workspace_id, user_id)
 - Privacy-preserving (returns only UUIDs, never content)
 - Performance optimized (<100ms target)
+
+Filters run as bitmap algebra over the per-(workspace, user) posting index
+in bitmap_index. Without card_bitmaps they use the index loaded from the
+bitmap store and maintained by bitmap_sync; given explicit rows they index
+those rows once for the call.
 """
 
 import logging
-from typing import NamedTuple, List, Dict, Any, Set
+import time
+from typing import NamedTuple, List, Dict, Any, Optional, Set
 from dataclasses import dataclass
 
+from pyroaring import BitMap
+
+from apps.shared.services.bitmap_index import TagPostingIndex
+from apps.shared.services.bitmap_sync import get_synced_index
+from apps.shared.services.filter_expression import compile_expression, evaluate
+
 logger = logging.getLogger(__name__)
 
 
@@ -26,6 +38,7 @@ class FilterResult(NamedTuple):
     operation: str
     method: str
     performance_ms: float = 0.0
+    ordinals: Optional[BitMap] = None  # index ordinals of card_ids (bitmap_wire)
 
 
 class BitmapOperation(NamedTuple):
@@ -83,11 +96,37 @@ def filter_by_workspace_and_user(
     ]
 
 
+def resolve_tag_index(
+    workspace_id: str,
+    user_id: str,
+    card_bitmaps: Optional[List[Dict[str, Any]]] = None
+) -> TagPostingIndex:
+    """
+    Get the posting index a filter runs against.
+
+    Args:
+        workspace_id: Workspace ID (zero-trust enforcement)
+        user_id: User ID (zero-trust enforcement)
+        card_bitmaps: Explicit rows to index for this call; None uses the
+            synced index for the workspace and user
+
+    Returns:
+        TagPostingIndex holding only the workspace/user's cards
+    """
+    if card_bitmaps is None:
+        return get_synced_index(workspace_id, user_id)
+    return TagPostingIndex.from_rows(workspace_id, user_id, card_bitmaps)
+
+
+def _elapsed_ms(start: float) -> float:
+    return (time.perf_counter() - start) * 1000
+
+
 def filter_by_bitmap(
     workspace_id: str,
     user_id: str,
     tag_bitmap: int,
-    card_bitmaps: List[Dict[str, Any]]
+    card_bitmaps: Optional[List[Dict[str, Any]]] = None
 ) -> FilterResult:
     """
     Filter cards that have a specific tag bitmap.
@@ -96,7 +135,7 @@ def filter_by_bitmap(
         workspace_id: Workspace ID (zero-trust enforcement)
         user_id: User ID (zero-trust enforcement)
         tag_bitmap: Tag bitmap to match
-        card_bitmaps: List of card bitmap dictionaries
+        card_bitmaps: Card bitmap rows to filter; None uses the synced index
 
     Returns:
         FilterResult with matching card IDs
@@ -107,17 +146,12 @@ def filter_by_bitmap(
         >>> result.card_ids
         ['c1']
     """
-    # Enforce zero-trust isolation
-    isolated_bitmaps = filter_by_workspace_and_user(
-        card_bitmaps, workspace_id, user_id
-    )
+    start = time.perf_counter()
 
-    # Filter cards that have the tag bitmap
-    matching_cards = []
-    for card in isolated_bitmaps:
-        card_tag_bitmaps = parse_tag_bitmaps(card.get("tag_bitmaps", ""))
-        if tag_bitmap in card_tag_bitmaps:
-            matching_cards.append(card["card_id"])
+    # Enforce zero-trust isolation: the index holds only this tenant's cards
+    index = resolve_tag_index(workspace_id, user_id, card_bitmaps)
+    ordinals = index.match(tag_bitmap)
+    matching_cards = index.card_ids(ordinals)
 
     logger.info(
         f"Bitmap filter: workspace={workspace_id}, user={user_id}, "
@@ -128,7 +162,9 @@ def filter_by_bitmap(
         card_ids=matching_cards,
         total_matches=len(matching_cards),
         operation="MATCH",
-        method="bitmap_match"
+        method="bitmap_match",
+        performance_ms=_elapsed_ms(start),
+        ordinals=ordinals
     )
 
 
@@ -136,7 +172,7 @@ def filter_by_intersection(
     workspace_id: str,
     user_id: str,
     tag_bitmaps: List[int],
-    card_bitmaps: List[Dict[str, Any]]
+    card_bitmaps: Optional[List[Dict[str, Any]]] = None
 ) -> FilterResult:
     """
     Filter cards that have ALL specified tag bitmaps (AND operation).
@@ -145,7 +181,7 @@ def filter_by_intersection(
         workspace_id: Workspace ID (zero-trust enforcement)
         user_id: User ID (zero-trust enforcement)
         tag_bitmaps: List of tag bitmaps to intersect
-        card_bitmaps: List of card bitmap dictionaries
+        card_bitmaps: Card bitmap rows to filter; None uses the synced index
 
     Returns:
         FilterResult with matching card IDs
@@ -156,20 +192,12 @@ def filter_by_intersection(
         >>> result.card_ids
         ['c1']
     """
-    # Enforce zero-trust isolation
-    isolated_bitmaps = filter_by_workspace_and_user(
-        card_bitmaps, workspace_id, user_id
-    )
-
-    # Convert to set for intersection operation
-    required_tags = set(tag_bitmaps)
+    start = time.perf_counter()
 
-    # Filter cards that have ALL required tags
-    matching_cards = []
-    for card in isolated_bitmaps:
-        card_tag_bitmaps = parse_tag_bitmaps(card.get("tag_bitmaps", ""))
-        if required_tags.issubset(card_tag_bitmaps):
-            matching_cards.append(card["card_id"])
+    # Enforce zero-trust isolation: the index holds only this tenant's cards
+    index = resolve_tag_index(workspace_id, user_id, card_bitmaps)
+    ordinals = index.match_all(tag_bitmaps)
+    matching_cards = index.card_ids(ordinals)
 
     logger.info(
         f"Intersection filter: workspace={workspace_id}, user={user_id}, "
@@ -180,7 +208,9 @@ def filter_by_intersection(
         card_ids=matching_cards,
         total_matches=len(matching_cards),
         operation="AND",
-        method="bitmap_intersection"
+        method="bitmap_intersection",
+        performance_ms=_elapsed_ms(start),
+        ordinals=ordinals
     )
 
 
@@ -188,7 +218,7 @@ def filter_by_union(
     workspace_id: str,
     user_id: str,
     tag_bitmaps: List[int],
-    card_bitmaps: List[Dict[str, Any]]
+    card_bitmaps: Optional[List[Dict[str, Any]]] = None
 ) -> FilterResult:
     """
     Filter cards that have ANY of the specified tag bitmaps (OR operation).
@@ -197,7 +227,7 @@ def filter_by_union(
         workspace_id: Workspace ID (zero-trust enforcement)
         user_id: User ID (zero-trust enforcement)
         tag_bitmaps: List of tag bitmaps to union
-        card_bitmaps: List of card bitmap dictionaries
+        card_bitmaps: Card bitmap rows to filter; None uses the synced index
 
     Returns:
         FilterResult with matching card IDs
@@ -208,20 +238,12 @@ def filter_by_union(
         >>> result.card_ids
         ['c1']
     """
-    # Enforce zero-trust isolation
-    isolated_bitmaps = filter_by_workspace_and_user(
-        card_bitmaps, workspace_id, user_id
-    )
+    start = time.perf_counter()
 
-    # Convert to set for union operation
-    any_tags = set(tag_bitmaps)
-
-    # Filter cards that have ANY of the required tags
-    matching_cards = []
-    for card in isolated_bitmaps:
-        card_tag_bitmaps = parse_tag_bitmaps(card.get("tag_bitmaps", ""))
-        if any_tags.intersection(card_tag_bitmaps):
-            matching_cards.append(card["card_id"])
+    # Enforce zero-trust isolation: the index holds only this tenant's cards
+    index = resolve_tag_index(workspace_id, user_id, card_bitmaps)
+    ordinals = index.match_any(tag_bitmaps)
+    matching_cards = index.card_ids(ordinals)
 
     logger.info(
         f"Union filter: workspace={workspace_id}, user={user_id}, "
@@ -232,7 +254,9 @@ def filter_by_union(
         card_ids=matching_cards,
         total_matches=len(matching_cards),
         operation="OR",
-        method="bitmap_union"
+        method="bitmap_union",
+        performance_ms=_elapsed_ms(start),
+        ordinals=ordinals
     )
 
 
@@ -241,7 +265,7 @@ def filter_by_exclusion(
     user_id: str,
     include_bitmap: int,
     exclude_bitmap: int,
-    card_bitmaps: List[Dict[str, Any]]
+    card_bitmaps: Optional[List[Dict[str, Any]]] = None
 ) -> FilterResult:
     """
     Filter cards that have include_bitmap but NOT exclude_bitmap (NOT operation).
@@ -251,7 +275,7 @@ def filter_by_exclusion(
         user_id: User ID (zero-trust enforcement)
         include_bitmap: Tag bitmap to include
         exclude_bitmap: Tag bitmap to exclude
-        card_bitmaps: List of card bitmap dictionaries
+        card_bitmaps: Card bitmap rows to filter; None uses the synced index
 
     Returns:
         FilterResult with matching card IDs
@@ -262,17 +286,12 @@ def filter_by_exclusion(
         >>> result.card_ids
         ['c1']
     """
-    # Enforce zero-trust isolation
-    isolated_bitmaps = filter_by_workspace_and_user(
-        card_bitmaps, workspace_id, user_id
-    )
+    start = time.perf_counter()
 
-    # Filter cards that have include but not exclude
-    matching_cards = []
-    for card in isolated_bitmaps:
-        card_tag_bitmaps = parse_tag_bitmaps(card.get("tag_bitmaps", ""))
-        if include_bitmap in card_tag_bitmaps and exclude_bitmap not in card_tag_bitmaps:
-            matching_cards.append(card["card_id"])
+    # Enforce zero-trust isolation: the index holds only this tenant's cards
+    index = resolve_tag_index(workspace_id, user_id, card_bitmaps)
+    ordinals = index.match(include_bitmap) - index.match(exclude_bitmap)
+    matching_cards = index.card_ids(ordinals)
 
     logger.info(
         f"Exclusion filter: workspace={workspace_id}, user={user_id}, "
@@ -283,7 +302,9 @@ def filter_by_exclusion(
         card_ids=matching_cards,
         total_matches=len(matching_cards),
         operation="NOT",
-        method="bitmap_exclusion"
+        method="bitmap_exclusion",
+        performance_ms=_elapsed_ms(start),
+        ordinals=ordinals
     )
 
 
@@ -291,79 +312,41 @@ def filter_by_complex_expression(
     workspace_id: str,
     user_id: str,
     filter_expression: str,
-    card_bitmaps: List[Dict[str, Any]]
+    card_bitmaps: Optional[List[Dict[str, Any]]] = None
 ) -> FilterResult:
     """
     Filter cards using complex nested expressions.
 
-    Supports expressions like: "(111 AND 222) OR (333 NOT 444)"
+    Supports arbitrarily nested AND/OR/NOT with parentheses, e.g.
+    "(111 AND 222) OR (333 NOT 444)" or "NOT (111 OR (222 AND NOT 333))".
+    The expression is compiled once (see filter_expression) and evaluated
+    in a single bitmap-algebra pass over the posting index.
 
     Args:
         workspace_id: Workspace ID (zero-trust enforcement)
         user_id: User ID (zero-trust enforcement)
         filter_expression: Complex filter expression
-        card_bitmaps: List of card bitmap dictionaries
+        card_bitmaps: Card bitmap rows to filter; None uses the synced index
 
     Returns:
         FilterResult with matching card IDs
 
+    Raises:
+        ValueError: If the expression is malformed
+
     Example:
         >>> bitmaps = [{"card_id": "c1", "workspace_id": "ws-1", "user_id": "u1", "tag_bitmaps": "111,222"}]
         >>> result = filter_by_complex_expression("ws-1", "u1", "(111 AND 222) OR (333 NOT 444)", bitmaps)
         >>> result.card_ids
         ['c1']
     """
-    # Enforce zero-trust isolation
-    isolated_bitmaps = filter_by_workspace_and_user(
-        card_bitmaps, workspace_id, user_id
-    )
+    start = time.perf_counter()
+    expression = compile_expression(filter_expression)
 
-    # Parse the expression (simplified implementation)
-    # Example: "(111 AND 222) OR (333 NOT 444)"
-    matching_cards = set()
-
-    # Split by OR first to get main parts
-    if " OR " in filter_expression:
-        # Handle OR by evaluating sub-expressions
-        or_parts = filter_expression.split(" OR ")
-        for part in or_parts:
-            part = part.strip("()")
-            if " AND " in part:
-                # Extract numbers before and after AND
-                and_parts = part.split(" AND ")
-                tags = [int(p.strip()) for p in and_parts]
-                result = filter_by_intersection(
-                    workspace_id, user_id, tags, isolated_bitmaps
-                )
-                matching_cards.update(result.card_ids)
-            elif " NOT " in part:
-                # Extract numbers before and after NOT
-                not_parts = part.split(" NOT ")
-                if len(not_parts) == 2:
-                    include_tag = int(not_parts[0].strip())
-                    exclude_tag = int(not_parts[1].strip())
-                    result = filter_by_exclusion(
-                        workspace_id, user_id, include_tag, exclude_tag, isolated_bitmaps
-                    )
-                    matching_cards.update(result.card_ids)
-    elif " AND " in filter_expression:
-        # Simple AND without OR
-        parts = filter_expression.strip("()").split(" AND ")
-        tags = [int(p.strip()) for p in parts]
-        result = filter_by_intersection(
-            workspace_id, user_id, tags, isolated_bitmaps
-        )
-        matching_cards.update(result.card_ids)
-    elif " NOT " in filter_expression:
-        # Simple NOT without OR
-        parts = filter_expression.strip("()").split(" NOT ")
-        if len(parts) == 2:
-            include_tag = int(parts[0].strip())
-            exclude_tag = int(parts[1].strip())
-            result = filter_by_exclusion(
-                workspace_id, user_id, include_tag, exclude_tag, isolated_bitmaps
-            )
-            matching_cards.update(result.card_ids)
+    # Enforce zero-trust isolation: the index holds only this tenant's cards
+    index = resolve_tag_index(workspace_id, user_id, card_bitmaps)
+    ordinals = evaluate(expression, index)
+    matching_cards = index.card_ids(ordinals)
 
     logger.info(
         f"Complex filter: workspace={workspace_id}, user={user_id}, "
@@ -371,14 +354,16 @@ def filter_by_complex_expression(
     )
 
     return FilterResult(
-        card_ids=list(matching_cards),
+        card_ids=matching_cards,
         total_matches=len(matching_cards),
         operation="COMPLEX",
-        method="complex_expression"
+        method="complex_expression",
+        performance_ms=_elapsed_ms(start),
+        ordinals=ordinals
     )
 
 
-# Module-level line count: 350 lines (within <700 line limit)
+# Module-level line count: 369 lines (within <700 line limit)
 # Architecture compliance: ✓ Pure functions, ✓ NamedTuple, ✓ Type safety
 # Zero-trust compatible: ✓ All functions enforce workspace_id and user_id
 # Privacy-preserving: ✓ Returns only UUIDs, never content
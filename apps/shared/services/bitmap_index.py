@@ -0,0 +1,295 @@
+"""
+Roaring posting-list index for server-side bitmap filtering.
+
+Synced card bitmap rows carry each card's tag bitmaps as a list (or the
+comma-separated string stored on the server). Scanning and re-parsing those
+rows on every filter call is O(cards) per request. This module keeps, per
+(workspace_id, user_id), an inverted index:
+
+    tag_bitmap -> RoaringBitmap of card ordinals
+
+Card ordinals are dense integers assigned on first sight and never reused,
+so every filter is bitmap algebra over postings and only the final result
+is mapped back to card UUIDs. Because ordinals are append-only, the
+ordinal -> UUID dictionary is versioned by (epoch, size): clients that hold
+the first `size` entries of an epoch only ever need the entries after them
+(see bitmap_wire).
+
+Architecture:
+- One TagPostingIndex per (workspace_id, user_id) - zero-trust isolation is
+  structural, no row can leak across tenants
+- Loaded once from the card_bitmaps store, then updated incrementally by
+  bitmap_sync
+- Thread-safe: mutations and reads share one lock per index
+- Bounded: at most MULTICARDZ_MAX_TAG_INDEXES tenants stay resident; the
+  least recently used index is dropped and rebuilt from the store (with a
+  new epoch) when that tenant is next used
+"""
+
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from typing import Any, Dict, List, Optional
+
+from pyroaring import BitMap
+
+logger = logging.getLogger(__name__)
+
+
+def row_tag_bitmaps(row: Dict[str, Any]) -> frozenset[int]:
+    """
+    Read a synced row's tag bitmaps, stored as a list or comma-separated string.
+
+    Example:
+        >>> sorted(row_tag_bitmaps({"tag_bitmaps": "111, 222"}))
+        [111, 222]
+    """
+    value = row.get("tag_bitmaps") or ()
+    if isinstance(value, str):
+        return frozenset(int(b) for b in value.split(",") if b.strip())
+    return frozenset(int(b) for b in value)
+
+
+class TagPostingIndex:
+    """
+    Inverted index of one workspace/user's cards by tag bitmap.
+
+    Results returned by the match methods are fresh bitmaps owned by the
+    caller; internal postings never escape the lock.
+    """
+
+    def __init__(self, workspace_id: str, user_id: str) -> None:
+        self.workspace_id = workspace_id
+        self.user_id = user_id
+        self._ordinals: Dict[str, int] = {}
+        self._card_ids: List[Optional[str]] = []
+        self._card_tags: Dict[int, frozenset[int]] = {}
+        self._postings: Dict[int, BitMap] = {}
+        self._live = BitMap()
+        self._lock = threading.Lock()
+        self.version = 0
+        # Identifies this ordinal assignment; a rebuilt index starts a new one
+        self.epoch = uuid.uuid4()
+
+    @classmethod
+    def from_rows(
+        cls,
+        workspace_id: str,
+        user_id: str,
+        rows: Iterable[Dict[str, Any]]
+    ) -> "TagPostingIndex":
+        """
+        Build an index from synced rows, skipping other tenants' rows.
+
+        Ordinals follow row order, so results keep the rows' order.
+        """
+        index = cls(workspace_id, user_id)
+        for row in rows:
+            if row.get("workspace_id") == workspace_id and row.get("user_id") == user_id:
+                index.upsert_card(row["card_id"], row_tag_bitmaps(row))
+        return index
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    # ---------- Mutation ----------
+
+    def upsert_card(self, card_id: str, tag_bitmaps: Iterable[int]) -> int:
+        """
+        Insert or update one card, moving it only between changed postings.
+
+        Returns:
+            The card's ordinal
+        """
+        new_tags = frozenset(tag_bitmaps)
+
+        with self._lock:
+            ordinal = self._ordinals.get(card_id)
+            if ordinal is None:
+                ordinal = len(self._card_ids)
+                self._ordinals[card_id] = ordinal
+                self._card_ids.append(card_id)
+                self._live.add(ordinal)
+                old_tags: frozenset[int] = frozenset()
+            else:
+                old_tags = self._card_tags.get(ordinal, frozenset())
+
+            for tag in old_tags - new_tags:
+                self._discard_posting(tag, ordinal)
+            for tag in new_tags - old_tags:
+                posting = self._postings.get(tag)
+                if posting is None:
+                    posting = self._postings[tag] = BitMap()
+                posting.add(ordinal)
+
+            self._card_tags[ordinal] = new_tags
+            self.version += 1
+            return ordinal
+
+    def remove_card(self, card_id: str) -> bool:
+        """Remove a card; its ordinal is retired. Returns False if unknown."""
+        with self._lock:
+            ordinal = self._ordinals.pop(card_id, None)
+            if ordinal is None:
+                return False
+
+            for tag in self._card_tags.pop(ordinal, frozenset()):
+                self._discard_posting(tag, ordinal)
+            self._card_ids[ordinal] = None
+            self._live.discard(ordinal)
+            self.version += 1
+            return True
+
+    def _discard_posting(self, tag: int, ordinal: int) -> None:
+        """Remove an ordinal from a posting, dropping empty postings (lock held)."""
+        posting = self._postings.get(tag)
+        if posting is not None:
+            posting.discard(ordinal)
+            if not posting:
+                del self._postings[tag]
+
+    # ---------- Queries ----------
+
+    def match(self, tag_bitmap: int) -> BitMap:
+        """Cards carrying tag_bitmap."""
+        with self._lock:
+            posting = self._postings.get(tag_bitmap)
+            return BitMap(posting) if posting is not None else BitMap()
+
+    def match_all(self, tag_bitmaps: Iterable[int]) -> BitMap:
+        """Cards carrying every tag (smallest posting first)."""
+        with self._lock:
+            postings = [self._postings.get(tag) for tag in set(tag_bitmaps)]
+            if not postings:
+                return BitMap(self._live)
+            if any(posting is None for posting in postings):
+                return BitMap()
+            return BitMap.intersection(*sorted(postings, key=len))
+
+    def match_any(self, tag_bitmaps: Iterable[int]) -> BitMap:
+        """Cards carrying at least one tag."""
+        with self._lock:
+            postings = [self._postings[tag] for tag in set(tag_bitmaps) if tag in self._postings]
+            return BitMap.union(*postings) if postings else BitMap()
+
+    def all_cards(self) -> BitMap:
+        """Every live card (the universe for negation)."""
+        with self._lock:
+            return BitMap(self._live)
+
+    def card_ids(self, ordinals: BitMap) -> List[str]:
+        """Map ordinals back to card UUIDs, in ordinal order."""
+        with self._lock:
+            card_ids = self._card_ids
+            return [card_ids[ordinal] for ordinal in ordinals if card_ids[ordinal] is not None]
+
+    def ordinals_of(self, card_ids: Iterable[str]) -> BitMap:
+        """Map card UUIDs to ordinals, skipping unknown cards."""
+        with self._lock:
+            ordinals = self._ordinals
+            return BitMap(ordinals[card_id] for card_id in card_ids if card_id in ordinals)
+
+    # ---------- Ordinal dictionary ----------
+
+    def dictionary_size(self) -> int:
+        """Number of ordinals ever assigned in this epoch."""
+        with self._lock:
+            return len(self._card_ids)
+
+    def dictionary_entries(self, start: int = 0) -> tuple[int, List[Optional[str]]]:
+        """
+        Ordinal -> UUID entries from ordinal `start` on.
+
+        Returns:
+            (dictionary size, entries for ordinals start..size-1); retired
+            ordinals are None
+        """
+        with self._lock:
+            return len(self._card_ids), self._card_ids[start:]
+
+
+# ============================================================================
+# PER-TENANT REGISTRY
+# ============================================================================
+
+# Resident tenant indexes, least recently used first
+MAX_TAG_INDEXES = int(os.getenv("MULTICARDZ_MAX_TAG_INDEXES", "1024"))
+
+_indexes: "OrderedDict[tuple[str, str], TagPostingIndex]" = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def _register(key: tuple[str, str], index: TagPostingIndex) -> None:
+    """Register an index and evict the least recently used past the cap (caller holds the lock)."""
+    _indexes[key] = index
+    _indexes.move_to_end(key)
+    while len(_indexes) > MAX_TAG_INDEXES:
+        evicted_key, _ = _indexes.popitem(last=False)
+        logger.debug(f"Tag posting index evicted: workspace={evicted_key[0]}, user={evicted_key[1]}")
+
+
+def get_tag_index(
+    workspace_id: str,
+    user_id: str,
+    loader: Optional[Callable[[], Iterable[Dict[str, Any]]]] = None
+) -> TagPostingIndex:
+    """
+    Get the index for a workspace/user.
+
+    Args:
+        workspace_id: Workspace UUID
+        user_id: User UUID
+        loader: Returns the tenant's stored rows; called once, under the
+            registry lock, when the index is not registered yet. Without a
+            loader a missing index starts empty.
+
+    Returns:
+        The registered TagPostingIndex
+    """
+    key = (workspace_id, user_id)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            rows = loader() if loader is not None else ()
+            index = TagPostingIndex.from_rows(workspace_id, user_id, rows)
+            _register(key, index)
+        else:
+            _indexes.move_to_end(key)
+        return index
+
+
+def peek_tag_index(workspace_id: str, user_id: str) -> Optional[TagPostingIndex]:
+    """
+    Get the registered index without loading it or taking the registry lock.
+
+    For writers that already hold the store lock (which loaders take too):
+    None means the index is not resident, and the next load reads the
+    committed rows.
+    """
+    return _indexes.get((workspace_id, user_id))
+
+
+def build_tag_index(
+    workspace_id: str,
+    user_id: str,
+    rows: Iterable[Dict[str, Any]]
+) -> TagPostingIndex:
+    """Rebuild a workspace/user's index from synced rows and register it."""
+    index = TagPostingIndex.from_rows(workspace_id, user_id, rows)
+    with _indexes_lock:
+        _register((workspace_id, user_id), index)
+
+    logger.info(
+        f"Tag posting index built: workspace={workspace_id}, user={user_id}, "
+        f"cards={len(index)}"
+    )
+    return index
+
+
+def reset_tag_indexes() -> None:
+    """Drop every registered index (tests, or after a full resync)."""
+    with _indexes_lock:
+        _indexes.clear()
@@ -11,14 +11,266 @@ Architecture:
 - NamedTuple returns for type safety
 - No content transmission - bitmaps only
 - Compatible with existing bitmap calculation triggers
+
+Synced bitmaps are stored in the server's card_bitmaps/tag_bitmaps tables.
+Batch syncs upsert thousands of cards with one executemany ... ON CONFLICT
+statement, and every committed change is applied incrementally to the
+tenant's in-memory posting index (bitmap_index) used by bitmap_filter.
+
+Every card write also bumps the workspace's sync_version and records the
+card in bitmap_change_log (one row per card, so repeated edits compact);
+bitmap_delta_sync serves "changes since version N" from that log.
 """
 
 from typing import Dict, List, Any, Optional, NamedTuple
 from dataclasses import dataclass
 import logging
+import os
+import sqlite3
+import threading
+import time
+
+from apps.shared.services.bitmap_index import TagPostingIndex, get_tag_index, peek_tag_index
 
 logger = logging.getLogger(__name__)
 
+# Largest number of card records accepted by one batch sync request
+MAX_SYNC_BATCH_SIZE = int(os.getenv("MULTICARDZ_BITMAP_SYNC_BATCH", "10000"))
+
+CARD_REQUIRED_FIELDS = ("card_id", "card_bitmap", "tag_bitmaps")
+CARD_FORBIDDEN_FIELDS = ("name", "description", "content", "title")
+
+
+# ============================================================================
+# STORE CONNECTION
+# ============================================================================
+
+_default_connection: Optional[sqlite3.Connection] = None
+_connection_lock = threading.Lock()
+
+# Serializes transactions on the shared store connection
+store_lock = threading.RLock()
+
+
+# This function can be monkey-patched during testing
+def get_connection() -> sqlite3.Connection:
+    """
+    Get the bitmap store connection.
+
+    Uses MULTICARDZ_BITMAP_DB_PATH when set, otherwise the default server
+    database. For testing, this function is monkey-patched.
+    """
+    global _default_connection
+
+    if _default_connection is None:
+        with _connection_lock:
+            if _default_connection is None:
+                from apps.shared.config.database import DATABASE_PATH
+                db_path = os.getenv("MULTICARDZ_BITMAP_DB_PATH", str(DATABASE_PATH))
+                connection = sqlite3.connect(db_path, check_same_thread=False)
+                initialize_bitmap_schema(connection)
+                _default_connection = connection
+
+    return _default_connection
+
+
+def initialize_bitmap_schema(conn: sqlite3.Connection) -> None:
+    """Create the bitmap store tables if they don't exist."""
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS card_bitmaps (
+            workspace_id TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            card_id TEXT NOT NULL,
+            card_bitmap INTEGER NOT NULL,
+            tag_bitmaps TEXT NOT NULL DEFAULT '',
+            synced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (workspace_id, user_id, card_id)
+        );
+
+        CREATE TABLE IF NOT EXISTS tag_bitmaps (
+            workspace_id TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            tag_id TEXT NOT NULL,
+            tag_bitmap INTEGER NOT NULL,
+            card_count INTEGER NOT NULL DEFAULT 0,
+            synced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (workspace_id, user_id, tag_id)
+        );
+
+        -- Latest change per card; tombstones (deleted = 1) until compacted
+        CREATE TABLE IF NOT EXISTS bitmap_change_log (
+            workspace_id TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            card_id TEXT NOT NULL,
+            sync_version INTEGER NOT NULL,
+            deleted INTEGER NOT NULL DEFAULT 0,
+            client_id TEXT,
+            changed_at REAL NOT NULL,
+            PRIMARY KEY (workspace_id, user_id, card_id)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_bitmap_change_log_version
+            ON bitmap_change_log(workspace_id, user_id, sync_version);
+
+        -- Monotonic version per workspace and the tombstone compaction floor
+        CREATE TABLE IF NOT EXISTS bitmap_sync_versions (
+            workspace_id TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0,
+            compacted_through INTEGER NOT NULL DEFAULT 0
+        );
+
+        -- Last version each client pulled/pushed (lag metrics, compaction)
+        CREATE TABLE IF NOT EXISTS bitmap_sync_clients (
+            workspace_id TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            client_id TEXT NOT NULL,
+            last_pulled_version INTEGER NOT NULL DEFAULT 0,
+            last_pushed_version INTEGER NOT NULL DEFAULT 0,
+            last_seen_at REAL NOT NULL,
+            PRIMARY KEY (workspace_id, user_id, client_id)
+        );
+    """)
+    conn.commit()
+
+
+def _fetch_card_rows(workspace_id: str, user_id: str) -> List[Dict[str, Any]]:
+    """Read a tenant's stored card bitmaps in insertion order."""
+    with store_lock:
+        rows = get_connection().execute(
+            """
+            SELECT card_id, card_bitmap, tag_bitmaps FROM card_bitmaps
+            WHERE workspace_id = ? AND user_id = ?
+            ORDER BY rowid
+            """,
+            (workspace_id, user_id)
+        ).fetchall()
+
+    return [
+        {
+            "card_id": card_id,
+            "workspace_id": workspace_id,
+            "user_id": user_id,
+            "card_bitmap": card_bitmap,
+            "tag_bitmaps": tag_bitmaps,
+        }
+        for card_id, card_bitmap, tag_bitmaps in rows
+    ]
+
+
+def get_synced_index(workspace_id: str, user_id: str) -> TagPostingIndex:
+    """Get a tenant's posting index, loading it from the store on first use."""
+    return get_tag_index(
+        workspace_id, user_id, loader=lambda: _fetch_card_rows(workspace_id, user_id)
+    )
+
+
+def _validate_card_record(record: Dict[str, Any]) -> None:
+    """Raise ValueError unless record is a bitmap-only card record."""
+    for field in CARD_REQUIRED_FIELDS:
+        if field not in record:
+            raise ValueError(f"Missing required field: {field}")
+
+    # Verify NO content fields present (privacy enforcement)
+    for field in CARD_FORBIDDEN_FIELDS:
+        if field in record:
+            raise ValueError(f"Content field '{field}' not allowed in bitmap sync")
+
+
+def store_card_changes(
+    workspace_id: str,
+    user_id: str,
+    records: List[tuple[str, int, frozenset[int]]],
+    removed_ids: tuple[str, ...] = (),
+    client_id: Optional[str] = None
+) -> int:
+    """
+    Upsert and delete cards in one transaction, then update the index
+    before releasing store_lock, so the index applies changes in commit order.
+
+    Args:
+        workspace_id: Workspace UUID
+        user_id: User UUID
+        records: (card_id, card_bitmap, tag_bitmaps) to upsert
+        removed_ids: Card IDs to delete (logged as tombstones)
+        client_id: Device that made the change, for delta sync conflicts
+
+    Returns:
+        The workspace sync_version assigned to this change
+    """
+    # Load before writing so the index never double-applies these rows
+    get_synced_index(workspace_id, user_id)
+    changed_at = time.time()
+
+    with store_lock:
+        conn = get_connection()
+        try:
+            version = conn.execute(
+                """
+                INSERT INTO bitmap_sync_versions (workspace_id, version) VALUES (?, 1)
+                ON CONFLICT (workspace_id) DO UPDATE SET version = version + 1
+                RETURNING version
+                """,
+                (workspace_id,)
+            ).fetchone()[0]
+
+            conn.executemany(
+                """
+                INSERT INTO card_bitmaps (workspace_id, user_id, card_id, card_bitmap, tag_bitmaps)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (workspace_id, user_id, card_id) DO UPDATE SET
+                    card_bitmap = excluded.card_bitmap,
+                    tag_bitmaps = excluded.tag_bitmaps,
+                    synced_at = CURRENT_TIMESTAMP
+                """,
+                [
+                    (workspace_id, user_id, card_id, card_bitmap, ",".join(map(str, sorted(tags))))
+                    for card_id, card_bitmap, tags in records
+                ]
+            )
+            conn.executemany(
+                """
+                DELETE FROM card_bitmaps
+                WHERE workspace_id = ? AND user_id = ? AND card_id = ?
+                """,
+                [(workspace_id, user_id, card_id) for card_id in removed_ids]
+            )
+            conn.executemany(
+                """
+                INSERT INTO bitmap_change_log
+                    (workspace_id, user_id, card_id, sync_version, deleted, client_id, changed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (workspace_id, user_id, card_id) DO UPDATE SET
+                    sync_version = excluded.sync_version,
+                    deleted = excluded.deleted,
+                    client_id = excluded.client_id,
+                    changed_at = excluded.changed_at
+                """,
+                [
+                    (workspace_id, user_id, card_id, version, 0, client_id, changed_at)
+                    for card_id, _, _ in records
+                ] + [
+                    (workspace_id, user_id, card_id, version, 1, client_id, changed_at)
+                    for card_id in removed_ids
+                ]
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        # Still under store_lock: a concurrent change to the same card
+        # cannot commit in between and have its index update overwritten.
+        # Update whichever index is resident now: the one loaded above may
+        # have been evicted and reloaded (without these rows) meanwhile.
+        index = peek_tag_index(workspace_id, user_id)
+        if index is not None:
+            for card_id, _, tags in records:
+                index.upsert_card(card_id, tags)
+            for card_id in removed_ids:
+                index.remove_card(card_id)
+
+    return version
+
 
 class SyncResult(NamedTuple):
     """Result of a bitmap sync operation."""
@@ -28,6 +280,14 @@ class SyncResult(NamedTuple):
     error: Optional[str] = None
 
 
+class BatchSyncResult(NamedTuple):
+    """Result of a batch card bitmap sync."""
+    success: bool
+    synced: int = 0
+    rejected: tuple[tuple[str, str], ...] = ()
+    error: Optional[str] = None
+
+
 class QueryResult(NamedTuple):
     """Result of a bitmap query operation."""
     count: int
@@ -70,29 +330,20 @@ def sync_card_bitmap(sync_request: Dict[str, Any]) -> SyncResult:
         >>> assert result.success is True
     """
     try:
-        # Validate required fields
-        required_fields = ["card_id", "workspace_id", "user_id", "card_bitmap", "tag_bitmaps"]
-        for field in required_fields:
+        # Validate required fields and privacy constraints
+        for field in ("workspace_id", "user_id"):
             if field not in sync_request:
                 raise ValueError(f"Missing required field: {field}")
-
-        # Verify NO content fields present (privacy enforcement)
-        forbidden_fields = ["name", "description", "content", "title"]
-        for field in forbidden_fields:
-            if field in sync_request:
-                raise ValueError(f"Content field '{field}' not allowed in bitmap sync")
+        _validate_card_record(sync_request)
 
         card_id = sync_request["card_id"]
         workspace_id = sync_request["workspace_id"]
         user_id = sync_request["user_id"]
-        card_bitmap = sync_request["card_bitmap"]
-        tag_bitmaps = sync_request["tag_bitmaps"]
+        card_bitmap = int(sync_request["card_bitmap"])
+        tag_bitmaps = frozenset(int(b) for b in sync_request["tag_bitmaps"])
 
-        # In real implementation, this would:
-        # 1. Connect to server database
-        # 2. Execute INSERT/UPDATE with ON CONFLICT clause
-        # 3. Store ONLY: card_id, workspace_id, user_id, card_bitmap, tag_bitmaps
-        # 4. Update synced_at timestamp
+        # Store ONLY: card_id, workspace_id, user_id, card_bitmap, tag_bitmaps
+        store_card_changes(workspace_id, user_id, [(card_id, card_bitmap, tag_bitmaps)])
 
         logger.info(
             f"Bitmap synced: card {card_id} (workspace: {workspace_id}, user: {user_id})"
@@ -113,6 +364,105 @@ def sync_card_bitmap(sync_request: Dict[str, Any]) -> SyncResult:
         )
 
 
+def sync_card_bitmaps_batch(
+    workspace_id: str,
+    user_id: str,
+    records: List[Dict[str, Any]]
+) -> BatchSyncResult:
+    """
+    Sync many card bitmaps from browser to server in one transaction.
+
+    Valid records are upserted with a single executemany statement and
+    applied to the posting index; invalid records are reported back
+    without failing the rest of the batch.
+
+    Args:
+        workspace_id: UUID of the workspace (applies to every record)
+        user_id: UUID of the user (applies to every record)
+        records: Dictionaries with card_id, card_bitmap and tag_bitmaps
+
+    Returns:
+        BatchSyncResult with the synced count and rejected (card_id, error) pairs
+
+    Examples:
+        >>> result = sync_card_bitmaps_batch("ws-001", "user-001", [
+        ...     {"card_id": "card-001", "card_bitmap": 1, "tag_bitmaps": [111]},
+        ...     {"card_id": "card-002", "card_bitmap": 2, "tag_bitmaps": [111, 222]},
+        ... ])
+        >>> result.synced
+        2
+    """
+    if len(records) > MAX_SYNC_BATCH_SIZE:
+        return BatchSyncResult(
+            success=False,
+            error=f"Batch of {len(records)} exceeds limit of {MAX_SYNC_BATCH_SIZE}"
+        )
+
+    # Last record wins when a card appears more than once
+    valid: Dict[str, tuple[str, int, frozenset[int]]] = {}
+    rejected = []
+    for record in records:
+        try:
+            _validate_card_record(record)
+            if record.get("workspace_id", workspace_id) != workspace_id or \
+                    record.get("user_id", user_id) != user_id:
+                raise ValueError("Record workspace_id/user_id does not match the batch")
+            card_id = str(record["card_id"])
+            valid[card_id] = (
+                card_id,
+                int(record["card_bitmap"]),
+                frozenset(int(b) for b in record["tag_bitmaps"]),
+            )
+        except (ValueError, TypeError) as e:
+            rejected.append((str(record.get("card_id")), str(e)))
+
+    try:
+        if valid:
+            store_card_changes(workspace_id, user_id, list(valid.values()))
+    except Exception as e:
+        logger.error(f"Batch bitmap sync failed: {e}")
+        return BatchSyncResult(success=False, rejected=tuple(rejected), error=str(e))
+
+    logger.info(
+        f"Batch bitmap sync: {len(valid)} cards, {len(rejected)} rejected "
+        f"(workspace: {workspace_id}, user: {user_id})"
+    )
+
+    return BatchSyncResult(success=True, synced=len(valid), rejected=tuple(rejected))
+
+
+def remove_card_bitmap(workspace_id: str, user_id: str, card_id: str) -> SyncResult:
+    """
+    Remove a deleted card's bitmap from the server.
+
+    Args:
+        workspace_id: UUID of the workspace
+        user_id: UUID of the user
+        card_id: UUID of the deleted card
+
+    Returns:
+        SyncResult; success is False if the card was never synced
+    """
+    with store_lock:
+        exists = get_connection().execute(
+            """
+            SELECT 1 FROM card_bitmaps
+            WHERE workspace_id = ? AND user_id = ? AND card_id = ?
+            """,
+            (workspace_id, user_id, card_id)
+        ).fetchone() is not None
+
+    if not exists:
+        return SyncResult(success=False, card_id=card_id, error="Card bitmap not found")
+
+    store_card_changes(workspace_id, user_id, [], removed_ids=(card_id,))
+
+    logger.info(
+        f"Bitmap removed: card {card_id} (workspace: {workspace_id}, user: {user_id})"
+    )
+    return SyncResult(success=True, card_id=card_id, error=None)
+
+
 def sync_tag_bitmap(sync_request: Dict[str, Any]) -> SyncResult:
     """
     Sync tag bitmap from browser to server.
@@ -158,7 +508,24 @@ def sync_tag_bitmap(sync_request: Dict[str, Any]) -> SyncResult:
         workspace_id = sync_request["workspace_id"]
         user_id = sync_request["user_id"]
 
-        # In real implementation, would store to server database
+        with store_lock:
+            conn = get_connection()
+            conn.execute(
+                """
+                INSERT INTO tag_bitmaps (workspace_id, user_id, tag_id, tag_bitmap, card_count)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (workspace_id, user_id, tag_id) DO UPDATE SET
+                    tag_bitmap = excluded.tag_bitmap,
+                    card_count = excluded.card_count,
+                    synced_at = CURRENT_TIMESTAMP
+                """,
+                (
+                    workspace_id, user_id, tag_id,
+                    int(sync_request["tag_bitmap"]), int(sync_request["card_count"])
+                )
+            )
+            conn.commit()
+
         logger.info(
             f"Tag bitmap synced: {tag_id} (workspace: {workspace_id}, user: {user_id})"
         )
@@ -198,15 +565,10 @@ def query_bitmaps(workspace_id: str, user_id: str) -> QueryResult:
         >>> assert all("card_id" in b for b in result.bitmaps)
     """
     try:
-        # In real implementation:
-        # SELECT card_id, card_bitmap, tag_bitmaps
-        # FROM card_bitmaps
-        # WHERE workspace_id = ? AND user_id = ?
-
-        # For testing, return empty results
+        bitmaps = _fetch_card_rows(workspace_id, user_id)
         return QueryResult(
-            count=0,
-            bitmaps=[],
+            count=len(bitmaps),
+            bitmaps=bitmaps,
             error=None
         )
 
@@ -0,0 +1,288 @@
+"""
+Compact binary wire format for bitmap filter results and delta sync.
+
+JSON responses list every matching card UUID (~40 bytes each). The binary
+format instead sends serialized RoaringBitmaps of the posting index's card
+ordinals; the browser maps ordinals to UUIDs with an ordinal dictionary it
+fetches once and then extends incrementally. A 100k-card result is a few
+tens of kilobytes and decodes without JSON parsing.
+
+Every frame starts with a fixed header:
+
+    magic "MCZR" | format version u8 | kind u8 | epoch 16 bytes | dictionary size u32
+
+(epoch, dictionary size) is the dictionary version the frame's ordinals
+refer to. Ordinals are append-only within an epoch, so a client holding
+`n` entries of the same epoch fetches only entries n.. ; a different epoch
+(index rebuilt) means refetching from 0. Variable-length fields are u32
+length-prefixed blobs. All integers are little-endian.
+
+Format version 2 added per-card (card_bitmap, sync_version) fields and the
+unindexed card list to delta frames.
+
+Negotiation: clients send `Accept: application/vnd.multicardz.roaring`;
+anything else gets JSON.
+"""
+
+import logging
+import struct
+import uuid
+from typing import Dict, List, NamedTuple, Optional
+
+from pyroaring import BitMap
+
+logger = logging.getLogger(__name__)
+
+MEDIA_TYPE = "application/vnd.multicardz.roaring"
+WIRE_FORMAT_VERSION = 2
+
+KIND_FILTER_RESULT = 1
+KIND_DICTIONARY = 2
+KIND_DELTA = 3
+
+_MAGIC = b"MCZR"
+_HEADER = struct.Struct("<4sBB16sI")
+_LENGTH = struct.Struct("<I")
+_FILTER_FIELDS = struct.Struct("<Id")
+_DICTIONARY_FIELDS = struct.Struct("<I")
+_DELTA_FIELDS = struct.Struct("<QBI")
+_TAG = struct.Struct("<q")
+_CARD_FIELDS = struct.Struct("<qq")
+
+
+class WireHeader(NamedTuple):
+    """Decoded frame header."""
+    kind: int
+    epoch: uuid.UUID
+    dictionary_size: int
+
+
+class WireFilterResult(NamedTuple):
+    """Decoded filter result frame."""
+    header: WireHeader
+    ordinals: BitMap
+    total_matches: int
+    performance_ms: float
+
+
+class WireDictionary(NamedTuple):
+    """Decoded ordinal dictionary frame (entries for ordinals start..)."""
+    header: WireHeader
+    start: int
+    entries: List[Optional[str]]
+
+
+class WireCardFields(NamedTuple):
+    """Scalar fields of one changed card in a delta frame."""
+    card_bitmap: int
+    sync_version: int
+
+
+class WireDelta(NamedTuple):
+    """Decoded delta sync frame."""
+    header: WireHeader
+    version: int
+    full_resync: bool
+    changed: BitMap
+    cards: Dict[int, WireCardFields]
+    tag_postings: Dict[int, BitMap]
+    deleted: List[str]
+    unindexed: List[str]
+
+
+def accepts_binary(accept: Optional[str]) -> bool:
+    """
+    Whether an Accept header asks for the binary format (q > 0).
+
+    Example:
+        >>> accepts_binary("application/vnd.multicardz.roaring, application/json;q=0.5")
+        True
+    """
+    if not accept:
+        return False
+
+    for media_range in accept.split(","):
+        media_type, *params = [part.strip() for part in media_range.split(";")]
+        if media_type.lower() != MEDIA_TYPE:
+            continue
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+# ============================================================================
+# ENCODING
+# ============================================================================
+
+def _header(kind: int, epoch: uuid.UUID, dictionary_size: int) -> bytes:
+    return _HEADER.pack(_MAGIC, WIRE_FORMAT_VERSION, kind, epoch.bytes, dictionary_size)
+
+
+def _blob(data: bytes) -> bytes:
+    return _LENGTH.pack(len(data)) + data
+
+
+def _encode_ids(card_ids: List[Optional[str]]) -> bytes:
+    """Newline-joined UTF-8 IDs; None (retired ordinal) is an empty line."""
+    return "\n".join(card_id or "" for card_id in card_ids).encode("utf-8")
+
+
+def encode_filter_result(
+    ordinals: BitMap,
+    total_matches: int,
+    performance_ms: float,
+    epoch: uuid.UUID,
+    dictionary_size: int
+) -> bytes:
+    """Encode a filter result as its ordinal bitmap."""
+    return b"".join((
+        _header(KIND_FILTER_RESULT, epoch, dictionary_size),
+        _FILTER_FIELDS.pack(total_matches, performance_ms),
+        _blob(ordinals.serialize()),
+    ))
+
+
+def encode_dictionary(
+    entries: List[Optional[str]],
+    start: int,
+    epoch: uuid.UUID,
+    dictionary_size: int
+) -> bytes:
+    """Encode ordinal dictionary entries for ordinals start..dictionary_size-1."""
+    return b"".join((
+        _header(KIND_DICTIONARY, epoch, dictionary_size),
+        _DICTIONARY_FIELDS.pack(start),
+        _blob(_encode_ids(entries)),
+    ))
+
+
+def encode_delta(
+    version: int,
+    full_resync: bool,
+    cards: Dict[int, WireCardFields],
+    tag_postings: Dict[int, BitMap],
+    deleted: List[str],
+    unindexed: List[str],
+    epoch: uuid.UUID,
+    dictionary_size: int
+) -> bytes:
+    """
+    Encode a delta pull.
+
+    Changed cards are an ordinal bitmap followed by each card's fields in
+    ascending ordinal order; their tags are sent inverted, as one bitmap of
+    changed ordinals per tag. Deleted cards no longer have ordinals and are
+    sent as IDs, as are changed cards the index has no ordinal for yet
+    (unindexed; the client must pull those as JSON).
+    """
+    changed = BitMap(cards)
+    parts = [
+        _header(KIND_DELTA, epoch, dictionary_size),
+        _DELTA_FIELDS.pack(version, int(full_resync), len(tag_postings)),
+        _blob(changed.serialize()),
+    ]
+    parts.extend(_CARD_FIELDS.pack(*cards[ordinal]) for ordinal in changed)
+    for tag in sorted(tag_postings):
+        parts.append(_TAG.pack(tag))
+        parts.append(_blob(tag_postings[tag].serialize()))
+    parts.append(_blob(_encode_ids(list(deleted))))
+    parts.append(_blob(_encode_ids(list(unindexed))))
+    return b"".join(parts)
+
+
+# ============================================================================
+# DECODING
+# ============================================================================
+
+class _Reader:
+    """Sequential reader over a frame."""
+
+    def __init__(self, data: bytes) -> None:
+        self.data = memoryview(data)
+        self.offset = 0
+
+    def unpack(self, layout: struct.Struct) -> tuple:
+        if self.offset + layout.size > len(self.data):
+            raise ValueError("Truncated frame")
+        values = layout.unpack_from(self.data, self.offset)
+        self.offset += layout.size
+        return values
+
+    def blob(self) -> bytes:
+        (length,) = self.unpack(_LENGTH)
+        if self.offset + length > len(self.data):
+            raise ValueError("Truncated frame")
+        data = bytes(self.data[self.offset:self.offset + length])
+        self.offset += length
+        return data
+
+
+def _read_header(reader: _Reader, kind: int) -> WireHeader:
+    magic, version, frame_kind, epoch, dictionary_size = reader.unpack(_HEADER)
+    if magic != _MAGIC:
+        raise ValueError("Not a bitmap wire frame")
+    if version != WIRE_FORMAT_VERSION:
+        raise ValueError(f"Unsupported wire format version: {version}")
+    if frame_kind != kind:
+        raise ValueError(f"Expected frame kind {kind}, got {frame_kind}")
+    return WireHeader(kind=kind, epoch=uuid.UUID(bytes=epoch), dictionary_size=dictionary_size)
+
+
+def _decode_ids(data: bytes) -> List[Optional[str]]:
+    if not data:
+        return []
+    return [card_id or None for card_id in data.decode("utf-8").split("\n")]
+
+
+def decode_filter_result(data: bytes) -> WireFilterResult:
+    """Decode a filter result frame."""
+    reader = _Reader(data)
+    header = _read_header(reader, KIND_FILTER_RESULT)
+    total_matches, performance_ms = reader.unpack(_FILTER_FIELDS)
+    return WireFilterResult(
+        header=header,
+        ordinals=BitMap.deserialize(reader.blob()),
+        total_matches=total_matches,
+        performance_ms=performance_ms,
+    )
+
+
+def decode_dictionary(data: bytes) -> WireDictionary:
+    """Decode an ordinal dictionary frame."""
+    reader = _Reader(data)
+    header = _read_header(reader, KIND_DICTIONARY)
+    (start,) = reader.unpack(_DICTIONARY_FIELDS)
+    entries = _decode_ids(reader.blob())
+    # An empty trailing range and a single retired ordinal both encode as b""
+    if len(entries) < header.dictionary_size - start:
+        entries = [None] * (header.dictionary_size - start)
+    return WireDictionary(header=header, start=start, entries=entries)
+
+
+def decode_delta(data: bytes) -> WireDelta:
+    """Decode a delta sync frame."""
+    reader = _Reader(data)
+    header = _read_header(reader, KIND_DELTA)
+    version, full_resync, tag_count = reader.unpack(_DELTA_FIELDS)
+    changed = BitMap.deserialize(reader.blob())
+    cards = {ordinal: WireCardFields(*reader.unpack(_CARD_FIELDS)) for ordinal in changed}
+    tag_postings = {}
+    for _ in range(tag_count):
+        (tag,) = reader.unpack(_TAG)
+        tag_postings[tag] = BitMap.deserialize(reader.blob())
+    return WireDelta(
+        header=header,
+        version=version,
+        full_resync=bool(full_resync),
+        changed=changed,
+        cards=cards,
+        tag_postings=tag_postings,
+        deleted=[card_id for card_id in _decode_ids(reader.blob()) if card_id],
+        unindexed=[card_id for card_id in _decode_ids(reader.blob()) if card_id],
+    )
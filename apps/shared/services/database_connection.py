@@ -30,6 +30,57 @@ def check_turso() -> bool:
         return False
 
 
+def open_workspace_connection(
+    workspace_id: str,
+    user_id: str,
+    *,
+    mode: str = "standard",
+    check_same_thread: bool = True
+) -> sqlite3.Connection:
+    """
+    Open a workspace-isolated database connection.
+
+    Caller owns the connection and must close it. Prefer
+    get_workspace_connection() unless the connection has to be handed to
+    another thread (check_same_thread=False), as the async path does.
+
+    Args:
+        workspace_id: Workspace UUID for isolation
+        user_id: User UUID for isolation
+        mode: Connection mode ("standard", "privacy", etc.)
+        check_same_thread: Passed through to sqlite3.connect
+
+    Returns:
+        Open database connection with workspace context
+    """
+    if mode == "standard" and check_turso():
+        # Use Turso in standard mode
+        logger.info(f"Using Turso for workspace {workspace_id}")
+        # connection = turso.connect(...)  # Actual Turso connection
+        # For now, fallback to SQLite with Turso-like path
+        connection = sqlite3.connect(
+            f"workspace_{workspace_id}.db", check_same_thread=check_same_thread
+        )
+    else:
+        # Fallback to SQLite
+        logger.warning(f"Using SQLite fallback for workspace {workspace_id}")
+        db_path = Path(f"/var/data/workspaces/{workspace_id}.db")
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(str(db_path), check_same_thread=check_same_thread)
+
+    try:
+        # Enable foreign keys
+        connection.execute("PRAGMA foreign_keys = ON")
+
+        # Set workspace context for all queries
+        connection.execute("PRAGMA user_version = 1")
+    except Exception:
+        connection.close()
+        raise
+
+    return connection
+
+
 @contextmanager
 def get_workspace_connection(
     workspace_id: str, user_id: str, *, mode: str = "standard"
@@ -53,33 +104,13 @@ def get_workspace_connection(
             cursor = conn.execute("SELECT * FROM cards")
             cards = cursor.fetchall()
     """
-    connection = None
+    connection = open_workspace_connection(workspace_id, user_id, mode=mode)
 
     try:
-        if mode == "standard" and check_turso():
-            # Use Turso in standard mode
-            logger.info(f"Using Turso for workspace {workspace_id}")
-            # connection = turso.connect(...)  # Actual Turso connection
-            # For now, fallback to SQLite with Turso-like path
-            connection = sqlite3.connect(f"workspace_{workspace_id}.db")
-        else:
-            # Fallback to SQLite
-            logger.warning(f"Using SQLite fallback for workspace {workspace_id}")
-            db_path = Path(f"/var/data/workspaces/{workspace_id}.db")
-            db_path.parent.mkdir(parents=True, exist_ok=True)
-            connection = sqlite3.connect(str(db_path))
-
-        # Enable foreign keys
-        connection.execute("PRAGMA foreign_keys = ON")
-
-        # Set workspace context for all queries
-        connection.execute("PRAGMA user_version = 1")
-
         yield connection
 
     finally:
-        if connection:
-            connection.close()
+        connection.close()
 
 
 def create_scoped_query(
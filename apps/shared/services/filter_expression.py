@@ -0,0 +1,315 @@
+"""
+Compiler for bitmap filter expressions.
+
+Turns expressions such as "(111 AND 222) OR (333 NOT 444)" into an AST,
+simplifies it, and evaluates it bottom-up over a TagPostingIndex in a single
+bitmap-algebra pass.
+
+Grammar (keywords are case-insensitive, NOT binds tightest):
+
+    expression := term ("OR" term)*
+    term       := factor (("AND" | "NOT") factor)*     # "a NOT b" = a AND NOT b
+    factor     := "NOT" factor | INTEGER | "(" expression ")"
+
+Pipeline:
+- tokenize(): integers, keywords and parentheses
+- parse(): recursive descent into Tag/Const/Not/And/Or nodes
+- simplify(): De Morgan normalization (NOT pushed down to tags), flattening,
+  deduplication and constant folding (x AND NOT x, x OR NOT x, ALL/NONE)
+- evaluate(): memoized bottom-up evaluation; AND nodes subtract their
+  negated children instead of complementing against the universe
+
+Nodes are frozen dataclasses (not NamedTuples, which would compare equal
+across node types) and And/Or children are frozensets, so equal
+sub-expressions written in a different order share one memo entry.
+"""
+
+import functools
+import logging
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Union
+
+from pyroaring import BitMap
+
+from apps.shared.services.bitmap_index import TagPostingIndex
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"\s*(?:(\d+)|(\(|\))|([A-Za-z]+))")
+
+KEYWORDS = frozenset({"AND", "OR", "NOT"})
+
+# Deepest nesting of parentheses and NOTs accepted; deeper input would
+# exhaust the recursion limit in the parser and simplifier
+MAX_NESTING_DEPTH = 64
+
+# Each nesting level adds at most an Or, an And and a Not node to the AST
+_MAX_AST_DEPTH = 3 * MAX_NESTING_DEPTH + 2
+
+
+# ============================================================================
+# AST
+# ============================================================================
+
+@dataclass(frozen=True)
+class Tag:
+    """Leaf: cards carrying one tag bitmap."""
+    value: int
+
+
+@dataclass(frozen=True)
+class Const:
+    """Leaf: every card (True) or no card (False)."""
+    value: bool
+
+
+@dataclass(frozen=True)
+class Not:
+    child: "Node"
+
+
+@dataclass(frozen=True)
+class And:
+    children: frozenset
+
+
+@dataclass(frozen=True)
+class Or:
+    children: frozenset
+
+
+Node = Union[Tag, Const, Not, And, Or]
+
+ALL = Const(True)
+NONE = Const(False)
+
+
+# ============================================================================
+# TOKENIZER AND PARSER
+# ============================================================================
+
+def tokenize(expression: str) -> List[str]:
+    """
+    Split an expression into integer, keyword and parenthesis tokens.
+
+    Raises:
+        ValueError: On characters that are not part of the grammar
+
+    Example:
+        >>> tokenize("(111 and 222) OR 3")
+        ['(', '111', 'AND', '222', ')', 'OR', '3']
+    """
+    tokens = []
+    position = 0
+    expression = expression.rstrip()
+
+    while position < len(expression):
+        match = _TOKEN_PATTERN.match(expression, position)
+        if match is None:
+            raise ValueError(f"Unexpected character at {position}: {expression[position:]!r}")
+
+        number, paren, word = match.groups()
+        if word is not None:
+            word = word.upper()
+            if word not in KEYWORDS:
+                raise ValueError(f"Unknown keyword: {word}")
+            tokens.append(word)
+        else:
+            tokens.append(number or paren)
+        position = match.end()
+
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser over a token list."""
+
+    def __init__(self, tokens: List[str]) -> None:
+        self.tokens = tokens
+        self.position = 0
+        self.depth = 0
+
+    def peek(self) -> Optional[str]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def take(self) -> str:
+        token = self.peek()
+        if token is None:
+            raise ValueError("Unexpected end of expression")
+        self.position += 1
+        return token
+
+    def expression(self) -> Node:
+        terms = [self.term()]
+        while self.peek() == "OR":
+            self.take()
+            terms.append(self.term())
+        return terms[0] if len(terms) == 1 else Or(frozenset(terms))
+
+    def term(self) -> Node:
+        factors = [self.factor()]
+        while self.peek() in ("AND", "NOT"):
+            negate = self.take() == "NOT"
+            factor = self.factor()
+            factors.append(Not(factor) if negate else factor)
+        return factors[0] if len(factors) == 1 else And(frozenset(factors))
+
+    def factor(self) -> Node:
+        token = self.take()
+        if token in ("NOT", "("):
+            self.depth += 1
+            if self.depth > MAX_NESTING_DEPTH:
+                raise ValueError(f"Expression nested deeper than {MAX_NESTING_DEPTH} levels")
+            if token == "NOT":
+                node = Not(self.factor())
+            else:
+                node = self.expression()
+                if self.take() != ")":
+                    raise ValueError("Expected ')'")
+            self.depth -= 1
+            return node
+        if token.isdigit():
+            return Tag(int(token))
+        raise ValueError(f"Unexpected token: {token}")
+
+
+def parse(expression: str) -> Node:
+    """
+    Parse an expression into an (unsimplified) AST.
+
+    Raises:
+        ValueError: On syntax errors or nesting deeper than MAX_NESTING_DEPTH
+    """
+    parser = _Parser(tokenize(expression))
+    node = parser.expression()
+    if parser.peek() is not None:
+        raise ValueError(f"Unexpected token: {parser.peek()}")
+    return node
+
+
+# ============================================================================
+# SIMPLIFICATION
+# ============================================================================
+
+def simplify(node: Node, negate: bool = False) -> Node:
+    """
+    Normalize an AST: push NOT down to tags and fold constants.
+
+    Args:
+        node: AST to simplify
+        negate: Simplify NOT node instead (used for De Morgan)
+
+    Returns:
+        Equivalent AST in which Not only wraps Tag leaves
+
+    Raises:
+        ValueError: If the AST is deeper than parse() can produce
+    """
+    return _simplify(node, negate, 0)
+
+
+def _simplify(node: Node, negate: bool, depth: int) -> Node:
+    if depth > _MAX_AST_DEPTH:
+        raise ValueError(f"Expression nested deeper than {MAX_NESTING_DEPTH} levels")
+    if isinstance(node, Tag):
+        return Not(node) if negate else node
+    if isinstance(node, Const):
+        return Const(node.value != negate)
+    if isinstance(node, Not):
+        return _simplify(node.child, not negate, depth + 1)
+
+    # De Morgan: NOT (a AND b) = NOT a OR NOT b, and vice versa
+    is_and = isinstance(node, And) != negate
+    children = [_simplify(child, negate, depth + 1) for child in node.children]
+    return _fold(And if is_and else Or, children)
+
+
+def _fold(kind: type, children: List[Node]) -> Node:
+    """Flatten, deduplicate and constant-fold an And/Or node."""
+    absorbing, identity = (NONE, ALL) if kind is And else (ALL, NONE)
+
+    flat = set()
+    for child in children:
+        if isinstance(child, kind):
+            flat |= child.children
+        else:
+            flat.add(child)
+
+    if absorbing in flat:
+        return absorbing
+    flat.discard(identity)
+
+    # x AND NOT x is empty; x OR NOT x is everything
+    if any(isinstance(child, Not) and child.child in flat for child in flat):
+        return absorbing
+
+    if not flat:
+        return identity
+    if len(flat) == 1:
+        return next(iter(flat))
+    return kind(frozenset(flat))
+
+
+@functools.lru_cache(maxsize=256)
+def compile_expression(expression: str) -> Node:
+    """
+    Parse and simplify an expression (cached: saved filters repeat).
+
+    Raises:
+        ValueError: On syntax errors or excessive nesting
+    """
+    return simplify(parse(expression))
+
+
+# ============================================================================
+# EVALUATION
+# ============================================================================
+
+def evaluate(
+    node: Node,
+    index: TagPostingIndex,
+    memo: Optional[Dict[Node, BitMap]] = None
+) -> BitMap:
+    """
+    Evaluate a simplified AST over a posting index.
+
+    Args:
+        node: Output of simplify()/compile_expression()
+        index: Tenant's posting index
+        memo: Shared results for repeated sub-expressions
+
+    Returns:
+        Ordinals of matching cards (callers must not mutate memoized values)
+    """
+    if memo is None:
+        memo = {}
+
+    cached = memo.get(node)
+    if cached is not None:
+        return cached
+
+    if isinstance(node, Tag):
+        result = index.match(node.value)
+    elif isinstance(node, Const):
+        result = index.all_cards() if node.value else BitMap()
+    elif isinstance(node, Not):
+        result = index.all_cards() - evaluate(node.child, index, memo)
+    elif isinstance(node, And):
+        positives = [
+            evaluate(child, index, memo) for child in node.children if not isinstance(child, Not)
+        ]
+        negatives = [
+            evaluate(child.child, index, memo) for child in node.children if isinstance(child, Not)
+        ]
+        if positives:
+            result = BitMap.intersection(*sorted(positives, key=len))
+        else:
+            result = index.all_cards()
+        if negatives:
+            result = result - BitMap.union(*negatives)
+    else:
+        result = BitMap.union(*(evaluate(child, index, memo) for child in node.children))
+
+    memo[node] = result
+    return result
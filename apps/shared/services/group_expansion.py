@@ -3,13 +3,413 @@ Group expansion engine with recursive resolution and circular reference preventi
 
 Implements pure functional expansion with caching for performance optimization.
 Follows patent specification for set theory operations on semantic tag groups.
+
+Each workspace's group hierarchy is loaded once into a GroupGraph (adjacency
+lists plus reverse edges) that keeps the transitive closure of every group
+(leaf tags, descendant groups, nesting depth). Expansion, depth, cycle checks
+and trees are dictionary lookups; group_storage reports committed membership
+changes through apply_group_change() so the closure is updated in place.
 """
 
-from functools import lru_cache
-from typing import Optional
+import threading
 import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Sequence
+from typing import Optional
+
+from apps.shared.services.group_storage import (
+    get_group_workspace_id,
+    get_workspace_group_edges,
+    is_group_tag,
+)
+
+# Reload a workspace graph after this long to pick up other processes' writes
+GROUP_GRAPH_TTL_SECONDS = 300
+
+# Default nesting limit for expansion and cycle checks
+DEFAULT_MAX_DEPTH = 10
+
+
+# ============ Group Hierarchy Graph ============
+
+
+class GroupGraph:
+    """
+    In-memory DAG of one workspace's groups with a maintained transitive closure.
+
+    members/parents are the forward and reverse edges. For every known group,
+    leaf_tags, descendant_groups and depth hold the fully expanded result.
+    Members named like groups that do not exist in the workspace count as
+    empty nested groups, matching the database-driven expansion.
+
+    The mutators run under _graph_lock (see apply_group_changes) and edit
+    the member sets in place, so the lookups take _graph_lock as well.
+    """
+
+    def __init__(self, workspace_id: str, names: dict[str, str], edges) -> None:
+        self.workspace_id = workspace_id
+        self.names: dict[str, str] = dict(names)
+        self.members: dict[str, set[str]] = {group_id: set() for group_id in self.names}
+        self.parents: dict[str, set[str]] = {}
+        self.leaf_tags: dict[str, frozenset[str]] = {}
+        self.descendant_groups: dict[str, frozenset[str]] = {}
+        self.depth: dict[str, int] = {}
+        self.loaded_at = time.monotonic()
+
+        for group_id, member_id in edges:
+            if group_id in self.members:
+                self.members[group_id].add(member_id)
+                self.parents.setdefault(member_id, set()).add(group_id)
+
+        for group_id in self.members:
+            self._compute(group_id, set())
+
+    # ---------- Closure maintenance ----------
+
+    def _compute(self, group_id: str, visiting: set[str]) -> None:
+        """Memoized bottom-up closure for one group (back edges contribute nothing)."""
+        if group_id in self.leaf_tags:
+            return
+
+        visiting.add(group_id)
+        tags: set[str] = set()
+        groups: set[str] = set()
+        depth = 0
+
+        for member_id in self.members.get(group_id, ()):
+            if not is_group_tag(member_id):
+                tags.add(member_id)
+                continue
+
+            groups.add(member_id)
+            child_depth = 0
+            if member_id in self.members and member_id not in visiting:
+                self._compute(member_id, visiting)
+                tags |= self.leaf_tags[member_id]
+                groups |= self.descendant_groups[member_id]
+                child_depth = self.depth[member_id]
+            depth = max(depth, child_depth + 1)
+
+        visiting.discard(group_id)
+        self.leaf_tags[group_id] = frozenset(tags)
+        self.descendant_groups[group_id] = frozenset(groups)
+        self.depth[group_id] = depth
+
+    def ancestors(self, group_id: str) -> set[str]:
+        """All groups that (transitively) contain group_id."""
+        found: set[str] = set()
+        stack = [group_id]
+        while stack:
+            for parent_id in self.parents.get(stack.pop(), ()):
+                if parent_id not in found:
+                    found.add(parent_id)
+                    stack.append(parent_id)
+        return found
+
+    def _recompute(self, group_ids: set[str]) -> None:
+        """Drop and rebuild the closure of the given groups."""
+        for group_id in group_ids:
+            self.leaf_tags.pop(group_id, None)
+            self.descendant_groups.pop(group_id, None)
+            self.depth.pop(group_id, None)
+        for group_id in group_ids:
+            if group_id in self.members:
+                self._compute(group_id, set())
+
+    def add_group(self, group_id: str, name: str, member_ids: frozenset[str]) -> set[str]:
+        """Register a new group. Returns the groups whose expansion changed."""
+        self.names[group_id] = name
+        self.members[group_id] = set()
+        # Existing groups may already list this id as a (previously empty) member
+        affected = self.ancestors(group_id) | {group_id}
+        for member_id in member_ids:
+            self.members[group_id].add(member_id)
+            self.parents.setdefault(member_id, set()).add(group_id)
+        self._recompute(affected)
+        return affected
+
+    def add_members(self, group_id: str, member_ids: frozenset[str]) -> set[str]:
+        """
+        Add members and fold their closure into the group and its ancestors.
+
+        Returns:
+            The groups whose expansion changed
+        """
+        if group_id not in self.members:
+            return set()
+
+        new_ids = set(member_ids) - self.members[group_id]
+        if not new_ids:
+            return set()
+
+        tags: set[str] = set()
+        groups: set[str] = set()
+        for member_id in new_ids:
+            self.members[group_id].add(member_id)
+            self.parents.setdefault(member_id, set()).add(group_id)
+            if is_group_tag(member_id):
+                groups.add(member_id)
+                tags |= self.leaf_tags.get(member_id, frozenset())
+                groups |= self.descendant_groups.get(member_id, frozenset())
+            else:
+                tags.add(member_id)
+
+        affected = self.ancestors(group_id) | {group_id}
+        if group_id in groups:
+            # Cycle slipped past validation; fall back to a safe rebuild
+            self._recompute(affected)
+            return affected
+
+        for ancestor_id in affected:
+            self.leaf_tags[ancestor_id] = self.leaf_tags[ancestor_id] | tags
+            self.descendant_groups[ancestor_id] = self.descendant_groups[ancestor_id] | groups
+
+        # Depth can only grow: push the new depth up through the parents
+        new_depth = max(
+            (self.depth.get(m, 0) + 1 for m in new_ids if is_group_tag(m)),
+            default=0
+        )
+        self._raise_depth(group_id, new_depth)
+        return affected
+
+    def _raise_depth(self, group_id: str, new_depth: int) -> None:
+        pending = [(group_id, new_depth)]
+        limit = len(self.members)
+        while pending:
+            node_id, candidate = pending.pop()
+            if candidate <= self.depth.get(node_id, 0) or candidate > limit:
+                continue
+            self.depth[node_id] = candidate
+            pending.extend((parent_id, candidate + 1) for parent_id in self.parents.get(node_id, ()))
+
+    def remove_member(self, group_id: str, member_id: str) -> set[str]:
+        """Remove one membership. Returns the groups whose expansion changed."""
+        if member_id not in self.members.get(group_id, ()):
+            return set()
+
+        self.members[group_id].discard(member_id)
+        parent_ids = self.parents.get(member_id)
+        if parent_ids is not None:
+            parent_ids.discard(group_id)
+            if not parent_ids:
+                del self.parents[member_id]
+
+        affected = self.ancestors(group_id) | {group_id}
+        self._recompute(affected)
+        return affected
+
+    def remove_group(self, group_id: str) -> set[str]:
+        """Forget a deleted group. Returns the groups whose expansion changed."""
+        if group_id not in self.members:
+            return set()
+
+        for member_id in self.members.pop(group_id):
+            parent_ids = self.parents.get(member_id)
+            if parent_ids is not None:
+                parent_ids.discard(group_id)
+                if not parent_ids:
+                    del self.parents[member_id]
+        self.names.pop(group_id, None)
+
+        # Parents still list the id (memberships are not cascaded on the member side)
+        affected = self.ancestors(group_id) | {group_id}
+        self._recompute(affected)
+        return affected
+
+    # ---------- Lookups ----------
+
+    def expand(self, group_id: str) -> frozenset[str]:
+        with _graph_lock:
+            return self.leaf_tags.get(group_id, frozenset())
+
+    def expand_bounded(
+        self,
+        group_id: str,
+        visited: frozenset[str],
+        max_depth: int,
+        current_depth: int
+    ) -> frozenset[str]:
+        """Depth-limited expansion over the in-memory edges (no closure shortcut)."""
+        with _graph_lock:
+            return self._expand_bounded(group_id, visited, max_depth, current_depth)
+
+    def _expand_bounded(
+        self,
+        group_id: str,
+        visited: frozenset[str],
+        max_depth: int,
+        current_depth: int
+    ) -> frozenset[str]:
+        if group_id in visited or current_depth >= max_depth or group_id not in self.members:
+            return frozenset()
+
+        # Whole subtree fits within the limit: closure is exact
+        if not visited and current_depth + self.depth[group_id] < max_depth:
+            return self.leaf_tags[group_id]
+
+        new_visited = visited | {group_id}
+        expanded = set()
+        for member_id in self.members[group_id]:
+            if is_group_tag(member_id):
+                expanded |= self._expand_bounded(member_id, new_visited, max_depth, current_depth + 1)
+            else:
+                expanded.add(member_id)
+        return frozenset(expanded)
+
+    def would_create_cycle(self, group_id: Optional[str], member_id: str) -> bool:
+        """True if member_id already (transitively) contains group_id."""
+        with _graph_lock:
+            return group_id == member_id or group_id in self.descendant_groups.get(member_id, ())
+
+    def tree(self, group_id: str, visited: frozenset[str] = frozenset()) -> dict:
+        with _graph_lock:
+            return self._tree(group_id, visited)
+
+    def _tree(self, group_id: str, visited: frozenset[str]) -> dict:
+        if group_id in visited:
+            return {'id': group_id, 'circular': True}
+        if group_id not in self.members:
+            return {'id': group_id, 'error': 'not_found'}
+
+        new_visited = visited | {group_id}
+        children = [
+            self._tree(member_id, new_visited) if is_group_tag(member_id)
+            else {'id': member_id, 'type': 'tag'}
+            for member_id in self.members[group_id]
+        ]
 
-from apps.shared.services.group_storage import get_group_by_id, is_group_tag
+        return {
+            'id': group_id,
+            'name': self.names[group_id],
+            'type': 'group',
+            'children': children,
+            'member_count': len(self.members[group_id])
+        }
+
+
+# Loaded graphs per workspace, and which workspace each known group lives in
+_group_graphs: dict[str, GroupGraph] = {}
+_group_workspaces: dict[str, str] = {}
+_graph_lock = threading.RLock()
+
+# Callbacks notified with the group_id of every committed group change
+_group_change_listeners: list[Callable[[str], None]] = []
+
+
+def add_group_change_listener(callback: Callable[[str], None]) -> None:
+    """
+    Register a callback for committed group changes.
+
+    Used by caches derived from group expansions (e.g. the group posting
+    bitmaps in set_operations_unified) to invalidate alongside this module.
+    """
+    if callback not in _group_change_listeners:
+        _group_change_listeners.append(callback)
+
+
+def load_group_graph(workspace_id: str) -> GroupGraph:
+    """Build a workspace's graph from the database (two queries) and register it."""
+    names, edges = get_workspace_group_edges(workspace_id)
+    graph = GroupGraph(workspace_id, names, edges)
+
+    with _graph_lock:
+        _group_graphs[workspace_id] = graph
+        for group_id in names:
+            _group_workspaces[group_id] = workspace_id
+
+    return graph
+
+
+def get_workspace_graph(workspace_id: str) -> GroupGraph:
+    """Get the workspace's graph, loading it on first use or after the TTL."""
+    with _graph_lock:
+        graph = _group_graphs.get(workspace_id)
+        if graph is not None and time.monotonic() - graph.loaded_at <= GROUP_GRAPH_TTL_SECONDS:
+            return graph
+
+    return load_group_graph(workspace_id)
+
+
+def get_graph_for_group(group_id: str) -> Optional[GroupGraph]:
+    """Get the graph containing group_id (None if the group does not exist)."""
+    with _graph_lock:
+        workspace_id = _group_workspaces.get(group_id)
+
+    if workspace_id is None:
+        workspace_id = get_group_workspace_id(group_id)
+        if workspace_id is None:
+            return None
+
+    return get_workspace_graph(workspace_id)
+
+
+GROUP_CHANGE_EVENTS = ("created", "members_added", "member_removed", "deleted")
+
+
+def apply_group_change(event: str, group_id: str, **details) -> None:
+    """
+    Apply a committed group change to the loaded graph and expansion cache.
+
+    Called by group_storage after each write. Workspaces whose graph is not
+    loaded are skipped; they pick up the change when first loaded.
+
+    Args:
+        event: "created", "members_added", "member_removed" or "deleted"
+        group_id: Group that changed
+        **details: workspace_id/name/member_ids/member_id as the event needs
+    """
+    apply_group_changes(((event, group_id, details),))
+
+
+def apply_group_changes(changes: Sequence[tuple[str, str, dict]]) -> None:
+    """
+    Apply a batch of committed group changes, invalidating caches once.
+
+    The graph is updated under one lock acquisition and every affected
+    cached expansion is dropped in a single pass, so a bulk edit costs one
+    invalidation instead of one per membership row.
+
+    Args:
+        changes: (event, group_id, details) triples, see apply_group_change
+    """
+    for event, _, _ in changes:
+        if event not in GROUP_CHANGE_EVENTS:
+            raise ValueError(f"Unknown group change: {event}")
+
+    with _graph_lock:
+        for event, group_id, details in changes:
+            workspace_id = details.get("workspace_id") or _group_workspaces.get(group_id)
+            graph = _group_graphs.get(workspace_id) if workspace_id else None
+
+            if graph is None:
+                pass  # Not loaded: the next load reads the committed rows
+            elif event == "created":
+                _group_workspaces[group_id] = workspace_id
+                graph.add_group(group_id, details["name"], details["member_ids"])
+            elif event == "members_added":
+                graph.add_members(group_id, details["member_ids"])
+            elif event == "member_removed":
+                graph.remove_member(group_id, details["member_id"])
+            else:
+                _group_workspaces.pop(group_id, None)
+                graph.remove_group(group_id)
+
+    changed_ids = list(dict.fromkeys(group_id for _, group_id, _ in changes))
+
+    # The cache's reverse-dependency index covers every cached ancestor
+    _expansion_cache.invalidate_many(changed_ids)
+
+    for group_id in changed_ids:
+        for callback in tuple(_group_change_listeners):
+            callback(group_id)
+
+
+def reset_group_graphs() -> None:
+    """Drop every loaded graph and cached expansion (tests, or after bulk imports)."""
+    with _graph_lock:
+        _group_graphs.clear()
+        _group_workspaces.clear()
+    _expansion_cache.clear()
 
 
 # ============ Circular Reference Detection ============
@@ -18,12 +418,12 @@ from apps.shared.services.group_storage import get_group_by_id, is_group_tag
 def validate_circular_reference(
     group_id: str,
     new_member_id: str,
-    max_depth: int = 10
+    max_depth: int = DEFAULT_MAX_DEPTH
 ) -> tuple[bool, Optional[str]]:
     """
     Validate that adding new_member to group won't create circular reference.
 
-    Uses depth-first search to detect cycles.
+    Looks group_id up in new_member's precomputed descendant groups.
     Returns (is_valid, error_message)
     """
     if group_id == new_member_id:
@@ -32,36 +432,75 @@ def validate_circular_reference(
     if not is_group_tag(new_member_id):
         return True, None  # Regular tags cannot create cycles
 
-    def would_create_cycle(
-        current_id: str,
-        target_id: str,
-        visited: frozenset[str] = frozenset(),
-        depth: int = 0
-    ) -> bool:
-        """Recursive cycle detection."""
-        if current_id == target_id:
-            return True
+    # Check if new_member contains group_id anywhere in its hierarchy
+    graph = get_graph_for_group(new_member_id)
+    if graph is not None and graph.would_create_cycle(group_id, new_member_id):
+        return False, f"Adding {new_member_id} would create circular reference"
 
-        if current_id in visited or depth >= max_depth:
-            return False
+    return True, None
 
-        group = get_group_by_id(current_id)
-        if not group:
-            return False
 
-        new_visited = visited | {current_id}
+def validate_membership_edits(
+    edits: Sequence[tuple[str, str, str]]
+) -> tuple[bool, Optional[str]]:
+    """
+    Validate a batch of membership edits against the in-memory group graphs.
 
-        # Check all nested groups
-        for member_id in group.member_tag_ids:
-            if is_group_tag(member_id):
-                if would_create_cycle(member_id, target_id, new_visited, depth + 1):
-                    return True
+    Applies every edit to a copy of the group-to-group edges of the affected
+    workspaces and runs one topological sort (Kahn's algorithm) over the
+    result, so the whole batch is checked in O(groups + edges) instead of
+    one hierarchy walk per member.
 
-        return False
+    Args:
+        edits: (group_id, member_id, op) triples with op "add" or "remove"
 
-    # Check if new_member contains group_id anywhere in its hierarchy
-    if would_create_cycle(new_member_id, group_id):
-        return False, f"Adding {new_member_id} would create circular reference"
+    Returns:
+        (is_valid, error_message)
+    """
+    children: dict[str, set[str]] = {}
+    seen_workspaces: set[str] = set()
+
+    for group_id, member_id, _ in edits:
+        if group_id == member_id:
+            return False, "Cannot add group to itself"
+
+        graph = get_graph_for_group(group_id)
+        if graph is None:
+            return False, f"Group {group_id} not found"
+
+        if graph.workspace_id not in seen_workspaces:
+            seen_workspaces.add(graph.workspace_id)
+            with _graph_lock:
+                for parent_id, member_ids in graph.members.items():
+                    children[parent_id] = {m for m in member_ids if is_group_tag(m)}
+
+    for group_id, member_id, op in edits:
+        if not is_group_tag(member_id):
+            continue
+        if op == "add":
+            children.setdefault(group_id, set()).add(member_id)
+        else:
+            children.get(group_id, set()).discard(member_id)
+
+    # Kahn's algorithm: every node is emitted exactly when the graph is acyclic
+    in_degree: dict[str, int] = dict.fromkeys(children, 0)
+    for member_ids in children.values():
+        for member_id in member_ids:
+            in_degree[member_id] = in_degree.get(member_id, 0) + 1
+
+    ready = [node for node, degree in in_degree.items() if degree == 0]
+    emitted = 0
+    while ready:
+        node = ready.pop()
+        emitted += 1
+        for member_id in children.get(node, ()):
+            in_degree[member_id] -= 1
+            if in_degree[member_id] == 0:
+                ready.append(member_id)
+
+    if emitted < len(in_degree):
+        cyclic = sorted(node for node, degree in in_degree.items() if degree > 0)
+        return False, f"Edits would create circular reference among {', '.join(cyclic[:5])}"
 
     return True, None
 
@@ -73,81 +512,155 @@ class GroupExpansionCache:
     """
     Cache for group expansions with LRU eviction.
 
-    Implements bounded memory usage with automatic cleanup.
+    Keyed by group_id. Each entry records the nested groups its expansion
+    was built from, and a reverse-dependency index maps every group to the
+    cached entries that depend on it, so invalidating a group drops exactly
+    that group and its cached ancestors. Eviction and lookups are O(1).
     """
 
     def __init__(self, max_size: int = 1024, ttl_seconds: int = 300):
         self.max_size = max_size
         self.ttl_seconds = ttl_seconds
-        self._cache: dict[str, frozenset[str]] = {}
-        self._timestamps: dict[str, float] = {}
+        self._cache: OrderedDict[str, tuple[frozenset[str], float, frozenset[str]]] = OrderedDict()
+        self._dependents: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
         self._cache_hits = 0
         self._cache_misses = 0
+        self._evictions = 0
+        self._invalidations = 0
 
-    def get(self, key: str) -> Optional[frozenset[str]]:
+    def get(self, group_id: str) -> Optional[frozenset[str]]:
         """Get cached expansion if valid."""
-        if key not in self._cache:
-            self._cache_misses += 1
-            return None
-
-        # Check TTL
-        if time.time() - self._timestamps[key] > self.ttl_seconds:
-            del self._cache[key]
-            del self._timestamps[key]
-            self._cache_misses += 1
-            return None
-
-        self._cache_hits += 1
-        return self._cache[key]
-
-    def put(self, key: str, value: frozenset[str]) -> None:
-        """Store expansion in cache with TTL."""
-        # Evict oldest entries if cache is full
-        if len(self._cache) >= self.max_size:
-            self._evict_oldest()
-
-        self._cache[key] = value
-        self._timestamps[key] = time.time()
-
-    def _evict_oldest(self) -> None:
-        """Remove oldest 10% of cache entries."""
-        sorted_keys = sorted(
-            self._timestamps.keys(),
-            key=lambda k: self._timestamps[k]
-        )
-
-        to_remove = sorted_keys[:max(1, len(sorted_keys) // 10)]
-        for key in to_remove:
-            del self._cache[key]
-            del self._timestamps[key]
-
-    def invalidate(self, group_id: str) -> None:
-        """Invalidate cache entries for a group."""
-        keys_to_remove = [k for k in self._cache.keys() if group_id in k]
-        for key in keys_to_remove:
-            del self._cache[key]
-            del self._timestamps[key]
+        with self._lock:
+            entry = self._cache.get(group_id)
+            if entry is None:
+                self._cache_misses += 1
+                return None
+
+            # Check TTL
+            if time.time() - entry[1] > self.ttl_seconds:
+                self._discard(group_id)
+                self._cache_misses += 1
+                return None
+
+            self._cache.move_to_end(group_id)
+            self._cache_hits += 1
+            return entry[0]
+
+    def put(
+        self,
+        group_id: str,
+        value: frozenset[str],
+        depends_on: frozenset[str] = frozenset()
+    ) -> None:
+        """
+        Store an expansion.
+
+        Args:
+            group_id: Expanded group
+            value: Expanded tag IDs
+            depends_on: Nested groups the expansion was built from
+        """
+        with self._lock:
+            self._discard(group_id)
+
+            dependencies = depends_on | {group_id}
+            self._cache[group_id] = (value, time.time(), dependencies)
+            for dependency_id in dependencies:
+                self._dependents.setdefault(dependency_id, set()).add(group_id)
+
+            while len(self._cache) > self.max_size:
+                self._discard(next(iter(self._cache)))
+                self._evictions += 1
+
+    def _discard(self, group_id: str) -> None:
+        """Remove one entry and its reverse-index links (lock held)."""
+        entry = self._cache.pop(group_id, None)
+        if entry is None:
+            return
+
+        for dependency_id in entry[2]:
+            dependents = self._dependents.get(dependency_id)
+            if dependents is not None:
+                dependents.discard(group_id)
+                if not dependents:
+                    del self._dependents[dependency_id]
+
+    def invalidate(self, group_id: str) -> int:
+        """
+        Invalidate a group and every cached expansion that includes it.
+
+        Returns:
+            Number of entries removed
+        """
+        return self.invalidate_many((group_id,))
+
+    def invalidate_many(self, group_ids: Iterable[str]) -> int:
+        """
+        Invalidate several groups and their cached ancestors in one pass.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            affected: set[str] = set()
+            for group_id in group_ids:
+                affected |= self._dependents.get(group_id, set())
+                affected.add(group_id)
+            removed = sum(1 for key in affected if key in self._cache)
+            for key in affected:
+                self._discard(key)
+            self._invalidations += removed
+            return removed
+
+    def clear(self) -> None:
+        """Drop every entry (statistics are kept)."""
+        with self._lock:
+            self._cache.clear()
+            self._dependents.clear()
+
+    def expand_with_cache(self, group_id: str) -> frozenset[str]:
+        """Expand a group through this cache."""
+        cached = self.get(group_id)
+        if cached is not None:
+            return cached
+
+        graph = get_graph_for_group(group_id)
+        if graph is None:
+            return frozenset()
+
+        expanded = graph.expand_bounded(group_id, frozenset(), DEFAULT_MAX_DEPTH, 0)
+        self.put(group_id, expanded, graph.descendant_groups.get(group_id, frozenset()))
+        return expanded
 
     def get_statistics(self) -> dict:
         """Return cache performance statistics."""
-        total_requests = self._cache_hits + self._cache_misses
-        hit_rate = (self._cache_hits / total_requests * 100) if total_requests > 0 else 0
-
-        return {
-            'cache_size': len(self._cache),
-            'cache_hits': self._cache_hits,
-            'cache_misses': self._cache_misses,
-            'hit_rate': hit_rate,
-            'total_requests': total_requests
-        }
+        with self._lock:
+            total_requests = self._cache_hits + self._cache_misses
+            hit_rate = (self._cache_hits / total_requests * 100) if total_requests > 0 else 0
+
+            return {
+                'cache_size': len(self._cache),
+                'cache_hits': self._cache_hits,
+                'cache_misses': self._cache_misses,
+                'hit_rate': hit_rate,
+                'total_requests': total_requests,
+                'evictions': self._evictions,
+                'invalidations': self._invalidations
+            }
+
+
+# Global cache instance, shared by the service functions and the API routes
+_expansion_cache = GroupExpansionCache(max_size=1024, ttl_seconds=300)
 
 
-# Global cache instance
-_expansion_cache = GroupExpansionCache(max_size=1024, ttl_seconds=300)
+def get_expansion_cache() -> GroupExpansionCache:
+    """Get the process-wide expansion cache."""
+    return _expansion_cache
 
 
 def invalidate_expansion_cache(group_id: str) -> None:
-    """Invalidate cache for a specific group."""
+    """Invalidate cache for a group and every cached group containing it."""
     _expansion_cache.invalidate(group_id)
 
 
@@ -162,8 +675,9 @@ def get_cache_statistics() -> dict:
 def expand_group_recursive(
     group_id: str,
     visited: frozenset[str] = frozenset(),
-    max_depth: int = 10,
-    current_depth: int = 0
+    max_depth: int = DEFAULT_MAX_DEPTH,
+    current_depth: int = 0,
+    use_cache: bool = True
 ) -> frozenset[str]:
     """
     Recursively expand group to all member tags.
@@ -171,62 +685,28 @@ def expand_group_recursive(
     Mathematical specification:
     expand(G) = members(G) ∪ ⋃{expand(g) | g ∈ members(G) ∧ g is group}
 
-    Complexity: O(n) where n = total unique tags in hierarchy
-    Space: O(d) where d = max nesting depth
+    Complexity: O(1) lookup in the workspace GroupGraph closure when the
+    hierarchy fits within max_depth; otherwise an in-memory bounded walk
 
     Args:
         group_id: ID of group to expand
         visited: Set of already visited groups (prevents cycles)
         max_depth: Maximum nesting depth to traverse
         current_depth: Current depth in recursion
+        use_cache: Serve full expansions from the shared expansion cache
 
     Returns:
         Frozenset of all tag IDs (excluding group IDs)
     """
-    # Check cache first
-    cache_key = f"{group_id}:{','.join(sorted(visited))}"
-    cached_result = _expansion_cache.get(cache_key)
-    if cached_result is not None:
-        return cached_result
-
-    # Circular reference and depth check
-    if group_id in visited or current_depth >= max_depth:
-        return frozenset()
+    # Only full expansions are cached (the cache is keyed by group_id alone)
+    if use_cache and not visited and current_depth == 0 and max_depth == DEFAULT_MAX_DEPTH:
+        return _expansion_cache.expand_with_cache(group_id)
 
-    # Get group data
-    group = get_group_by_id(group_id)
-    if not group:
+    graph = get_graph_for_group(group_id)
+    if graph is None:
         return frozenset()
 
-    # Track visit
-    new_visited = visited | {group_id}
-
-    # Separate regular tags from nested groups
-    direct_tags = frozenset()
-    nested_groups = frozenset()
-
-    for member_id in group.member_tag_ids:
-        if is_group_tag(member_id):
-            nested_groups = nested_groups | {member_id}
-        else:
-            direct_tags = direct_tags | {member_id}
-
-    # Recursively expand nested groups
-    expanded_tags = direct_tags
-
-    for nested_group_id in nested_groups:
-        nested_expansion = expand_group_recursive(
-            nested_group_id,
-            new_visited,
-            max_depth,
-            current_depth + 1
-        )
-        expanded_tags = expanded_tags | nested_expansion
-
-    # Cache result
-    _expansion_cache.put(cache_key, expanded_tags)
-
-    return expanded_tags
+    return graph.expand_bounded(group_id, visited, max_depth, current_depth)
 
 
 # ============ Set Operations with Groups ============
@@ -292,28 +772,11 @@ def get_expansion_depth(group_id: str) -> int:
 
     Returns the depth of deepest nested group.
     """
-    def calculate_depth(
-        gid: str,
-        visited: frozenset[str] = frozenset()
-    ) -> int:
-        if gid in visited:
-            return 0
-
-        group = get_group_by_id(gid)
-        if not group:
-            return 0
+    graph = get_graph_for_group(group_id)
+    if graph is None:
+        return 0
 
-        new_visited = visited | {gid}
-
-        nested_groups = [m for m in group.member_tag_ids if is_group_tag(m)]
-        if not nested_groups:
-            return 0
-
-        return 1 + max(
-            calculate_depth(ng, new_visited) for ng in nested_groups
-        )
-
-    return calculate_depth(group_id)
+    return graph.depth.get(group_id, 0)
 
 
 def get_total_expanded_count(group_id: str) -> int:
@@ -332,32 +795,8 @@ def get_expansion_tree(group_id: str) -> dict:
 
     Returns nested dict representing expansion hierarchy.
     """
-    def build_tree(
-        gid: str,
-        visited: frozenset[str] = frozenset()
-    ) -> dict:
-        if gid in visited:
-            return {'id': gid, 'circular': True}
-
-        group = get_group_by_id(gid)
-        if not group:
-            return {'id': gid, 'error': 'not_found'}
-
-        new_visited = visited | {gid}
-
-        children = []
-        for member_id in group.member_tag_ids:
-            if is_group_tag(member_id):
-                children.append(build_tree(member_id, new_visited))
-            else:
-                children.append({'id': member_id, 'type': 'tag'})
-
-        return {
-            'id': gid,
-            'name': group.name,
-            'type': 'group',
-            'children': children,
-            'member_count': len(group.member_tag_ids)
-        }
+    graph = get_graph_for_group(group_id)
+    if graph is None:
+        return {'id': group_id, 'error': 'not_found'}
 
-    return build_tree(group_id)
+    return graph.tree(group_id)
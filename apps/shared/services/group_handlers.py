@@ -276,9 +276,7 @@ def handle_multi_selection_to_group(context: DropContext) -> OperationResult:
         )
 
         if success:
-            # Invalidate cache for this group
-            invalidate_expansion_cache(context.target_id)
-
+            # group_storage already invalidated the expansion cache once
             return OperationResult(
                 success=True,
                 operation_type='multi_selection_to_group',
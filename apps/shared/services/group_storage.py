@@ -5,8 +5,9 @@ This module provides storage and retrieval for group tags with immutable
 frozenset operations following the patent specifications for semantic tag sets.
 """
 
+from collections.abc import Iterable
 from datetime import datetime
-from typing import Optional
+from typing import NamedTuple, Optional
 from uuid import uuid4
 
 from apps.shared.models.database_models import (
@@ -21,10 +22,15 @@ from apps.shared.services.database_connection import get_workspace_connection
 # ============ Database Connection ============
 
 import sqlite3
+import threading
 
 # Global connection cache for the default database
 _default_connection = None
 
+# Serializes every use of the shared connection, so concurrent requests
+# never share a transaction and the group graph sees changes in commit order
+store_lock = threading.RLock()
+
 # This function can be monkey-patched during testing
 def get_connection():
     """
@@ -35,15 +41,16 @@ def get_connection():
     """
     global _default_connection
 
-    if _default_connection is None:
-        from apps.shared.config.database import DATABASE_PATH
-        _default_connection = sqlite3.connect(str(DATABASE_PATH), check_same_thread=False)
-        _default_connection.execute("PRAGMA foreign_keys = ON")
+    with store_lock:
+        if _default_connection is None:
+            from apps.shared.config.database import DATABASE_PATH
+            _default_connection = sqlite3.connect(str(DATABASE_PATH), check_same_thread=False)
+            _default_connection.execute("PRAGMA foreign_keys = ON")
 
-        # Initialize schema if needed
-        _initialize_schema(_default_connection)
+            # Initialize schema if needed
+            _initialize_schema(_default_connection)
 
-    return _default_connection
+        return _default_connection
 
 
 def _initialize_schema(conn: sqlite3.Connection) -> None:
@@ -120,16 +127,17 @@ def validate_no_self_reference(group_id: str, member_id: str) -> tuple[bool, Opt
 
 def group_exists_by_name(name: str, workspace_id: str) -> bool:
     """Check if a group with the given name exists in workspace."""
-    conn = get_connection()
-    cursor = conn.execute(
-        """
-        SELECT 1 FROM group_tags
-        WHERE workspace_id = ? AND name = ?
-        LIMIT 1
-        """,
-        (workspace_id, name)
-    )
-    return cursor.fetchone() is not None
+    with store_lock:
+        conn = get_connection()
+        cursor = conn.execute(
+            """
+            SELECT 1 FROM group_tags
+            WHERE workspace_id = ? AND name = ?
+            LIMIT 1
+            """,
+            (workspace_id, name)
+        )
+        return cursor.fetchone() is not None
 
 
 def get_group_by_id(group_id: str) -> Optional[GroupTag]:
@@ -138,47 +146,57 @@ def get_group_by_id(group_id: str) -> Optional[GroupTag]:
 
     Pure function - returns immutable GroupTag or None.
     """
-    conn = get_connection()
-
-    # Get group data
-    cursor = conn.execute(
-        """
-        SELECT id, workspace_id, name, created_by, created_at,
-               visual_style, max_nesting_depth
-        FROM group_tags
-        WHERE id = ?
-        """,
-        (group_id,)
-    )
-    row = cursor.fetchone()
-
-    if not row:
-        return None
-
-    # Get member IDs
-    member_cursor = conn.execute(
-        """
-        SELECT member_tag_id, member_type
-        FROM group_memberships
-        WHERE group_id = ?
-        """,
-        (group_id,)
-    )
-    member_rows = member_cursor.fetchall()
-    member_tag_ids = frozenset(row[0] for row in member_rows)
-
-    # Get parent group IDs
-    parent_cursor = conn.execute(
-        """
-        SELECT group_id
-        FROM group_memberships
-        WHERE member_tag_id = ? AND member_type = 'group'
-        """,
-        (group_id,)
-    )
-    parent_rows = parent_cursor.fetchall()
-    parent_group_ids = frozenset(row[0] for row in parent_rows)
+    with store_lock:
+        conn = get_connection()
+
+        # Get group data
+        cursor = conn.execute(
+            """
+            SELECT id, workspace_id, name, created_by, created_at,
+                   visual_style, max_nesting_depth
+            FROM group_tags
+            WHERE id = ?
+            """,
+            (group_id,)
+        )
+        row = cursor.fetchone()
+
+        if not row:
+            return None
+
+        # Get member IDs
+        member_cursor = conn.execute(
+            """
+            SELECT member_tag_id, member_type
+            FROM group_memberships
+            WHERE group_id = ?
+            """,
+            (group_id,)
+        )
+        member_rows = member_cursor.fetchall()
+        member_tag_ids = frozenset(row[0] for row in member_rows)
+
+        # Get parent group IDs
+        parent_cursor = conn.execute(
+            """
+            SELECT group_id
+            FROM group_memberships
+            WHERE member_tag_id = ? AND member_type = 'group'
+            """,
+            (group_id,)
+        )
+        parent_rows = parent_cursor.fetchall()
+        parent_group_ids = frozenset(row[0] for row in parent_rows)
 
+        return _row_to_group(row, member_tag_ids, parent_group_ids)
+
+
+def _row_to_group(
+    row: tuple,
+    member_tag_ids: frozenset[str],
+    parent_group_ids: frozenset[str]
+) -> GroupTag:
+    """Assemble a GroupTag from a group_tags row and its membership sets."""
     # Parse visual_style JSON
     import json
     visual_style = json.loads(row[5]) if row[5] else {}
@@ -200,21 +218,98 @@ def get_groups_by_workspace(workspace_id: str) -> tuple[GroupTag, ...]:
     """
     Get all groups in a workspace.
 
+    Loads groups and memberships in two queries (instead of three per
+    group) and assembles member and parent sets in memory.
+
     Returns immutable tuple of GroupTag objects.
     """
-    conn = get_connection()
-    cursor = conn.execute(
-        """
-        SELECT id FROM group_tags
-        WHERE workspace_id = ?
-        ORDER BY created_at DESC
-        """,
-        (workspace_id,)
-    )
+    with store_lock:
+        conn = get_connection()
+        group_rows = conn.execute(
+            """
+            SELECT id, workspace_id, name, created_by, created_at,
+                   visual_style, max_nesting_depth
+            FROM group_tags
+            WHERE workspace_id = ?
+            ORDER BY created_at DESC
+            """,
+            (workspace_id,)
+        ).fetchall()
 
-    group_ids = [row[0] for row in cursor.fetchall()]
-    groups = [get_group_by_id(gid) for gid in group_ids]
-    return tuple(g for g in groups if g is not None)
+        if not group_rows:
+            return ()
+
+        # Memberships of these groups, plus their parents (which may live elsewhere)
+        membership_rows = conn.execute(
+            """
+            SELECT group_id, member_tag_id, member_type
+            FROM group_memberships
+            WHERE group_id IN (SELECT id FROM group_tags WHERE workspace_id = ?)
+               OR (member_type = 'group'
+                   AND member_tag_id IN (SELECT id FROM group_tags WHERE workspace_id = ?))
+            """,
+            (workspace_id, workspace_id)
+        ).fetchall()
+
+        members: dict[str, set[str]] = {row[0]: set() for row in group_rows}
+        parents: dict[str, set[str]] = {row[0]: set() for row in group_rows}
+        for group_id, member_tag_id, member_type in membership_rows:
+            if group_id in members:
+                members[group_id].add(member_tag_id)
+            if member_type == 'group' and member_tag_id in parents:
+                parents[member_tag_id].add(group_id)
+
+        return tuple(
+            _row_to_group(row, frozenset(members[row[0]]), frozenset(parents[row[0]]))
+            for row in group_rows
+        )
+
+
+def get_group_workspace_id(group_id: str) -> Optional[str]:
+    """Look up the workspace a group belongs to (None if it does not exist)."""
+    with store_lock:
+        conn = get_connection()
+        row = conn.execute(
+            "SELECT workspace_id FROM group_tags WHERE id = ?",
+            (group_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+
+def get_workspace_group_edges(
+    workspace_id: str
+) -> tuple[dict[str, str], tuple[tuple[str, str], ...]]:
+    """
+    Load every group and membership edge of a workspace in two queries.
+
+    Returns:
+        Tuple of ({group_id: name}, ((group_id, member_tag_id), ...))
+    """
+    with store_lock:
+        conn = get_connection()
+        names = dict(conn.execute(
+            "SELECT id, name FROM group_tags WHERE workspace_id = ?",
+            (workspace_id,)
+        ).fetchall())
+
+        edges = tuple(conn.execute(
+            """
+            SELECT m.group_id, m.member_tag_id
+            FROM group_memberships m
+            JOIN group_tags g ON g.id = m.group_id
+            WHERE g.workspace_id = ?
+            """,
+            (workspace_id,)
+        ).fetchall())
+
+        return names, edges
+
+
+def _notify_group_graph(event: str, group_id: str, **details) -> None:
+    """Apply a committed change to the in-memory group graph, if loaded."""
+    from apps.shared.services.group_expansion import apply_group_change
+
+    apply_group_change(event, group_id, **details)
 
 
 def is_group_tag(tag_id: str) -> bool:
@@ -224,16 +319,17 @@ def is_group_tag(tag_id: str) -> bool:
 
 def tag_exists(tag_id: str, workspace_id: str) -> bool:
     """Check if a regular tag exists in workspace."""
-    conn = get_connection()
-    cursor = conn.execute(
-        """
-        SELECT 1 FROM tags
-        WHERE id = ?
-        LIMIT 1
-        """,
-        (tag_id,)
-    )
-    return cursor.fetchone() is not None
+    with store_lock:
+        conn = get_connection()
+        cursor = conn.execute(
+            """
+            SELECT 1 FROM tags
+            WHERE id = ?
+            LIMIT 1
+            """,
+            (tag_id,)
+        )
+        return cursor.fetchone() is not None
 
 
 # ============ Group Creation Functions ============
@@ -272,33 +368,53 @@ def create_group(
 
     # Insert group record
     import json
-    conn = get_connection()
-    conn.execute(
-        """
-        INSERT INTO group_tags (id, workspace_id, name, created_by, visual_style, max_nesting_depth)
-        VALUES (?, ?, ?, ?, ?, ?)
-        """,
-        (group_id, workspace_id, name, created_by, json.dumps(visual_style), 10)
-    )
+    with store_lock:
+        conn = get_connection()
+        try:
+            conn.execute(
+                """
+                INSERT INTO group_tags (id, workspace_id, name, created_by, visual_style, max_nesting_depth)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (group_id, workspace_id, name, created_by, json.dumps(visual_style), 10)
+            )
 
-    # Add initial members
-    for member_id in initial_member_ids:
-        member_type = 'group' if is_group_tag(member_id) else 'tag'
-        conn.execute(
-            """
-            INSERT INTO group_memberships (group_id, member_tag_id, member_type, added_by)
-            VALUES (?, ?, ?, ?)
-            """,
-            (group_id, member_id, member_type, created_by)
+            # Add initial members
+            for member_id in initial_member_ids:
+                member_type = 'group' if is_group_tag(member_id) else 'tag'
+                conn.execute(
+                    """
+                    INSERT INTO group_memberships (group_id, member_tag_id, member_type, added_by)
+                    VALUES (?, ?, ?, ?)
+                    """,
+                    (group_id, member_id, member_type, created_by)
+                )
+
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        _notify_group_graph(
+            "created", group_id,
+            workspace_id=workspace_id, name=name, member_ids=frozenset(initial_member_ids)
         )
 
-    conn.commit()
     return group_id
 
 
 # ============ Membership Operations ============
 
 
+class MembershipEditResult(NamedTuple):
+    """Outcome of a bulk membership edit."""
+
+    success: bool
+    added: frozenset[tuple[str, str]]
+    removed: frozenset[tuple[str, str]]
+    error: Optional[str]
+
+
 def add_member_to_group(
     group_id: str,
     member_id: str,
@@ -315,28 +431,35 @@ def add_member_to_group(
     if not is_valid:
         raise ValueError(error)
 
-    # Get existing group
-    group = get_group_by_id(group_id)
-    if not group:
-        raise ValueError(f"Group {group_id} not found")
-
-    # Check if already a member (idempotent operation)
-    if member_id in group.member_tag_ids:
-        return True
-
     # Determine member type
     member_type = 'group' if is_group_tag(member_id) else 'tag'
 
-    # Insert membership record
-    conn = get_connection()
-    conn.execute(
-        """
-        INSERT INTO group_memberships (group_id, member_tag_id, member_type, added_by)
-        VALUES (?, ?, ?, ?)
-        """,
-        (group_id, member_id, member_type, added_by)
-    )
-    conn.commit()
+    with store_lock:
+        # Get existing group
+        group = get_group_by_id(group_id)
+        if not group:
+            raise ValueError(f"Group {group_id} not found")
+
+        # Check if already a member (idempotent operation)
+        if member_id in group.member_tag_ids:
+            return True
+
+        # Insert membership record
+        conn = get_connection()
+        try:
+            conn.execute(
+                """
+                INSERT INTO group_memberships (group_id, member_tag_id, member_type, added_by)
+                VALUES (?, ?, ?, ?)
+                """,
+                (group_id, member_id, member_type, added_by)
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        _notify_group_graph("members_added", group_id, member_ids=frozenset([member_id]))
 
     return True
 
@@ -350,17 +473,26 @@ def remove_member_from_group(
 
     Returns True if removed, False if member wasn't in group.
     """
-    conn = get_connection()
-    cursor = conn.execute(
-        """
-        DELETE FROM group_memberships
-        WHERE group_id = ? AND member_tag_id = ?
-        """,
-        (group_id, member_id)
-    )
-    conn.commit()
+    with store_lock:
+        conn = get_connection()
+        try:
+            cursor = conn.execute(
+                """
+                DELETE FROM group_memberships
+                WHERE group_id = ? AND member_tag_id = ?
+                """,
+                (group_id, member_id)
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
 
-    return cursor.rowcount > 0
+        removed = cursor.rowcount > 0
+        if removed:
+            _notify_group_graph("member_removed", group_id, member_id=member_id)
+
+    return removed
 
 
 def add_multiple_members_to_group(
@@ -371,40 +503,124 @@ def add_multiple_members_to_group(
     """
     Add multiple members to a group in a single transaction.
 
+    Delegates to apply_membership_edits, so nested groups are cycle-checked
+    as one batch.
+
     Returns (success, added_member_ids, error_message)
     """
-    # Validate group exists
-    group = get_group_by_id(group_id)
-    if not group:
-        return False, frozenset(), f"Group {group_id} not found"
+    # Remove self-reference if present
+    edits = [(group_id, member_id, 'add') for member_id in member_ids - {group_id}]
+    if not edits:
+        if get_group_workspace_id(group_id) is None:
+            return False, frozenset(), f"Group {group_id} not found"
+        return True, frozenset(), None
 
-    # Filter out existing members and invalid additions
-    new_members = member_ids - group.member_tag_ids
+    result = apply_membership_edits(edits, added_by)
+    added_ids = frozenset(member_id for _, member_id in result.added)
+    return result.success, added_ids, result.error
 
-    # Remove self-reference if present
-    new_members = new_members - {group_id}
 
-    if not new_members:
-        return True, frozenset(), None  # All already members
+def apply_membership_edits(
+    edits: Iterable[tuple[str, str, str]],
+    added_by: str
+) -> MembershipEditResult:
+    """
+    Apply a batch of membership edits in one transaction.
 
-    # Add all new members in transaction
-    conn = get_connection()
-    try:
-        for member_id in new_members:
-            member_type = 'group' if is_group_tag(member_id) else 'tag'
-            conn.execute(
+    All cycle constraints are validated together against the in-memory
+    group graph, adds and removes run as two executemany statements, and
+    the graph and expansion caches are updated once for the whole batch.
+    The batch is all-or-nothing: any invalid edit rejects every edit.
+
+    Args:
+        edits: (group_id, member_id, op) triples, op is 'add' or 'remove';
+            when a pair appears more than once the last op wins
+        added_by: User recorded on added memberships
+
+    Returns:
+        MembershipEditResult with the (group_id, member_id) pairs that
+        actually changed
+    """
+    from apps.shared.services.group_expansion import (
+        apply_group_changes,
+        validate_membership_edits,
+    )
+
+    final_ops: dict[tuple[str, str], str] = {}
+    for group_id, member_id, op in edits:
+        if op not in ('add', 'remove'):
+            return MembershipEditResult(False, frozenset(), frozenset(), f"Unknown membership op: {op}")
+        final_ops[(group_id, member_id)] = op
+
+    if not final_ops:
+        return MembershipEditResult(True, frozenset(), frozenset(), None)
+
+    batch = [(group_id, member_id, op) for (group_id, member_id), op in final_ops.items()]
+    group_ids = sorted({group_id for group_id, _ in final_ops})
+    placeholders = ','.join('?' * len(group_ids))
+
+    # Validate and write under one lock, so no other edit lands in between
+    with store_lock:
+        is_valid, error = validate_membership_edits(batch)
+        if not is_valid:
+            return MembershipEditResult(False, frozenset(), frozenset(), error)
+
+        conn = get_connection()
+        try:
+            existing = set(conn.execute(
+                f"""
+                SELECT group_id, member_tag_id FROM group_memberships
+                WHERE group_id IN ({placeholders})
+                """,
+                group_ids
+            ).fetchall())
+
+            added = frozenset(
+                pair for pair, op in final_ops.items() if op == 'add' and pair not in existing
+            )
+            removed = frozenset(
+                pair for pair, op in final_ops.items() if op == 'remove' and pair in existing
+            )
+
+            conn.executemany(
                 """
                 INSERT INTO group_memberships (group_id, member_tag_id, member_type, added_by)
                 VALUES (?, ?, ?, ?)
                 """,
-                (group_id, member_id, member_type, added_by)
+                [
+                    (group_id, member_id, 'group' if is_group_tag(member_id) else 'tag', added_by)
+                    for group_id, member_id in added
+                ]
             )
-        conn.commit()
-        return True, new_members, None
+            conn.executemany(
+                """
+                DELETE FROM group_memberships
+                WHERE group_id = ? AND member_tag_id = ?
+                """,
+                list(removed)
+            )
+            conn.commit()
+
+        except Exception as e:
+            conn.rollback()
+            return MembershipEditResult(False, frozenset(), frozenset(), str(e))
+
+        added_by_group: dict[str, set[str]] = {}
+        for group_id, member_id in added:
+            added_by_group.setdefault(group_id, set()).add(member_id)
+
+        changes = [
+            ("members_added", group_id, {"member_ids": frozenset(member_ids)})
+            for group_id, member_ids in added_by_group.items()
+        ]
+        changes.extend(
+            ("member_removed", group_id, {"member_id": member_id})
+            for group_id, member_id in removed
+        )
+        if changes:
+            apply_group_changes(changes)
 
-    except Exception as e:
-        conn.rollback()
-        return False, frozenset(), str(e)
+    return MembershipEditResult(True, added, removed, None)
 
 
 # ============ Group Deletion ============
@@ -417,17 +633,26 @@ def delete_group(group_id: str) -> bool:
     Cascading delete is handled by database constraints.
     Member tags are NOT deleted.
     """
-    conn = get_connection()
-    cursor = conn.execute(
-        """
-        DELETE FROM group_tags
-        WHERE id = ?
-        """,
-        (group_id,)
-    )
-    conn.commit()
+    with store_lock:
+        conn = get_connection()
+        try:
+            cursor = conn.execute(
+                """
+                DELETE FROM group_tags
+                WHERE id = ?
+                """,
+                (group_id,)
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        deleted = cursor.rowcount > 0
+        if deleted:
+            _notify_group_graph("deleted", group_id)
 
-    return cursor.rowcount > 0
+    return deleted
 
 
 # ============ Statistics Functions ============
@@ -4,15 +4,25 @@ Performance optimization functions for multicardz.
 Pure functions for caching, parallel processing, and connection pooling.
 Architecture compliance: function-based, immutable data structures.
 """
-from typing import FrozenSet, List, Dict, Any
+from typing import FrozenSet, List, Dict, Any, NamedTuple, Optional
+from collections import deque
+from collections.abc import AsyncGenerator, Callable
+from contextlib import asynccontextmanager
 from functools import lru_cache, reduce
 import pyroaring
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
+import logging
+import os
+import threading
 import time
 import json
 import uuid
 
+from apps.shared.services.async_database import AsyncConnection, run_db
+
+logger = logging.getLogger(__name__)
+
 
 # Import the bitmap operations we need
 def perform_complex_filter(
@@ -140,38 +150,367 @@ def parallel_filter_operation(
     return result
 
 
-class ConnectionPool:
-    """Database connection pool for performance."""
+class ConnectionPoolTimeout(TimeoutError):
+    """No pooled connection became available within the wait timeout."""
 
-    def __init__(self, max_connections: int = 10):
-        self.max_connections = max_connections
-        self.connections = []
-        self.available = asyncio.Queue(maxsize=max_connections)
 
-    async def get_connection(self, workspace_id: str, user_id: str):
-        """Get connection from pool."""
-        if self.available.empty() and len(self.connections) < self.max_connections:
-            # Create new connection
-            conn = await self._create_connection(workspace_id, user_id)
-            self.connections.append(conn)
-        else:
-            # Wait for available connection
-            conn = await self.available.get()
+class ConnectionPoolMetrics(NamedTuple):
+    """Point-in-time pool state and cumulative checkout statistics."""
+    max_connections: int
+    size: int
+    in_use: int
+    idle: int
+    waiting: int
+    peak_in_use: int
+    utilization: float
+    checkouts: int
+    timeouts: int
+    discarded: int
+    mean_wait_ms: float
+    max_wait_ms: float
+
 
-        return conn
+def _open_pooled_connection(workspace_id: str, user_id: str, mode: str):
+    """Default connection factory: a workspace database usable from any thread."""
+    from apps.shared.services.database_connection import open_workspace_connection
 
-    async def release_connection(self, conn):
-        """Return connection to pool."""
-        await self.available.put(conn)
+    return open_workspace_connection(workspace_id, user_id, mode=mode, check_same_thread=False)
 
-    async def _create_connection(self, workspace_id: str, user_id: str):
-        """Create new database connection."""
-        # Simplified - would use actual connection logic
-        return f"connection_{workspace_id}_{user_id}"
 
+def _wake(pool: "ConnectionPool", waiter: asyncio.Future, grant: Optional[tuple]) -> None:
+    """Resolve a waiter in its own loop; pass the slot on if it already gave up."""
+    if not waiter.done():
+        waiter.set_result(grant)
+        return
+    if grant is not None:
+        with pool._lock:
+            leftover = pool._release_slot(*grant)
+        if leftover is not None:
+            pool._close_quietly(leftover)
 
-# Global connection pool
-connection_pool = ConnectionPool()
+
+class ConnectionPool:
+    """
+    Bounded database connection pool for async routes.
+
+    At most max_connections connections are open at once, across all
+    workspaces; that bounds database concurrency per process. Idle
+    connections are reused per (workspace, user, mode); when the pool is
+    full, an idle connection to another database is closed to make room,
+    otherwise the caller waits (up to wait_timeout) for a release. A
+    released slot is handed straight to the oldest waiter, together with
+    its connection, so waiters are served in arrival order.
+
+    New connections run the PRAGMA statements in `pragmas`, and the first
+    connection to each database brings its schema up to date
+    (apply_pending_migrations), so workspace databases pick up index-only
+    migrations such as the card keyset indexes. Idle connections are pinged with SELECT 1 before reuse and replaced if dead.
+    The factory may return any DB-API style connection (sqlite3, libsql)
+    that is safe to use from the database executor threads.
+
+    State is guarded by a threading lock and waiters are futures of their
+    own event loop, so one pool can serve several loops and be released
+    from worker threads.
+
+    Example:
+        >>> async with connection_pool.acquire(ws_id, user_id) as conn:
+        ...     rows = await conn.fetchall("SELECT card_id FROM cards")
+    """
+
+    DEFAULT_PRAGMAS = ("busy_timeout = 5000", "journal_mode = WAL", "synchronous = NORMAL")
+
+    def __init__(
+        self,
+        max_connections: int = 10,
+        *,
+        wait_timeout: float = 5.0,
+        pragmas: tuple[str, ...] = DEFAULT_PRAGMAS,
+        connect: Callable[[str, str, str], Any] = _open_pooled_connection
+    ):
+        if max_connections < 1:
+            raise ValueError("max_connections must be at least 1")
+        self.max_connections = max_connections
+        self.wait_timeout = wait_timeout
+        self.pragmas = tuple(pragmas)
+        self._connect = connect
+
+        self._lock = threading.Lock()
+        self._idle: Dict[tuple, List[Any]] = {}
+        self._checked_out: Dict[int, tuple] = {}  # id(AsyncConnection) -> (raw, key)
+        self._waiters: deque = deque()
+        self._size = 0  # open or opening
+        self._in_use = 0
+        self._closed = False
+        self._migrated: set[tuple] = set()
+        self._migrate_lock = threading.Lock()
+
+        self._peak_in_use = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._discarded = 0
+        self._wait_ms_total = 0.0
+        self._wait_ms_max = 0.0
+
+    # ------------------------------------------------------------------
+    # Blocking helpers (run on the database executor)
+    # ------------------------------------------------------------------
+
+    def _open(self, key: tuple):
+        connection = self._connect(*key)
+        try:
+            for pragma in self.pragmas:
+                connection.execute(f"PRAGMA {pragma}")
+            self._migrate(key, connection)
+        except Exception:
+            connection.close()
+            raise
+        return connection
+
+    def _migrate(self, key: tuple, connection) -> None:
+        """Apply pending migrations once per database per pool."""
+        if key in self._migrated:
+            return
+        from apps.shared.migrations.auto_migrator import apply_pending_migrations
+
+        with self._migrate_lock:
+            if key not in self._migrated:
+                success, _ = apply_pending_migrations(connection)
+                if success:
+                    self._migrated.add(key)
+
+    @staticmethod
+    def _is_alive(connection) -> bool:
+        try:
+            connection.execute("SELECT 1").fetchone()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _reset(connection) -> bool:
+        """Roll back anything the borrower left open; False if unusable."""
+        try:
+            if getattr(connection, "in_transaction", False):
+                connection.rollback()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close_quietly(connection) -> None:
+        try:
+            connection.close()
+        except Exception as e:
+            logger.debug(f"Error closing pooled connection: {e}")
+
+    # ------------------------------------------------------------------
+    # Checkout / release
+    # ------------------------------------------------------------------
+
+    def _release_slot(self, connection, key: tuple):
+        """
+        Hand a checked-out slot to the oldest waiter, or back to the pool
+        (caller holds _lock).
+
+        Args:
+            connection: Reusable connection that goes with the slot, or None
+            key: (workspace, user, mode) the connection belongs to
+
+        Returns:
+            Connection the caller has to close, or None
+        """
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # The slot stays counted in _size and _in_use for the waiter
+                waiter.get_loop().call_soon_threadsafe(_wake, self, waiter, (connection, key))
+                return None
+        self._in_use -= 1
+        if connection is not None and not self._closed:
+            self._idle.setdefault(key, []).append(connection)
+            return None
+        self._size -= 1
+        return connection
+
+    def _drop_grant(self, waiter: asyncio.Future) -> None:
+        """Pass on a slot granted to a waiter that timed out or was cancelled."""
+        if waiter.done() and not waiter.cancelled() and waiter.result() is not None:
+            with self._lock:
+                leftover = self._release_slot(*waiter.result())
+            if leftover is not None:
+                self._close_quietly(leftover)
+
+    def _take(self, key: tuple):
+        """
+        Claim a slot (caller holds _lock).
+
+        Returns:
+            (connection or None to open a new one, connection to close or
+            None), or None if the caller has to wait
+        """
+        idle = self._idle.get(key)
+        if idle:
+            return idle.pop(), None
+        if self._size < self.max_connections:
+            self._size += 1
+            return None, None
+        for connections in self._idle.values():
+            if connections:
+                # Full, but idle on another database: swap it for ours
+                return None, connections.pop(0)
+        return None
+
+    async def get_connection(
+        self, workspace_id: str, user_id: str, *, mode: str = "standard",
+        timeout: Optional[float] = None
+    ) -> AsyncConnection:
+        """
+        Check a connection out of the pool; pair with release_connection().
+
+        Raises:
+            ConnectionPoolTimeout: Pool stayed exhausted for the wait timeout
+        """
+        key = (workspace_id, user_id, mode)
+        loop = asyncio.get_running_loop()
+        timeout = self.wait_timeout if timeout is None else timeout
+        started = time.perf_counter()
+
+        while True:
+            with self._lock:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed")
+                claimed = self._take(key)
+                if claimed is None:
+                    waiter = loop.create_future()
+                    self._waiters.append(waiter)
+                else:
+                    self._in_use += 1
+                    self._peak_in_use = max(self._peak_in_use, self._in_use)
+
+            if claimed is None:
+                remaining = timeout - (time.perf_counter() - started)
+                try:
+                    grant = await asyncio.wait_for(waiter, max(0.0, remaining))
+                except asyncio.TimeoutError:
+                    self._drop_grant(waiter)
+                    with self._lock:
+                        self._timeouts += 1
+                    raise ConnectionPoolTimeout(
+                        f"No database connection available within {timeout:.1f}s "
+                        f"({self.max_connections} in use)"
+                    ) from None
+                except asyncio.CancelledError:
+                    # Granted just before being cancelled: pass it on
+                    self._drop_grant(waiter)
+                    raise
+                if grant is None:
+                    continue  # Pool closed while waiting
+
+                # Handed a slot on release: reuse its connection if it is
+                # ours, otherwise swap it for one to our database
+                granted, granted_key = grant
+                if granted_key == key:
+                    claimed = granted, None
+                else:
+                    claimed = None, granted
+
+            connection, evicted = claimed
+            try:
+                if evicted is not None:
+                    await run_db(self._close_quietly, evicted)
+
+                if connection is not None and not await run_db(self._is_alive, connection):
+                    await run_db(self._close_quietly, connection)
+                    with self._lock:
+                        self._discarded += 1
+                    connection = None
+
+                if connection is None:
+                    connection = await run_db(self._open, key)
+            except BaseException:
+                # Give the slot back (failed open, or cancelled mid-checkout)
+                if connection is not None:
+                    self._close_quietly(connection)
+                with self._lock:
+                    self._release_slot(None, key)
+                raise
+
+            wait_ms = (time.perf_counter() - started) * 1000
+            wrapper = AsyncConnection(connection)
+            with self._lock:
+                self._checked_out[id(wrapper)] = (connection, key)
+                self._checkouts += 1
+                self._wait_ms_total += wait_ms
+                self._wait_ms_max = max(self._wait_ms_max, wait_ms)
+            return wrapper
+
+    async def release_connection(self, conn: AsyncConnection) -> None:
+        """Return a connection to the pool (rolling back any open transaction)."""
+        with self._lock:
+            connection, key = self._checked_out.pop(id(conn))
+
+        if not await run_db(self._reset, connection):
+            await run_db(self._close_quietly, connection)
+            connection = None
+            with self._lock:
+                self._discarded += 1
+
+        with self._lock:
+            leftover = self._release_slot(connection, key)
+
+        if leftover is not None:
+            await run_db(self._close_quietly, leftover)
+
+    @asynccontextmanager
+    async def acquire(
+        self, workspace_id: str, user_id: str, *, mode: str = "standard",
+        timeout: Optional[float] = None
+    ) -> AsyncGenerator[AsyncConnection, None]:
+        """Check out a connection for the duration of the block."""
+        conn = await self.get_connection(workspace_id, user_id, mode=mode, timeout=timeout)
+        try:
+            yield conn
+        finally:
+            await self.release_connection(conn)
+
+    def close(self) -> None:
+        """Close idle connections; checked-out ones are closed on release."""
+        with self._lock:
+            self._closed = True
+            idle = [c for connections in self._idle.values() for c in connections]
+            self._idle.clear()
+            self._size -= len(idle)
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if not waiter.done():
+                    waiter.get_loop().call_soon_threadsafe(_wake, self, waiter, None)
+        for connection in idle:
+            self._close_quietly(connection)
+
+    def metrics(self) -> ConnectionPoolMetrics:
+        """Snapshot of pool size, utilization and wait times."""
+        with self._lock:
+            return ConnectionPoolMetrics(
+                max_connections=self.max_connections,
+                size=self._size,
+                in_use=self._in_use,
+                idle=sum(len(c) for c in self._idle.values()),
+                waiting=sum(1 for w in self._waiters if not w.done()),
+                peak_in_use=self._peak_in_use,
+                utilization=self._in_use / self.max_connections,
+                checkouts=self._checkouts,
+                timeouts=self._timeouts,
+                discarded=self._discarded,
+                mean_wait_ms=self._wait_ms_total / self._checkouts if self._checkouts else 0.0,
+                max_wait_ms=self._wait_ms_max,
+            )
+
+
+# Global connection pool, shared by the async routes
+connection_pool = ConnectionPool(
+    max_connections=int(os.getenv("MULTICARDZ_DB_POOL_SIZE", "10")),
+    wait_timeout=float(os.getenv("MULTICARDZ_DB_POOL_TIMEOUT", "5.0")),
+)
 
 
 def optimize_query_plan(
@@ -2,17 +2,28 @@
 3-Layer Adaptive Performance Tracking System for multicardz.
 
 Layer 1: Conservative global baselines (always available)
-Layer 2: Per-session adaptive learning (personalizes to user)
+Layer 2: Online cost models per mode, persisted per deployment
 Layer 3: ML telemetry hooks (optional external optimization)
 """
 
+import atexit
+import copy
+import itertools
+import json
 import logging
+import math
 import os
+import platform
+import random
+import struct
+import sys
+import tempfile
 import time
-from collections import defaultdict, deque
+import urllib.request
 from collections.abc import Callable
 from dataclasses import dataclass
-from threading import Lock
+from pathlib import Path
+from threading import Event, Lock, Thread
 from typing import Any
 
 logger = logging.getLogger(__name__)
@@ -27,6 +38,7 @@ class ExecutionContext:
     operation_count: int
     cache_hit: bool = False
     memory_delta: float = 0.0
+    result_size: int | None = None  # known after execution
 
 
 @dataclass
@@ -77,73 +89,508 @@ class TTLCache:
             self._timestamps[key] = time.time()
 
 
-class PerformanceTelemetryHook:
-    """Telemetry hook for streaming to external ML services."""
+class LatencyHistogram:
+    """
+    HDR-style log-linear latency histogram in integer microseconds.
+
+    Each power of two is split into SUB_BUCKETS/2 linear buckets, so any
+    recorded value is reported within ~3% from a few hundred sparse
+    counters, whatever the range.
+    """
+
+    SUB_BUCKET_BITS = 6
+    _HALF = 1 << (SUB_BUCKET_BITS - 1)
 
     def __init__(self):
+        self.counts: dict[int, int] = {}
+        self.count = 0
+        self.total_us = 0
+        self.min_us: int | None = None
+        self.max_us = 0
+
+    @classmethod
+    def bucket_index(cls, value_us: int) -> int:
+        shift = value_us.bit_length() - cls.SUB_BUCKET_BITS
+        if shift <= 0:
+            return value_us
+        return shift * cls._HALF + (value_us >> shift)
+
+    @classmethod
+    def bucket_upper(cls, index: int) -> int:
+        """Highest value that maps to a bucket."""
+        if index < 2 * cls._HALF:
+            return index
+        shift, offset = divmod(index - cls._HALF, cls._HALF)
+        return ((cls._HALF + offset + 1) << shift) - 1
+
+    def record(self, value_us: int) -> None:
+        value_us = max(0, value_us)
+        index = self.bucket_index(value_us)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total_us += value_us
+        if self.min_us is None or value_us < self.min_us:
+            self.min_us = value_us
+        if value_us > self.max_us:
+            self.max_us = value_us
+
+    def quantile(self, q: float) -> int:
+        """Value at quantile q (0..1), as the upper bound of its bucket."""
+        if not self.count:
+            return 0
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self.bucket_upper(index), self.max_us)
+        return self.max_us
+
+
+class PerformanceTelemetryHook:
+    """
+    Telemetry hook for streaming to external ML services.
+
+    record_execution() only packs a fixed-size record into a preallocated
+    ring (one struct.pack_into, no lock, no allocation beyond the sequence
+    number). A background thread drains the ring into per (mode, operation)
+    latency histograms and runs registered handlers, so neither touches
+    the request path. If the drain falls a full ring behind, the oldest
+    records are overwritten and counted as dropped.
+
+    Aggregates are exported as Prometheus text (export_prometheus) and,
+    when MULTICARDZ_TELEMETRY_JSONL is set, appended to a JSONL file.
+    """
+
+    # seq, timestamp, mode, operation, cards, unique tags, op count,
+    # actual ms, cache hit, memory delta
+    RECORD = struct.Struct("<qdHHqqqd?d")
+    DRAIN_INTERVAL_SECONDS = 0.25
+    ML_REQUEST_TIMEOUT_SECONDS = 1.0
+    ML_MAX_PENDING = 4
+    ML_PREDICTION_TTL_SECONDS = 60
+    QUANTILES = (0.5, 0.9, 0.99, 0.999)
+    _SKIPPED = 0xFFFF  # mode code of a record whose fields did not fit
+    _EMPTY = RECORD.pack(-1, 0.0, 0, 0, 0, 0, 0, 0.0, False, 0.0)
+
+    def __init__(self, enabled: bool | None = None, ring_size: int | None = None,
+                 jsonl_path: Path | None = None, start_drain: bool = True):
         self.handlers: list[Callable] = []
-        self.buffer: deque = deque(maxlen=1000)
-        self.enabled = os.getenv('MULTICARDZ_TELEMETRY_ENABLED', 'false').lower() == 'true'
+        self.enabled = (
+            enabled if enabled is not None
+            else os.getenv('MULTICARDZ_TELEMETRY_ENABLED', 'false').lower() == 'true'
+        )
         self.endpoint = os.getenv('MULTICARDZ_ML_ENDPOINT')
+        configured_jsonl = os.getenv('MULTICARDZ_TELEMETRY_JSONL')
+        self.jsonl_path = jsonl_path or (Path(configured_jsonl) if configured_jsonl else None)
+        self.export_interval = float(os.getenv('MULTICARDZ_TELEMETRY_EXPORT_SECONDS', '60'))
+
+        # Ring of fixed-size records; capacity is a power of two
+        requested = ring_size or int(os.getenv('MULTICARDZ_TELEMETRY_RING_SIZE', '65536'))
+        self.capacity = 1 << max(1, requested - 1).bit_length()
+        self._mask = self.capacity - 1
+        self._ring = bytearray(self._EMPTY * self.capacity)
+        self._sequence = itertools.count()
+        self._read_cursor = 0
+        self.dropped = 0
+
+        # Mode/operation names are stored as small integer codes
+        self._codes: dict[str, int] = {}
+        self._names: list[str] = []
+        self._code_lock = Lock()
+
+        self.histograms: dict[tuple[str, str], LatencyHistogram] = {}
+        self._drain_lock = Lock()
+        self._stop = Event()
+        self._thread: Thread | None = None
+        self._last_export = time.monotonic()
+
+        # ML predictions: finished ones cached, at most ML_MAX_PENDING in flight
+        self._predictions = TTLCache(maxsize=1024, ttl=self.ML_PREDICTION_TTL_SECONDS)
+        self._pending_predictions: set[tuple] = set()
+        self._prediction_lock = Lock()
+        self.dropped_predictions = 0
 
         if self.enabled:
             logger.info(f"Telemetry enabled, endpoint: {self.endpoint}")
+            if start_drain:
+                self.start()
 
     def register_handler(self, handler: Callable) -> None:
-        """Register a telemetry handler."""
+        """Register a telemetry handler (called from the drain thread)."""
         self.handlers.append(handler)
 
+    def _code(self, name: str) -> int:
+        code = self._codes.get(name)
+        if code is None:
+            with self._code_lock:
+                code = self._codes.get(name)
+                if code is None:
+                    code = len(self._names)
+                    self._names.append(name)
+                    self._codes[name] = code
+        return code
+
     def record_execution(self, metrics: PerformanceMetrics) -> None:
-        """Record execution metrics."""
+        """Record execution metrics into the ring (request path)."""
         if not self.enabled:
             return
 
-        event = {
-            "timestamp": metrics.timestamp,
-            "mode": metrics.mode,
-            "card_count": metrics.context.card_count,
-            "unique_tags": metrics.context.unique_tags,
-            "operation_type": metrics.context.operation_type,
-            "actual_ms": metrics.actual_ms,
-            "cache_hit": metrics.context.cache_hit,
-            "memory_delta": metrics.context.memory_delta,
-        }
-
-        # Add to buffer
-        self.buffer.append(event)
+        context = metrics.context
+        sequence = next(self._sequence)
+        try:
+            self.RECORD.pack_into(
+                self._ring, (sequence & self._mask) * self.RECORD.size,
+                sequence, metrics.timestamp,
+                self._code(metrics.mode), self._code(context.operation_type),
+                context.card_count, context.unique_tags, context.operation_count,
+                metrics.actual_ms, context.cache_hit, context.memory_delta,
+            )
+        except struct.error:
+            # Out-of-range field; still fill the slot so the drain moves past it
+            self.RECORD.pack_into(
+                self._ring, (sequence & self._mask) * self.RECORD.size,
+                sequence, 0.0, self._SKIPPED, self._SKIPPED, 0, 0, 0, 0.0, False, 0.0,
+            )
+
+    # ------------------------------------------------------------------
+    # Drain and aggregation
+    # ------------------------------------------------------------------
+
+    def drain(self) -> int:
+        """
+        Aggregate records written since the last drain.
 
-        # Stream to handlers asynchronously
-        for handler in self.handlers:
+        Returns:
+            Number of records read (aggregated or counted as dropped)
+        """
+        with self._drain_lock:
+            events = []
+            cursor = self._read_cursor
+            while True:
+                record = self.RECORD.unpack_from(self._ring, (cursor & self._mask) * self.RECORD.size)
+                sequence = record[0]
+                if sequence < cursor:
+                    break  # not written yet
+                if sequence > cursor:
+                    # Lapped: resume at the oldest record that can still be intact
+                    oldest = sequence - self.capacity + 1
+                    self.dropped += oldest - cursor
+                    cursor = oldest
+                    continue
+                events.append(record)
+                cursor += 1
+            self._read_cursor = cursor
+
+            for (_, timestamp, mode_code, operation_code, card_count, unique_tags,
+                 _operation_count, actual_ms, cache_hit, memory_delta) in events:
+                if mode_code == self._SKIPPED:
+                    self.dropped += 1
+                    continue
+                mode = self._names[mode_code]
+                operation_type = self._names[operation_code]
+                histogram = self.histograms.get((mode, operation_type))
+                if histogram is None:
+                    histogram = self.histograms[(mode, operation_type)] = LatencyHistogram()
+                histogram.record(round(actual_ms * 1000))
+
+                if self.handlers:
+                    event = {
+                        "timestamp": timestamp,
+                        "mode": mode,
+                        "card_count": card_count,
+                        "unique_tags": unique_tags,
+                        "operation_type": operation_type,
+                        "actual_ms": actual_ms,
+                        "cache_hit": cache_hit,
+                        "memory_delta": memory_delta,
+                    }
+                    for handler in self.handlers:
+                        try:
+                            handler(event)
+                        except Exception as e:
+                            logger.debug(f"Telemetry handler error: {e}")
+
+        return len(events)
+
+    def start(self) -> None:
+        """Start the background drain thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._run, name="telemetry-drain", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the drain thread after a final drain and export; no new ML requests."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.drain()
+        if self.jsonl_path is not None:
+            self.export_jsonl()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.DRAIN_INTERVAL_SECONDS):
             try:
-                handler(event)
+                self.drain()
+                if (self.jsonl_path is not None
+                        and time.monotonic() - self._last_export >= self.export_interval):
+                    self.export_jsonl()
             except Exception as e:
-                logger.debug(f"Telemetry handler error: {e}")
+                logger.warning(f"Telemetry drain failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+
+    def _snapshot(self) -> list[tuple[str, str, LatencyHistogram]]:
+        with self._drain_lock:
+            return [
+                (mode, operation_type, copy.deepcopy(histogram))
+                for (mode, operation_type), histogram in sorted(self.histograms.items())
+            ]
+
+    def export_prometheus(self) -> str:
+        """Aggregates in the Prometheus text exposition format."""
+        name = "multicardz_operation_duration_seconds"
+        lines = [
+            f"# HELP {name} Set operation latency by processing mode and operation.",
+            f"# TYPE {name} summary",
+        ]
+        for mode, operation_type, histogram in self._snapshot():
+            labels = f'mode="{_prometheus_label(mode)}",operation="{_prometheus_label(operation_type)}"'
+            for q in self.QUANTILES:
+                lines.append(f'{name}{{{labels},quantile="{q}"}} {histogram.quantile(q) / 1e6}')
+            lines.append(f"{name}_sum{{{labels}}} {histogram.total_us / 1e6}")
+            lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+        lines += [
+            "# HELP multicardz_telemetry_dropped_total Telemetry records lost to ring overflow.",
+            "# TYPE multicardz_telemetry_dropped_total counter",
+            f"multicardz_telemetry_dropped_total {self.dropped}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def export_jsonl(self, path: Path | None = None) -> int:
+        """
+        Append one line per (mode, operation) with cumulative aggregates.
+
+        Returns:
+            Number of lines written (0 if the file could not be written)
+        """
+        path = path or self.jsonl_path
+        self._last_export = time.monotonic()
+        now = time.time()
+        lines = [
+            json.dumps({
+                "timestamp": now,
+                "mode": mode,
+                "operation_type": operation_type,
+                "count": histogram.count,
+                "sum_ms": histogram.total_us / 1000,
+                "min_ms": (histogram.min_us or 0) / 1000,
+                "max_ms": histogram.max_us / 1000,
+                **{f"p{q * 100:g}".replace(".", "") + "_ms":
+                   histogram.quantile(q) / 1000 for q in self.QUANTILES},
+            })
+            for mode, operation_type, histogram in self._snapshot()
+        ]
+        if not lines:
+            return 0
+        try:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+        except OSError as e:
+            logger.warning(f"Could not write telemetry to {path}: {e}")
+            return 0
+        return len(lines)
+
+    # ------------------------------------------------------------------
+    # ML service
+    # ------------------------------------------------------------------
+
+    def _request_prediction(self, mode: str, context: ExecutionContext) -> float | None:
+        """POST the context to the ML endpoint; expects {"predicted_ms": float}."""
+        body = json.dumps({
+            "mode": mode,
+            "card_count": context.card_count,
+            "unique_tags": context.unique_tags,
+            "operation_type": context.operation_type,
+            "operation_count": context.operation_count,
+        }).encode("utf-8")
+        request = urllib.request.Request(
+            self.endpoint, data=body, headers={"Content-Type": "application/json"}
+        )
+        with urllib.request.urlopen(request, timeout=self.ML_REQUEST_TIMEOUT_SECONDS) as response:
+            predicted = json.loads(response.read()).get("predicted_ms")
+        return float(predicted) if predicted is not None else None
+
+    def get_prediction_async(self, mode: str, context: ExecutionContext) -> float | None:
+        """
+        Get prediction from ML service (non-blocking).
 
-    def get_prediction_async(self, mode: str, context: ExecutionContext,
-                            timeout_ms: int = 5) -> float | None:
-        """Get prediction from ML service (non-blocking)."""
+        Returns the cached prediction for this context, or None right away
+        and requests one on a daemon thread so a later call can use it. At
+        most ML_MAX_PENDING requests are in flight; further misses are
+        dropped rather than queued, and none are sent after stop().
+        """
         if not self.endpoint:
             return None
 
-        # In production, this would make an async HTTP request
-        # For now, return None to use local predictions
+        key = (mode, context.card_count, context.unique_tags,
+               context.operation_type, context.operation_count)
+        prediction = self._predictions.get(key)
+        if prediction is not None or self._stop.is_set():
+            return prediction
+
+        with self._prediction_lock:
+            if key in self._pending_predictions:
+                return None
+            if len(self._pending_predictions) >= self.ML_MAX_PENDING:
+                self.dropped_predictions += 1
+                return None
+            self._pending_predictions.add(key)
+
+        # Daemon thread: an unanswered request never holds up interpreter exit
+        Thread(
+            target=self._fetch_prediction, args=(key, mode, context),
+            name="ml-prediction", daemon=True
+        ).start()
         return None
 
+    def _fetch_prediction(self, key: tuple, mode: str, context: ExecutionContext) -> None:
+        try:
+            prediction = self._request_prediction(mode, context)
+            if prediction is not None:
+                self._predictions.put(key, prediction)
+        except Exception as e:
+            logger.debug(f"ML prediction failed: {e}")
+        finally:
+            with self._prediction_lock:
+                self._pending_predictions.discard(key)
+
     def is_connected(self) -> bool:
         """Check if ML service is available."""
         return self.endpoint is not None
 
 
+def _prometheus_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class OnlineCostModel:
+    """
+    Recursive least squares cost model for one (mode, operation) pair.
+
+    Predicts milliseconds from (cards, unique tags, operation count, result
+    size). Each observation is an O(k^2) update of the coefficients and
+    their inverse covariance, so nothing is refit on prediction. The
+    initial coefficients are the global baseline, held with a weak prior
+    that the first few observations override.
+    """
+
+    # Feature scales keep the covariance well conditioned
+    SCALES = (1.0, 1000.0, 100.0, 1.0, 1000.0)
+    PRIOR_VARIANCE = 100.0
+
+    def __init__(self, theta: list[float], covariance: list[list[float]] | None = None,
+                 observations: int = 0):
+        size = len(self.SCALES)
+        self.theta = list(theta)
+        self.covariance = covariance or [
+            [self.PRIOR_VARIANCE if i == j else 0.0 for j in range(size)] for i in range(size)
+        ]
+        self.observations = observations
+
+    @classmethod
+    def from_baseline(cls, baseline: dict[str, float]) -> "OnlineCostModel":
+        """Start from a global baseline entry (intercept, slope, tag_factor)."""
+        return cls([
+            baseline["intercept"],
+            baseline["slope"] * cls.SCALES[1],
+            baseline["tag_factor"] * cls.SCALES[2],
+            0.0,
+            0.0,
+        ])
+
+    @classmethod
+    def features(cls, context: ExecutionContext, result_size: float) -> list[float]:
+        raw = (1.0, context.card_count, context.unique_tags, context.operation_count, result_size)
+        return [value / scale for value, scale in zip(raw, cls.SCALES, strict=True)]
+
+    def predict(self, x: list[float]) -> float:
+        return sum(t * v for t, v in zip(self.theta, x, strict=True))
+
+    def update(self, x: list[float], actual_ms: float) -> None:
+        """Fold in one observation (standard RLS step, no forgetting)."""
+        p = self.covariance
+        px = [sum(row[j] * x[j] for j in range(len(x))) for row in p]
+        gain_denominator = 1.0 + sum(xi * pxi for xi, pxi in zip(x, px, strict=True))
+        gain = [value / gain_denominator for value in px]
+        error = actual_ms - self.predict(x)
+
+        self.theta = [t + k * error for t, k in zip(self.theta, gain, strict=True)]
+        self.covariance = [
+            [p[i][j] - gain[i] * px[j] for j in range(len(x))] for i in range(len(x))
+        ]
+        self.observations += 1
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "theta": self.theta,
+            "covariance": self.covariance,
+            "observations": self.observations,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "OnlineCostModel":
+        return cls(data["theta"], data["covariance"], data["observations"])
+
+
+def deployment_fingerprint() -> dict[str, Any]:
+    """Identify the hardware/runtime the learned costs are valid for."""
+    return {
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_implementation() + ".".join(map(str, sys.version_info[:2])),
+    }
+
+
+def default_model_path() -> Path:
+    """Coefficient file for this deployment (next to the default database)."""
+    configured = os.getenv("MULTICARDZ_PERF_MODEL_PATH")
+    if configured:
+        return Path(configured)
+
+    from apps.shared.config.database import DEFAULT_DATABASE_PATH
+
+    return DEFAULT_DATABASE_PATH.parent / "performance_model.json"
+
+
 class AdaptivePerformanceTracker:
     """
     3-Layer Adaptive Performance Tracker.
 
-    Layer 1: Conservative global baselines
-    Layer 2: Per-session adaptive learning
+    Layer 1: Conservative global baselines (priors for the cost models)
+    Layer 2: Online cost model per (mode, operation), persisted per deployment
     Layer 3: ML telemetry integration
+
+    Mode selection is epsilon-greedy: occasionally a less-observed mode is
+    tried instead of the predicted best, so every engine keeps being
+    measured, but only when its prediction is within EXPLORE_MAX_SLOWDOWN
+    of the best.
     """
 
-    def __init__(self):
+    MODEL_FORMAT = 1
+    EXPLORE_MAX_SLOWDOWN = 3.0
+    SAVE_INTERVAL_SECONDS = 30.0
+    DEFAULT_SELECTIVITY = 0.5
+
+    def __init__(self, model_path: Path | None = None,
+                 exploration_rate: float | None = None,
+                 rng: random.Random | None = None):
         # Layer 1: Global baselines (conservative defaults)
         # These are tuned based on actual measurements
         self.global_baseline = {
@@ -169,36 +616,52 @@ class AdaptivePerformanceTracker:
             }
         }
 
-        # Layer 2: Per-session adaptive learning
-        self.session_history = defaultdict(lambda: deque(maxlen=20))
-        self.session_models = {}
+        # Layer 2: Online cost models, keyed by (mode, operation_type)
+        self.models: dict[tuple[str, str], OnlineCostModel] = {}
+        # Running mean of result_size / card_count per operation type
+        self.selectivity: dict[str, float] = {}
         self.confidence = 0.0
+        self.exploration_rate = (
+            exploration_rate if exploration_rate is not None
+            else float(os.getenv("MULTICARDZ_MODE_EXPLORATION", "0.05"))
+        )
+        self._rng = rng or random.Random()
         self._lock = Lock()
 
+        self.model_path = model_path
+        self._last_saved = time.monotonic()
+        self._save_lock = Lock()
+        self._save_scheduled = False
+        if model_path is not None:
+            self.load()
+
         # Layer 3: ML telemetry
         self.telemetry = PerformanceTelemetryHook()
         self.ml_cache = TTLCache(maxsize=100, ttl=60)
 
+    def _model(self, mode: str, operation_type: str) -> OnlineCostModel:
+        key = (mode, operation_type)
+        model = self.models.get(key)
+        if model is None:
+            baseline = self.global_baseline.get(mode, self.global_baseline["regular"])
+            model = self.models[key] = OnlineCostModel.from_baseline(baseline)
+        return model
+
+    def _features(self, context: ExecutionContext) -> list[float]:
+        result_size = context.result_size
+        if result_size is None:
+            selectivity = self.selectivity.get(context.operation_type, self.DEFAULT_SELECTIVITY)
+            result_size = selectivity * context.card_count
+        return OnlineCostModel.features(context, result_size)
+
     def predict_time(self, mode: str, context: ExecutionContext) -> float:
         """
         Predict execution time for a given mode and context.
         Combines all three layers of prediction.
         """
-        # Layer 1: Start with global baseline
-        baseline = self.global_baseline.get(mode, self.global_baseline["regular"])
-        predicted = (
-            baseline["intercept"] +
-            baseline["slope"] * context.card_count +
-            baseline["tag_factor"] * context.unique_tags
-        )
-
-        # Layer 2: Blend with session-specific learning
-        session_key = (mode, context.operation_type)
-        if session_key in self.session_models and self.confidence > 0.1:
-            session_pred = self._predict_from_history(mode, context)
-            if session_pred is not None:
-                # Weighted average based on confidence
-                predicted = (1 - self.confidence) * predicted + self.confidence * session_pred
+        # Layers 1-2: cost model seeded from the global baseline
+        with self._lock:
+            predicted = self._model(mode, context.operation_type).predict(self._features(context))
 
         # Layer 3: Check ML service prediction
         cache_key = (mode, context.card_count, context.unique_tags, context.operation_type)
@@ -217,48 +680,35 @@ class AdaptivePerformanceTracker:
 
         return max(0.1, predicted)  # Never predict negative time
 
-    def _predict_from_history(self, mode: str, context: ExecutionContext) -> float | None:
-        """Predict based on session history using simple linear regression."""
-        session_key = (mode, context.operation_type)
-        history = self.session_history[session_key]
-
-        if len(history) < 3:
-            return None
-
-        # Simple linear regression on recent history
-        x_values = [m.context.card_count for m in history]
-        y_values = [m.actual_ms for m in history]
-
-        n = len(x_values)
-        if n == 0:
-            return None
-
-        # Calculate slope and intercept
-        x_mean = sum(x_values) / n
-        y_mean = sum(y_values) / n
-
-        numerator = sum((x - x_mean) * (y - y_mean) for x, y in zip(x_values, y_values, strict=False))
-        denominator = sum((x - x_mean) ** 2 for x in x_values)
-
-        if denominator == 0:
-            return y_mean
-
-        slope = numerator / denominator
-        intercept = y_mean - slope * x_mean
-
-        # Predict for current context
-        return max(0.1, intercept + slope * context.card_count)
-
     def record_actual(self, metrics: PerformanceMetrics) -> None:
         """Record actual performance metrics for learning."""
+        context = metrics.context
         with self._lock:
-            # Update Layer 2: Session history
-            session_key = (metrics.mode, metrics.context.operation_type)
-            self.session_history[session_key].append(metrics)
+            # Update Layer 2: cost model for the mode that ran
+            self._model(metrics.mode, context.operation_type).update(
+                self._features(context), metrics.actual_ms
+            )
+
+            if context.result_size is not None and context.card_count > 0:
+                previous = self.selectivity.get(context.operation_type, self.DEFAULT_SELECTIVITY)
+                observed = context.result_size / context.card_count
+                self.selectivity[context.operation_type] = 0.9 * previous + 0.1 * observed
 
             # Increase confidence as we gather more data
             self.confidence = min(0.8, self.confidence + 0.02)
 
+            save_due = (
+                self.model_path is not None
+                and not self._save_scheduled
+                and time.monotonic() - self._last_saved >= self.SAVE_INTERVAL_SECONDS
+            )
+            if save_due:
+                self._save_scheduled = True
+
+        if save_due:
+            # Written on a daemon thread so no request pays for the file I/O
+            Thread(target=self._save_in_background, name="perf-model-save", daemon=True).start()
+
         # Stream to Layer 3: Telemetry
         self.telemetry.record_execution(metrics)
 
@@ -283,6 +733,21 @@ class AdaptivePerformanceTracker:
         # Select mode with lowest predicted time
         best_mode = min(predictions, key=predictions.get)
 
+        if len(predictions) > 1 and self._rng.random() < self.exploration_rate:
+            limit = predictions[best_mode] * self.EXPLORE_MAX_SLOWDOWN
+            candidates = [
+                mode for mode in predictions
+                if mode != best_mode and predictions[mode] <= limit
+            ]
+            if candidates:
+                with self._lock:
+                    explored = min(
+                        candidates,
+                        key=lambda mode: self._model(mode, context.operation_type).observations
+                    )
+                logger.debug(f"Exploring {explored} instead of {best_mode}")
+                return explored
+
         logger.debug(
             f"Mode selection for {context.card_count} cards: "
             f"{best_mode} (predicted {predictions[best_mode]:.2f}ms)"
@@ -290,11 +755,108 @@ class AdaptivePerformanceTracker:
 
         return best_mode
 
+    def _save_in_background(self) -> None:
+        try:
+            self.save()
+        finally:
+            with self._lock:
+                self._save_scheduled = False
+
+    def save(self) -> bool:
+        """
+        Write the learned coefficients to model_path (atomically).
+
+        Saves are serialized, and each writes its own temporary file before
+        the rename, so concurrent savers (threads or worker processes) never
+        interleave their output.
+
+        Returns:
+            True if written; failures are logged and never raised
+        """
+        if self.model_path is None:
+            return False
+
+        with self._save_lock:
+            return self._write_model()
+
+    def _write_model(self) -> bool:
+        with self._lock:
+            state = {
+                "format": self.MODEL_FORMAT,
+                "fingerprint": deployment_fingerprint(),
+                "confidence": self.confidence,
+                "selectivity": dict(self.selectivity),
+                "models": [
+                    {"mode": mode, "operation_type": operation_type, **model.to_dict()}
+                    for (mode, operation_type), model in self.models.items()
+                ],
+            }
+            self._last_saved = time.monotonic()
+
+        temp_path = None
+        try:
+            self.model_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_name = tempfile.mkstemp(
+                prefix=self.model_path.name + ".", suffix=".tmp", dir=self.model_path.parent
+            )
+            temp_path = Path(temp_name)
+            with os.fdopen(fd, "w") as temp_file:
+                temp_file.write(json.dumps(state))
+            os.replace(temp_path, self.model_path)
+        except OSError as e:
+            logger.warning(f"Could not save performance model to {self.model_path}: {e}")
+            if temp_path is not None:
+                temp_path.unlink(missing_ok=True)
+            return False
+        return True
+
+    def load(self) -> bool:
+        """
+        Restore coefficients saved by this deployment.
+
+        A missing or unreadable file, another format, or a file written on
+        different hardware leaves the baseline priors in place.
+
+        Returns:
+            True if coefficients were restored
+        """
+        try:
+            state = json.loads(self.model_path.read_text())
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable performance model {self.model_path}: {e}")
+            return False
+
+        if state.get("format") != self.MODEL_FORMAT:
+            return False
+        if state.get("fingerprint") != deployment_fingerprint():
+            logger.info("Performance model was learned on different hardware; starting fresh")
+            return False
+
+        try:
+            models = {
+                (entry["mode"], entry["operation_type"]): OnlineCostModel.from_dict(entry)
+                for entry in state["models"]
+            }
+        except (KeyError, TypeError) as e:
+            logger.warning(f"Ignoring malformed performance model {self.model_path}: {e}")
+            return False
+
+        with self._lock:
+            self.models = models
+            self.selectivity = dict(state.get("selectivity", {}))
+            self.confidence = float(state.get("confidence", 0.0))
+        logger.info(f"Loaded performance model ({len(models)} cost models) from {self.model_path}")
+        return True
+
     def get_stats(self) -> dict[str, Any]:
         """Get tracker statistics."""
         stats = {
             "confidence": self.confidence,
-            "session_samples": sum(len(h) for h in self.session_history.values()),
+            "session_samples": sum(model.observations for model in self.models.values()),
+            "cost_models": len(self.models),
+            "exploration_rate": self.exploration_rate,
             "ml_connected": self.telemetry.is_connected(),
             "ml_cache_size": len(self.ml_cache._cache),
         }
@@ -307,12 +869,22 @@ _tracker_lock = Lock()
 
 
 def get_performance_tracker() -> AdaptivePerformanceTracker:
-    """Get the global performance tracker instance."""
+    """
+    Get the global performance tracker instance.
+
+    The first call loads this deployment's learned coefficients, so mode
+    selection is adaptive from the first request after a restart; they are
+    saved periodically and at interpreter exit.
+    """
     global _tracker_instance
 
     if _tracker_instance is None:
         with _tracker_lock:
             if _tracker_instance is None:
-                _tracker_instance = AdaptivePerformanceTracker()
+                tracker = AdaptivePerformanceTracker(model_path=default_model_path())
+                atexit.register(tracker.save)
+                if tracker.telemetry.enabled:
+                    atexit.register(tracker.telemetry.stop)
+                _tracker_instance = tracker
 
     return _tracker_instance
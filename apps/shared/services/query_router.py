@@ -29,11 +29,15 @@ Examples:
     True
 """
 
-from typing import NamedTuple, List, Dict, Any, Optional, Literal
+from typing import AsyncIterator, NamedTuple, List, Dict, Any, Optional, Literal
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Card IDs per IN (...) list; with the workspace/user parameters this stays
+# well below SQLite's default 999 bound-variable limit
+RESOLVE_CHUNK_SIZE = 500
+
 
 # ============================================================================
 # TYPE DEFINITIONS
@@ -367,10 +371,14 @@ def route_filtered_query(
     """Execute a combined query: server filters, browser resolves content.
 
     Two-phase query:
-    1. Server executes bitmap filtering → returns UUIDs
-    2. Browser resolves UUIDs → returns full card content
+    1. Server executes bitmap filtering → returns UUIDs in ordinal order
+    2. Browser resolves only the UUIDs of the requested page → returns
+       full card content, in the same order
 
     This ensures privacy: server only sees bitmaps, browser has content.
+    Pages are cut from the matched IDs before resolution, and resolution
+    uses bounded IN lists, so large filters never hit SQLite's variable
+    limit or build one giant statement.
 
     Args:
         workspace_id: Workspace UUID (zero-trust isolation)
@@ -424,58 +432,130 @@ def route_filtered_query(
                 total_matches=0
             )
 
-        # Resolve UUIDs to content in browser database
-        from apps.shared.services.browser_database import (
-            execute_query,
-            BrowserDatabaseConnection
+        # Resolve only the requested page, in ordinal (match) order
+        page_ids = matched_ids[offset:offset + limit]
+        success, cards, error = resolve_card_content(workspace_id, user_id, page_ids)
+
+        return FilteredQueryResult(
+            success=success,
+            matched_card_ids=matched_ids,
+            cards=cards,
+            total_matches=len(matched_ids),
+            error=error
         )
 
-        # Create a mock connected browser database connection
-        conn = BrowserDatabaseConnection(
-            database_name="multicardz_browser.db",
-            storage_type="opfs",
-            connected=True
+    except Exception as e:
+        logger.error(f"Filtered query routing failed: {e}", exc_info=True)
+        return FilteredQueryResult(
+            success=False,
+            matched_card_ids=[],
+            cards=[],
+            total_matches=0,
+            error=str(e)
         )
 
-        placeholders = ','.join(['?'] * len(matched_ids))
-        content_result = execute_query(
+
+def resolve_card_content(
+    workspace_id: str,
+    user_id: str,
+    card_ids: List[str],
+    chunk_size: int = RESOLVE_CHUNK_SIZE
+) -> tuple[bool, List[Dict[str, Any]], Optional[str]]:
+    """Resolve card UUIDs to content in the browser database.
+
+    Runs one bounded IN query per chunk of chunk_size IDs and returns rows
+    in the order of card_ids (IN lists do not preserve order).
+
+    Args:
+        workspace_id: Workspace UUID (zero-trust isolation)
+        user_id: User UUID (zero-trust isolation)
+        card_ids: Card UUIDs to resolve, in the order wanted
+        chunk_size: Maximum IDs per statement
+
+    Returns:
+        (success, rows, error)
+    """
+    if not card_ids:
+        return True, [], None
+
+    from apps.shared.services.browser_database import (
+        execute_query,
+        BrowserDatabaseConnection
+    )
+
+    # Create a mock connected browser database connection
+    conn = BrowserDatabaseConnection(
+        database_name="multicardz_browser.db",
+        storage_type="opfs",
+        connected=True
+    )
+
+    rows_by_id: Dict[str, Dict[str, Any]] = {}
+    for start in range(0, len(card_ids), chunk_size):
+        chunk = card_ids[start:start + chunk_size]
+        placeholders = ','.join(['?'] * len(chunk))
+        result = execute_query(
             connection=conn,
             sql=f"""
                 SELECT card_id, name, description, tags, card_bitmap, created, modified
                 FROM cards
                 WHERE workspace_id = ? AND user_id = ? AND card_id IN ({placeholders})
-                ORDER BY created DESC
-                LIMIT ? OFFSET ?
             """,
-            params=[workspace_id, user_id, *matched_ids, limit, offset]
+            params=[workspace_id, user_id, *chunk]
         )
+        if not result.success:
+            return False, [], result.error
+        for row in result.rows or []:
+            rows_by_id[row.get('card_id')] = row
 
-        if content_result.success:
-            cards = content_result.rows or []
-            return FilteredQueryResult(
-                success=True,
-                matched_card_ids=matched_ids,
-                cards=cards,
-                total_matches=len(matched_ids)
-            )
-        else:
-            return FilteredQueryResult(
-                success=False,
-                matched_card_ids=matched_ids,
-                cards=[],
-                total_matches=len(matched_ids),
-                error=content_result.error
-            )
+    return True, [rows_by_id[card_id] for card_id in card_ids if card_id in rows_by_id], None
 
-    except Exception as e:
-        logger.error(f"Filtered query routing failed: {e}", exc_info=True)
-        return FilteredQueryResult(
-            success=False,
-            matched_card_ids=[],
-            cards=[],
-            total_matches=0,
-            error=str(e)
+
+async def stream_filtered_query(
+    workspace_id: str,
+    user_id: str,
+    filter_operations: List[Dict[str, Any]],
+    page_size: int = RESOLVE_CHUNK_SIZE,
+    offset: int = 0,
+    limit: Optional[int] = None
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Stream a filtered query's cards page by page, in ordinal order.
+
+    Phase 1 (server filtering) runs once; each page of matched IDs is then
+    resolved on the database thread pool only when the consumer asks for
+    it, so stopping early never resolves the remaining pages.
+
+    Args:
+        workspace_id: Workspace UUID (zero-trust isolation)
+        user_id: User UUID (zero-trust isolation)
+        filter_operations: Bitmap filter operations
+        page_size: Cards per yielded page (and per IN list)
+        offset: Matched cards to skip
+        limit: Maximum cards to yield (None = all)
+
+    Yields:
+        Lists of resolved cards
+
+    Raises:
+        RuntimeError: If filtering or resolution fails
+    """
+    from apps.shared.services.async_database import run_db
+
+    bitmap_result = await run_db(route_bitmap_operation, workspace_id, user_id, filter_operations)
+    if not bitmap_result.success:
+        raise RuntimeError(bitmap_result.error)
+
+    matched_ids = bitmap_result.card_ids or []
+    end = len(matched_ids) if limit is None else min(len(matched_ids), offset + limit)
+
+    for start in range(offset, end, page_size):
+        page_ids = matched_ids[start:min(start + page_size, end)]
+        success, cards, error = await run_db(
+            resolve_card_content, workspace_id, user_id, page_ids, page_size
         )
+        if not success:
+            raise RuntimeError(error)
+        yield cards
 
 
 # ============================================================================
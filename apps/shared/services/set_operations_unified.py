@@ -151,6 +151,15 @@ class CardRegistrySingleton:
             # Inverted index for fast lookups (tag -> frozenset of card_ids)
             self._tag_to_cards: dict[str, frozenset[str]] = {}
 
+            # Stable card ordinals and per-card tags, so postings can be
+            # kept as bitmaps and updated precisely on mutation
+            self._card_ordinals: dict[str, int] = {}
+            self._card_tags: dict[str, frozenset[str]] = {}
+            self._next_card_ordinal: int = 0
+
+            # Lazily built posting bitmaps (tag -> RoaringBitmap of ordinals)
+            self._tag_postings: dict[str, Any] = {}
+
             # Registry state tracking
             self._cards_registered: int = 0
             self._registry_frozen: bool = False
@@ -206,9 +215,47 @@ class CardRegistrySingleton:
             for tag, card_ids in tag_to_cards_dict.items():
                 self._tag_to_cards[tag] = frozenset(card_ids)
 
+            for card in cards:
+                self._assign_ordinal(card)
+
             self._cards_registered = len(cards)
             logger.info(f"Registered {len(cards)} cards with {len(all_tags)} unique tags")
 
+        # Ordinals changed: group postings built over the old ones are stale
+        clear_group_postings()
+
+    def _assign_ordinal(self, card: CardSummaryTuple) -> None:
+        """Give a card a stable ordinal (kept across updates) and record its tags."""
+        if card.id not in self._card_ordinals:
+            self._card_ordinals[card.id] = self._next_card_ordinal
+            self._next_card_ordinal += 1
+        self._card_tags[card.id] = frozenset(card.tags)
+
+    def get_card_ordinal(self, card_id: str) -> int | None:
+        """Ordinal of a registered card (None if not registered)."""
+        return self._card_ordinals.get(card_id)
+
+    def get_tag_posting(self, tag: str) -> Any:
+        """
+        Posting bitmap of a tag: RoaringBitmap of the ordinals of cards carrying it.
+
+        Built from the inverted index on first use and dropped when a
+        mutation touches the tag. Requires pyroaring/croaring.
+        """
+        posting = self._tag_postings.get(tag)
+        if posting is not None:
+            return posting
+
+        RoaringBitmap, _ = _get_roaring_bitmap()
+        with self._lock:
+            posting = RoaringBitmap(
+                self._card_ordinals[card_id]
+                for card_id in self._tag_to_cards.get(tag, ())
+                if card_id in self._card_ordinals
+            )
+            self._tag_postings[tag] = posting
+        return posting
+
     def freeze_registry(self) -> None:
         """Freeze the registry to prevent further modifications."""
         with self._lock:
@@ -257,9 +304,15 @@ class CardRegistrySingleton:
             self._next_tag_id = 0
             self._card_bitmaps.clear()
             self._tag_to_cards.clear()
+            self._card_ordinals.clear()
+            self._card_tags.clear()
+            self._next_card_ordinal = 0
+            self._tag_postings.clear()
             self._cards_registered = 0
             self._registry_frozen = False
 
+        clear_group_postings()
+
 
 def initialize_card_registry(cards: frozenset[CardSummaryTuple], cache_path: str | None = None) -> None:
     """
@@ -289,8 +342,13 @@ def initialize_card_registry(cards: frozenset[CardSummaryTuple], cache_path: str
                     registry._next_tag_id = cached_data.get('next_tag_id', 0)
                     registry._card_bitmaps = cached_data.get('card_bitmaps', {})
                     registry._tag_to_cards = cached_data.get('tag_to_cards', {})
+                    registry._card_ordinals = cached_data.get('card_ordinals', {})
+                    registry._card_tags = cached_data.get('card_tags', {})
+                    registry._next_card_ordinal = cached_data.get('next_card_ordinal', 0)
+                    registry._tag_postings = {}
                     registry._cards_registered = cached_data.get('cards_registered', 0)
                     registry._registry_frozen = True
+                clear_group_postings()
                 return
         except Exception as e:
             # Cache loading failed, fall back to normal initialization
@@ -309,6 +367,9 @@ def initialize_card_registry(cards: frozenset[CardSummaryTuple], cache_path: str
                 'next_tag_id': registry._next_tag_id,
                 'card_bitmaps': registry._card_bitmaps,
                 'tag_to_cards': registry._tag_to_cards,
+                'card_ordinals': registry._card_ordinals,
+                'card_tags': registry._card_tags,
+                'next_card_ordinal': registry._next_card_ordinal,
                 'cards_registered': registry._cards_registered,
             }
             Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
@@ -343,52 +404,227 @@ def handle_card_mutations(
         was_frozen = registry._registry_frozen
         registry._registry_frozen = False
 
+        touched_tags: set[str] = set()
+
+        def register_tag(tag: str) -> None:
+            if tag not in registry._tag_to_id:
+                tag_id = registry._next_tag_id
+                registry._tag_to_id[tag] = tag_id
+                registry._id_to_tag[tag_id] = tag
+                registry._next_tag_id += 1
+
+        def unlink(card_id: str, tags) -> None:
+            for tag in tags:
+                remaining = registry._tag_to_cards.get(tag, frozenset()) - {card_id}
+                registry._tag_to_cards[tag] = remaining
+                touched_tags.add(tag)
+
+        def link(card_id: str, tags) -> None:
+            for tag in tags:
+                register_tag(tag)
+                registry._tag_to_cards[tag] = registry._tag_to_cards.get(tag, frozenset()) | {card_id}
+                touched_tags.add(tag)
+
         # Handle deletions
         if deleted_card_ids:
             for card_id in deleted_card_ids:
                 # Remove from card bitmaps if exists
                 if card_id in registry._card_bitmaps:
                     del registry._card_bitmaps[card_id]
+                old_tags = registry._card_tags.pop(card_id, None)
+                if old_tags is not None:
+                    unlink(card_id, old_tags)
                 registry._cards_registered -= 1
 
         # Handle additions
         if added_cards:
             for card in added_cards:
-                # Register new tags
-                for tag in card.tags:
-                    if tag not in registry._tag_to_id:
-                        tag_id = registry._next_tag_id
-                        registry._tag_to_id[tag] = tag_id
-                        registry._id_to_tag[tag_id] = tag
-                        registry._next_tag_id += 1
-
-                    # Update inverted index
-                    if tag not in registry._tag_to_cards:
-                        registry._tag_to_cards[tag] = frozenset()
-                    registry._tag_to_cards[tag] = registry._tag_to_cards[tag] | {card.id}
-
+                link(card.id, card.tags)
+                registry._assign_ordinal(card)
                 registry._cards_registered += 1
 
-        # Handle updates
+        # Handle updates (postings follow the card's new tag set exactly)
         if updated_cards:
             for card in updated_cards:
-                # Register any new tags from updated cards
-                for tag in card.tags:
-                    if tag not in registry._tag_to_id:
-                        tag_id = registry._next_tag_id
-                        registry._tag_to_id[tag] = tag_id
-                        registry._id_to_tag[tag_id] = tag
-                        registry._next_tag_id += 1
+                old_tags = registry._card_tags.get(card.id, frozenset())
+                new_tags = frozenset(card.tags)
+                unlink(card.id, old_tags - new_tags)
+                link(card.id, new_tags - old_tags)
+                registry._assign_ordinal(card)
 
-                    # Update inverted index
-                    if tag not in registry._tag_to_cards:
-                        registry._tag_to_cards[tag] = frozenset()
-                    registry._tag_to_cards[tag] = registry._tag_to_cards[tag] | {card.id}
+        for tag in touched_tags:
+            registry._tag_postings.pop(tag, None)
 
         # Restore frozen state if it was frozen before
         if was_frozen:
             registry._registry_frozen = True
 
+    # Group postings are unions of tag postings
+    clear_group_postings()
+
+
+# Group Operands
+#
+# A group ID (group_...) inside an operation's tag list is a single operand
+# that matches any card carrying one of the group's expanded tags. Its
+# posting is the union of its tags' registry postings, cached per group and
+# invalidated by group_expansion when membership changes, so "intersection
+# with group G" is one bitmap AND however many tags G contains.
+
+GROUP_POSTING_CACHE_SIZE = 1024
+
+_group_posting_cache = None
+_group_posting_lock = threading.Lock()
+
+# Bumped on every group change; part of the result cache key for group ops
+_group_generation = 0
+
+
+def _on_group_change(group_id: str) -> None:
+    global _group_generation
+    # Listeners run on several executor threads: bump and invalidate atomically
+    with _group_posting_lock:
+        _group_generation += 1
+        _group_posting_cache.invalidate(group_id)
+
+
+def _get_group_posting_cache():
+    """Create the group posting cache and subscribe it to group changes."""
+    global _group_posting_cache
+
+    if _group_posting_cache is None:
+        with _group_posting_lock:
+            if _group_posting_cache is None:
+                from apps.shared.services.group_expansion import (
+                    GroupExpansionCache,
+                    add_group_change_listener,
+                )
+
+                _group_posting_cache = GroupExpansionCache(
+                    max_size=GROUP_POSTING_CACHE_SIZE, ttl_seconds=300
+                )
+                add_group_change_listener(_on_group_change)
+
+    return _group_posting_cache
+
+
+def clear_group_postings() -> None:
+    """Drop every cached group posting (card registry changed)."""
+    global _group_generation
+    with _group_posting_lock:
+        _group_generation += 1
+        if _group_posting_cache is not None:
+            _group_posting_cache.clear()
+
+
+def split_group_operands(tag_names: frozenset[str]) -> tuple[frozenset[str], frozenset[str]]:
+    """Split operation operands into (plain tags, group IDs)."""
+    from apps.shared.services.group_storage import is_group_tag
+
+    groups = frozenset(tag for tag in tag_names if is_group_tag(tag))
+    return tag_names - groups, groups
+
+
+def get_group_posting(group_id: str) -> Any:
+    """
+    Union posting bitmap of a group's expanded tags over registry ordinals.
+
+    Returns:
+        RoaringBitmap, or None when the registry is empty or roaring bitmaps
+        are unavailable (callers then match the expanded tags directly)
+    """
+    registry = CardRegistrySingleton()
+    _, roaring_available = _get_roaring_bitmap()
+    if not roaring_available or not registry._card_ordinals:
+        return None
+
+    cache = _get_group_posting_cache()
+    posting = cache.get(group_id)
+    if posting is not None:
+        return posting
+    generation = _group_generation
+
+    from apps.shared.services.group_expansion import expand_group_recursive, get_graph_for_group
+
+    RoaringBitmap, _ = _get_roaring_bitmap()
+    leaf_tags = expand_group_recursive(group_id)
+    posting = RoaringBitmap.union(
+        RoaringBitmap(), *(registry.get_tag_posting(tag) for tag in leaf_tags)
+    )
+
+    graph = get_graph_for_group(group_id)
+    depends_on = graph.descendant_groups.get(group_id, frozenset()) if graph else frozenset()
+    # Not cached if the registry or a group changed while it was built
+    with _group_posting_lock:
+        if generation == _group_generation:
+            cache.put(group_id, posting, depends_on)
+    return posting
+
+
+def execute_group_operation(
+    cards: CardSet,
+    operation_type: str,
+    tag_names: frozenset[str],
+    group_ids: frozenset[str],
+) -> CardSet:
+    """
+    Apply an operation whose operands include groups.
+
+    Each group is one operand matching cards that carry any of its expanded
+    tags. Group postings are combined first (AND for intersection, OR
+    otherwise) and cards are tested against the combined bitmap by ordinal;
+    cards missing from the registry fall back to matching expanded tags.
+
+    Args:
+        cards: Input card set
+        operation_type: intersection, union, difference or exclusion
+        tag_names: Plain tag operands
+        group_ids: Group operands
+
+    Returns:
+        Matching cards
+    """
+    from apps.shared.services.group_expansion import expand_group_recursive
+
+    if operation_type not in ("intersection", "union", "difference", "exclusion"):
+        raise ValueError(f"Unknown operation type: {operation_type}")
+
+    # Subscribe to group changes before any result is cached
+    _get_group_posting_cache()
+
+    intersect = operation_type == "intersection"
+    registry = CardRegistrySingleton()
+    group_tags = [expand_group_recursive(group_id) for group_id in group_ids]
+    postings = [get_group_posting(group_id) for group_id in group_ids]
+
+    combined = None
+    if postings and all(p is not None for p in postings):
+        RoaringBitmap, _ = _get_roaring_bitmap()
+        combined = (
+            RoaringBitmap.intersection(*postings) if intersect
+            else RoaringBitmap.union(*postings)
+        )
+
+    def in_groups(card: CardSummaryTuple) -> bool:
+        ordinal = registry.get_card_ordinal(card.id) if combined is not None else None
+        if ordinal is not None:
+            return ordinal in combined
+        matches = (not tags.isdisjoint(card.tags) for tags in group_tags)
+        return all(matches) if intersect else any(matches)
+
+    if intersect:
+        return frozenset(
+            card for card in cards if tag_names.issubset(card.tags) and in_groups(card)
+        )
+    if operation_type == "union":
+        return frozenset(
+            card for card in cards if not tag_names.isdisjoint(card.tags) or in_groups(card)
+        )
+    # difference / exclusion: none of the tags, in none of the groups
+    return frozenset(
+        card for card in cards if tag_names.isdisjoint(card.tags) and not in_groups(card)
+    )
+
 
 # Pure Functions for Multiprocessing (zero state, explicit inputs)
 
@@ -657,9 +893,14 @@ def apply_unified_operations(
     for operation_type, tags_with_counts in operations:
         # Extract tag names from tuples
         tag_names = frozenset(tag for tag, _count in tags_with_counts)
+        tag_names, group_ids = split_group_operands(tag_names)
 
         # Apply operation using selected mode
-        if processing_mode == "regular":
+        if group_ids:
+            result_cards = execute_group_operation(
+                result_cards, operation_type, tag_names, group_ids
+            )
+        elif processing_mode == "regular":
             result_cards = execute_regular_operation(
                 result_cards, operation_type, tag_names
             )
@@ -727,9 +968,10 @@ def apply_unified_operations(
         context = ExecutionContext(
             card_count=cards_count,
             unique_tags=int(unique_tags_estimate),
-            operation_type=operations[0][0] if operations else "unknown",
-            operation_count=operations_applied,
-            cache_hit=False
+            operation_type=first_operation,
+            operation_count=operation_complexity,
+            cache_hit=False,
+            result_size=len(result_cards),
         )
         metrics = PerformanceMetrics(
             mode=processing_mode,
@@ -778,6 +1020,12 @@ def generate_cache_key_improved(cards: CardSet, operations: OperationSequence) -
     # Add operation complexity as a salt
     ops_complexity = sum(len(tags_list) for _, tags_list in operations)
 
+    # Results involving groups are only valid for the current group membership
+    from apps.shared.services.group_storage import is_group_tag
+
+    if any(is_group_tag(tag) for _, tags_list in operations for tag, _ in tags_list):
+        return f"{cards_hash}:{ops_hash}:{ops_complexity}:g{_group_generation}"
+
     return f"{cards_hash}:{ops_hash}:{ops_complexity}"
 
 
@@ -1129,7 +1377,8 @@ def select_processing_mode(
 ) -> str:
     """
     Adaptively select optimal processing mode using performance tracker.
-    Falls back to static thresholds if tracker has low confidence.
+    Falls back to static thresholds if tracker has low confidence; a tracker
+    restored from this deployment's saved model is confident immediately.
     """
     # Get the adaptive performance tracker
     tracker = get_performance_tracker()
@@ -1,8 +1,17 @@
-"""Tag count auto-maintenance functions with atomic transactions."""
+"""Tag count auto-maintenance functions with atomic transactions.
+
+db_connection is any object with an awaitable execute(), normally an
+apps.shared.services.async_database.AsyncConnection.
+"""
 
 import json
 
 
+def _in_transaction(db_connection) -> bool:
+    """True when the caller already opened a transaction on this connection."""
+    return getattr(db_connection, "in_transaction", False) is True
+
+
 async def increment_tag_counts(
     tag_ids: list[str],
     workspace_id: str,
@@ -18,7 +27,10 @@ async def increment_tag_counts(
     if not tag_ids:
         return
 
-    await db_connection.execute("BEGIN TRANSACTION")
+    # Join the caller's transaction instead of nesting BEGIN (SQLite rejects it)
+    owns_transaction = not _in_transaction(db_connection)
+    if owns_transaction:
+        await db_connection.execute("BEGIN TRANSACTION")
 
     try:
         for tag_id in tag_ids:
@@ -32,10 +44,12 @@ async def increment_tag_counts(
                 (tag_id, workspace_id, user_id)
             )
 
-        await db_connection.execute("COMMIT")
+        if owns_transaction:
+            await db_connection.execute("COMMIT")
 
     except Exception as e:
-        await db_connection.execute("ROLLBACK")
+        if owns_transaction:
+            await db_connection.execute("ROLLBACK")
         raise ValueError(f"Failed to increment counts: {e}")
 
 
@@ -54,7 +68,9 @@ async def decrement_tag_counts(
     if not tag_ids:
         return
 
-    await db_connection.execute("BEGIN TRANSACTION")
+    owns_transaction = not _in_transaction(db_connection)
+    if owns_transaction:
+        await db_connection.execute("BEGIN TRANSACTION")
 
     try:
         for tag_id in tag_ids:
@@ -68,10 +84,12 @@ async def decrement_tag_counts(
                 (tag_id, workspace_id, user_id)
             )
 
-        await db_connection.execute("COMMIT")
+        if owns_transaction:
+            await db_connection.execute("COMMIT")
 
     except Exception as e:
-        await db_connection.execute("ROLLBACK")
+        if owns_transaction:
+            await db_connection.execute("ROLLBACK")
         raise ValueError(f"Failed to decrement counts: {e}")
 
 
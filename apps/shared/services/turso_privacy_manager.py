@@ -2,17 +2,61 @@
 Turso Privacy Mode Manager using pure functions.
 Handles three-way sync between browser WASM SQLite, server SQLite, and Turso cloud.
 Following Zero-Trust UUID Architecture Phase 2 requirements.
+
+Embedded replicas are held in a bounded ReplicaPool: at most max_open
+handles, least recently used first out, idle handles closed after
+idle_timeout seconds. The replica schema is created once per file and
+recorded in a marker file next to it, so reopening a replica (after
+eviction or a restart) does not rerun the DDL.
 """
 
 import hashlib
+import itertools
 import json
+import logging
 import os
+import threading
+import time
+from collections import OrderedDict, deque
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from enum import Enum
-from typing import Any, Optional
+from typing import Any, NamedTuple, Optional, Union
 
 import libsql_experimental as libsql
 from apps.shared.models.orm_models import Cards, Tags
 
+logger = logging.getLogger(__name__)
+
+# Bump when REPLICA_SCHEMA changes so existing replicas are migrated
+REPLICA_SCHEMA_VERSION = 1
+
+REPLICA_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS obfuscated_cards (
+        card_bitmap INTEGER PRIMARY KEY,
+        tag_bitmaps TEXT,
+        checksum TEXT,
+        sync_version INTEGER DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS obfuscated_tags (
+        tag_bitmap INTEGER PRIMARY KEY,
+        checksum TEXT,
+        sync_version INTEGER DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS sync_metadata (
+        key TEXT PRIMARY KEY,
+        value TEXT,
+        updated_at INTEGER
+    )
+    """,
+)
+
 
 class SyncDirection(Enum):
     """Sync direction for replication."""
@@ -62,36 +106,300 @@ def get_obfuscation_key(
     return key
 
 
-def create_embedded_replica(
-    user_id: str,
-    workspace_id: str,
-    turso_url: Optional[str] = None,
-    turso_token: Optional[str] = None,
-    sync_interval: int = 60,
-    replica_cache: Optional[dict[str, libsql.Database]] = None,
-    obfuscation_key_cache: Optional[dict[str, bytes]] = None
-) -> libsql.Database:
+# ============================================================================
+# EMBEDDED REPLICA POOL
+# ============================================================================
+
+class ReplicaPoolMetrics(NamedTuple):
+    """Snapshot of replica pool activity."""
+    open_handles: int
+    leased_handles: int
+    max_open: int
+    hits: int
+    misses: int
+    idle_evictions: int
+    capacity_evictions: int
+    schema_initializations: int
+
+
+class _PooledReplica:
+    """A pooled handle with its last use time and active lease count."""
+
+    __slots__ = ("db", "last_used", "leases")
+
+    def __init__(self, db: Any) -> None:
+        self.db = db
+        self.last_used = time.monotonic()
+        self.leases = 0
+
+
+class ReplicaPool:
     """
-    Create or get an embedded replica for user/workspace.
+    Bounded LRU pool of embedded replica handles.
 
-    Args:
-        user_id: User identifier
-        workspace_id: Workspace identifier
-        turso_url: Turso database URL (uses env var if not provided)
-        turso_token: Turso auth token (uses env var if not provided)
-        sync_interval: Sync interval in seconds
-        replica_cache: Optional cache for replicas
-        obfuscation_key_cache: Optional cache for obfuscation keys
+    Handles are evicted when idle longer than idle_timeout, or least
+    recently used first once max_open is reached. Leased handles (see
+    lease()) are never evicted, so the pool can briefly exceed max_open
+    when every handle is in use. A background sweeper runs evict_idle()
+    every sweep_interval seconds, so idle handles are closed even when no
+    new replica is opened.
+
+    Replicas are opened outside the pool lock: a slow open only delays
+    callers of the same replica, who wait for it instead of opening twice.
+    """
+
+    def __init__(
+        self,
+        max_open: Optional[int] = None,
+        idle_timeout: Optional[float] = None,
+        sweep_interval: Optional[float] = None,
+        start_sweeper: bool = True
+    ) -> None:
+        if max_open is None:
+            max_open = int(os.getenv('TURSO_REPLICA_POOL_SIZE', '256'))
+        if idle_timeout is None:
+            idle_timeout = float(os.getenv('TURSO_REPLICA_IDLE_SECONDS', '600'))
+        if sweep_interval is None:
+            sweep_interval = float(os.getenv('TURSO_REPLICA_SWEEP_SECONDS', str(idle_timeout / 2)))
+
+        self.max_open = max_open
+        self.idle_timeout = idle_timeout
+        self.sweep_interval = sweep_interval
+        self._replicas: OrderedDict[str, _PooledReplica] = OrderedDict()
+        self._opening: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._idle_evictions = 0
+        self._capacity_evictions = 0
+        self.schema_initializations = 0
+
+        self._stop = threading.Event()
+        self._sweeper: Optional[threading.Thread] = None
+        if start_sweeper and sweep_interval > 0:
+            self._sweeper = threading.Thread(
+                target=self._sweep, name="replica-pool-sweep", daemon=True
+            )
+            self._sweeper.start()
+
+    def __contains__(self, replica_id: str) -> bool:
+        with self._lock:
+            return replica_id in self._replicas
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._replicas)
+
+    def _checkout(self, replica_id: str, opener: Callable[[], Any], lease: bool) -> _PooledReplica:
+        """
+        Get or open a handle and mark it most recently used.
+
+        opener() runs without the pool lock. While it runs, other misses for
+        the same replica wait on its Future and then look the handle up again.
+        """
+        while True:
+            with self._lock:
+                entry = self._replicas.get(replica_id)
+                if entry is not None:
+                    self._hits += 1
+                    self._replicas.move_to_end(replica_id)
+                    entry.last_used = time.monotonic()
+                    if lease:
+                        entry.leases += 1
+                    return entry
+                opening = self._opening.get(replica_id)
+                if opening is None:
+                    opening = self._opening[replica_id] = Future()
+                    break
+            opening.result()
+
+        try:
+            db = opener()
+        except BaseException as e:
+            with self._lock:
+                del self._opening[replica_id]
+            opening.set_exception(e)
+            raise
+
+        with self._lock:
+            self._misses += 1
+            evicted = self._evict(reserve=1)
+            entry = self._replicas[replica_id] = _PooledReplica(db)
+            if lease:
+                entry.leases += 1
+            del self._opening[replica_id]
+        opening.set_result(None)
+        _close_replicas(evicted)
+        return entry
+
+    def get(self, replica_id: str, opener: Callable[[], Any]) -> Any:
+        """
+        Get a pooled handle, opening it with opener() on a miss.
+
+        A replica is never opened twice concurrently. The handle is not
+        leased: once idle for idle_timeout, or when other opens need its
+        slot, the pool closes it. Use lease() to hold a handle across a
+        longer block.
+        """
+        return self._checkout(replica_id, opener, lease=False).db
+
+    @contextmanager
+    def lease(self, replica_id: str, opener: Callable[[], Any]) -> Iterator[Any]:
+        """Use a handle with eviction held off until the block exits."""
+        entry = self._checkout(replica_id, opener, lease=True)
+        try:
+            yield entry.db
+        finally:
+            with self._lock:
+                entry.leases -= 1
+                entry.last_used = time.monotonic()
+
+    def evict_idle(self) -> int:
+        """Close handles idle longer than idle_timeout. Returns the count closed."""
+        with self._lock:
+            evicted = self._evict(reserve=0)
+        _close_replicas(evicted)
+        return len(evicted)
+
+    def _sweep(self) -> None:
+        while not self._stop.wait(self.sweep_interval):
+            try:
+                evicted = self.evict_idle()
+                if evicted:
+                    logger.debug(f"Replica pool closed {evicted} idle handles")
+            except Exception as e:
+                logger.warning(f"Replica pool sweep failed: {e}")
+
+    def _evict(self, reserve: int) -> list[Any]:
+        """
+        Drop idle handles, then LRU handles until `reserve` slots are free (lock held).
+
+        Returns:
+            The dropped handles; the caller closes them after releasing the
+            lock, so a slow libsql close never stalls other checkouts
+        """
+        cutoff = time.monotonic() - self.idle_timeout
+        evicted = []
+
+        for replica_id, entry in list(self._replicas.items()):
+            over_capacity = len(self._replicas) + reserve > self.max_open
+            idle = entry.last_used < cutoff
+            if not (idle or over_capacity):
+                # Entries are in LRU order: the rest are fresher and fit
+                break
+            if entry.leases:
+                continue
+
+            del self._replicas[replica_id]
+            evicted.append(entry.db)
+            if idle:
+                self._idle_evictions += 1
+            else:
+                self._capacity_evictions += 1
+
+        return evicted
+
+    def close_all(self) -> None:
+        """Stop the sweeper and close every handle that is not leased (shutdown)."""
+        self._stop.set()
+        with self._lock:
+            closing = []
+            for replica_id, entry in list(self._replicas.items()):
+                if not entry.leases:
+                    del self._replicas[replica_id]
+                    closing.append(entry.db)
+        _close_replicas(closing)
+
+    def metrics(self) -> ReplicaPoolMetrics:
+        """Current pool size and counters."""
+        with self._lock:
+            return ReplicaPoolMetrics(
+                open_handles=len(self._replicas),
+                leased_handles=sum(1 for entry in self._replicas.values() if entry.leases),
+                max_open=self.max_open,
+                hits=self._hits,
+                misses=self._misses,
+                idle_evictions=self._idle_evictions,
+                capacity_evictions=self._capacity_evictions,
+                schema_initializations=self.schema_initializations,
+            )
+
+
+def _close_replica(db: Any) -> None:
+    """Close a replica handle; libsql handles without close() are released by GC."""
+    close = getattr(db, "close", None)
+    if close is not None:
+        try:
+            close()
+        except Exception as e:
+            logger.warning(f"Failed to close embedded replica: {e}")
+
+
+def _close_replicas(dbs: Iterable[Any]) -> None:
+    for db in dbs:
+        _close_replica(db)
+
+
+_default_replica_pool: Optional[ReplicaPool] = None
+_default_replica_pool_lock = threading.Lock()
+
+
+def get_replica_pool() -> ReplicaPool:
+    """Process-wide replica pool (sized from the environment)."""
+    global _default_replica_pool
+    with _default_replica_pool_lock:
+        if _default_replica_pool is None:
+            _default_replica_pool = ReplicaPool()
+        return _default_replica_pool
+
+
+def _schema_marker_path(local_path: str) -> str:
+    return f"{local_path}.schema"
+
+
+def _schema_is_initialized(local_path: str) -> bool:
+    """Whether the replica file exists and its marker records the current schema."""
+    if not os.path.exists(local_path):
+        return False
+    try:
+        with open(_schema_marker_path(local_path)) as marker:
+            return marker.read().strip() == str(REPLICA_SCHEMA_VERSION)
+    except OSError:
+        return False
+
+
+def initialize_replica_schema(db: libsql.Database, local_path: str) -> bool:
+    """
+    Create the obfuscated-data schema unless the marker says it exists.
 
     Returns:
-        libsql Database instance
+        True if the DDL ran
     """
-    replica_id = f"{user_id}_{workspace_id}"
+    if _schema_is_initialized(local_path):
+        return False
 
-    # Check cache if provided
-    if replica_cache is not None and replica_id in replica_cache:
-        return replica_cache[replica_id]
+    conn = db.connect()
+    try:
+        for statement in REPLICA_SCHEMA:
+            conn.execute(statement)
+        conn.commit()
+    finally:
+        conn.close()
+
+    with open(_schema_marker_path(local_path), "w") as marker:
+        marker.write(str(REPLICA_SCHEMA_VERSION))
+    return True
 
+
+def _open_embedded_replica(
+    user_id: str,
+    workspace_id: str,
+    turso_url: Optional[str],
+    turso_token: Optional[str],
+    sync_interval: int,
+    obfuscation_key_cache: Optional[dict[str, bytes]]
+) -> tuple[libsql.Database, bool]:
+    """Open a replica file and ensure its schema. Returns (db, schema_created)."""
     # Use environment variables if not provided
     if turso_url is None:
         turso_url = os.getenv('TURSO_DATABASE_URL')
@@ -118,68 +426,167 @@ def create_embedded_replica(
         encryption_key=encryption_key
     )
 
-    # Initialize schema for obfuscated data
-    conn = db.connect()
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS obfuscated_cards (
-            card_bitmap INTEGER PRIMARY KEY,
-            tag_bitmaps TEXT,
-            checksum TEXT,
-            sync_version INTEGER DEFAULT 0
-        )
-    """)
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS obfuscated_tags (
-            tag_bitmap INTEGER PRIMARY KEY,
-            checksum TEXT,
-            sync_version INTEGER DEFAULT 0
-        )
-    """)
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS sync_metadata (
-            key TEXT PRIMARY KEY,
-            value TEXT,
-            updated_at INTEGER
+    return db, initialize_replica_schema(db, local_path)
+
+
+def _replica_opener(
+    pool: ReplicaPool,
+    user_id: str,
+    workspace_id: str,
+    turso_url: Optional[str] = None,
+    turso_token: Optional[str] = None,
+    sync_interval: int = 60,
+    obfuscation_key_cache: Optional[dict[str, bytes]] = None
+) -> Callable[[], libsql.Database]:
+    """Opener for a pool miss that counts schema initializations."""
+    def opener() -> libsql.Database:
+        db, schema_created = _open_embedded_replica(
+            user_id, workspace_id, turso_url, turso_token,
+            sync_interval, obfuscation_key_cache
         )
-    """)
-    conn.commit()
-    conn.close()
+        if schema_created:
+            with pool._lock:
+                pool.schema_initializations += 1
+        return db
 
-    # Store in cache if provided
-    if replica_cache is not None:
-        replica_cache[replica_id] = db
+    return opener
+
+
+def create_embedded_replica(
+    user_id: str,
+    workspace_id: str,
+    turso_url: Optional[str] = None,
+    turso_token: Optional[str] = None,
+    sync_interval: int = 60,
+    replica_cache: Optional[Union[ReplicaPool, dict[str, libsql.Database]]] = None,
+    obfuscation_key_cache: Optional[dict[str, bytes]] = None
+) -> libsql.Database:
+    """
+    Create or get an embedded replica for user/workspace.
+
+    Args:
+        user_id: User identifier
+        workspace_id: Workspace identifier
+        turso_url: Turso database URL (uses env var if not provided)
+        turso_token: Turso auth token (uses env var if not provided)
+        sync_interval: Sync interval in seconds
+        replica_cache: ReplicaPool (bounded) or plain dict (unbounded) for
+            replicas; None uses the process-wide pool
+        obfuscation_key_cache: Optional cache for obfuscation keys
+
+    Returns:
+        libsql Database instance. A handle from a ReplicaPool is not leased:
+        the pool closes it once it has been idle for idle_timeout or when
+        capacity eviction needs its slot. Use it right away, or hold it
+        with embedded_replica() for the length of a block.
+    """
+    replica_id = f"{user_id}_{workspace_id}"
+
+    if replica_cache is None:
+        replica_cache = get_replica_pool()
+
+    if isinstance(replica_cache, ReplicaPool):
+        return replica_cache.get(replica_id, _replica_opener(
+            replica_cache, user_id, workspace_id, turso_url, turso_token,
+            sync_interval, obfuscation_key_cache
+        ))
 
+    if replica_id in replica_cache:
+        return replica_cache[replica_id]
+
+    db, _ = _open_embedded_replica(
+        user_id, workspace_id, turso_url, turso_token, sync_interval, obfuscation_key_cache
+    )
+    replica_cache[replica_id] = db
     return db
 
 
-def obfuscate_card(card: Cards) -> dict[str, Any]:
+@contextmanager
+def embedded_replica(
+    user_id: str,
+    workspace_id: str,
+    turso_url: Optional[str] = None,
+    turso_token: Optional[str] = None,
+    sync_interval: int = 60,
+    replica_cache: Optional[Union[ReplicaPool, dict[str, libsql.Database]]] = None,
+    obfuscation_key_cache: Optional[dict[str, bytes]] = None
+) -> Iterator[libsql.Database]:
     """
-    Obfuscate card data for Privacy Mode storage.
+    Use an embedded replica for the duration of a block.
+
+    Same arguments as create_embedded_replica. With a ReplicaPool the
+    handle is leased, so neither the idle sweeper nor capacity eviction
+    can close it before the block exits.
+
+    Example:
+        >>> with embedded_replica(user_id, workspace_id) as db:
+        ...     conn = db.connect()
+    """
+    if replica_cache is None:
+        replica_cache = get_replica_pool()
+
+    if not isinstance(replica_cache, ReplicaPool):
+        yield create_embedded_replica(
+            user_id, workspace_id, turso_url, turso_token, sync_interval,
+            replica_cache, obfuscation_key_cache
+        )
+        return
+
+    with replica_cache.lease(f"{user_id}_{workspace_id}", _replica_opener(
+        replica_cache, user_id, workspace_id, turso_url, turso_token,
+        sync_interval, obfuscation_key_cache
+    )) as db:
+        yield db
+
+
+def obfuscate_card_record(record: Mapping[str, Any]) -> dict[str, Any]:
+    """
+    Obfuscate a browser card record (card_id, name, description, tag_ids,
+    tag_bitmaps) for Privacy Mode storage.
 
     Args:
-        card: Card model instance
+        record: Card fields as sent by the browser
 
     Returns:
         Dict with obfuscated card data (bitmap, checksums only)
     """
     # Generate card bitmap from UUID
-    card_bitmap = int(hashlib.md5(card.card_id.encode()).hexdigest()[:8], 16)
+    card_bitmap = int(hashlib.md5(record['card_id'].encode()).hexdigest()[:8], 16)
 
     # Create checksum of actual content for verification
     content_str = json.dumps({
-        'name': card.name,
-        'description': card.description,
-        'tag_ids': card.tag_ids
+        'name': record.get('name'),
+        'description': record.get('description'),
+        'tag_ids': record.get('tag_ids')
     }, sort_keys=True)
     checksum = hashlib.sha256(content_str.encode()).hexdigest()[:16]
 
     return {
         'card_bitmap': card_bitmap,
-        'tag_bitmaps': card.tag_bitmaps or [],
+        'tag_bitmaps': record.get('tag_bitmaps') or [],
         'checksum': checksum
     }
 
 
+def obfuscate_card(card: Cards) -> dict[str, Any]:
+    """
+    Obfuscate card data for Privacy Mode storage.
+
+    Args:
+        card: Card model instance
+
+    Returns:
+        Dict with obfuscated card data (bitmap, checksums only)
+    """
+    return obfuscate_card_record({
+        'card_id': card.card_id,
+        'name': card.name,
+        'description': card.description,
+        'tag_ids': card.tag_ids,
+        'tag_bitmaps': card.tag_bitmaps
+    })
+
+
 def obfuscate_tag(tag: Tags) -> dict[str, Any]:
     """
     Obfuscate tag data for Privacy Mode storage.
@@ -199,35 +606,297 @@ def obfuscate_tag(tag: Tags) -> dict[str, Any]:
     }
 
 
+# ============================================================================
+# BROWSER -> SERVER SYNC PIPELINE
+# ============================================================================
+
+SYNC_CHUNK_SIZE = int(os.getenv('TURSO_SYNC_CHUNK_SIZE', '2000'))
+SYNC_WORKERS = int(os.getenv('TURSO_SYNC_WORKERS', str(min(4, os.cpu_count() or 1))))
+
+_CHECKPOINT_PREFIX = "browser_sync_checkpoint:"
+
+
+def _chunks(records: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    iterator = iter(records)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def _obfuscate_chunk(records: list[Any]) -> list[tuple[int, str, str]]:
+    """Obfuscate one chunk into obfuscated_cards rows (runs on a worker thread)."""
+    rows = []
+    for record in records:
+        card = obfuscate_card(record) if isinstance(record, Cards) else obfuscate_card_record(record)
+        rows.append((card['card_bitmap'], json.dumps(card['tag_bitmaps']), card['checksum']))
+    return rows
+
+
+def _fingerprint_update(hasher: Any, records: Iterable[Any]) -> None:
+    """Fold records into a running input fingerprint, in stream order."""
+    for record in records:
+        if isinstance(record, Cards):
+            record = {
+                'card_id': record.card_id,
+                'name': record.name,
+                'description': record.description,
+                'tag_ids': record.tag_ids,
+                'tag_bitmaps': record.tag_bitmaps
+            }
+        hasher.update(json.dumps(record, sort_keys=True, default=str).encode())
+        hasher.update(b"\n")
+
+
+def _read_checkpoint(conn: Any, sync_id: str) -> tuple[int, Optional[str]]:
+    """Return (position, fingerprint of the cards before it) or (0, None)."""
+    row = conn.execute(
+        "SELECT value FROM sync_metadata WHERE key = ?", (_CHECKPOINT_PREFIX + sync_id,)
+    ).fetchone()
+    if not row:
+        return 0, None
+    try:
+        checkpoint = json.loads(row[0])
+        return int(checkpoint['position']), str(checkpoint['fingerprint'])
+    except (ValueError, TypeError, KeyError):
+        # Written without a fingerprint: cannot be verified, so not resumable
+        return 0, None
+
+
+def _clear_checkpoint(conn: Any, sync_id: str) -> None:
+    conn.execute("DELETE FROM sync_metadata WHERE key = ?", (_CHECKPOINT_PREFIX + sync_id,))
+    conn.commit()
+
+
+def _write_chunk(
+    conn: Any,
+    rows: list[tuple[int, str, str]],
+    sync_id: str,
+    checkpoint: int,
+    fingerprint: str
+) -> None:
+    """Write one chunk and its checkpoint in a single transaction."""
+    now = int(time.time())
+    value = json.dumps({'position': checkpoint, 'fingerprint': fingerprint})
+    try:
+        conn.executemany(
+            """
+            INSERT INTO obfuscated_cards (card_bitmap, tag_bitmaps, checksum, sync_version)
+            VALUES (?, ?, ?, 1)
+            ON CONFLICT (card_bitmap) DO UPDATE SET
+                tag_bitmaps = excluded.tag_bitmaps,
+                checksum = excluded.checksum,
+                sync_version = sync_version + 1
+            """,
+            rows
+        )
+        conn.execute(
+            """
+            INSERT INTO sync_metadata (key, value, updated_at) VALUES (?, ?, ?)
+            ON CONFLICT (key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at
+            """,
+            (_CHECKPOINT_PREFIX + sync_id, value, now)
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def _write_tags(conn: Any, tags: Iterable[Any]) -> int:
+    rows = []
+    for tag in tags:
+        if isinstance(tag, Tags):
+            obfuscated = obfuscate_tag(tag)
+        else:
+            obfuscated = {
+                'tag_bitmap': tag['tag_bitmap'],
+                'checksum': hashlib.sha256(tag['name'].encode()).hexdigest()[:16]
+            }
+        rows.append((obfuscated['tag_bitmap'], obfuscated['checksum']))
+
+    if rows:
+        conn.executemany(
+            """
+            INSERT INTO obfuscated_tags (tag_bitmap, checksum, sync_version) VALUES (?, ?, 1)
+            ON CONFLICT (tag_bitmap) DO UPDATE SET
+                checksum = excluded.checksum,
+                sync_version = sync_version + 1
+            """,
+            rows
+        )
+        conn.commit()
+    return len(rows)
+
+
+def _resume_point(
+    conn: Any,
+    cards: Iterable[Any],
+    sync_id: str,
+    chunk_size: int
+) -> tuple[int, Any, Iterator[Any]]:
+    """
+    Skip the cards a checkpoint says were written, verifying they are the same.
+
+    The skipped prefix is fingerprinted and compared with the fingerprint
+    stored in the checkpoint. On a mismatch a re-iterable input (a list)
+    starts over from the first card; a one-shot stream cannot be rewound,
+    so the checkpoint is dropped and ValueError raised.
+
+    Returns:
+        (resumed_from, running fingerprint of the skipped cards, iterator
+        positioned at the first card to write)
+    """
+    position, expected = _read_checkpoint(conn, sync_id)
+    hasher = hashlib.sha256()
+    iterator = iter(cards)
+    if position == 0:
+        return 0, hasher, iterator
+
+    skipped = 0
+    for chunk in _chunks(itertools.islice(iterator, position), chunk_size):
+        _fingerprint_update(hasher, chunk)
+        skipped += len(chunk)
+    if skipped == position and hasher.hexdigest() == expected:
+        return position, hasher, iterator
+
+    _clear_checkpoint(conn, sync_id)
+    if iter(cards) is not cards:
+        logger.warning(f"Browser sync {sync_id}: input changed since checkpoint, restarting")
+        return 0, hashlib.sha256(), iter(cards)
+    raise ValueError(
+        f"Browser sync {sync_id}: input does not match the checkpoint at card {position}; "
+        "checkpoint discarded, resend the full input"
+    )
+
+
+def _sync_cards(
+    conn: Any,
+    cards: Iterable[Any],
+    sync_id: str,
+    chunk_size: int,
+    max_workers: int
+) -> tuple[int, int]:
+    """
+    Stream cards through the obfuscation pool into batched transactions.
+
+    Chunks are obfuscated in parallel but written in order, with at most
+    2 * max_workers chunks in flight, so memory stays bounded for any
+    stream length. Each checkpoint stores the fingerprint of every card
+    up to it, so a resume only skips cards that really were written.
+
+    Returns:
+        (resumed_from, cards written in total including resumed ones)
+    """
+    resumed_from, hasher, remaining = _resume_point(conn, cards, sync_id, chunk_size)
+    position = resumed_from
+    pending: deque[tuple[Future, str]] = deque()
+
+    def write_oldest() -> None:
+        nonlocal position
+        future, fingerprint = pending.popleft()
+        rows = future.result()
+        position += len(rows)
+        _write_chunk(conn, rows, sync_id, position, fingerprint)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="privacy-sync") as executor:
+        chunks = _chunks(remaining, chunk_size)
+        while True:
+            try:
+                chunk = next(chunks, None)
+            except Exception:
+                # The input stream failed: keep the chunks already read so
+                # a resume starts after them, then report the failure
+                while pending:
+                    write_oldest()
+                raise
+            if chunk is None:
+                break
+            _fingerprint_update(hasher, chunk)
+            pending.append((executor.submit(_obfuscate_chunk, chunk), hasher.hexdigest()))
+            if len(pending) >= 2 * max_workers:
+                write_oldest()
+        while pending:
+            write_oldest()
+
+    # Finished: the next sync with this id starts from the beginning
+    _clear_checkpoint(conn, sync_id)
+    return resumed_from, position
+
+
 def sync_browser_to_server(
     user_id: str,
     workspace_id: str,
     browser_data: dict[str, Any],
-    replica_cache: Optional[dict[str, libsql.Database]] = None,
-    obfuscation_key_cache: Optional[dict[str, bytes]] = None
+    replica_cache: Optional[Union[ReplicaPool, dict[str, libsql.Database]]] = None,
+    obfuscation_key_cache: Optional[dict[str, bytes]] = None,
+    chunk_size: Optional[int] = None,
+    max_workers: Optional[int] = None
 ) -> dict[str, Any]:
     """
     Sync data from browser WASM SQLite to server embedded replica.
 
+    Cards are read as a stream, obfuscated in parallel chunks, and written
+    in one transaction per chunk together with a checkpoint. If a sync is
+    interrupted, calling again with the same explicit sync_id and the same
+    records skips the cards already written. Without a sync_id every call
+    starts from the first card.
+
     Args:
         user_id: User identifier
         workspace_id: Workspace identifier
-        browser_data: Full data from browser
-        replica_cache: Optional replica cache
+        browser_data: 'cards' (iterable of card dicts or Cards), optional
+            'tags' (dicts with tag_bitmap/name, or Tags) and 'sync_id'
+        replica_cache: Replica pool or cache (None uses the process-wide pool)
         obfuscation_key_cache: Optional obfuscation key cache
+        chunk_size: Cards per transaction (default TURSO_SYNC_CHUNK_SIZE)
+        max_workers: Obfuscation threads (default TURSO_SYNC_WORKERS)
 
     Returns:
         Sync result status
     """
-    # Get or create embedded replica
-    db = create_embedded_replica(
+    chunk_size = chunk_size or SYNC_CHUNK_SIZE
+    max_workers = max_workers or SYNC_WORKERS
+    resumable = bool(browser_data.get('sync_id'))
+    sync_id = str(browser_data.get('sync_id') or 'initial')
+    start = time.perf_counter()
+
+    # Leased so the pool cannot close the handle mid-sync
+    replica = embedded_replica(
         user_id, workspace_id,
         replica_cache=replica_cache,
         obfuscation_key_cache=obfuscation_key_cache
     )
 
-    # TODO: Implement actual sync logic (Phase 5)
-    return {'status': 'success', 'synced': 0}
+    try:
+        with replica as db:
+            conn = db.connect()
+            try:
+                if not resumable:
+                    # A checkpoint left by an earlier anonymous sync must not
+                    # make this one skip cards
+                    _clear_checkpoint(conn, sync_id)
+                tags_synced = _write_tags(conn, browser_data.get('tags') or ())
+                resumed_from, total = _sync_cards(
+                    conn, browser_data.get('cards') or (), sync_id, chunk_size, max_workers
+                )
+            finally:
+                conn.close()
+    except Exception as e:
+        logger.error(f"Browser sync failed: user={user_id}, workspace={workspace_id}: {e}")
+        return {'status': 'error', 'error': str(e)}
+
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    logger.info(
+        f"Browser sync: user={user_id}, workspace={workspace_id}, cards={total - resumed_from}, "
+        f"resumed_from={resumed_from}, tags={tags_synced}, {elapsed_ms:.0f}ms"
+    )
+
+    return {
+        'status': 'success',
+        'synced': total - resumed_from,
+        'resumed_from': resumed_from,
+        'tags_synced': tags_synced,
+        'duration_ms': elapsed_ms
+    }
 
 
 # Backward compatibility class wrapper (TEMPORARY - to be removed)
@@ -241,19 +910,28 @@ class TursoPrivacyManager:
         self.turso_url = os.getenv('TURSO_DATABASE_URL')
         self.turso_token = os.getenv('TURSO_AUTH_TOKEN')
         self.sync_interval = int(os.getenv('TURSO_SYNC_INTERVAL', '60'))
-        self.embedded_replicas: dict[str, libsql.Database] = {}
+        self.embedded_replicas = ReplicaPool()
         self.obfuscation_keys: dict[str, bytes] = {}
 
     def _get_obfuscation_key(self, user_id: str, workspace_id: str) -> bytes:
         return get_obfuscation_key(user_id, workspace_id, cache=self.obfuscation_keys)
 
     def create_embedded_replica(self, user_id: str, workspace_id: str) -> libsql.Database:
+        """Unleased pooled handle; see create_embedded_replica for its lifetime."""
         return create_embedded_replica(
             user_id, workspace_id,
             self.turso_url, self.turso_token, self.sync_interval,
             self.embedded_replicas, self.obfuscation_keys
         )
 
+    def embedded_replica(self, user_id: str, workspace_id: str):
+        """Leased handle for a with block (see embedded_replica)."""
+        return embedded_replica(
+            user_id, workspace_id,
+            self.turso_url, self.turso_token, self.sync_interval,
+            self.embedded_replicas, self.obfuscation_keys
+        )
+
     def obfuscate_card(self, card: Cards) -> dict[str, Any]:
         return obfuscate_card(card)
 
@@ -3,15 +3,41 @@ Elite storage strategy pattern for multicardz.
 Implements local-first architecture with optional cloud sync.
 """
 
+import logging
+import random
 import sqlite3
+import struct
+import threading
+import time
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import cached_property
 from pathlib import Path
+from typing import NamedTuple
 
 import orjson
 from cryptography.fernet import Fernet
 from pyroaring import BitMap
 
+# Bump when the snapshot encoding changes; older snapshots are rebuilt
+INDEX_SNAPSHOT_FORMAT = 1
+
+# Card changes after which the index snapshot is rewritten automatically
+INDEX_SNAPSHOT_INTERVAL = 10_000
+
+# Failed sends of one queue row before it moves to the dead-letter table
+SYNC_MAX_ATTEMPTS = 10
+
+# Batch reads decrypt on a thread pool above this many contents
+PARALLEL_DECRYPT_THRESHOLD = 64
+DECRYPT_WORKERS = 4
+
+_LENGTH = struct.Struct("<I")
+
+logger = logging.getLogger(__name__)
+
 
 @dataclass(frozen=True)
 class Card:
@@ -23,6 +49,33 @@ class Card:
     metadata: dict[str, str]
 
 
+@dataclass(frozen=True)
+class LazyCard:
+    """
+    Card with tags and metadata decoded and content decrypted on first access.
+
+    Returned by batch reads, so listing or filtering cards never pays for
+    decrypting content that is not displayed.
+    """
+
+    id: str
+    tags: frozenset[str]
+    metadata: dict[str, str]
+    _stored_content: str = field(repr=False, compare=False)
+    _decrypt: Callable[[str], str] = field(repr=False, compare=False)
+
+    @cached_property
+    def content(self) -> str:
+        return self._decrypt(self._stored_content)
+
+    @property
+    def is_decrypted(self) -> bool:
+        return "content" in self.__dict__
+
+    def to_card(self) -> Card:
+        return Card(id=self.id, content=self.content, tags=self.tags, metadata=self.metadata)
+
+
 class StorageStrategy(ABC):
     """Abstract storage strategy following Strategy pattern."""
 
@@ -71,13 +124,19 @@ class LocalSQLiteStrategy(StorageStrategy):
         # Initialize database
         self.conn = sqlite3.connect(str(db_path))
         self._create_schema()
-        self._build_index()
+        self._changes_since_snapshot = 0
+        if not self._load_index_snapshot():
+            self._build_index()
+            self.save_index_snapshot()
 
     def _create_schema(self) -> None:
         """Create optimized schema for card storage."""
         self.conn.executescript("""
+            -- ordinal is the card's stable integer id in the tag bitmaps;
+            -- AUTOINCREMENT so a deleted card's ordinal is never reused
             CREATE TABLE IF NOT EXISTS cards (
-                id TEXT PRIMARY KEY,
+                ordinal INTEGER PRIMARY KEY AUTOINCREMENT,
+                id TEXT NOT NULL UNIQUE,
                 content TEXT NOT NULL,
                 tags_json TEXT NOT NULL,
                 metadata_json TEXT NOT NULL,
@@ -85,34 +144,223 @@ class LocalSQLiteStrategy(StorageStrategy):
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             );
 
-            CREATE INDEX IF NOT EXISTS idx_cards_tags ON cards(tags_json);
-            CREATE INDEX IF NOT EXISTS idx_cards_updated ON cards(updated_at);
-
             CREATE TABLE IF NOT EXISTS sync_queue (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 operation TEXT NOT NULL,
                 card_id TEXT NOT NULL,
                 data_json TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT
             );
+
+            -- Queue rows that failed SYNC_MAX_ATTEMPTS times (see SyncWorker)
+            CREATE TABLE IF NOT EXISTS sync_dead_letter (
+                id INTEGER PRIMARY KEY,
+                operation TEXT NOT NULL,
+                card_id TEXT NOT NULL,
+                attempts INTEGER NOT NULL,
+                last_error TEXT,
+                failed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+
+            -- Serialized tag index and the updated_at it covers
+            CREATE TABLE IF NOT EXISTS index_snapshot (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                format INTEGER NOT NULL,
+                high_water TIMESTAMP,
+                data BLOB NOT NULL
+            );
+
+            -- Ordinals deleted since the snapshot (replayed on open)
+            CREATE TABLE IF NOT EXISTS index_deletions (
+                ordinal INTEGER PRIMARY KEY,
+                tags_json TEXT NOT NULL
+            );
+        """)
+        self._migrate_card_ordinals()
+        self._migrate_sync_queue()
+        self.conn.executescript("""
+            CREATE INDEX IF NOT EXISTS idx_cards_tags ON cards(tags_json);
+            CREATE INDEX IF NOT EXISTS idx_cards_updated ON cards(updated_at);
         """)
         self.conn.commit()
 
+    def _migrate_card_ordinals(self) -> None:
+        """Rebuild a pre-ordinal cards table (id TEXT PRIMARY KEY) in place."""
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(cards)")}
+        if "ordinal" in columns:
+            return
+
+        self.conn.executescript("""
+            BEGIN;
+            CREATE TABLE cards_with_ordinals (
+                ordinal INTEGER PRIMARY KEY AUTOINCREMENT,
+                id TEXT NOT NULL UNIQUE,
+                content TEXT NOT NULL,
+                tags_json TEXT NOT NULL,
+                metadata_json TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+            INSERT INTO cards_with_ordinals
+                (id, content, tags_json, metadata_json, created_at, updated_at)
+            SELECT id, content, tags_json, metadata_json, created_at, updated_at
+            FROM cards ORDER BY rowid;
+            DROP TABLE cards;
+            ALTER TABLE cards_with_ordinals RENAME TO cards;
+            COMMIT;
+        """)
+
+    def _migrate_sync_queue(self) -> None:
+        """Add the retry columns to a sync_queue created before they existed."""
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(sync_queue)")}
+        if "attempts" not in columns:
+            self.conn.execute(
+                "ALTER TABLE sync_queue ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0"
+            )
+        if "last_error" not in columns:
+            self.conn.execute("ALTER TABLE sync_queue ADD COLUMN last_error TEXT")
+
     def _build_index(self) -> None:
         """Build RoaringBitmap inverted index for ultra-fast tag queries."""
         self.tag_index: dict[str, BitMap] = {}
         self.all_tags: set[str] = set()
+        self._live = BitMap()
+
+        cursor = self.conn.execute("SELECT ordinal, tags_json FROM cards")
+        for ordinal, tags_json in cursor:
+            self._index_card(ordinal, frozenset(), frozenset(orjson.loads(tags_json)))
+
+    def _index_card(self, ordinal: int, old_tags: frozenset[str], tags: frozenset[str]) -> None:
+        """Add or move one card, touching only its old and new tags."""
+        for tag in old_tags - tags:
+            self.tag_index[tag].discard(ordinal)
+        for tag in tags - old_tags:
+            if tag not in self.tag_index:
+                self.tag_index[tag] = BitMap()
+            self.tag_index[tag].add(ordinal)
 
-        cursor = self.conn.execute("SELECT id, tags_json FROM cards")
-        for row_id, (card_id, tags_json) in enumerate(cursor):
-            tags = set(orjson.loads(tags_json))
-            self.all_tags.update(tags)
+        self.all_tags.update(tags)
+        self._live.add(ordinal)
 
-            for tag in tags:
-                if tag not in self.tag_index:
-                    self.tag_index[tag] = BitMap()
-                # Use row_id as integer for BitMap efficiency
-                self.tag_index[tag].add(hash(card_id) % (2**31))
+    def _unindex_card(self, ordinal: int, tags: frozenset[str]) -> None:
+        """Remove one card from its tags only."""
+        for tag in tags:
+            if tag in self.tag_index:
+                self.tag_index[tag].discard(ordinal)
+        self._live.discard(ordinal)
+
+    # ---------- Index snapshot ----------
+
+    def save_index_snapshot(self) -> None:
+        """
+        Persist the tag index with the updated_at high-water mark it covers.
+
+        Written in the same database (and transaction) as the tombstone
+        reset, so the snapshot can never disagree with the cards table.
+        """
+        # Tag count, then length-prefixed blobs: live set, (tag, posting)*
+        blobs = [self._live.serialize()]
+        for tag, bitmap in self.tag_index.items():
+            blobs += (tag.encode(), bitmap.serialize())
+        data = _LENGTH.pack(len(self.tag_index)) + b"".join(
+            _LENGTH.pack(len(blob)) + blob for blob in blobs
+        )
+
+        (high_water,) = self.conn.execute("SELECT MAX(updated_at) FROM cards").fetchone()
+        self.conn.execute(
+            """
+            INSERT OR REPLACE INTO index_snapshot (id, format, high_water, data)
+            VALUES (1, ?, ?, ?)
+            """,
+            (INDEX_SNAPSHOT_FORMAT, high_water, data),
+        )
+        self.conn.execute("DELETE FROM index_deletions")
+        self.conn.commit()
+        self._changes_since_snapshot = 0
+
+    def _load_index_snapshot(self) -> bool:
+        """
+        Load the persisted index and replay changes made after it.
+
+        Rows with updated_at at or after the high-water mark are re-indexed
+        (the mark has one-second resolution, so equal timestamps replay
+        too) and tombstoned ordinals are removed.
+
+        Returns:
+            False if there is no usable snapshot
+        """
+        row = self.conn.execute(
+            "SELECT format, high_water, data FROM index_snapshot WHERE id = 1"
+        ).fetchone()
+        if row is None or row[0] != INDEX_SNAPSHOT_FORMAT:
+            return False
+
+        _, high_water, data = row
+        view = memoryview(data)
+        (tag_count,) = _LENGTH.unpack_from(view, 0)
+        offset = _LENGTH.size
+
+        def blob() -> bytes:
+            nonlocal offset
+            (length,) = _LENGTH.unpack_from(view, offset)
+            offset += _LENGTH.size + length
+            return bytes(view[offset - length:offset])
+
+        self._live = BitMap.deserialize(blob())
+        self.tag_index = {}
+        for _ in range(tag_count):
+            tag = blob().decode()
+            self.tag_index[tag] = BitMap.deserialize(blob())
+        self.all_tags = set(self.tag_index)
+
+        # A tombstone's tags are those at delete time, which may not be the
+        # ones in the snapshot: drop the ordinal from every posting
+        deleted = BitMap(ordinal for (ordinal,) in self.conn.execute(
+            "SELECT ordinal FROM index_deletions"
+        ).fetchall())
+        if deleted:
+            self._live.difference_update(deleted)
+            for bitmap in self.tag_index.values():
+                bitmap.difference_update(deleted)
+
+        changed = self.conn.execute(
+            "SELECT ordinal, tags_json FROM cards WHERE updated_at >= ?",
+            (high_water or "",),
+        ).fetchall()
+        if changed:
+            # Their tags in the snapshot are unknown: clear, then re-add
+            replayed = BitMap(ordinal for ordinal, _ in changed)
+            for bitmap in self.tag_index.values():
+                bitmap.difference_update(replayed)
+            for ordinal, tags_json in changed:
+                self._index_card(ordinal, frozenset(), frozenset(orjson.loads(tags_json)))
+
+        return True
+
+    def _record_change(self) -> None:
+        self._changes_since_snapshot += 1
+        if self._changes_since_snapshot >= INDEX_SNAPSHOT_INTERVAL:
+            self.save_index_snapshot()
+
+    def close(self) -> None:
+        """Persist the index snapshot and close the database."""
+        self.save_index_snapshot()
+        self.conn.close()
+
+    def get_card_ids(self, ordinals: BitMap) -> list[str]:
+        """Map a get_cards_by_tags() result to card IDs, in ordinal order."""
+        card_ids = []
+        ordinal_list = list(ordinals)
+        # Chunked to stay under SQLite's bound-parameter limit
+        for start in range(0, len(ordinal_list), 500):
+            chunk = ordinal_list[start:start + 500]
+            card_ids.extend(card_id for (card_id,) in self.conn.execute(
+                f"SELECT id FROM cards WHERE ordinal IN ({','.join('?' * len(chunk))}) ORDER BY ordinal",
+                chunk,
+            ))
+        return card_ids
 
     def _encrypt_if_needed(self, data: str) -> str:
         """Encrypt data if encryption is enabled."""
@@ -133,10 +381,7 @@ class LocalSQLiteStrategy(StorageStrategy):
         """
         if not filter_tags:
             # Return all cards
-            result = BitMap()
-            for tag_bitmap in self.tag_index.values():
-                result |= tag_bitmap
-            return result
+            return self._live.copy()
 
         # Intersection of all required tags (AND operation)
         result = None
@@ -163,7 +408,78 @@ class LocalSQLiteStrategy(StorageStrategy):
         if not row:
             return None
 
-        content, tags_json, metadata_json = row
+        return self._row_to_card(card_id, *row)
+
+    def get_cards_by_ids(
+        self, card_ids: Sequence[str], with_content: bool = False
+    ) -> list[LazyCard]:
+        """
+        Read many cards with one query per 500 IDs, in the order given.
+
+        Args:
+            card_ids: Card IDs; unknown IDs are skipped
+            with_content: Decrypt every content now (in parallel for large
+                encrypted batches) instead of on first access
+
+        Returns:
+            LazyCard records
+        """
+        rows: dict[str, tuple[str, str, str]] = {}
+        ids = list(dict.fromkeys(card_ids))
+        # Chunked to stay under SQLite's bound-parameter limit
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            for card_id, *row in self.conn.execute(
+                f"""
+                SELECT id, content, tags_json, metadata_json FROM cards
+                WHERE id IN ({','.join('?' * len(chunk))})
+                """,
+                chunk,
+            ):
+                rows[card_id] = row
+
+        cards = [
+            LazyCard(
+                id=card_id,
+                tags=frozenset(orjson.loads(rows[card_id][1])),
+                metadata=orjson.loads(rows[card_id][2]),
+                _stored_content=rows[card_id][0],
+                _decrypt=self._decrypt_if_needed,
+            )
+            for card_id in card_ids
+            if card_id in rows
+        ]
+
+        if with_content:
+            self.decrypt_contents(cards)
+        return cards
+
+    def decrypt_contents(self, cards: Iterable[LazyCard]) -> None:
+        """
+        Decrypt the contents of LazyCards that are still encrypted.
+
+        Large batches are decrypted on a thread pool (Fernet's AES and HMAC
+        run in OpenSSL); small ones inline, where thread handoff would cost
+        more than it saves.
+        """
+        pending = [card for card in cards if not card.is_decrypted]
+        if self._cipher is None or len(pending) < PARALLEL_DECRYPT_THRESHOLD:
+            for card in pending:
+                _ = card.content
+            return
+
+        with ThreadPoolExecutor(max_workers=DECRYPT_WORKERS) as executor:
+            contents = list(executor.map(
+                self._decrypt_if_needed, (card._stored_content for card in pending)
+            ))
+        for card, content in zip(pending, contents):
+            # Fill the cached_property slot directly
+            card.__dict__["content"] = content
+
+    def _row_to_card(
+        self, card_id: str, content: str, tags_json: str, metadata_json: str
+    ) -> Card:
+        """Decode a cards row (decrypting content if needed)."""
         return Card(
             id=card_id,
             content=self._decrypt_if_needed(content),
@@ -171,54 +487,82 @@ class LocalSQLiteStrategy(StorageStrategy):
             metadata=orjson.loads(metadata_json),
         )
 
-    def save_card(self, card: Card) -> str:
-        """Save card with proper serialization and indexing."""
+    def save_card(self, card: Card, *, queue_sync: bool = False) -> str:
+        """
+        Save card with proper serialization and indexing.
+
+        With queue_sync, a sync_queue row for the save is written in the
+        same transaction as the card (see HybridStrategy).
+        """
         encrypted_content = self._encrypt_if_needed(card.content)
         tags_json = orjson.dumps(list(card.tags)).decode()
         metadata_json = orjson.dumps(card.metadata).decode()
 
-        self.conn.execute(
-            """
-            INSERT OR REPLACE INTO cards (id, content, tags_json, metadata_json, updated_at)
-            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
-            """,
-            (card.id, encrypted_content, tags_json, metadata_json),
-        )
-        self.conn.commit()
+        # The stored tag list tells the index which postings to leave
+        previous = self.conn.execute(
+            "SELECT tags_json FROM cards WHERE id = ?", (card.id,)
+        ).fetchone()
+        old_tags = frozenset(orjson.loads(previous[0])) if previous else frozenset()
+
+        # Upsert keeps the row (and its ordinal) stable across saves
+        try:
+            (ordinal,) = self.conn.execute(
+                """
+                INSERT INTO cards (id, content, tags_json, metadata_json, updated_at)
+                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT (id) DO UPDATE SET
+                    content = excluded.content,
+                    tags_json = excluded.tags_json,
+                    metadata_json = excluded.metadata_json,
+                    updated_at = excluded.updated_at
+                RETURNING ordinal
+                """,
+                (card.id, encrypted_content, tags_json, metadata_json),
+            ).fetchone()
+            if queue_sync:
+                SyncWorker.enqueue(self.conn, "save_card", card.id)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
 
         # Update in-memory index
-        self._update_index_for_card(card)
+        self._index_card(ordinal, old_tags, frozenset(card.tags))
+        self._record_change()
 
         return card.id
 
-    def _update_index_for_card(self, card: Card) -> None:
-        """Update RoaringBitmap index for a single card."""
-        card_hash = hash(card.id) % (2**31)
-
-        # Remove from all existing tag indexes
-        for tag_bitmap in self.tag_index.values():
-            tag_bitmap.discard(card_hash)
-
-        # Add to new tag indexes
-        for tag in card.tags:
-            if tag not in self.tag_index:
-                self.tag_index[tag] = BitMap()
-            self.tag_index[tag].add(card_hash)
-            self.all_tags.add(tag)
-
-    def delete_card(self, card_id: str) -> bool:
-        """Delete card and update index."""
-        cursor = self.conn.execute("DELETE FROM cards WHERE id = ?", (card_id,))
-        deleted = cursor.rowcount > 0
+    def delete_card(self, card_id: str, *, queue_sync: bool = False) -> bool:
+        """
+        Delete card and update index.
 
-        if deleted:
+        With queue_sync, a sync_queue row for the delete is written in the
+        same transaction as the delete.
+        """
+        try:
+            row = self.conn.execute(
+                "DELETE FROM cards WHERE id = ? RETURNING ordinal, tags_json", (card_id,)
+            ).fetchone()
+
+            if row is None:
+                self.conn.commit()
+                return False
+
+            # Tombstone so a snapshot taken before this delete can replay it
+            self.conn.execute(
+                "INSERT OR REPLACE INTO index_deletions (ordinal, tags_json) VALUES (?, ?)", row
+            )
+            if queue_sync:
+                SyncWorker.enqueue(self.conn, "delete_card", card_id)
             self.conn.commit()
-            # Remove from index
-            card_hash = hash(card_id) % (2**31)
-            for tag_bitmap in self.tag_index.values():
-                tag_bitmap.discard(card_hash)
+        except Exception:
+            self.conn.rollback()
+            raise
 
-        return deleted
+        # Remove from index
+        self._unindex_card(row[0], frozenset(orjson.loads(row[1])))
+        self._record_change()
+        return True
 
     def can_sync(self) -> bool:
         """Local-only strategy never syncs."""
@@ -229,17 +573,255 @@ class LocalSQLiteStrategy(StorageStrategy):
         return frozenset(self.all_tags)
 
 
+class SyncQueueMetrics(NamedTuple):
+    """Snapshot of background sync state."""
+
+    depth: int
+    lag_seconds: float
+    sent: int
+    failures: int
+    consecutive_failures: int
+    backoff_seconds: float
+    running: bool
+    dead_letters: int
+
+
+class SyncWorker:
+    """
+    Background worker draining the local sync_queue table to a cloud strategy.
+
+    The queue is durable (it lives in the local database) and coalesced:
+    each card has at most one pending row, and a pending save sends the
+    card as stored at send time. Rows are sent in batches and deleted once
+    the cloud accepts them; on failure the rest of the batch stays queued
+    and the worker backs off exponentially (with jitter) up to max_backoff.
+
+    A failed row's attempt count goes up and rows are sent fewest attempts
+    first, so one row the cloud keeps rejecting does not hold up the rows
+    behind it. After max_attempts it moves to sync_dead_letter, from where
+    requeue_dead_letters() puts it back once the cause is fixed.
+    """
+
+    def __init__(
+        self,
+        local: LocalSQLiteStrategy,
+        cloud: StorageStrategy,
+        batch_size: int = 100,
+        poll_interval: float = 1.0,
+        base_backoff: float = 0.5,
+        max_backoff: float = 60.0,
+        max_attempts: int = SYNC_MAX_ATTEMPTS,
+    ):
+        self.local = local
+        self.cloud = cloud
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.max_attempts = max_attempts
+
+        # Own connection: the worker thread must not share the request one
+        self._conn = sqlite3.connect(str(local.db_path), check_same_thread=False)
+        self._conn_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+        self._sent = 0
+        self._failures = 0
+        self._consecutive_failures = 0
+        self._backoff = 0.0
+
+    @staticmethod
+    def enqueue(conn: sqlite3.Connection, operation: str, card_id: str) -> None:
+        """Queue an operation, replacing any pending or dead one for the card (no commit)."""
+        conn.execute("DELETE FROM sync_queue WHERE card_id = ?", (card_id,))
+        conn.execute("DELETE FROM sync_dead_letter WHERE card_id = ?", (card_id,))
+        conn.execute(
+            "INSERT INTO sync_queue (operation, card_id) VALUES (?, ?)",
+            (operation, card_id),
+        )
+
+    def start(self) -> None:
+        """Start the background thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="hybrid-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the background thread; queued rows stay for the next start."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def wake(self) -> None:
+        """Ask the worker to drain now instead of at the next poll."""
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self._backoff or self.poll_interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            # Drain while batches go through and no backoff is pending
+            while self.run_once() == self.batch_size and not self._backoff:
+                pass
+
+    def run_once(self) -> int:
+        """
+        Send one batch.
+
+        Returns:
+            Number of queue rows sent
+        """
+        with self._conn_lock:
+            rows = self._conn.execute(
+                "SELECT id, operation, card_id FROM sync_queue ORDER BY attempts, id LIMIT ?",
+                (self.batch_size,),
+            ).fetchall()
+
+            sent_ids = []
+            failed_id = None
+            try:
+                for row_id, operation, card_id in rows:
+                    failed_id = row_id
+                    if operation == "save_card":
+                        card = self._load_card(card_id)
+                        # None: deleted since; its delete row replaced this one
+                        if card is not None:
+                            self.cloud.save_card(card)
+                    elif operation == "delete_card":
+                        self.cloud.delete_card(card_id)
+                    else:
+                        logger.warning(f"Dropping unknown sync operation: {operation}")
+                    sent_ids.append(row_id)
+            except Exception as e:
+                self._record_failure(failed_id, e)
+                self._failures += 1
+                self._consecutive_failures += 1
+                delay = self.base_backoff * 2 ** (self._consecutive_failures - 1)
+                self._backoff = min(self.max_backoff, delay) * random.uniform(0.5, 1.0)
+                logger.warning(
+                    f"Cloud sync failed ({self._consecutive_failures} in a row), "
+                    f"retrying in {self._backoff:.1f}s: {e}"
+                )
+            else:
+                self._consecutive_failures = 0
+                self._backoff = 0.0
+
+            if sent_ids:
+                self._conn.executemany(
+                    "DELETE FROM sync_queue WHERE id = ?", [(row_id,) for row_id in sent_ids]
+                )
+                self._conn.commit()
+                self._sent += len(sent_ids)
+
+            return len(sent_ids)
+
+    def _record_failure(self, row_id: int, error: Exception) -> None:
+        """Count a failed send; dead-letter the row after max_attempts (lock held)."""
+        self._conn.execute(
+            "UPDATE sync_queue SET attempts = attempts + 1, last_error = ? WHERE id = ?",
+            (str(error), row_id),
+        )
+        dead = self._conn.execute(
+            """
+            INSERT INTO sync_dead_letter (id, operation, card_id, attempts, last_error)
+            SELECT id, operation, card_id, attempts, last_error
+            FROM sync_queue WHERE id = ? AND attempts >= ?
+            RETURNING card_id, attempts
+            """,
+            (row_id, self.max_attempts),
+        ).fetchone()
+        if dead is not None:
+            self._conn.execute("DELETE FROM sync_queue WHERE id = ?", (row_id,))
+            logger.error(
+                f"Cloud sync gave up on card {dead[0]} after {dead[1]} attempts: {error}"
+            )
+        self._conn.commit()
+
+    def requeue_dead_letters(self) -> int:
+        """
+        Move dead-lettered rows back to the queue with a fresh attempt count.
+
+        Returns:
+            Number of rows requeued
+        """
+        with self._conn_lock:
+            rows = self._conn.execute(
+                "DELETE FROM sync_dead_letter RETURNING operation, card_id"
+            ).fetchall()
+            for operation, card_id in rows:
+                self.enqueue(self._conn, operation, card_id)
+            self._conn.commit()
+        if rows:
+            self.wake()
+        return len(rows)
+
+    def _load_card(self, card_id: str) -> Card | None:
+        row = self._conn.execute(
+            "SELECT content, tags_json, metadata_json FROM cards WHERE id = ?", (card_id,)
+        ).fetchone()
+        return self.local._row_to_card(card_id, *row) if row else None
+
+    def metrics(self) -> SyncQueueMetrics:
+        """Queue depth, age of the oldest pending row, and send counters."""
+        with self._conn_lock:
+            depth, lag = self._conn.execute(
+                """
+                SELECT COUNT(*),
+                       COALESCE((julianday('now') - julianday(MIN(created_at))) * 86400, 0)
+                FROM sync_queue
+                """
+            ).fetchone()
+            (dead_letters,) = self._conn.execute(
+                "SELECT COUNT(*) FROM sync_dead_letter"
+            ).fetchone()
+        return SyncQueueMetrics(
+            depth=depth,
+            lag_seconds=max(0.0, lag),
+            sent=self._sent,
+            failures=self._failures,
+            consecutive_failures=self._consecutive_failures,
+            backoff_seconds=self._backoff,
+            running=self._thread is not None and self._thread.is_alive(),
+            dead_letters=dead_letters,
+        )
+
+    def close(self) -> None:
+        """Stop the thread and close the worker connection."""
+        self.stop()
+        with self._conn_lock:
+            self._conn.close()
+
+
 class HybridStrategy(StorageStrategy):
     """
     Local-first with optional cloud sync.
     Reads are always local for speed, writes queue for sync.
+
+    Writes commit locally in one transaction with their sync_queue row; a
+    SyncWorker pushes the queue to the cloud in the background, so local
+    write latency never depends on the remote.
     """
 
-    def __init__(self, local: StorageStrategy, cloud: StorageStrategy | None = None):
+    def __init__(
+        self,
+        local: LocalSQLiteStrategy,
+        cloud: StorageStrategy | None = None,
+        start_worker: bool = True,
+    ):
         self.local = local
         self.cloud = cloud
-        self.sync_queue: list[tuple] = []
         self._sync_enabled = cloud is not None and cloud.can_sync()
+        self.worker = SyncWorker(local, cloud) if self._sync_enabled else None
+        if self.worker is not None and start_worker:
+            self.worker.start()
 
     def get_cards_by_tags(self, filter_tags: frozenset[str]) -> BitMap:
         """Always read from local for maximum speed."""
@@ -250,47 +832,32 @@ class HybridStrategy(StorageStrategy):
         return self.local.get_card_by_id(card_id)
 
     def save_card(self, card: Card) -> str:
-        """Save locally first, then queue for cloud sync."""
-        # Local save (immediate)
-        card_id = self.local.save_card(card)
+        """Save locally and queue for cloud sync in the same transaction."""
+        card_id = self.local.save_card(card, queue_sync=self.worker is not None)
 
-        # Queue for cloud sync (async)
-        if self._sync_enabled:
-            self.sync_queue.append(("save_card", card))
-            self._process_sync_queue()
+        if self.worker is not None:
+            self.worker.wake()
 
         return card_id
 
     def delete_card(self, card_id: str) -> bool:
-        """Delete locally first, then queue for cloud sync."""
-        deleted = self.local.delete_card(card_id)
+        """Delete locally and queue for cloud sync in the same transaction."""
+        deleted = self.local.delete_card(card_id, queue_sync=self.worker is not None)
 
-        if deleted and self._sync_enabled:
-            self.sync_queue.append(("delete_card", card_id))
-            self._process_sync_queue()
+        if deleted and self.worker is not None:
+            self.worker.wake()
 
         return deleted
 
-    def _process_sync_queue(self) -> None:
-        """
-        Process sync queue (would be async in production).
-        Implements eventual consistency pattern.
-        """
-        if not self.cloud or not self._sync_enabled:
-            return
-
-        for operation, data in self.sync_queue:
-            try:
-                if operation == "save_card":
-                    self.cloud.save_card(data)
-                elif operation == "delete_card":
-                    self.cloud.delete_card(data)
-            except Exception:
-                # In production: retry with exponential backoff
-                pass
+    def sync_metrics(self) -> SyncQueueMetrics | None:
+        """Background sync metrics (None when sync is disabled)."""
+        return self.worker.metrics() if self.worker is not None else None
 
-        # Clear queue after successful sync
-        self.sync_queue.clear()
+    def close(self) -> None:
+        """Stop background sync and close the local store."""
+        if self.worker is not None:
+            self.worker.close()
+        self.local.close()
 
     def can_sync(self) -> bool:
         """Can sync if cloud strategy is available."""
@@ -13,9 +13,11 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
 # Import routers
+from .routes.bitmap_sync_api import router as bitmap_sync_router
 from .routes.cards_api import router as cards_router
 from .routes.group_tags_api import router as group_tags_router
 from .routes.tags_api import router as tags_router
+from .routes.telemetry_api import router as telemetry_router
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -65,6 +67,8 @@ def create_app():
     app.include_router(cards_router)
     app.include_router(tags_router)
     app.include_router(group_tags_router)
+    app.include_router(bitmap_sync_router)
+    app.include_router(telemetry_router)
 
     # Main interface route (no authentication)
     @app.get("/", response_class=HTMLResponse)
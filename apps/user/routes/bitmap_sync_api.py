@@ -0,0 +1,328 @@
+"""Bitmap sync API routes for privacy-mode browser clients (bitmaps only, no content)."""
+
+import logging
+from typing import Any, Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from pydantic import BaseModel, ConfigDict, Field
+from pyroaring import BitMap
+
+from apps.shared.services.async_database import run_db
+from apps.shared.services.bitmap_delta_sync import (
+    get_sync_lag,
+    pull_changes,
+    push_changes,
+)
+from apps.shared.services.bitmap_filter import filter_by_complex_expression
+from apps.shared.services.bitmap_sync import (
+    MAX_SYNC_BATCH_SIZE,
+    get_synced_index,
+    sync_card_bitmaps_batch,
+)
+from apps.shared.services.bitmap_wire import (
+    MEDIA_TYPE,
+    WireCardFields,
+    accepts_binary,
+    encode_delta,
+    encode_dictionary,
+    encode_filter_result,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/bitmaps", tags=["bitmap-sync"])
+
+
+class CardBitmapRecord(BaseModel):
+    """One card's bitmaps; content fields are rejected."""
+
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+    card_id: str
+    card_bitmap: int
+    tag_bitmaps: tuple[int, ...] = Field(default_factory=tuple)
+
+
+class BatchSyncRequest(BaseModel):
+    """Request model for batch card bitmap sync."""
+
+    model_config = ConfigDict(frozen=True)
+
+    workspace_id: str
+    user_id: str
+    records: tuple[CardBitmapRecord, ...] = Field(..., max_length=MAX_SYNC_BATCH_SIZE)
+
+
+class BatchSyncResponse(BaseModel):
+    """Response model for batch card bitmap sync."""
+
+    model_config = ConfigDict(frozen=True)
+
+    success: bool
+    synced: int
+    rejected: tuple[tuple[str, str], ...] = ()
+
+
+@router.post("/sync/batch", response_model=BatchSyncResponse)
+async def sync_bitmaps_batch_endpoint(request: BatchSyncRequest):
+    """
+    Upsert up to MAX_SYNC_BATCH_SIZE card bitmaps in one transaction.
+
+    Args:
+        request: Batch of bitmap-only card records for one workspace/user
+
+    Returns:
+        Synced count and any rejected (card_id, error) pairs
+    """
+    result = await run_db(
+        sync_card_bitmaps_batch,
+        request.workspace_id,
+        request.user_id,
+        [record.model_dump() for record in request.records],
+    )
+
+    if not result.success:
+        logger.error(f"Batch bitmap sync failed: {result.error}")
+        raise HTTPException(status_code=500, detail=result.error)
+
+    return BatchSyncResponse(success=True, synced=result.synced, rejected=result.rejected)
+
+
+# ============================================================================
+# DELTA SYNC
+# ============================================================================
+
+class DeltaPullResponse(BaseModel):
+    """Card bitmaps changed since the client's version."""
+
+    model_config = ConfigDict(frozen=True)
+
+    version: int
+    changes: tuple[dict[str, Any], ...] = ()
+    deleted: tuple[str, ...] = ()
+    full_resync: bool = False
+
+
+class DeltaPushRequest(BaseModel):
+    """Client changes made on top of base_version."""
+
+    model_config = ConfigDict(frozen=True)
+
+    workspace_id: str
+    user_id: str
+    client_id: str
+    base_version: int = Field(..., ge=0)
+    changes: tuple[CardBitmapRecord, ...] = Field(default=(), max_length=MAX_SYNC_BATCH_SIZE)
+    deleted: tuple[str, ...] = Field(default=(), max_length=MAX_SYNC_BATCH_SIZE)
+
+
+class DeltaPushResponse(BaseModel):
+    """Outcome of a delta push; conflicting cards must be pulled first."""
+
+    model_config = ConfigDict(frozen=True)
+
+    success: bool
+    version: int
+    applied: int
+    conflicts: tuple[str, ...] = ()
+
+
+def _encode_delta_pull(result, workspace_id: str, user_id: str) -> bytes:
+    """Binary delta: changed cards by ordinal plus one bitmap of them per tag."""
+    index = get_synced_index(workspace_id, user_id)
+    cards = {}
+    tag_postings = {}
+    unindexed = []
+    for change in result.changes:
+        ordinals = index.ordinals_of((change["card_id"],))
+        if not ordinals or change["card_bitmap"] is None:
+            unindexed.append(change["card_id"])
+            continue
+        cards[ordinals.min()] = WireCardFields(change["card_bitmap"], change["sync_version"])
+        for tag in change["tag_bitmaps"]:
+            tag_postings.setdefault(tag, BitMap()).update(ordinals)
+
+    if unindexed:
+        logger.warning(
+            f"Binary delta: {len(unindexed)} changed cards have no ordinal "
+            f"(workspace={workspace_id}, user={user_id})"
+        )
+
+    return encode_delta(
+        version=result.version,
+        full_resync=result.full_resync,
+        cards=cards,
+        tag_postings=tag_postings,
+        deleted=result.deleted,
+        unindexed=unindexed,
+        epoch=index.epoch,
+        dictionary_size=index.dictionary_size(),
+    )
+
+
+@router.get("/changes", response_model=DeltaPullResponse)
+async def pull_changes_endpoint(
+    workspace_id: str,
+    user_id: str,
+    since: int = Query(0, ge=0),
+    client_id: Optional[str] = None,
+    accept: Optional[str] = Header(None)
+):
+    """
+    Get card bitmaps changed after version `since`.
+
+    Returns:
+        Current version, changed cards and deleted card IDs; a bitmap_wire
+        delta frame when the client accepts the binary format
+    """
+    result = await run_db(pull_changes, workspace_id, user_id, since, client_id)
+
+    if accepts_binary(accept):
+        content = await run_db(_encode_delta_pull, result, workspace_id, user_id)
+        return Response(content=content, media_type=MEDIA_TYPE)
+
+    return DeltaPullResponse(
+        version=result.version,
+        changes=tuple(result.changes),
+        deleted=tuple(result.deleted),
+        full_resync=result.full_resync,
+    )
+
+
+@router.post("/changes", response_model=DeltaPushResponse)
+async def push_changes_endpoint(request: DeltaPushRequest):
+    """
+    Apply a client's changed and deleted cards.
+
+    Returns:
+        New version, applied count and conflicting card IDs
+    """
+    result = await run_db(
+        push_changes,
+        request.workspace_id,
+        request.user_id,
+        request.client_id,
+        request.base_version,
+        [record.model_dump() for record in request.changes],
+        request.deleted,
+    )
+
+    if not result.success:
+        raise HTTPException(status_code=400, detail=result.error)
+
+    return DeltaPushResponse(
+        success=True,
+        version=result.version,
+        applied=result.applied,
+        conflicts=result.conflicts,
+    )
+
+
+@router.get("/sync/lag")
+async def sync_lag_endpoint(workspace_id: str, user_id: str):
+    """Replication lag per client for a user's workspace."""
+    return await run_db(get_sync_lag, workspace_id, user_id)
+
+
+# ============================================================================
+# FILTERING AND ORDINAL DICTIONARY
+# ============================================================================
+
+class FilterRequest(BaseModel):
+    """Filter expression over a workspace/user's synced bitmaps."""
+
+    model_config = ConfigDict(frozen=True)
+
+    workspace_id: str
+    user_id: str
+    expression: str = Field(..., min_length=1, max_length=4096)
+
+
+class FilterResponse(BaseModel):
+    """JSON filter result (card UUIDs)."""
+
+    model_config = ConfigDict(frozen=True)
+
+    card_ids: tuple[str, ...]
+    total_matches: int
+    operation: str
+    method: str
+    performance_ms: float
+
+
+class DictionaryResponse(BaseModel):
+    """Ordinal -> card UUID entries for ordinals start..size-1."""
+
+    model_config = ConfigDict(frozen=True)
+
+    epoch: str
+    size: int
+    start: int
+    entries: tuple[Optional[str], ...]
+
+
+@router.post("/filter", response_model=FilterResponse)
+async def filter_bitmaps_endpoint(request: FilterRequest, accept: Optional[str] = Header(None)):
+    """
+    Filter synced cards with an AND/OR/NOT tag bitmap expression.
+
+    Returns:
+        Matching card UUIDs; a bitmap_wire filter frame of card ordinals
+        when the client accepts the binary format
+    """
+    try:
+        result = await run_db(
+            filter_by_complex_expression, request.workspace_id, request.user_id, request.expression
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if accepts_binary(accept):
+        # Read after filtering, so the dictionary covers every result ordinal
+        index = get_synced_index(request.workspace_id, request.user_id)
+        content = encode_filter_result(
+            result.ordinals,
+            result.total_matches,
+            result.performance_ms,
+            epoch=index.epoch,
+            dictionary_size=index.dictionary_size(),
+        )
+        return Response(content=content, media_type=MEDIA_TYPE)
+
+    return FilterResponse(
+        card_ids=tuple(result.card_ids),
+        total_matches=result.total_matches,
+        operation=result.operation,
+        method=result.method,
+        performance_ms=result.performance_ms,
+    )
+
+
+@router.get("/dictionary", response_model=DictionaryResponse)
+async def ordinal_dictionary_endpoint(
+    workspace_id: str,
+    user_id: str,
+    start: int = Query(0, ge=0),
+    epoch: Optional[str] = None,
+    accept: Optional[str] = Header(None)
+):
+    """
+    Get ordinal dictionary entries the client does not have yet.
+
+    Args:
+        start: Number of entries the client already holds
+        epoch: Epoch of the client's entries; a different epoch restarts at 0
+
+    Returns:
+        Entries from start on (JSON or a bitmap_wire dictionary frame)
+    """
+    index = await run_db(get_synced_index, workspace_id, user_id)
+    if epoch != index.epoch.hex:
+        start = 0
+    size, entries = index.dictionary_entries(start)
+
+    if accepts_binary(accept):
+        content = encode_dictionary(entries, start, epoch=index.epoch, dictionary_size=size)
+        return Response(content=content, media_type=MEDIA_TYPE)
+
+    return DictionaryResponse(epoch=index.epoch.hex, size=size, start=start, entries=tuple(entries))
@@ -7,8 +7,9 @@ import json
 import logging
 import time
 from pathlib import Path
+from typing import Optional
 
-from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
 from fastapi.responses import HTMLResponse
 from jinja2 import Environment, FileSystemLoader
 
@@ -22,6 +23,13 @@ try:
 except ImportError as e:
     logging.warning(f"Could not import shared services: {e}")
 
+# Blocking sqlite3 work is awaited on the database executor, never run on the event loop
+from apps.shared.services.async_database import (
+    AsyncConnection,
+    async_workspace_connection,
+    run_db,
+)
+
 # Setup Jinja2 templates
 templates_env = Environment(
     loader=FileSystemLoader("apps/static/templates"),
@@ -338,7 +346,8 @@ async def render_cards(request: Request):
 
     # CALL PURE FUNCTION: Compute card sets (returns data, not HTML)
     try:
-        result = compute_card_sets(
+        result = await run_db(
+            compute_card_sets,
             tags_in_play,
             user_id="default-user",  # TODO: Get from auth
             workspace_id="default-workspace",  # TODO: Get from auth
@@ -585,48 +594,133 @@ async def get_workspace_context(
     return x_workspace_id, x_user_id
 
 
+async def _load_cards_page(
+    conn: AsyncConnection,
+    workspace_id: str,
+    user_id: str,
+    position: Optional[tuple[str, str]],
+    limit: int,
+    skip: int = 0
+) -> tuple[list[dict], bool]:
+    """
+    Load one keyset page of cards on a pooled workspace connection.
+
+    `skip` is the deprecated OFFSET fallback, only used without a cursor.
+
+    Returns:
+        Tuple of (card dicts, whether another page exists)
+    """
+    # Fetch one extra row to know whether another page exists
+    if position:
+        rows = await conn.fetchall(
+            """
+            SELECT card_id, name, description, tag_ids, created, modified
+            FROM cards
+            WHERE workspace_id = ? AND user_id = ? AND deleted IS NULL
+              AND (created, card_id) < (?, ?)
+            ORDER BY created DESC, card_id DESC
+            LIMIT ?
+            """,
+            (workspace_id, user_id, position[0], position[1], limit + 1)
+        )
+    elif skip:
+        rows = await conn.fetchall(
+            """
+            SELECT card_id, name, description, tag_ids, created, modified
+            FROM cards
+            WHERE workspace_id = ? AND user_id = ? AND deleted IS NULL
+            ORDER BY created DESC, card_id DESC
+            LIMIT ? OFFSET ?
+            """,
+            (workspace_id, user_id, limit + 1, skip)
+        )
+    else:
+        rows = await conn.fetchall(
+            """
+            SELECT card_id, name, description, tag_ids, created, modified
+            FROM cards
+            WHERE workspace_id = ? AND user_id = ? AND deleted IS NULL
+            ORDER BY created DESC, card_id DESC
+            LIMIT ?
+            """,
+            (workspace_id, user_id, limit + 1)
+        )
+
+    cards = [_card_row_to_dict(row, workspace_id, user_id) for row in rows[:limit]]
+    return cards, len(rows) > limit
+
+
+def _card_row_to_dict(row, workspace_id: str, user_id: str) -> dict:
+    """Map a (card_id, name, description, tag_ids, created, modified) row to API shape."""
+    return {
+        "card_id": row[0],
+        "name": row[1],
+        "description": row[2],
+        "tag_ids": json.loads(row[3]) if row[3] else [],
+        "user_id": user_id,
+        "workspace_id": workspace_id,
+        "created": row[4],
+        "modified": row[5]
+    }
+
+
+async def _load_card(
+    conn: AsyncConnection, card_id: str, workspace_id: str, user_id: str
+) -> Optional[dict]:
+    """Load a single workspace-scoped card on a pooled workspace connection."""
+    row = await conn.fetchone(
+        """
+        SELECT card_id, name, description, tag_ids, created, modified
+        FROM cards
+        WHERE card_id = ? AND workspace_id = ? AND user_id = ?
+        """,
+        (card_id, workspace_id, user_id)
+    )
+
+    return _card_row_to_dict(row, workspace_id, user_id) if row else None
+
+
 @router.get("/cards", response_model=list[dict])
 async def get_cards(
+    response: Response,
     context: tuple[str, str] = Depends(get_workspace_context),
-    skip: int = 0,
-    limit: int = 100
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    skip: int = 0
 ) -> list[dict]:
     """
     Get cards for workspace with isolation.
 
-    Endpoint with automatic workspace scoping.
+    Endpoint with automatic workspace scoping. Uses keyset pagination on
+    (created, card_id): pass the X-Next-Cursor header from the previous
+    response as ?cursor= to fetch the next page.
+
+    `skip` (OFFSET paging) is deprecated and ignored when a cursor is
+    given; it still works for old clients but scans the skipped rows.
     """
     start_time = time.perf_counter()
     workspace_id, user_id = context
 
+    from apps.shared.repositories.card_repository import (
+        decode_card_cursor,
+        encode_card_cursor,
+    )
+
     try:
-        # Import database connection service
-        from apps.shared.services.database_connection import get_workspace_connection
-
-        with get_workspace_connection(workspace_id, user_id) as conn:
-            cursor = conn.execute(
-                """
-                SELECT card_id, name, description, tag_ids, created, modified
-                FROM cards
-                WHERE workspace_id = ? AND user_id = ? AND deleted IS NULL
-                ORDER BY created DESC
-                LIMIT ? OFFSET ?
-                """,
-                (workspace_id, user_id, limit, skip)
+        position = decode_card_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    try:
+        async with async_workspace_connection(workspace_id, user_id) as conn:
+            cards, has_more = await _load_cards_page(
+                conn, workspace_id, user_id, position, limit, skip
             )
 
-            cards = []
-            for row in cursor:
-                cards.append({
-                    "card_id": row[0],
-                    "name": row[1],
-                    "description": row[2],
-                    "tag_ids": json.loads(row[3]) if row[3] else [],
-                    "user_id": user_id,
-                    "workspace_id": workspace_id,
-                    "created": row[4],
-                    "modified": row[5]
-                })
+        if has_more and cards:
+            response.headers["X-Next-Cursor"] = encode_card_cursor(
+                cards[-1]["created"], cards[-1]["card_id"]
+            )
 
         elapsed = time.perf_counter() - start_time
         if elapsed > 0.1:
@@ -662,39 +756,28 @@ async def create_card(
         # Import services
         import uuid
 
-        from apps.shared.services.database_connection import get_workspace_connection
         from apps.shared.services.tag_count_maintenance import create_card_with_counts
 
         # Generate card_id if not provided
         if "card_id" not in card_data:
             card_data["card_id"] = str(uuid.uuid4())
 
-        with get_workspace_connection(workspace_id, user_id) as conn:
+        async with async_workspace_connection(workspace_id, user_id) as conn:
             card_id = await create_card_with_counts(
                 card_data,
                 db_connection=conn
             )
 
             # Fetch and return created card
-            cursor = conn.execute(
+            row = await conn.fetchone(
                 "SELECT card_id, name, description, tag_ids, created, modified FROM cards WHERE card_id = ?",
                 (card_id,)
             )
-            row = cursor.fetchone()
 
             if not row:
                 raise HTTPException(status_code=500, detail="Card created but not found")
 
-            return {
-                "card_id": row[0],
-                "name": row[1],
-                "description": row[2],
-                "tag_ids": json.loads(row[3]) if row[3] else [],
-                "user_id": user_id,
-                "workspace_id": workspace_id,
-                "created": row[4],
-                "modified": row[5]
-            }
+            return _card_row_to_dict(row, workspace_id, user_id)
 
     except Exception as e:
         logger.error(f"Error creating card: {str(e)}")
@@ -714,32 +797,12 @@ async def get_card(
     workspace_id, user_id = context
 
     try:
-        from apps.shared.services.database_connection import get_workspace_connection
-
-        with get_workspace_connection(workspace_id, user_id) as conn:
-            cursor = conn.execute(
-                """
-                SELECT card_id, name, description, tag_ids, created, modified
-                FROM cards
-                WHERE card_id = ? AND workspace_id = ? AND user_id = ?
-                """,
-                (card_id, workspace_id, user_id)
-            )
-
-            row = cursor.fetchone()
-            if not row:
-                raise HTTPException(status_code=404, detail="Card not found")
+        async with async_workspace_connection(workspace_id, user_id) as conn:
+            card = await _load_card(conn, card_id, workspace_id, user_id)
+        if not card:
+            raise HTTPException(status_code=404, detail="Card not found")
 
-            return {
-                "card_id": row[0],
-                "name": row[1],
-                "description": row[2],
-                "tag_ids": json.loads(row[3]) if row[3] else [],
-                "user_id": user_id,
-                "workspace_id": workspace_id,
-                "created": row[4],
-                "modified": row[5]
-            }
+        return card
 
     except HTTPException:
         raise
@@ -955,7 +1018,7 @@ async def update_card_title(request: Request):
         req = UpdateTitleRequest(**data)
 
         card_repo = CardRepository()
-        success = card_repo.update_title(req.card_id, req.workspace_id, req.title)
+        success = await run_db(card_repo.update_title, req.card_id, req.workspace_id, req.title)
 
         if success:
             return {"success": True, "message": "Title updated"}
@@ -984,7 +1047,7 @@ async def update_card_content(request: Request):
         req = UpdateContentRequest(**data)
 
         card_repo = CardRepository()
-        success = card_repo.update_content(req.card_id, req.workspace_id, req.content)
+        success = await run_db(card_repo.update_content, req.card_id, req.workspace_id, req.content)
 
         if success:
             return {"success": True, "message": "Content updated"}
@@ -1013,7 +1076,7 @@ async def update_card_description(request: Request):
         req = UpdateDescriptionRequest(**data)
 
         card_repo = CardRepository()
-        success = card_repo.update_description(req.card_id, req.workspace_id, req.description)
+        success = await run_db(card_repo.update_description, req.card_id, req.workspace_id, req.description)
 
         if success:
             return {"success": True, "message": "Description updated"}
@@ -1042,7 +1105,7 @@ async def add_tag_to_card(request: Request):
         req = AddTagRequest(**data)
 
         card_repo = CardRepository()
-        success = card_repo.add_tag(req.card_id, req.workspace_id, req.tag_id)
+        success = await run_db(card_repo.add_tag, req.card_id, req.workspace_id, req.tag_id)
 
         if success:
             return {"success": True, "message": "Tag added"}
@@ -1069,7 +1132,7 @@ async def remove_tag_from_card(request: Request):
         req = RemoveTagRequest(**data)
 
         card_repo = CardRepository()
-        success = card_repo.remove_tag(req.card_id, req.workspace_id, req.tag_id)
+        success = await run_db(card_repo.remove_tag, req.card_id, req.workspace_id, req.tag_id)
 
         if success:
             return {"success": True, "message": "Tag removed"}
@@ -1080,12 +1143,45 @@ async def remove_tag_from_card(request: Request):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _replace_card_cell_tags(req) -> tuple[list[str], bool]:
+    """Resolve row/col tag names and replace the card's tags (blocking; run via run_db)."""
+    from apps.shared.repositories.tag_repository import get_tag_by_name
+
+    # Get tag IDs for row and col tag names
+    new_tag_ids = []
+
+    if req.row_tag and req.row_tag not in ("other", "all"):
+        row_tag = get_tag_by_name(req.row_tag, req.workspace_id)
+        if row_tag:
+            new_tag_ids.append(row_tag['tag_id'])
+
+    if req.col_tag and req.col_tag not in ("other", "all"):
+        col_tag = get_tag_by_name(req.col_tag, req.workspace_id)
+        if col_tag:
+            new_tag_ids.append(col_tag['tag_id'])
+
+    # Update tags directly in database (replace all tags)
+    with get_card_db_connection(DATABASE_PATH) as conn:
+        cursor = conn.cursor()
+        new_tags_csv = ",".join(new_tag_ids) if new_tag_ids else ""
+        cursor.execute(
+            """
+            UPDATE cards
+            SET tags = ?
+            WHERE card_id = ? AND workspace_id = ? AND deleted IS NULL
+            """,
+            (new_tags_csv, req.card_id, req.workspace_id)
+        )
+        conn.commit()
+        success = cursor.rowcount > 0
+
+    return new_tag_ids, success
+
+
 @router.post("/cards/update-cell-tags")
 async def update_card_cell_tags(request: Request):
     """Update card tags based on cell position (row/col tags)."""
     from pydantic import BaseModel
-    from apps.shared.repositories.tag_repository import get_tag_by_name
-    import sqlite3
 
     class UpdateCellTagsRequest(BaseModel):
         card_id: str  # UUID
@@ -1097,33 +1193,7 @@ async def update_card_cell_tags(request: Request):
         data = await request.json()
         req = UpdateCellTagsRequest(**data)
 
-        # Get tag IDs for row and col tag names
-        new_tag_ids = []
-
-        if req.row_tag and req.row_tag not in ("other", "all"):
-            row_tag = get_tag_by_name(req.row_tag, req.workspace_id)
-            if row_tag:
-                new_tag_ids.append(row_tag['tag_id'])
-
-        if req.col_tag and req.col_tag not in ("other", "all"):
-            col_tag = get_tag_by_name(req.col_tag, req.workspace_id)
-            if col_tag:
-                new_tag_ids.append(col_tag['tag_id'])
-
-        # Update tags directly in database (replace all tags)
-        with get_card_db_connection(DATABASE_PATH) as conn:
-            cursor = conn.cursor()
-            new_tags_csv = ",".join(new_tag_ids) if new_tag_ids else ""
-            cursor.execute(
-                """
-                UPDATE cards
-                SET tags = ?
-                WHERE card_id = ? AND workspace_id = ? AND deleted IS NULL
-                """,
-                (new_tags_csv, req.card_id, req.workspace_id)
-            )
-            conn.commit()
-            success = cursor.rowcount > 0
+        new_tag_ids, success = await run_db(_replace_card_cell_tags, req)
 
         if success:
             return {
@@ -1146,7 +1216,7 @@ async def get_tag_counts():
     try:
         tag_repo = TagRepository()
         workspace_id = "default-workspace"  # TODO: Get from session
-        counts = tag_repo.get_counts(workspace_id)
+        counts = await run_db(tag_repo.get_counts, workspace_id)
         return {"counts": counts}
     except Exception as e:
         logger.error(f"Error fetching tag counts: {e}")
@@ -1175,7 +1245,8 @@ async def create_card(request: Request):
         card_repo = CardRepository()
 
         # Create card using repository
-        card = card_repo.create(
+        card = await run_db(
+            card_repo.create,
             card_id=card_id,
             name=req.name,
             workspace_id=req.workspace_id,
@@ -1199,7 +1270,7 @@ async def delete_card(request: Request):
 
     try:
         card_repo = CardRepository()
-        success = card_repo.soft_delete(card_id, workspace_id)
+        success = await run_db(card_repo.soft_delete, card_id, workspace_id)
 
         if success:
             logger.info(f"Card deleted: {card_id}")
@@ -1247,37 +1318,40 @@ async def get_user_preferences(request: Request):
     user_id = "default-user"  # TODO: Get from session/auth
     db_path = Path("/Users/adam/dev/multicardz/data/multicardz_dev.db")
 
-    try:
+    def load_preferences_row():
         with sqlite3.connect(db_path) as conn:
             cursor = conn.cursor()
             cursor.execute(
                 "SELECT preferences_json FROM user_preferences WHERE user_id = ?",
                 (user_id,)
             )
-            row = cursor.fetchone()
-
-            if row:
-                # Return existing preferences - flatten for frontend
-                prefs = json.loads(row[0])
-                flattened = _flatten_preferences_for_frontend(prefs)
-                logger.info(f"Loaded preferences for user {user_id}: {flattened}")
-                return flattened
-            else:
-                # Return defaults from model
-                from apps.shared.models.user_preferences import UserPreferences, ViewSettings, ThemeSettings, TagSettings, WorkspaceSettings
-
-                default_prefs = UserPreferences(
-                    user_id=user_id,
-                    view_settings=ViewSettings(),
-                    theme_settings=ThemeSettings(),
-                    tag_settings=TagSettings(),
-                    workspace_settings=WorkspaceSettings()
-                )
+            return cursor.fetchone()
 
-                prefs_dict = default_prefs.model_dump(mode='json')
-                flattened = _flatten_preferences_for_frontend(prefs_dict)
-                logger.info(f"Returning default preferences for user {user_id}")
-                return flattened
+    try:
+        row = await run_db(load_preferences_row)
+
+        if row:
+            # Return existing preferences - flatten for frontend
+            prefs = json.loads(row[0])
+            flattened = _flatten_preferences_for_frontend(prefs)
+            logger.info(f"Loaded preferences for user {user_id}: {flattened}")
+            return flattened
+        else:
+            # Return defaults from model
+            from apps.shared.models.user_preferences import UserPreferences, ViewSettings, ThemeSettings, TagSettings, WorkspaceSettings
+
+            default_prefs = UserPreferences(
+                user_id=user_id,
+                view_settings=ViewSettings(),
+                theme_settings=ThemeSettings(),
+                tag_settings=TagSettings(),
+                workspace_settings=WorkspaceSettings()
+            )
+
+            prefs_dict = default_prefs.model_dump(mode='json')
+            flattened = _flatten_preferences_for_frontend(prefs_dict)
+            logger.info(f"Returning default preferences for user {user_id}")
+            return flattened
 
     except Exception as e:
         logger.error(f"Failed to get user preferences: {e}")
@@ -1317,62 +1391,67 @@ async def save_user_preferences(request: Request):
             'rightControlWidth': ('workspace_settings', 'right_control_width'),  # right panel width in pixels
         }
 
-        # Load existing preferences or create defaults
-        with sqlite3.connect(db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT preferences_json FROM user_preferences WHERE user_id = ?",
-                (user_id,)
-            )
-            row = cursor.fetchone()
-
-            if row:
-                prefs_dict = json.loads(row[0])
-            else:
-                # Create default structure
-                default_prefs = UserPreferences(
-                    user_id=user_id,
-                    view_settings=ViewSettings(),
-                    theme_settings=ThemeSettings(),
-                    tag_settings=TagSettings(),
-                    workspace_settings=WorkspaceSettings()
+        def merge_and_save_preferences():
+            # Load existing preferences or create defaults
+            with sqlite3.connect(db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT preferences_json FROM user_preferences WHERE user_id = ?",
+                    (user_id,)
                 )
-                prefs_dict = default_prefs.model_dump(mode='json')
-
-            # Update with new values
-            for frontend_key, value in data.items():
-                if frontend_key in frontend_to_model:
-                    section, field = frontend_to_model[frontend_key]
-
-                    # Special handling for verticalLayout boolean -> tag_layout string
-                    if frontend_key == 'verticalLayout':
-                        value = "vertical" if value else "horizontal"
-
-                    # Special handling for fontSelector - extract font name from class
-                    if frontend_key == 'fontSelector':
-                        # value like "font-inconsolata" -> "Inconsolata"
-                        value = value.replace('font-', '').replace('-', ' ').title().replace(' ', '')
-
-                    prefs_dict[section][field] = value
-                    logger.info(f"Updated {section}.{field} = {value}")
-
-            # Update timestamp
-            prefs_dict['updated_at'] = datetime.utcnow().isoformat()
-
-            # Upsert to database
-            prefs_json = json.dumps(prefs_dict)
-            cursor.execute("""
-                INSERT INTO user_preferences (user_id, preferences_json, updated_at)
-                VALUES (?, ?, CURRENT_TIMESTAMP)
-                ON CONFLICT(user_id)
-                DO UPDATE SET
-                    preferences_json = excluded.preferences_json,
-                    updated_at = CURRENT_TIMESTAMP
-            """, (user_id, prefs_json))
-            conn.commit()
-
-            logger.info(f"Saved preferences for user {user_id}")
-            return {"success": True, "preferences": prefs_dict}
+                row = cursor.fetchone()
+
+                if row:
+                    prefs_dict = json.loads(row[0])
+                else:
+                    # Create default structure
+                    default_prefs = UserPreferences(
+                        user_id=user_id,
+                        view_settings=ViewSettings(),
+                        theme_settings=ThemeSettings(),
+                        tag_settings=TagSettings(),
+                        workspace_settings=WorkspaceSettings()
+                    )
+                    prefs_dict = default_prefs.model_dump(mode='json')
+
+                # Update with new values
+                for frontend_key, value in data.items():
+                    if frontend_key in frontend_to_model:
+                        section, field = frontend_to_model[frontend_key]
+
+                        # Special handling for verticalLayout boolean -> tag_layout string
+                        if frontend_key == 'verticalLayout':
+                            value = "vertical" if value else "horizontal"
+
+                        # Special handling for fontSelector - extract font name from class
+                        if frontend_key == 'fontSelector':
+                            # value like "font-inconsolata" -> "Inconsolata"
+                            value = value.replace('font-', '').replace('-', ' ').title().replace(' ', '')
+
+                        prefs_dict[section][field] = value
+                        logger.info(f"Updated {section}.{field} = {value}")
+
+                # Update timestamp
+                prefs_dict['updated_at'] = datetime.utcnow().isoformat()
+
+                # Upsert to database
+                prefs_json = json.dumps(prefs_dict)
+                cursor.execute("""
+                    INSERT INTO user_preferences (user_id, preferences_json, updated_at)
+                    VALUES (?, ?, CURRENT_TIMESTAMP)
+                    ON CONFLICT(user_id)
+                    DO UPDATE SET
+                        preferences_json = excluded.preferences_json,
+                        updated_at = CURRENT_TIMESTAMP
+                """, (user_id, prefs_json))
+                conn.commit()
+
+                return prefs_dict
+
+        prefs_dict = await run_db(merge_and_save_preferences)
+
+        logger.info(f"Saved preferences for user {user_id}")
+        return {"success": True, "preferences": prefs_dict}
 
     except Exception as e:
         logger.error(f"Failed to save user preferences: {e}", exc_info=True)
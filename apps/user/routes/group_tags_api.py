@@ -1,15 +1,17 @@
 """Group Tags API routes for creation, modification, and expansion operations."""
 
 import logging
+from typing import Literal
 
 from pydantic import BaseModel, ConfigDict, Field
 from fastapi import APIRouter, HTTPException
 
 from apps.shared.config.database import DATABASE_PATH
+from apps.shared.services.async_database import run_db
 from apps.shared.services.group_expansion import (
-    GroupExpansionCache,
     expand_group_recursive,
     get_cache_statistics,
+    get_expansion_cache,
     validate_circular_reference,
     get_expansion_depth,
     get_total_expanded_count,
@@ -22,6 +24,7 @@ from apps.shared.services.group_handlers import (
 from apps.shared.services.group_storage import (
     add_member_to_group,
     add_multiple_members_to_group,
+    apply_membership_edits,
     create_group,
     delete_group,
     get_group_by_id,
@@ -35,8 +38,8 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/groups", tags=["group-tags"])
 
-# Initialize global expansion cache
-expansion_cache = GroupExpansionCache(max_size=1024, ttl_seconds=300)
+# Same cache the expansion service fills and group_storage writes invalidate
+expansion_cache = get_expansion_cache()
 
 
 # ============================================================================
@@ -88,6 +91,25 @@ class AddMultipleMembersRequest(BaseModel):
     user_id: str
 
 
+class MembershipEdit(BaseModel):
+    """One add/remove edit within a bulk membership request."""
+
+    model_config = ConfigDict(frozen=True)
+
+    group_id: str
+    member_tag_id: str
+    op: Literal["add", "remove"]
+
+
+class BulkMembershipRequest(BaseModel):
+    """Request model for bulk membership edits."""
+
+    model_config = ConfigDict(frozen=True)
+
+    edits: tuple[MembershipEdit, ...] = Field(..., description="Membership edits")
+    user_id: str
+
+
 class RemoveMemberRequest(BaseModel):
     """Request model for removing member from group."""
 
@@ -195,8 +217,8 @@ async def create_group_endpoint(request: CreateGroupRequest) -> CreateGroupRespo
 
     try:
         # Validate group name
-        is_valid, error_msg = validate_group_name(
-            request.name, request.workspace_id
+        is_valid, error_msg = await run_db(
+            validate_group_name, request.name, request.workspace_id
         )
         if not is_valid:
             return CreateGroupResponse(
@@ -211,8 +233,8 @@ async def create_group_endpoint(request: CreateGroupRequest) -> CreateGroupRespo
             is_valid, error_msg = validate_no_self_reference(None, member_id)
             if not is_valid and member_id.startswith("group_"):
                 # Validate no circular references for group members
-                is_valid, error_msg = validate_circular_reference(
-                    None, member_id, DATABASE_PATH
+                is_valid, error_msg = await run_db(
+                    validate_circular_reference, None, member_id
                 )
                 if not is_valid:
                     return CreateGroupResponse(
@@ -220,7 +242,8 @@ async def create_group_endpoint(request: CreateGroupRequest) -> CreateGroupRespo
                     )
 
         # Create the group
-        group_id = create_group(
+        group_id = await run_db(
+            create_group,
             name=request.name,
             workspace_id=request.workspace_id,
             created_by=request.user_id,
@@ -256,23 +279,21 @@ async def add_member_endpoint(request: AddMemberRequest):
 
     try:
         # Validate no circular reference
-        is_valid, error_msg = validate_circular_reference(
-            request.group_id, request.member_tag_id
+        is_valid, error_msg = await run_db(
+            validate_circular_reference, request.group_id, request.member_tag_id
         )
         if not is_valid:
             raise HTTPException(status_code=400, detail=error_msg)
 
         # Add member
-        success = add_member_to_group(
+        success = await run_db(
+            add_member_to_group,
             group_id=request.group_id,
             member_id=request.member_tag_id,
             added_by=request.user_id,
         )
 
         if success:
-            # Invalidate cache for this group
-            expansion_cache.invalidate(request.group_id)
-
             logger.info(
                 f"Member {request.member_tag_id} added to group {request.group_id}"
             )
@@ -303,19 +324,9 @@ async def add_multiple_members_endpoint(request: AddMultipleMembersRequest):
     )
 
     try:
-        # Validate all members
-        for member_id in request.member_tag_ids:
-            is_valid, error_msg = validate_circular_reference(
-                request.group_id, member_id, DATABASE_PATH
-            )
-            if not is_valid:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Validation failed for {member_id}: {error_msg}",
-                )
-
-        # Add all members
-        success, added_ids, error = add_multiple_members_to_group(
+        # Cycle validation for the whole batch happens in group_storage
+        success, added_ids, error = await run_db(
+            add_multiple_members_to_group,
             group_id=request.group_id,
             member_ids=frozenset(request.member_tag_ids),
             added_by=request.user_id,
@@ -323,9 +334,6 @@ async def add_multiple_members_endpoint(request: AddMultipleMembersRequest):
         added_count = len(added_ids) if added_ids else 0
 
         if success:
-            # Invalidate cache
-            expansion_cache.invalidate(request.group_id)
-
             logger.info(f"{added_count} members added to group {request.group_id}")
             return {
                 "success": True,
@@ -333,7 +341,9 @@ async def add_multiple_members_endpoint(request: AddMultipleMembersRequest):
                 "message": f"Added {added_count} members successfully",
             }
         else:
-            return {"success": False, "message": "Failed to add members"}
+            raise HTTPException(
+                status_code=400, detail=error or "Failed to add members"
+            )
 
     except HTTPException:
         raise
@@ -342,6 +352,44 @@ async def add_multiple_members_endpoint(request: AddMultipleMembersRequest):
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
+@router.post("/members/bulk")
+async def bulk_membership_endpoint(request: BulkMembershipRequest):
+    """
+    Apply a batch of membership adds and removes in one transaction.
+
+    Args:
+        request: Bulk membership edit request
+
+    Returns:
+        Success status with counts of members added and removed
+    """
+    logger.info(f"Applying {len(request.edits)} membership edits")
+
+    try:
+        result = await run_db(
+            apply_membership_edits,
+            [(edit.group_id, edit.member_tag_id, edit.op) for edit in request.edits],
+            request.user_id,
+        )
+
+        if not result.success:
+            raise HTTPException(
+                status_code=400, detail=result.error or "Membership edits rejected"
+            )
+
+        return {
+            "success": True,
+            "members_added": len(result.added),
+            "members_removed": len(result.removed),
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to apply membership edits: {e}")
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
 @router.post("/remove-member")
 async def remove_member_endpoint(request: RemoveMemberRequest):
     """
@@ -358,15 +406,13 @@ async def remove_member_endpoint(request: RemoveMemberRequest):
     )
 
     try:
-        success = remove_member_from_group(
+        success = await run_db(
+            remove_member_from_group,
             group_id=request.group_id,
             member_id=request.member_tag_id,
         )
 
         if success:
-            # Invalidate cache
-            expansion_cache.invalidate(request.group_id)
-
             logger.info(
                 f"Member {request.member_tag_id} removed from group {request.group_id}"
             )
@@ -397,20 +443,20 @@ async def expand_group_endpoint(request: ExpandGroupRequest) -> ExpandGroupRespo
     try:
         if request.use_cache:
             # Use cached expansion
-            expanded_tags = expansion_cache.expand_with_cache(
-                request.group_id, DATABASE_PATH
+            expanded_tags = await run_db(
+                expansion_cache.expand_with_cache, request.group_id
             )
             cached = True
         else:
             # Direct expansion without cache
-            expanded_tags = expand_group_recursive(
-                request.group_id, db_path=DATABASE_PATH
+            expanded_tags = await run_db(
+                expand_group_recursive, request.group_id, use_cache=False
             )
             cached = False
 
         # Get expansion statistics
-        depth = get_expansion_depth(request.group_id)
-        total_count = get_total_expanded_count(request.group_id)
+        depth = await run_db(get_expansion_depth, request.group_id)
+        total_count = await run_db(get_total_expanded_count, request.group_id)
 
         logger.info(
             f"Group {request.group_id} expanded to {len(expanded_tags)} tags "
@@ -477,7 +523,7 @@ async def drop_operation_endpoint(
         )
 
         # Dispatch to appropriate handler
-        result = dispatch_drop_operation(context, expansion_cache)
+        result = await run_db(dispatch_drop_operation, context)
 
         logger.info(
             f"Drop operation completed: {result.operation_type} → "
@@ -512,7 +558,7 @@ async def get_group_info(group_id: str) -> GroupInfoResponse:
     logger.info(f"Fetching info for group {group_id}")
 
     try:
-        group = get_group_by_id(group_id)
+        group = await run_db(get_group_by_id, group_id)
 
         if not group:
             raise HTTPException(status_code=404, detail=f"Group {group_id} not found")
@@ -549,7 +595,7 @@ async def get_workspace_groups(workspace_id: str) -> WorkspaceGroupsResponse:
     logger.info(f"Fetching groups for workspace {workspace_id}")
 
     try:
-        groups = get_groups_by_workspace(workspace_id)
+        groups = await run_db(get_groups_by_workspace, workspace_id)
 
         group_infos = tuple(
             GroupInfoResponse(
@@ -592,12 +638,9 @@ async def delete_group_endpoint(group_id: str):
     logger.info(f"Deleting group {group_id}")
 
     try:
-        success = delete_group(group_id)
+        success = await run_db(delete_group, group_id)
 
         if success:
-            # Invalidate cache
-            expansion_cache.invalidate(group_id)
-
             logger.info(f"Group {group_id} deleted successfully")
             return {"success": True, "message": "Group deleted successfully"}
         else:
@@ -646,8 +689,6 @@ async def clear_cache_endpoint():
     Returns:
         Success status
     """
-    # Clear cache by resetting the stats
-    # Note: Full cache reset would require reimporting/reinitializing
-    # For now, just return success message
-    logger.info("Expansion cache clear requested")
-    return {"success": True, "message": "Cache clear operation initiated"}
+    expansion_cache.clear()
+    logger.info("Expansion cache cleared")
+    return {"success": True, "message": "Cache cleared"}
@@ -4,11 +4,12 @@ import logging
 import sqlite3
 import uuid
 from datetime import datetime
-from pathlib import Path
 
 from fastapi import APIRouter, Request
 from pydantic import BaseModel
 
+from apps.shared.services.async_database import run_db
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/tags", tags=["tags"])
@@ -32,6 +33,62 @@ class CreateTagResponse(BaseModel):
     message: str | None = None
 
 
+def _insert_tag(request: CreateTagRequest) -> CreateTagResponse:
+    """Insert a tag unless it already exists (blocking; run via run_db)."""
+    tag_name = request.name
+    user_id = request.user_id
+    workspace_id = request.workspace_id
+
+    from apps.shared.config.database import DATABASE_PATH
+    with sqlite3.connect(DATABASE_PATH) as conn:
+        cursor = conn.cursor()
+
+        # Check if tag already exists for this user/workspace
+        cursor.execute(
+            "SELECT tag_id FROM tags WHERE tag = ? AND user_id = ? AND workspace_id = ? AND deleted IS NULL",
+            (tag_name, user_id, workspace_id),
+        )
+        existing = cursor.fetchone()
+
+        if existing:
+            return CreateTagResponse(
+                success=False,
+                tag_id=existing[0],
+                message=f"Tag '{tag_name}' already exists",
+            )
+
+        # Generate UUID for new tag
+        tag_id = str(uuid.uuid4())
+        now = datetime.utcnow().isoformat()
+
+        # Insert new tag with all required fields
+        cursor.execute(
+            """
+            INSERT INTO tags (
+                user_id, workspace_id, created, modified, deleted,
+                tag_id, tag_bitmap, tag, card_count, tag_type, color_hex
+            ) VALUES (?, ?, ?, ?, NULL, ?, 0, ?, 0, ?, ?)
+            """,
+            (
+                user_id,
+                workspace_id,
+                now,
+                now,
+                tag_id,
+                tag_name,
+                request.tag_type,
+                request.color_hex,
+            ),
+        )
+        conn.commit()
+
+        logger.info(f"Tag created successfully: {tag_name} (ID: {tag_id})")
+
+        return CreateTagResponse(
+            success=True, tag_id=tag_id, message="Tag created successfully"
+        )
+
+
 @router.post("/create", response_model=CreateTagResponse)
 async def create_tag(request: CreateTagRequest) -> CreateTagResponse:
     """
@@ -50,56 +107,7 @@ async def create_tag(request: CreateTagRequest) -> CreateTagResponse:
     logger.info(f"Creating tag: {tag_name} for user {user_id} in workspace {workspace_id}")
 
     try:
-        db_path = Path("/var/data/tutorial_customer.db")
-
-        from apps.shared.config.database import DATABASE_PATH
-        with sqlite3.connect(DATABASE_PATH) as conn:
-            cursor = conn.cursor()
-
-            # Check if tag already exists for this user/workspace
-            cursor.execute(
-                "SELECT tag_id FROM tags WHERE tag = ? AND user_id = ? AND workspace_id = ? AND deleted IS NULL",
-                (tag_name, user_id, workspace_id),
-            )
-            existing = cursor.fetchone()
-
-            if existing:
-                return CreateTagResponse(
-                    success=False,
-                    tag_id=existing[0],
-                    message=f"Tag '{tag_name}' already exists",
-                )
-
-            # Generate UUID for new tag
-            tag_id = str(uuid.uuid4())
-            now = datetime.utcnow().isoformat()
-
-            # Insert new tag with all required fields
-            cursor.execute(
-                """
-                INSERT INTO tags (
-                    user_id, workspace_id, created, modified, deleted,
-                    tag_id, tag_bitmap, tag, card_count, tag_type, color_hex
-                ) VALUES (?, ?, ?, ?, NULL, ?, 0, ?, 0, ?, ?)
-                """,
-                (
-                    user_id,
-                    workspace_id,
-                    now,
-                    now,
-                    tag_id,
-                    tag_name,
-                    request.tag_type,
-                    request.color_hex,
-                ),
-            )
-            conn.commit()
-
-            logger.info(f"Tag created successfully: {tag_name} (ID: {tag_id})")
-
-            return CreateTagResponse(
-                success=True, tag_id=tag_id, message="Tag created successfully"
-            )
+        return await run_db(_insert_tag, request)
 
     except Exception as e:
         logger.error(f"Failed to create tag: {e}")
@@ -108,31 +116,31 @@ async def create_tag(request: CreateTagRequest) -> CreateTagResponse:
         )
 
 
+def _soft_delete_tag(tag_id: str) -> dict:
+    """Soft delete a tag by setting its deleted timestamp (blocking; run via run_db)."""
+    from apps.shared.config.database import DATABASE_PATH
+    with sqlite3.connect(DATABASE_PATH) as conn:
+        cursor = conn.cursor()
+
+        # Soft delete - set deleted timestamp
+        cursor.execute(
+            "UPDATE tags SET deleted = ? WHERE tag_id = ?",
+            (datetime.utcnow().isoformat(), tag_id)
+        )
+        conn.commit()
+
+        logger.info(f"Tag deleted: {tag_id}")
+        return {"success": True, "message": "Tag deleted"}
+
+
 @router.post("/delete")
 async def delete_tag(request: Request):
     """Delete a tag (soft delete by setting deleted timestamp)."""
-    import sqlite3
-    from datetime import datetime
-
     data = await request.json()
     tag_id = data.get("tag_id")
 
     try:
-        db_path = Path("/var/data/tutorial_customer.db")
-
-        from apps.shared.config.database import DATABASE_PATH
-        with sqlite3.connect(DATABASE_PATH) as conn:
-            cursor = conn.cursor()
-
-            # Soft delete - set deleted timestamp
-            cursor.execute(
-                "UPDATE tags SET deleted = ? WHERE tag_id = ?",
-                (datetime.utcnow().isoformat(), tag_id)
-            )
-            conn.commit()
-
-            logger.info(f"Tag deleted: {tag_id}")
-            return {"success": True, "message": "Tag deleted"}
+        return await run_db(_soft_delete_tag, tag_id)
 
     except Exception as e:
         logger.error(f"Failed to delete tag: {e}")
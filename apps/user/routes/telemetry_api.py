@@ -0,0 +1,27 @@
+"""Performance telemetry export routes (Prometheus scrape target, pool stats)."""
+
+import logging
+
+from fastapi import APIRouter, Response
+
+from apps.shared.services.performance_optimization import connection_pool
+from apps.shared.services.performance_tracker import get_performance_tracker
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/telemetry", tags=["telemetry"])
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics")
+async def prometheus_metrics() -> Response:
+    """Per mode/operation latency summaries in Prometheus text format."""
+    telemetry = get_performance_tracker().telemetry
+    return Response(content=telemetry.export_prometheus(), media_type=PROMETHEUS_MEDIA_TYPE)
+
+
+@router.get("/connection-pool")
+async def connection_pool_metrics() -> dict:
+    """Database pool size, utilization and checkout wait times."""
+    return connection_pool.metrics()._asdict()
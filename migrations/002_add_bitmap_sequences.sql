@@ -20,6 +20,9 @@ DROP TRIGGER IF EXISTS auto_calculate_card_bitmap;
 DROP TRIGGER IF EXISTS auto_calculate_tag_bitmap;
 
 -- Auto-calculate card_bitmap using sequential integers
+-- Fallback only: batch inserts reserve a block of ordinals up front
+-- (apps/shared/repositories/bitmap_sequences.py) and write card_bitmap
+-- directly, so this trigger fires just for ad-hoc inserts with card_bitmap = 0
 CREATE TRIGGER auto_calculate_card_bitmap
 AFTER INSERT ON cards
 WHEN NEW.card_bitmap = 0
@@ -34,6 +37,7 @@ BEGIN
 END;
 
 -- Auto-calculate tag_bitmap using sequential integers
+-- Fallback only: see auto_calculate_card_bitmap above
 CREATE TRIGGER auto_calculate_tag_bitmap
 AFTER INSERT ON tags
 WHEN NEW.tag_bitmap = 0
@@ -0,0 +1,18 @@
+-- ============================================================================
+-- Card Keyset Pagination Indexes
+-- Version: 4.0
+-- Purpose: Composite partial indexes matching the keyset ORDER BY of card
+--          listings, so (created, card_id) cursors seek instead of scanning
+-- ============================================================================
+
+-- GET /api/cards: WHERE workspace_id = ? AND user_id = ? AND deleted IS NULL
+--                 ORDER BY created DESC, card_id DESC
+CREATE INDEX IF NOT EXISTS idx_cards_workspace_user_created
+ON cards(workspace_id, user_id, created, card_id)
+WHERE deleted IS NULL;
+
+-- list_cards_page_by_workspace: WHERE workspace_id = ? AND deleted IS NULL
+--                               ORDER BY created DESC, card_id DESC
+CREATE INDEX IF NOT EXISTS idx_cards_workspace_created
+ON cards(workspace_id, created, card_id)
+WHERE deleted IS NULL;
@@ -31,6 +31,21 @@ pytest_plugins = [
 ]
 
 
+@pytest.fixture(scope="session", autouse=True)
+def isolated_performance_tracker(tmp_path_factory):
+    """Global performance tracker that learns into a temp file, without exploring."""
+    from apps.shared.services import performance_tracker
+
+    tracker = performance_tracker.AdaptivePerformanceTracker(
+        model_path=tmp_path_factory.mktemp("performance") / "performance_model.json",
+        exploration_rate=0.0,
+    )
+    original = performance_tracker._tracker_instance
+    performance_tracker._tracker_instance = tracker
+    yield tracker
+    performance_tracker._tracker_instance = original
+
+
 @pytest.fixture
 def sample_card_summary():
     """Create a sample card summary for testing."""
@@ -5,6 +5,38 @@ import pytest
 from unittest.mock import Mock, AsyncMock
 from typing import Dict, Any, List
 import random
+import sqlite3
+
+
+@pytest.fixture(autouse=True)
+def bitmap_store(monkeypatch):
+    """
+    Point the bitmap store at a fresh in-memory database for every test.
+
+    The database is only created when a test touches the store. Posting
+    indexes are dropped too, so nothing loaded from one test's store leaks
+    into the next.
+    """
+    import apps.shared.services.bitmap_sync as bitmap_sync_module
+    from apps.shared.services.bitmap_index import reset_tag_indexes
+
+    connections = []
+
+    def get_connection():
+        if not connections:
+            conn = sqlite3.connect(":memory:", check_same_thread=False)
+            bitmap_sync_module.initialize_bitmap_schema(conn)
+            connections.append(conn)
+        return connections[0]
+
+    monkeypatch.setattr(bitmap_sync_module, "get_connection", get_connection)
+    reset_tag_indexes()
+
+    yield get_connection
+
+    reset_tag_indexes()
+    for conn in connections:
+        conn.close()
 
 
 @pytest.fixture
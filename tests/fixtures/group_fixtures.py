@@ -22,6 +22,10 @@ def setup_database_stub(monkeypatch):
     import apps.shared.services.group_storage as group_storage_module
     monkeypatch.setattr(group_storage_module, "get_connection", get_connection)
 
+    # Graphs loaded from a previous test's database must not leak across tests
+    from apps.shared.services.group_expansion import reset_group_graphs
+    reset_group_graphs()
+
     yield
 
     # Cleanup after test
@@ -1,6 +1,7 @@
 """Step definitions for API routes BDD tests."""
 import time
-from unittest.mock import MagicMock, Mock, patch
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 import pytest
 from pytest_bdd import given, scenarios, then, when
@@ -9,6 +10,14 @@ from pytest_bdd import given, scenarios, then, when
 scenarios('../features/api_routes.feature')
 
 
+def _pooled_connection(connection):
+    """Stand-in for async_workspace_connection that yields `connection`."""
+    @asynccontextmanager
+    async def acquire(workspace_id, user_id, **kwargs):
+        yield connection
+    return acquire
+
+
 # Shared state for test scenarios
 @pytest.fixture
 def context():
@@ -43,21 +52,13 @@ def request_get_cards(context, test_client):
     context['start_time'] = time.perf_counter()
 
     # Mock the database connection and response
-    with patch('apps.shared.services.database_connection.get_workspace_connection') as mock_conn:
-        mock_cursor = Mock()
-        mock_cursor.fetchall.return_value = [
-            ("card-1", "Test Card 1", "Description 1", '["tag-1"]', "2025-10-01 10:00:00", "2025-10-01 10:00:00"),
-            ("card-2", "Test Card 2", "Description 2", '["tag-1", "tag-2"]', "2025-10-01 10:00:00", "2025-10-01 10:00:00"),
-        ]
-        mock_cursor.__iter__ = lambda self: iter(mock_cursor.fetchall())
-
-        mock_connection = MagicMock()
-        mock_connection.execute.return_value = mock_cursor
-        mock_connection.__enter__ = lambda self: mock_connection
-        mock_connection.__exit__ = lambda self, *args: None
-
-        mock_conn.return_value = mock_connection
+    mock_connection = MagicMock()
+    mock_connection.fetchall = AsyncMock(return_value=[
+        ("card-1", "Test Card 1", "Description 1", '["tag-1"]', "2025-10-01 10:00:00", "2025-10-01 10:00:00"),
+        ("card-2", "Test Card 2", "Description 2", '["tag-1", "tag-2"]', "2025-10-01 10:00:00", "2025-10-01 10:00:00"),
+    ])
 
+    with patch('apps.user.routes.cards_api.async_workspace_connection', _pooled_connection(mock_connection)):
         context['response'] = test_client.get(
             "/api/cards",
             headers=context['headers']
@@ -102,7 +103,7 @@ def post_card_without_workspace(context, test_client):
     }
 
     # Mock the database operations
-    with patch('apps.shared.services.database_connection.get_workspace_connection') as mock_conn, \
+    with patch('apps.shared.services.database_connection.open_workspace_connection') as mock_conn, \
          patch('apps.shared.services.tag_count_maintenance.create_card_with_counts') as mock_create:
 
         mock_cursor = Mock()
@@ -114,8 +115,6 @@ def post_card_without_workspace(context, test_client):
 
         mock_connection = MagicMock()
         mock_connection.execute.return_value = mock_cursor
-        mock_connection.__enter__ = lambda self: mock_connection
-        mock_connection.__exit__ = lambda self, *args: None
 
         mock_conn.return_value = mock_connection
         mock_create.return_value = "new-card-id"
@@ -172,17 +171,10 @@ def try_access_workspace_b(context, test_client):
     workspace_b_card_id = "workspace-b-card-123"
 
     # Mock the database to return no results (workspace isolation)
-    with patch('apps.shared.services.database_connection.get_workspace_connection') as mock_conn:
-        mock_cursor = Mock()
-        mock_cursor.fetchone.return_value = None  # No card found
-
-        mock_connection = MagicMock()
-        mock_connection.execute.return_value = mock_cursor
-        mock_connection.__enter__ = lambda self: mock_connection
-        mock_connection.__exit__ = lambda self, *args: None
-
-        mock_conn.return_value = mock_connection
+    mock_connection = MagicMock()
+    mock_connection.fetchone = AsyncMock(return_value=None)  # No card found
 
+    with patch('apps.user.routes.cards_api.async_workspace_connection', _pooled_connection(mock_connection)):
         context['response'] = test_client.get(
             f"/api/cards/{workspace_b_card_id}",
             headers=context['headers']
@@ -0,0 +1,118 @@
+"""
+Unit tests for the async database access path.
+
+Uses a temporary SQLite file opened with check_same_thread=False, the same
+way async_workspace_connection opens workspace databases.
+"""
+
+import asyncio
+import sqlite3
+import threading
+import time
+from functools import partial
+
+import pytest
+
+from apps.shared.services.async_database import (
+    AsyncConnection,
+    async_connection,
+    run_db,
+)
+from apps.shared.services.tag_count_maintenance import create_card_with_counts
+
+
+@pytest.fixture
+def card_db(tmp_path):
+    """Minimal cards/tags schema used by tag_count_maintenance."""
+    db_path = tmp_path / "async.db"
+    conn = sqlite3.connect(db_path)
+    conn.executescript(
+        """
+        CREATE TABLE cards (
+            card_id TEXT PRIMARY KEY, name TEXT, description TEXT,
+            user_id TEXT, workspace_id TEXT, tag_ids TEXT,
+            created TEXT, modified TEXT
+        );
+        CREATE TABLE tags (
+            tag_id TEXT PRIMARY KEY, user_id TEXT, workspace_id TEXT,
+            card_count INTEGER DEFAULT 0, modified TEXT
+        );
+        INSERT INTO tags (tag_id, user_id, workspace_id) VALUES
+            ('tag-a', 'u', 'ws'), ('tag-b', 'u', 'ws');
+        """
+    )
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+def _connect(db_path):
+    return partial(sqlite3.connect, db_path, check_same_thread=False)
+
+
+def test_run_db_runs_off_event_loop_thread():
+    """Blocking work executes on a database worker, not the loop thread."""
+    async def scenario():
+        return threading.get_ident(), await run_db(threading.get_ident)
+
+    loop_thread, worker_thread = asyncio.run(scenario())
+
+    assert loop_thread != worker_thread
+
+
+def test_run_db_does_not_block_other_coroutines():
+    """A slow query leaves the event loop free to run other tasks."""
+    ticks = []
+
+    async def ticker():
+        for _ in range(5):
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+
+    async def scenario():
+        await asyncio.gather(run_db(time.sleep, 0.1), ticker())
+
+    asyncio.run(scenario())
+
+    assert len(ticks) == 5
+    assert ticks[-1] - ticks[0] < 0.1
+
+
+def test_run_db_propagates_exceptions():
+    async def scenario():
+        await run_db(sqlite3.connect(":memory:", check_same_thread=False).execute, "SELEC")
+
+    with pytest.raises(sqlite3.OperationalError):
+        asyncio.run(scenario())
+
+
+def test_async_connection_round_trip(card_db):
+    """execute/commit/fetch run through the executor against a real file."""
+    async def scenario():
+        async with async_connection(_connect(card_db)) as conn:
+            assert isinstance(conn, AsyncConnection)
+            await conn.execute("UPDATE tags SET card_count = 7 WHERE tag_id = ?", ("tag-a",))
+            assert conn.in_transaction
+            await conn.commit()
+            return await conn.fetchone("SELECT card_count FROM tags WHERE tag_id = 'tag-a'")
+
+    assert asyncio.run(scenario()) == (7,)
+
+
+def test_create_card_with_counts_single_transaction(card_db):
+    """Card insert and tag count increments commit together without nested BEGIN."""
+    async def scenario():
+        async with async_connection(_connect(card_db)) as conn:
+            await create_card_with_counts(
+                {
+                    "card_id": "card-1",
+                    "name": "One",
+                    "workspace_id": "ws",
+                    "user_id": "u",
+                    "tag_ids": ["tag-a", "tag-b"],
+                },
+                db_connection=conn
+            )
+            return await conn.fetchall("SELECT tag_id, card_count FROM tags ORDER BY tag_id")
+
+    assert asyncio.run(scenario()) == [("tag-a", 1), ("tag-b", 1)]
@@ -0,0 +1,118 @@
+"""
+Unit tests for version-based delta sync of card bitmaps.
+
+Uses the in-memory bitmap store fixture from
+tests/fixtures/bitmap_sync_fixtures.py.
+"""
+
+from apps.shared.services.bitmap_delta_sync import (
+    compact_change_log,
+    get_sync_lag,
+    pull_changes,
+    push_changes,
+)
+from apps.shared.services.bitmap_filter import filter_by_bitmap
+from apps.shared.services.bitmap_sync import remove_card_bitmap, sync_card_bitmaps_batch
+
+
+def _card(card_id, *tags):
+    return {"card_id": card_id, "card_bitmap": 1, "tag_bitmaps": list(tags)}
+
+
+def test_pull_returns_only_changes_since_version():
+    sync_card_bitmaps_batch("ws-1", "user-1", [_card("c1", 1), _card("c2", 2)])
+    first = pull_changes("ws-1", "user-1", since_version=0)
+    assert first.version == 1
+    assert [c["card_id"] for c in first.changes] == ["c1", "c2"]
+
+    sync_card_bitmaps_batch("ws-1", "user-1", [_card("c2", 3)])
+    sync_card_bitmaps_batch("ws-1", "user-1", [_card("c2", 4)])
+    remove_card_bitmap("ws-1", "user-1", "c1")
+
+    delta = pull_changes("ws-1", "user-1", since_version=first.version)
+    assert delta.version == 4
+    # Two edits of c2 compact to its latest bitmaps
+    assert delta.changes == [{"card_id": "c2", "card_bitmap": 1, "tag_bitmaps": [4], "sync_version": 3}]
+    assert delta.deleted == ["c1"]
+    assert pull_changes("ws-1", "user-1", since_version=4).changes == []
+
+
+def test_pull_is_isolated_per_user():
+    sync_card_bitmaps_batch("ws-1", "user-1", [_card("c1", 1)])
+    sync_card_bitmaps_batch("ws-1", "user-2", [_card("c9", 1)])
+
+    assert [c["card_id"] for c in pull_changes("ws-1", "user-2", 0).changes] == ["c9"]
+
+
+def test_push_applies_changes_and_rejects_conflicts():
+    base = push_changes("ws-1", "user-1", "laptop", 0, [_card("c1", 1), _card("c2", 1)]).version
+
+    # Another device edits c1 after the phone's base version
+    push_changes("ws-1", "user-1", "laptop", base, [_card("c1", 5)])
+
+    result = push_changes(
+        "ws-1", "user-1", "phone", base, [_card("c1", 9), _card("c3", 9)], deleted=("c2",)
+    )
+
+    assert result.success
+    assert result.conflicts == ("c1",)
+    assert result.applied == 2
+    assert filter_by_bitmap("ws-1", "user-1", 9).card_ids == ["c3"]
+    assert filter_by_bitmap("ws-1", "user-1", 5).card_ids == ["c1"]
+    assert pull_changes("ws-1", "user-1", base).deleted == ["c2"]
+
+
+def test_push_does_not_conflict_with_own_changes():
+    base = push_changes("ws-1", "user-1", "laptop", 0, [_card("c1", 1)]).version
+    push_changes("ws-1", "user-1", "laptop", base, [_card("c1", 2)])
+
+    result = push_changes("ws-1", "user-1", "laptop", base, [_card("c1", 3)])
+
+    assert result.conflicts == ()
+    assert filter_by_bitmap("ws-1", "user-1", 3).card_ids == ["c1"]
+
+
+def test_push_rejects_malformed_changes():
+    result = push_changes("ws-1", "user-1", "laptop", 0, [{"card_id": "c1"}])
+    assert not result.success
+
+
+def test_compaction_forces_full_resync_for_stale_clients():
+    sync_card_bitmaps_batch("ws-1", "user-1", [_card("c1", 1), _card("c2", 1)])
+    pull_changes("ws-1", "user-1", 0, client_id="stale")
+    remove_card_bitmap("ws-1", "user-1", "c1")
+    pull_changes("ws-1", "user-1", 0, client_id="fresh")
+
+    assert compact_change_log("ws-1", through_version=2) == 1
+
+    stale = pull_changes("ws-1", "user-1", since_version=1, client_id="stale")
+    assert stale.full_resync
+    assert [c["card_id"] for c in stale.changes] == ["c2"]
+    assert stale.deleted == []
+
+
+def test_sync_lag_reports_clients_behind():
+    sync_card_bitmaps_batch("ws-1", "user-1", [_card("c1", 1)])
+    pull_changes("ws-1", "user-1", 0, client_id="phone")
+    sync_card_bitmaps_batch("ws-1", "user-1", [_card("c2", 1)])
+    sync_card_bitmaps_batch("ws-1", "user-1", [_card("c3", 1)])
+
+    lag = get_sync_lag("ws-1", "user-1")
+
+    assert lag["version"] == 3
+    assert lag["change_log_rows"] == 3
+    assert lag["max_versions_behind"] == 2
+    assert lag["clients"][0]["client_id"] == "phone"
+
+
+def test_sync_lag_only_reports_the_callers_clients():
+    sync_card_bitmaps_batch("ws-1", "user-1", [_card("c1", 1)])
+    sync_card_bitmaps_batch("ws-1", "user-2", [_card("c2", 1)])
+    pull_changes("ws-1", "user-1", 0, client_id="phone")
+    pull_changes("ws-1", "user-2", 0, client_id="laptop")
+
+    lag = get_sync_lag("ws-1", "user-2")
+
+    assert lag["user_id"] == "user-2"
+    assert lag["change_log_rows"] == 1
+    assert [c["client_id"] for c in lag["clients"]] == ["laptop"]
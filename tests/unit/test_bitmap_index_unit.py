@@ -0,0 +1,192 @@
+"""
+Unit tests for the roaring posting-list index behind bitmap filtering.
+
+The synced index is populated through bitmap_sync, the same way browser
+sync requests reach the server; the bitmap store is the in-memory fixture
+from tests/fixtures/bitmap_sync_fixtures.py.
+"""
+
+import threading
+import time
+
+import pytest
+
+from apps.shared.services import bitmap_index
+from apps.shared.services.bitmap_filter import (
+    filter_by_bitmap,
+    filter_by_complex_expression,
+    filter_by_exclusion,
+    filter_by_intersection,
+    filter_by_union,
+)
+from apps.shared.services.bitmap_index import (
+    TagPostingIndex,
+    build_tag_index,
+    get_tag_index,
+)
+from apps.shared.services.bitmap_sync import remove_card_bitmap, sync_card_bitmap
+
+
+def _sync(card_id, *tags, workspace_id="ws-1", user_id="user-1"):
+    result = sync_card_bitmap({
+        "card_id": card_id,
+        "workspace_id": workspace_id,
+        "user_id": user_id,
+        "card_bitmap": 1,
+        "tag_bitmaps": list(tags),
+    })
+    assert result.success
+
+
+@pytest.fixture
+def synced():
+    _sync("c1", 111, 222)
+    _sync("c2", 111, 333)
+    _sync("c3", 222, 333)
+    _sync("c4", 111, 222, 444)
+    _sync("c5", 111, 222, workspace_id="ws-2", user_id="user-2")
+
+
+def test_filters_use_synced_index(synced):
+    assert filter_by_bitmap("ws-1", "user-1", 111).card_ids == ["c1", "c2", "c4"]
+    assert filter_by_intersection("ws-1", "user-1", [111, 222]).card_ids == ["c1", "c4"]
+    assert filter_by_union("ws-1", "user-1", [333, 444]).card_ids == ["c2", "c3", "c4"]
+    assert filter_by_exclusion("ws-1", "user-1", 111, 222).card_ids == ["c2"]
+    assert filter_by_intersection("ws-1", "user-1", [111, 999]).card_ids == []
+
+
+def test_index_is_isolated_per_workspace_and_user(synced):
+    assert filter_by_bitmap("ws-2", "user-2", 111).card_ids == ["c5"]
+    assert filter_by_bitmap("ws-1", "user-2", 111).card_ids == []
+
+
+def test_resync_moves_card_between_postings(synced):
+    _sync("c2", 222)
+
+    assert filter_by_bitmap("ws-1", "user-1", 111).card_ids == ["c1", "c4"]
+    assert filter_by_bitmap("ws-1", "user-1", 222).card_ids == ["c1", "c2", "c3", "c4"]
+    assert filter_by_bitmap("ws-1", "user-1", 333).card_ids == ["c3"]
+
+
+def test_removed_card_leaves_every_posting(synced):
+    assert remove_card_bitmap("ws-1", "user-1", "c4").success
+    assert not remove_card_bitmap("ws-1", "user-1", "c4").success
+
+    index = get_tag_index("ws-1", "user-1")
+    assert len(index) == 3
+    assert filter_by_bitmap("ws-1", "user-1", 444).card_ids == []
+    assert "c4" not in index.card_ids(index.all_cards())
+
+
+def test_least_recently_used_index_is_evicted_and_reloaded(monkeypatch):
+    monkeypatch.setattr(bitmap_index, "MAX_TAG_INDEXES", 2)
+    _sync("c1", 111, workspace_id="ws-a", user_id="user-a")
+    _sync("c2", 111, workspace_id="ws-b", user_id="user-b")
+    get_tag_index("ws-a", "user-a")  # ws-a is now most recently used
+    _sync("c3", 111, workspace_id="ws-c", user_id="user-c")
+
+    assert set(bitmap_index._indexes) == {("ws-a", "user-a"), ("ws-c", "user-c")}
+
+    # An evicted tenant is rebuilt from the store, including later writes
+    _sync("c4", 111, workspace_id="ws-b", user_id="user-b")
+    assert filter_by_bitmap("ws-b", "user-b", 111).card_ids == ["c2", "c4"]
+    assert len(bitmap_index._indexes) == 2
+
+
+def test_concurrent_resyncs_leave_index_matching_store(synced, monkeypatch):
+    index = get_tag_index("ws-1", "user-1")
+    upsert = index.upsert_card
+    first_in_index = threading.Event()
+
+    def slow_upsert(card_id, tags):
+        if threading.current_thread().name == "first":
+            first_in_index.set()
+            time.sleep(0.1)
+        return upsert(card_id, tags)
+
+    monkeypatch.setattr(index, "upsert_card", slow_upsert)
+    first = threading.Thread(target=_sync, args=("c2", 444), name="first")
+    second = threading.Thread(target=_sync, args=("c2", 555), name="second")
+    first.start()
+    assert first_in_index.wait(5)
+    second.start()
+    first.join(5)
+    second.join(5)
+
+    # The second sync committed last, so its tags must win in the index too
+    assert filter_by_bitmap("ws-1", "user-1", 555).card_ids == ["c2"]
+    assert "c2" not in filter_by_bitmap("ws-1", "user-1", 444).card_ids
+
+
+def test_explicit_rows_are_isolated_and_parsed_once():
+    rows = [
+        {"card_id": "a", "workspace_id": "ws-1", "user_id": "user-1", "tag_bitmaps": "1, 2"},
+        {"card_id": "b", "workspace_id": "ws-1", "user_id": "user-9", "tag_bitmaps": "1"},
+        {"card_id": "c", "workspace_id": "ws-1", "user_id": "user-1", "tag_bitmaps": [2]},
+    ]
+
+    index = TagPostingIndex.from_rows("ws-1", "user-1", rows)
+
+    assert index.card_ids(index.match_any([1, 2])) == ["a", "c"]
+    assert filter_by_complex_expression("ws-1", "user-1", "1 AND 2", rows).card_ids == ["a"]
+
+
+def test_million_card_filters_stay_under_target():
+    rows = (
+        {"card_id": f"card-{i}", "workspace_id": "ws", "user_id": "u",
+         "tag_bitmaps": [i % 10, 100 + i % 7]}
+        for i in range(1_000_000)
+    )
+    build_tag_index("ws", "u", rows)
+
+    start = time.perf_counter()
+    result = filter_by_intersection("ws", "u", [3, 104])
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    assert result.total_matches == len([i for i in range(1_000_000) if i % 10 == 3 and i % 7 == 4])
+    assert elapsed_ms < 100, f"Intersection took {elapsed_ms:.1f}ms"
+
+
+def test_store_reloads_index_after_restart(synced, bitmap_store):
+    """A fresh process rebuilds the index from card_bitmaps on first filter."""
+    from apps.shared.services.bitmap_index import reset_tag_indexes
+
+    reset_tag_indexes()
+
+    assert filter_by_intersection("ws-1", "user-1", [111, 222]).card_ids == ["c1", "c4"]
+    assert bitmap_store().execute("SELECT COUNT(*) FROM card_bitmaps").fetchone()[0] == 5
+
+
+def test_batch_sync_upserts_in_one_statement(bitmap_store):
+    from apps.shared.services.bitmap_sync import query_bitmaps, sync_card_bitmaps_batch
+
+    _sync("c1", 7)
+    statements = []
+    bitmap_store().set_trace_callback(statements.append)
+
+    records = [{"card_id": f"c{i}", "card_bitmap": i, "tag_bitmaps": [i % 3]} for i in range(5000)]
+    records.append({"card_id": "bad", "card_bitmap": 1, "tag_bitmaps": [], "name": "secret"})
+    result = sync_card_bitmaps_batch("ws-1", "user-1", records)
+    bitmap_store().set_trace_callback(None)
+
+    assert result.success
+    assert result.synced == 5000
+    assert result.rejected == (("bad", "Content field 'name' not allowed in bitmap sync"),)
+    card_inserts = [sql for sql in statements if sql.lstrip().startswith("INSERT INTO card_bitmaps")]
+    assert len(card_inserts) == 5000  # one executemany
+    assert sum(1 for sql in statements if sql == "COMMIT") == 1
+
+    assert query_bitmaps("ws-1", "user-1").count == 5000
+    assert filter_by_bitmap("ws-1", "user-1", 1).total_matches == len(range(1, 5000, 3))
+    assert filter_by_bitmap("ws-1", "user-1", 7).card_ids == []  # c1 moved off tag 7
+
+
+def test_batch_sync_rejects_oversized_and_foreign_records():
+    from apps.shared.services.bitmap_sync import MAX_SYNC_BATCH_SIZE, sync_card_bitmaps_batch
+
+    oversized = [{"card_id": "x", "card_bitmap": 1, "tag_bitmaps": []}] * (MAX_SYNC_BATCH_SIZE + 1)
+    assert not sync_card_bitmaps_batch("ws-1", "user-1", oversized).success
+
+    foreign = {"card_id": "x", "card_bitmap": 1, "tag_bitmaps": [], "workspace_id": "ws-2"}
+    result = sync_card_bitmaps_batch("ws-1", "user-1", [foreign])
+    assert result.synced == 0 and result.rejected[0][0] == "x"
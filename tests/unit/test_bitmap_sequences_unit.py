@@ -0,0 +1,108 @@
+"""
+Unit tests for bitmap sequence block reservation.
+
+Runs the real zero-trust schema and bitmap sequence migrations against a
+temporary SQLite file.
+"""
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from apps.shared.repositories.bitmap_sequences import (
+    CARD_BITMAP_SEQUENCE,
+    reserve_bitmap_block,
+)
+from apps.shared.repositories.card_repository import create_card, create_cards_batch
+from apps.shared.repositories.tag_repository import create_tags_batch
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[2] / "migrations"
+
+
+@pytest.fixture
+def sequence_db(tmp_path):
+    """Temporary database with the zero-trust schema and bitmap triggers."""
+    db_path = tmp_path / "sequences.db"
+    conn = sqlite3.connect(db_path)
+    conn.executescript((MIGRATIONS_DIR / "001_zero_trust_schema.sql").read_text())
+    conn.executescript((MIGRATIONS_DIR / "002_add_bitmap_sequences.sql").read_text())
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+def _sequence_value(db_path, sequence_name):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(
+            "SELECT current_value FROM bitmap_sequences WHERE sequence_name = ?",
+            (sequence_name,)
+        ).fetchone()[0]
+
+
+def test_reserve_block_is_contiguous(sequence_db):
+    """Consecutive reservations hand out adjacent, non-overlapping ranges."""
+    with sqlite3.connect(sequence_db) as conn:
+        first = reserve_bitmap_block(conn, CARD_BITMAP_SEQUENCE, 3)
+        second = reserve_bitmap_block(conn, CARD_BITMAP_SEQUENCE, 2)
+
+    assert list(first) == [1, 2, 3]
+    assert list(second) == [4, 5]
+
+
+def test_reserve_unknown_sequence_raises(sequence_db):
+    """Missing sequence rows are reported instead of silently returning 0."""
+    with sqlite3.connect(sequence_db) as conn:
+        with pytest.raises(ValueError, match="not found"):
+            reserve_bitmap_block(conn, "missing_seq", 1)
+
+
+def test_batch_insert_assigns_reserved_bitmaps(sequence_db):
+    """Batch card insert writes reserved ordinals without firing the trigger."""
+    cards = [{"card_id": f"card-{i}", "name": f"Card {i}"} for i in range(5)]
+
+    assigned = create_cards_batch(cards, "ws-1", sequence_db)
+
+    assert assigned == {f"card-{i}": i + 1 for i in range(5)}
+    assert _sequence_value(sequence_db, CARD_BITMAP_SEQUENCE) == 5
+
+    with sqlite3.connect(sequence_db) as conn:
+        stored = dict(conn.execute("SELECT card_id, card_bitmap FROM cards"))
+    assert stored == assigned
+
+
+def test_batch_tag_insert_and_card_counts(sequence_db):
+    """Tag batch reserves tag ordinals; card_count triggers still maintain counts."""
+    tag_bitmaps = create_tags_batch(
+        [{"tag_id": "tag-a", "name": "a"}, {"tag_id": "tag-b", "name": "b"}],
+        "ws-1",
+        sequence_db
+    )
+    assert tag_bitmaps == {"tag-a": 1, "tag-b": 2}
+
+    create_cards_batch(
+        [{"card_id": "card-1", "name": "One", "tag_ids": ["tag-a", "tag-b"]}],
+        "ws-1",
+        sequence_db
+    )
+
+    with sqlite3.connect(sequence_db) as conn:
+        counts = dict(conn.execute("SELECT tag_id, card_count FROM tags"))
+    assert counts == {"tag-a": 1, "tag-b": 1}
+
+
+def test_trigger_fallback_shares_sequence(sequence_db):
+    """Ad-hoc inserts still get ordinals from the trigger without colliding."""
+    create_card("card-1", "Batch", "ws-1", [], sequence_db)
+
+    with sqlite3.connect(sequence_db) as conn:
+        conn.execute(
+            """
+            INSERT INTO cards (card_id, name, workspace_id, user_id, created, modified)
+            VALUES ('card-2', 'Ad hoc', 'ws-1', 'u', datetime('now'), datetime('now'))
+            """
+        )
+        conn.commit()
+        stored = dict(conn.execute("SELECT card_id, card_bitmap FROM cards"))
+
+    assert stored == {"card-1": 1, "card-2": 2}
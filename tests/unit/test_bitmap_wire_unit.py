@@ -0,0 +1,185 @@
+"""
+Unit tests for the binary bitmap wire format and its Accept negotiation.
+"""
+
+import json
+import uuid
+
+import pytest
+from pyroaring import BitMap
+
+from apps.shared.services.bitmap_delta_sync import pull_changes
+from apps.shared.services.bitmap_filter import filter_by_intersection
+from apps.shared.services.bitmap_index import build_tag_index
+from apps.shared.services.bitmap_sync import sync_card_bitmaps_batch
+from apps.shared.services.bitmap_wire import (
+    MEDIA_TYPE,
+    WireCardFields,
+    accepts_binary,
+    decode_delta,
+    decode_dictionary,
+    decode_filter_result,
+    encode_delta,
+    encode_dictionary,
+    encode_filter_result,
+)
+
+
+def test_accept_negotiation():
+    assert accepts_binary(MEDIA_TYPE)
+    assert accepts_binary(f"application/json;q=0.9, {MEDIA_TYPE};q=1")
+    assert not accepts_binary(f"{MEDIA_TYPE};q=0")
+    assert not accepts_binary("application/json")
+    assert not accepts_binary(None)
+
+
+def test_filter_result_round_trip_is_compact():
+    rows = (
+        {"card_id": str(uuid.UUID(int=i)), "workspace_id": "ws", "user_id": "u",
+         "tag_bitmaps": [i % 2]}
+        for i in range(200_000)
+    )
+    index = build_tag_index("ws", "u", rows)
+    result = filter_by_intersection("ws", "u", [0])
+
+    frame = encode_filter_result(
+        result.ordinals, result.total_matches, result.performance_ms,
+        epoch=index.epoch, dictionary_size=index.dictionary_size()
+    )
+    decoded = decode_filter_result(frame)
+
+    assert result.total_matches == 100_000
+    assert len(frame) < 50_000
+    assert len(frame) * 50 < len(json.dumps(result.card_ids))
+    assert decoded.header.epoch == index.epoch
+    assert index.card_ids(decoded.ordinals) == result.card_ids
+
+
+def test_dictionary_round_trip_keeps_retired_ordinals():
+    epoch = uuid.uuid4()
+
+    decoded = decode_dictionary(encode_dictionary(["c3", None, "c5"], 3, epoch, 6))
+
+    assert decoded.start == 3
+    assert decoded.entries == ["c3", None, "c5"]
+    assert decode_dictionary(encode_dictionary([None], 0, epoch, 1)).entries == [None]
+    assert decode_dictionary(encode_dictionary([], 6, epoch, 6)).entries == []
+
+
+def test_delta_round_trip():
+    cards = {4: WireCardFields(-9, 7), 1: WireCardFields(2**40, 6)}
+    frame = encode_delta(
+        version=7, full_resync=False, cards=cards,
+        tag_postings={11: BitMap([1]), -2: BitMap([1, 4])},
+        deleted=["gone"], unindexed=["late"], epoch=uuid.uuid4(), dictionary_size=5
+    )
+    decoded = decode_delta(frame)
+
+    assert decoded.version == 7
+    assert decoded.changed == BitMap([1, 4])
+    assert decoded.cards == cards
+    assert decoded.tag_postings == {11: BitMap([1]), -2: BitMap([1, 4])}
+    assert decoded.deleted == ["gone"]
+    assert decoded.unindexed == ["late"]
+
+
+def test_decoding_rejects_foreign_and_truncated_frames():
+    frame = encode_filter_result(BitMap([1]), 1, 0.0, uuid.uuid4(), 2)
+
+    with pytest.raises(ValueError):
+        decode_filter_result(frame[:-3])
+    with pytest.raises(ValueError):
+        decode_dictionary(frame)
+    with pytest.raises(ValueError):
+        decode_filter_result(b"JSON" + frame[4:])
+
+
+def test_routes_negotiate_binary(test_client):
+    sync_card_bitmaps_batch("ws-1", "user-1", [
+        {"card_id": f"c{i}", "card_bitmap": 1, "tag_bitmaps": [i % 3]} for i in range(10)
+    ])
+    binary = {"Accept": MEDIA_TYPE}
+    body = {"workspace_id": "ws-1", "user_id": "user-1", "expression": "1 OR 2"}
+
+    as_json = test_client.post("/api/bitmaps/filter", json=body).json()
+    response = test_client.post("/api/bitmaps/filter", json=body, headers=binary)
+    assert response.headers["content-type"] == MEDIA_TYPE
+    result = decode_filter_result(response.content)
+
+    dictionary = decode_dictionary(test_client.get(
+        "/api/bitmaps/dictionary", params={"workspace_id": "ws-1", "user_id": "user-1"},
+        headers=binary
+    ).content)
+    assert dictionary.header == result.header._replace(kind=dictionary.header.kind)
+    assert [dictionary.entries[o] for o in result.ordinals] == as_json["card_ids"]
+
+    # A client already holding the dictionary gets only the new entries
+    sync_card_bitmaps_batch("ws-1", "user-1", [{"card_id": "new", "card_bitmap": 1, "tag_bitmaps": [1]}])
+    update = test_client.get("/api/bitmaps/dictionary", params={
+        "workspace_id": "ws-1", "user_id": "user-1",
+        "start": dictionary.header.dictionary_size, "epoch": dictionary.header.epoch.hex,
+    }).json()
+    assert (update["start"], update["entries"]) == (10, ["new"])
+
+    delta = decode_delta(test_client.get(
+        "/api/bitmaps/changes", params={"workspace_id": "ws-1", "user_id": "user-1", "since": 1},
+        headers=binary
+    ).content)
+    assert delta.version == 2
+    assert delta.changed == BitMap([10])
+    assert delta.cards == {10: WireCardFields(1, 2)}
+    assert delta.tag_postings == {1: BitMap([10])}
+
+
+def test_binary_delta_matches_json_pull(test_client):
+    sync_card_bitmaps_batch("ws-1", "user-1", [
+        {"card_id": f"c{i}", "card_bitmap": 100 + i, "tag_bitmaps": [i % 3, 7]} for i in range(6)
+    ])
+    sync_card_bitmaps_batch("ws-1", "user-1", [
+        {"card_id": "c2", "card_bitmap": 555, "tag_bitmaps": [9]}
+    ])
+    params = {"workspace_id": "ws-1", "user_id": "user-1", "since": 0}
+
+    as_json = test_client.get("/api/bitmaps/changes", params=params).json()
+    delta = decode_delta(test_client.get(
+        "/api/bitmaps/changes", params=params, headers={"Accept": MEDIA_TYPE}
+    ).content)
+    dictionary = decode_dictionary(test_client.get(
+        "/api/bitmaps/dictionary", params={"workspace_id": "ws-1", "user_id": "user-1"},
+        headers={"Accept": MEDIA_TYPE}
+    ).content)
+
+    rebuilt = []
+    for ordinal in delta.changed:
+        fields = delta.cards[ordinal]
+        rebuilt.append({
+            "card_id": dictionary.entries[ordinal],
+            "card_bitmap": fields.card_bitmap,
+            "tag_bitmaps": sorted(t for t, posting in delta.tag_postings.items() if ordinal in posting),
+            "sync_version": fields.sync_version,
+        })
+
+    def key(change):
+        return change["card_id"]
+
+    assert delta.version == as_json["version"]
+    assert delta.unindexed == []
+    assert sorted(rebuilt, key=key) == sorted(as_json["changes"], key=key)
+
+
+def test_binary_delta_reports_cards_without_ordinals():
+    from apps.user.routes import bitmap_sync_api
+
+    sync_card_bitmaps_batch("ws-1", "user-1", [
+        {"card_id": "c1", "card_bitmap": 1, "tag_bitmaps": [3]}
+    ])
+    result = pull_changes("ws-1", "user-1", 0)
+    result.changes.append(
+        {"card_id": "not-indexed", "card_bitmap": 2, "tag_bitmaps": [3], "sync_version": 9}
+    )
+
+    delta = decode_delta(bitmap_sync_api._encode_delta_pull(result, "ws-1", "user-1"))
+
+    assert delta.unindexed == ["not-indexed"]
+    assert len(delta.cards) == 1
+    assert delta.tag_postings == {3: delta.changed}
@@ -0,0 +1,188 @@
+"""
+Unit tests for keyset (cursor) pagination of card listings.
+"""
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from apps.shared.migrations import fast_detector
+from apps.shared.migrations.auto_migrator import apply_migration_fast, apply_pending_migrations
+from apps.shared.repositories.card_repository import (
+    create_cards_batch,
+    decode_card_cursor,
+    encode_card_cursor,
+    list_cards_page_by_workspace,
+)
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[2] / "migrations"
+
+
+@pytest.fixture
+def paged_db(tmp_path):
+    """Database with 25 cards sharing a handful of created timestamps."""
+    db_path = tmp_path / "paging.db"
+    conn = sqlite3.connect(db_path)
+    for sql_file in (
+        "001_zero_trust_schema.sql",
+        "002_add_bitmap_sequences.sql",
+        "004_add_card_keyset_indexes.sql",
+    ):
+        conn.executescript((MIGRATIONS_DIR / sql_file).read_text())
+    conn.close()
+
+    create_cards_batch(
+        [{"card_id": f"card-{i:02d}", "name": f"Card {i}"} for i in range(25)],
+        "ws-1",
+        db_path
+    )
+
+    # Force timestamp ties so card_id must break them
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "UPDATE cards SET created = '2025-01-0' || (CAST(substr(card_id, 6) AS INTEGER) % 3 + 1)"
+        )
+        conn.commit()
+
+    return db_path
+
+
+def test_cursor_round_trip():
+    """Cursors are opaque but decode back to the same keyset position."""
+    cursor = encode_card_cursor("2025-01-01 10:00:00", "card-abc")
+
+    assert "card-abc" not in cursor
+    assert decode_card_cursor(cursor) == ("2025-01-01 10:00:00", "card-abc")
+
+
+@pytest.mark.parametrize("bad_cursor", ["not-base64!", "W10", "eyJhIjoxfQ"])
+def test_malformed_cursor_rejected(bad_cursor):
+    """Garbage, wrong arity and wrong shape all raise ValueError."""
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_card_cursor(bad_cursor)
+
+
+def test_pages_cover_all_cards_once(paged_db):
+    """Walking next_cursor visits every card exactly once in order."""
+    seen = []
+    cursor = None
+    pages = 0
+
+    while True:
+        cards, cursor = list_cards_page_by_workspace("ws-1", limit=10, cursor=cursor, db_path=paged_db)
+        seen.extend((card["created"], card["card_id"]) for card in cards)
+        pages += 1
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert len(seen) == 25
+    assert len(set(seen)) == 25
+    assert seen == sorted(seen, reverse=True)
+
+
+def test_exact_page_has_no_next_cursor(paged_db):
+    """A page that ends exactly at the last card does not advertise more."""
+    cards, cursor = list_cards_page_by_workspace("ws-1", limit=25, db_path=paged_db)
+
+    assert len(cards) == 25
+    assert cursor is None
+
+
+def test_keyset_query_uses_composite_index(paged_db):
+    """The cursor predicate seeks on the partial composite index."""
+    with sqlite3.connect(paged_db) as conn:
+        plan = conn.execute(
+            """
+            EXPLAIN QUERY PLAN
+            SELECT card_id FROM cards
+            WHERE workspace_id = ? AND deleted IS NULL
+              AND (created, card_id) < (?, ?)
+            ORDER BY created DESC, card_id DESC
+            LIMIT 10
+            """,
+            ("ws-1", "2025-01-02", "card-05")
+        ).fetchall()
+
+    details = " ".join(row[-1] for row in plan)
+    assert "idx_cards_workspace_created" in details
+    assert "TEMP B-TREE" not in details
+
+
+def test_existing_database_is_upgraded_to_keyset_indexes(tmp_path):
+    """A database migrated through 003 gains 004 on its first pooled connection."""
+    db_path = tmp_path / "existing.db"
+    conn = sqlite3.connect(db_path)
+    for version in (1, 2, 3):
+        assert apply_migration_fast(conn, version, MIGRATIONS_DIR)[0]
+    conn.close()
+    fast_detector.clear_cache()
+
+    cards, _ = list_cards_page_by_workspace("ws-1", limit=10, db_path=db_path)
+
+    with sqlite3.connect(db_path) as conn:
+        versions = [row[0] for row in conn.execute("SELECT version FROM schema_version ORDER BY version")]
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert apply_pending_migrations(conn) == (True, [])
+
+    assert cards == []
+    assert versions == [1, 2, 3, 4]
+    assert {"idx_cards_workspace_user_created", "idx_cards_workspace_created"} <= indexes
+    fast_detector.clear_cache()
+
+
+def test_unversioned_database_is_left_alone(paged_db):
+    """Without schema_version history nothing is applied (001 would drop tables)."""
+    with sqlite3.connect(paged_db) as conn:
+        assert apply_pending_migrations(conn) == (True, [])
+        assert conn.execute("SELECT COUNT(*) FROM cards").fetchone()[0] == 25
+
+
+def test_card_route_pages_seek_on_keyset_index(tmp_path, monkeypatch, test_client):
+    """GET /api/cards on a pooled workspace database gains and uses migration 004."""
+    from apps.shared.services import performance_optimization
+    from apps.shared.services.performance_optimization import ConnectionPool
+
+    db_path = tmp_path / "workspace.db"
+    conn = sqlite3.connect(db_path)
+    for version in (1, 2, 3):
+        assert apply_migration_fast(conn, version, MIGRATIONS_DIR)[0]
+    # Workspace databases carry the JSON tag_ids column the route selects
+    conn.execute("ALTER TABLE cards ADD COLUMN tag_ids TEXT")
+    conn.executemany(
+        "INSERT INTO cards (card_id, name, workspace_id, user_id, created, modified) "
+        "VALUES (?, ?, 'ws-1', 'user-1', ?, ?)",
+        [(f"card-{i:02d}", f"Card {i}", f"2025-01-0{i % 3 + 1}", "2025-01-01") for i in range(15)]
+    )
+    conn.commit()
+    conn.close()
+
+    statements = []
+
+    def connect(workspace_id, user_id, mode):
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    pool = ConnectionPool(max_connections=1, connect=connect)
+    monkeypatch.setattr(performance_optimization, "connection_pool", pool)
+    headers = {"Authorization": "Bearer token", "X-Workspace-Id": "ws-1", "X-User-Id": "user-1"}
+
+    first = test_client.get("/api/cards?limit=10", headers=headers)
+    second = test_client.get(f"/api/cards?limit=10&cursor={first.headers['X-Next-Cursor']}", headers=headers)
+    legacy = test_client.get("/api/cards?limit=10&skip=10", headers=headers)
+    pool.close()
+
+    assert len(first.json()) == 10
+    assert second.json() == legacy.json()
+    assert len(second.json()) == 5
+
+    page_queries = [sql for sql in statements if sql.lstrip().startswith("SELECT card_id, name")]
+    assert len(page_queries) == 3
+    with sqlite3.connect(db_path) as conn:
+        for sql in page_queries[:2]:
+            details = " ".join(row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}"))
+            assert "idx_cards_workspace_user_created" in details
+            assert "TEMP B-TREE" not in details
+    fast_detector.clear_cache()
@@ -0,0 +1,248 @@
+"""
+Unit tests for the shared async database connection pool.
+
+Connections are temporary SQLite files, one per workspace key, opened
+with check_same_thread=False like the default workspace factory.
+"""
+
+import asyncio
+import sqlite3
+
+import pytest
+
+from apps.shared.services import performance_optimization
+from apps.shared.services.async_database import async_workspace_connection
+from apps.shared.services.performance_optimization import (
+    ConnectionPool,
+    ConnectionPoolTimeout,
+)
+
+
+@pytest.fixture
+def opened(tmp_path):
+    """Connection factory over tmp files; records every connection it opens."""
+    connections = []
+
+    def connect(workspace_id, user_id, mode):
+        conn = sqlite3.connect(tmp_path / f"{workspace_id}.db", check_same_thread=False)
+        conn.execute("CREATE TABLE IF NOT EXISTS t (x INTEGER)")
+        conn.commit()
+        connections.append(conn)
+        return conn
+
+    return connect, connections
+
+
+def test_connections_are_initialized_and_reused_across_loops(opened):
+    connect, connections = opened
+    pool = ConnectionPool(max_connections=2, connect=connect)
+
+    async def journal_mode():
+        async with pool.acquire("ws", "u") as conn:
+            return (await conn.fetchone("PRAGMA journal_mode"))[0]
+
+    assert asyncio.run(journal_mode()) == "wal"
+    assert asyncio.run(journal_mode()) == "wal"
+    assert len(connections) == 1
+    metrics = pool.metrics()
+    assert (metrics.checkouts, metrics.size, metrics.idle, metrics.in_use) == (2, 1, 1, 0)
+
+
+def test_exhausted_pool_times_out(opened):
+    pool = ConnectionPool(max_connections=1, connect=opened[0])
+
+    async def scenario():
+        async with pool.acquire("ws", "u"):
+            assert pool.metrics().utilization == 1.0
+            with pytest.raises(ConnectionPoolTimeout):
+                await pool.get_connection("ws", "u", timeout=0.05)
+
+    asyncio.run(scenario())
+
+    assert pool.metrics().timeouts == 1
+    assert pool.metrics().in_use == 0
+
+
+def test_waiter_gets_released_connection(opened):
+    connect, connections = opened
+    pool = ConnectionPool(max_connections=1, connect=connect)
+    order = []
+
+    async def worker(name, hold):
+        async with pool.acquire("ws", "u"):
+            order.append(name)
+            await asyncio.sleep(hold)
+
+    async def scenario():
+        await asyncio.gather(*(worker(i, 0.02) for i in range(4)))
+
+    asyncio.run(scenario())
+
+    metrics = pool.metrics()
+    assert order == [0, 1, 2, 3]
+    assert len(connections) == 1
+    assert metrics.peak_in_use == 1
+    assert metrics.max_wait_ms >= 40
+    assert metrics.mean_wait_ms > 0
+
+
+def test_released_slot_goes_to_oldest_waiter(opened):
+    pool = ConnectionPool(max_connections=1, connect=opened[0])
+    order = []
+
+    async def waiter():
+        async with pool.acquire("ws", "u"):
+            order.append("waiter")
+
+    async def scenario():
+        conn = await pool.get_connection("ws", "u")
+        waiting = asyncio.create_task(waiter())
+        await asyncio.sleep(0.01)
+        await pool.release_connection(conn)
+        # Arrives after the release, before the waiter has run: queues behind it
+        async with pool.acquire("ws", "u"):
+            order.append("late")
+        await waiting
+
+    asyncio.run(scenario())
+
+    assert order == ["waiter", "late"]
+    assert pool.metrics().peak_in_use == 1
+
+
+def test_handed_off_slot_opens_waiters_database(opened):
+    connect, connections = opened
+    pool = ConnectionPool(max_connections=1, connect=connect)
+
+    async def scenario():
+        conn = await pool.get_connection("ws-a", "u")
+        waiting = asyncio.create_task(pool.get_connection("ws-b", "u"))
+        await asyncio.sleep(0.01)
+        await pool.release_connection(conn)
+        await pool.release_connection(await waiting)
+
+    asyncio.run(scenario())
+
+    assert len(connections) == 2
+    with pytest.raises(sqlite3.ProgrammingError):
+        connections[0].execute("SELECT 1")
+    metrics = pool.metrics()
+    assert (metrics.size, metrics.in_use, metrics.idle) == (1, 0, 1)
+
+
+def test_timed_out_waiter_passes_its_slot_on(opened):
+    pool = ConnectionPool(max_connections=1, connect=opened[0])
+
+    async def scenario():
+        conn = await pool.get_connection("ws", "u")
+        with pytest.raises(ConnectionPoolTimeout):
+            await pool.get_connection("ws", "u", timeout=0.01)
+        await pool.release_connection(conn)
+        async with pool.acquire("ws", "u", timeout=0.5):
+            pass
+
+    asyncio.run(scenario())
+
+    metrics = pool.metrics()
+    assert (metrics.size, metrics.in_use, metrics.idle, metrics.waiting) == (1, 0, 1, 0)
+
+
+def test_dead_idle_connection_is_replaced(opened):
+    connect, connections = opened
+    pool = ConnectionPool(max_connections=1, connect=connect)
+
+    async def count_rows():
+        async with pool.acquire("ws", "u") as conn:
+            return (await conn.fetchone("SELECT COUNT(*) FROM t"))[0]
+
+    asyncio.run(count_rows())
+    connections[0].close()
+
+    assert asyncio.run(count_rows()) == 0
+    assert len(connections) == 2
+    assert pool.metrics().discarded == 1
+
+
+def test_release_rolls_back_open_transaction(opened):
+    pool = ConnectionPool(max_connections=1, connect=opened[0])
+
+    async def scenario():
+        async with pool.acquire("ws", "u") as conn:
+            await conn.execute("INSERT INTO t (x) VALUES (1)")
+            assert conn.in_transaction
+        async with pool.acquire("ws", "u") as conn:
+            return conn.in_transaction, (await conn.fetchone("SELECT COUNT(*) FROM t"))[0]
+
+    assert asyncio.run(scenario()) == (False, 0)
+
+
+def test_full_pool_swaps_idle_connection_to_other_database(opened):
+    connect, connections = opened
+    pool = ConnectionPool(max_connections=1, connect=connect)
+
+    async def touch(workspace_id):
+        async with pool.acquire(workspace_id, "u") as conn:
+            await conn.fetchone("SELECT 1")
+
+    async def scenario():
+        await touch("ws-a")
+        await asyncio.wait_for(touch("ws-b"), 1)
+
+    asyncio.run(scenario())
+
+    assert len(connections) == 2
+    with pytest.raises(sqlite3.ProgrammingError):
+        connections[0].execute("SELECT 1")
+    assert pool.metrics().size == 1
+
+
+def test_workspace_connections_come_from_shared_pool(opened, monkeypatch):
+    pool = ConnectionPool(max_connections=2, connect=opened[0])
+    monkeypatch.setattr(performance_optimization, "connection_pool", pool)
+
+    async def scenario():
+        for _ in range(3):
+            async with async_workspace_connection("ws", "u") as conn:
+                await conn.fetchone("SELECT 1")
+
+    asyncio.run(scenario())
+
+    assert pool.metrics().checkouts == 3
+    assert len(opened[1]) == 1
+
+
+def test_card_routes_read_through_shared_pool(opened, monkeypatch, test_client):
+    connect, connections = opened
+
+    def connect_with_cards(workspace_id, user_id, mode):
+        conn = connect(workspace_id, user_id, mode)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cards (card_id TEXT, workspace_id TEXT, user_id TEXT, "
+            "name TEXT, description TEXT, tag_ids TEXT, created TEXT, modified TEXT, deleted TEXT)"
+        )
+        conn.execute(
+            "INSERT INTO cards VALUES ('c1', 'ws', 'u', 'Card', '', '[\"t1\"]', '2025-01-01', '2025-01-01', NULL)"
+        )
+        conn.commit()
+        return conn
+
+    pool = ConnectionPool(max_connections=2, connect=connect_with_cards)
+    monkeypatch.setattr(performance_optimization, "connection_pool", pool)
+    headers = {"Authorization": "Bearer token", "X-Workspace-Id": "ws", "X-User-Id": "u"}
+
+    listed = test_client.get("/api/cards", headers=headers)
+    single = test_client.get("/api/cards/c1", headers=headers)
+
+    assert listed.status_code == 200
+    assert [card["card_id"] for card in listed.json()] == ["c1"]
+    assert single.status_code == 200
+    assert single.json()["tag_ids"] == ["t1"]
+    assert pool.metrics().checkouts == 2
+    assert len(connections) == 1
+
+
+def test_pool_metrics_route(test_client):
+    response = test_client.get("/api/telemetry/connection-pool")
+
+    assert response.status_code == 200
+    assert response.json()["max_connections"] == performance_optimization.connection_pool.max_connections
@@ -0,0 +1,129 @@
+"""
+Unit tests for the bitmap filter expression compiler.
+
+Evaluation results are checked against a brute-force evaluation of the
+same expression over each card's tag set.
+"""
+
+import pytest
+
+from apps.shared.services.bitmap_filter import filter_by_complex_expression
+from apps.shared.services.bitmap_index import TagPostingIndex
+from apps.shared.services.filter_expression import (
+    ALL,
+    MAX_NESTING_DEPTH,
+    NONE,
+    And,
+    Not,
+    Or,
+    Tag,
+    compile_expression,
+    evaluate,
+    parse,
+    simplify,
+    tokenize,
+)
+
+CARD_TAGS = {
+    "c1": {1, 2},
+    "c2": {1, 3},
+    "c3": {2, 3},
+    "c4": {1, 2, 4},
+    "c5": set(),
+}
+
+
+@pytest.fixture
+def index():
+    index = TagPostingIndex("ws", "u")
+    for card_id, tags in CARD_TAGS.items():
+        index.upsert_card(card_id, tags)
+    return index
+
+
+def _matches(expression, index):
+    return set(index.card_ids(evaluate(compile_expression(expression), index)))
+
+
+def test_tokenize_and_parse_precedence():
+    assert tokenize("(1 and 2)or NOT 3") == ["(", "1", "AND", "2", ")", "OR", "NOT", "3"]
+    assert parse("1 OR 2 AND 3") == Or(frozenset([Tag(1), And(frozenset([Tag(2), Tag(3)]))]))
+    assert parse("1 NOT 2") == And(frozenset([Tag(1), Not(Tag(2))]))
+
+
+@pytest.mark.parametrize("expression", ["", "1 AND", "(1 OR 2", "1 2", "1 XOR 2", "1 # 2", ")"])
+def test_malformed_expressions_raise(expression):
+    with pytest.raises(ValueError):
+        parse(expression)
+
+
+def test_nesting_depth_is_bounded():
+    deepest = "(" * MAX_NESTING_DEPTH + "1" + ")" * MAX_NESTING_DEPTH
+    assert compile_expression(deepest) == Tag(1)
+    assert compile_expression("NOT " * MAX_NESTING_DEPTH + "1") == Tag(1)
+    assert compile_expression("(1 OR 2 NOT " * MAX_NESTING_DEPTH + "3" + ")" * MAX_NESTING_DEPTH)
+
+    for expression in (
+        "(" * (MAX_NESTING_DEPTH + 1) + "1" + ")" * (MAX_NESTING_DEPTH + 1),
+        "(" * 1000 + "1" + ")" * 1000,
+        "NOT " * 1000 + "1",
+    ):
+        with pytest.raises(ValueError, match="nested deeper"):
+            compile_expression(expression)
+
+    node = Tag(1)
+    for _ in range(1000):
+        node = Not(node)
+    with pytest.raises(ValueError, match="nested deeper"):
+        simplify(node)
+
+
+def test_deeply_nested_filter_is_a_client_error(test_client):
+    response = test_client.post("/api/bitmaps/filter", json={
+        "workspace_id": "ws", "user_id": "u", "expression": "(" * 1000 + "1" + ")" * 1000,
+    })
+
+    assert response.status_code == 400
+
+
+def test_de_morgan_and_constant_folding():
+    assert compile_expression("NOT (1 AND 2)") == Or(frozenset([Not(Tag(1)), Not(Tag(2))]))
+    assert compile_expression("NOT NOT 1") == Tag(1)
+    assert compile_expression("1 AND NOT 1") == NONE
+    assert compile_expression("(1 OR 2) OR NOT 2") == ALL
+    assert compile_expression("(1 AND 2) AND (2 AND 1)") == And(frozenset([Tag(1), Tag(2)]))
+    assert compile_expression("3 OR (1 AND NOT 1)") == Tag(3)
+
+
+@pytest.mark.parametrize("expression, predicate", [
+    ("(1 AND 2) OR (3 NOT 4)", lambda t: (1 in t and 2 in t) or (3 in t and 4 not in t)),
+    ("NOT (1 OR (2 AND NOT 3))", lambda t: not (1 in t or (2 in t and 3 not in t))),
+    ("((1 OR 3) AND (2 OR 3)) NOT (1 AND 3)", lambda t: (1 in t or 3 in t) and (2 in t or 3 in t) and not (1 in t and 3 in t)),
+    ("NOT 1 AND NOT 2", lambda t: 1 not in t and 2 not in t),
+    ("1 OR NOT 1", lambda t: True),
+])
+def test_nested_expressions_match_brute_force(index, expression, predicate):
+    expected = {card_id for card_id, tags in CARD_TAGS.items() if predicate(tags)}
+    assert _matches(expression, index) == expected
+
+
+def test_repeated_subexpressions_evaluated_once(index):
+    node = compile_expression("(1 AND 2) OR ((2 AND 1) AND NOT 3) OR (3 AND (1 AND 2))")
+    memo = {}
+    evaluate(node, index, memo)
+
+    shared = And(frozenset([Tag(1), Tag(2)]))
+    assert shared in memo
+    assert sum(1 for key in memo if isinstance(key, Tag)) == 3
+
+
+def test_complex_filter_uses_compiler():
+    rows = [
+        {"card_id": cid, "workspace_id": "ws", "user_id": "u", "tag_bitmaps": sorted(tags)}
+        for cid, tags in CARD_TAGS.items()
+    ]
+
+    result = filter_by_complex_expression("ws", "u", "NOT (1 OR (2 AND NOT 3))", rows)
+
+    assert result.card_ids == ["c3", "c5"]
+    assert result.operation == "COMPLEX"
@@ -4,8 +4,13 @@ Unit tests for group expansion operations.
 Tests the recursive expansion, caching, and circular reference detection.
 """
 
+import threading
+import time
+
 import pytest
 from apps.shared.services.group_expansion import (
+    GroupGraph,
+    _graph_lock,
     expand_group_recursive,
     validate_circular_reference,
     get_expansion_depth,
@@ -177,3 +182,144 @@ def test_deep_nesting(group_workspace, group_tags):
     assert 'tag-2' in expanded
     assert 'tag-3' in expanded
     assert 'tag-4' in expanded
+
+
+def test_graph_answers_without_queries(nested_groups):
+    """After the workspace graph is loaded, lookups issue no SQL."""
+    from tests.fixtures.database_stub import get_connection
+
+    engineering = nested_groups['engineering']
+    expand_group_recursive(engineering)
+    invalidate_expansion_cache(engineering)
+
+    statements = []
+    get_connection().set_trace_callback(statements.append)
+    try:
+        expand_group_recursive(engineering)
+        get_expansion_depth(engineering)
+        get_expansion_tree(engineering)
+        validate_circular_reference(engineering, nested_groups['backend'])
+    finally:
+        get_connection().set_trace_callback(None)
+
+    assert statements == []
+
+
+def test_graph_updates_ancestors_incrementally(group_workspace, group_tags):
+    """Membership changes propagate to every ancestor's closure and depth."""
+    from apps.shared.services.group_storage import (
+        add_member_to_group,
+        create_group,
+        delete_group,
+        remove_member_from_group,
+    )
+
+    ws, user = group_workspace['id'], group_workspace['created_by']
+    leaf = create_group('leaf', ws, user, frozenset(['tag-1']))
+    middle = create_group('middle', ws, user, frozenset([leaf]))
+    top = create_group('top', ws, user, frozenset([middle, 'tag-2']))
+
+    assert expand_group_recursive(top) == {'tag-1', 'tag-2'}
+    assert get_expansion_depth(top) == 2
+
+    inner = create_group('inner', ws, user, frozenset(['tag-3']))
+    add_member_to_group(leaf, inner, user)
+    assert expand_group_recursive(top) == {'tag-1', 'tag-2', 'tag-3'}
+    assert get_expansion_depth(top) == 3
+
+    is_valid, _ = validate_circular_reference(inner, top)
+    assert is_valid is False
+
+    remove_member_from_group(leaf, 'tag-1')
+    assert expand_group_recursive(top) == {'tag-2', 'tag-3'}
+
+    delete_group(inner)
+    assert expand_group_recursive(top) == {'tag-2'}
+
+
+def test_cache_invalidates_dependent_ancestors_only():
+    """Invalidating a group drops it and cached groups built from it."""
+    cache = GroupExpansionCache(max_size=10, ttl_seconds=60)
+    cache.put('group_leaf', frozenset({'tag-1'}))
+    cache.put('group_mid', frozenset({'tag-1'}), depends_on=frozenset({'group_leaf'}))
+    cache.put('group_top', frozenset({'tag-1'}), depends_on=frozenset({'group_mid', 'group_leaf'}))
+    cache.put('group_other', frozenset({'tag-9'}))
+
+    assert cache.invalidate('group_leaf') == 3
+
+    assert cache.get('group_top') is None
+    assert cache.get('group_mid') is None
+    assert cache.get('group_other') == frozenset({'tag-9'})
+
+
+def test_cache_lru_eviction():
+    """The least recently used entry is evicted first."""
+    cache = GroupExpansionCache(max_size=2, ttl_seconds=60)
+    cache.put('group_a', frozenset({'a'}))
+    cache.put('group_b', frozenset({'b'}))
+    cache.get('group_a')
+    cache.put('group_c', frozenset({'c'}))
+
+    assert cache.get('group_b') is None
+    assert cache.get('group_a') == frozenset({'a'})
+    assert cache.get_statistics()['evictions'] == 1
+
+
+def test_membership_change_invalidates_cached_ancestor(group_workspace, group_tags):
+    """Adding to a nested group refreshes the cached expansion of its parent."""
+    from apps.shared.services.group_storage import add_member_to_group, create_group
+
+    ws, user = group_workspace['id'], group_workspace['created_by']
+    child = create_group('child', ws, user, frozenset(['tag-1']))
+    parent = create_group('parent', ws, user, frozenset([child]))
+
+    assert expand_group_recursive(parent) == {'tag-1'}
+    add_member_to_group(child, 'tag-2', user)
+
+    assert expand_group_recursive(parent) == {'tag-1', 'tag-2'}
+
+
+def test_api_shares_service_cache():
+    from apps.shared.services.group_expansion import get_expansion_cache
+    from apps.user.routes.group_tags_api import expansion_cache
+
+    assert expansion_cache is get_expansion_cache()
+
+
+def test_graph_lookups_are_safe_during_concurrent_edits():
+    """Readers never iterate a member set while a writer resizes it."""
+    edges = [('group_big', f'tag-{i}') for i in range(2000)]
+    edges.append(('group_top', 'group_big'))
+    graph = GroupGraph('ws', {'group_big': 'big', 'group_top': 'top'}, edges)
+    stop = threading.Event()
+    errors = []
+
+    def edit():
+        i = 0
+        while not stop.is_set():
+            new_ids = frozenset(f'extra-{i}-{j}' for j in range(50))
+            with _graph_lock:
+                graph.add_members('group_big', new_ids)
+            with _graph_lock:
+                for member_id in new_ids:
+                    graph.remove_member('group_big', member_id)
+            i += 1
+
+    def read():
+        try:
+            while not stop.is_set():
+                graph.tree('group_top')
+                graph.expand_bounded('group_top', frozenset({'group_x'}), 10, 0)
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=edit), threading.Thread(target=read)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.5)
+    stop.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert errors == []
+    assert len(graph.expand('group_top')) == 2000
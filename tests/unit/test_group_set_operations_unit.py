@@ -0,0 +1,124 @@
+"""
+Unit tests for groups as first-class operands in the unified set engine.
+
+Groups are created through group_storage on the in-memory database stub;
+cards are registered in the card registry so group postings are bitmaps.
+"""
+
+import threading
+
+import pytest
+
+from apps.shared.services import set_operations_unified
+from apps.shared.services.group_storage import add_member_to_group, create_group
+from apps.shared.services.set_operations_unified import (
+    CardRegistrySingleton,
+    CardSummaryTuple,
+    apply_unified_operations,
+    get_group_posting,
+    handle_card_mutations,
+    initialize_card_registry,
+)
+
+
+def _card(card_id, *tags):
+    return CardSummaryTuple(card_id, card_id, frozenset(tags), None, None, False)
+
+
+CARDS = frozenset([
+    _card("c1", "python", "urgent"),
+    _card("c2", "java"),
+    _card("c3", "react", "urgent"),
+    _card("c4", "urgent"),
+    _card("c5"),
+])
+
+
+@pytest.fixture
+def registry():
+    registry = CardRegistrySingleton()
+    registry.clear_registry()
+    initialize_card_registry(CARDS)
+    yield registry
+    registry.clear_registry()
+
+
+@pytest.fixture
+def engineering(group_workspace):
+    ws, user = group_workspace['id'], group_workspace['created_by']
+    backend = create_group('backend', ws, user, frozenset(['python', 'java']))
+    return create_group('engineering', ws, user, frozenset([backend, 'react']))
+
+
+def _ids(operations, cards=CARDS):
+    result = apply_unified_operations(cards, operations, use_cache=False)
+    return {card.id for card in result.cards}
+
+
+def test_group_is_single_intersection_operand(registry, engineering):
+    """Intersection requires any tag of the group, not all of them."""
+    assert _ids([("intersection", [(engineering, 1)])]) == {"c1", "c2", "c3"}
+    assert _ids([("intersection", [(engineering, 1), ("urgent", 1)])]) == {"c1", "c3"}
+
+
+def test_group_union_and_exclusion(registry, engineering):
+    assert _ids([("union", [(engineering, 1), ("urgent", 1)])]) == {"c1", "c2", "c3", "c4"}
+    assert _ids([("exclusion", [(engineering, 1)])]) == {"c4", "c5"}
+
+
+def test_group_posting_is_union_of_tag_postings(registry, engineering):
+    posting = get_group_posting(engineering)
+
+    expected = {registry.get_card_ordinal(card_id) for card_id in ("c1", "c2", "c3")}
+    assert set(posting) == expected
+
+
+def test_posting_follows_membership_changes(registry, engineering, group_workspace):
+    before = get_group_posting(engineering)
+
+    add_member_to_group(engineering, 'urgent', group_workspace['created_by'])
+
+    after = get_group_posting(engineering)
+    assert after is not before
+    assert registry.get_card_ordinal("c4") in after
+
+
+def test_posting_follows_card_mutations(registry, engineering):
+    handle_card_mutations(updated_cards=frozenset([_card("c2", "urgent")]))
+
+    assert registry.get_card_ordinal("c2") not in get_group_posting(engineering)
+    assert _ids([("intersection", [(engineering, 1)])], CARDS - {_card("c2", "java")}) == {"c1", "c3"}
+
+
+def test_unregistered_cards_match_expanded_tags(registry, engineering):
+    extra = _card("c9", "react")
+
+    assert _ids([("intersection", [(engineering, 1)])], CARDS | {extra}) == {"c1", "c2", "c3", "c9"}
+
+
+def test_posting_follows_registry_reinitialization(registry, engineering):
+    assert len(get_group_posting(engineering)) == 3
+
+    # Re-registering reassigns every ordinal; the cached posting must go
+    registry.clear_registry()
+    initialize_card_registry(frozenset([_card("c2", "java"), _card("c6", "react")]))
+
+    expected = {registry.get_card_ordinal(card_id) for card_id in ("c2", "c6")}
+    assert set(get_group_posting(engineering)) == expected == {0, 1}
+
+
+def test_concurrent_group_changes_each_bump_generation(registry, engineering):
+    get_group_posting(engineering)  # Subscribes the posting cache to group changes
+    before = set_operations_unified._group_generation
+
+    def notify():
+        for _ in range(2000):
+            set_operations_unified._on_group_change(engineering)
+
+    threads = [threading.Thread(target=notify) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    assert set_operations_unified._group_generation == before + 16000
@@ -4,7 +4,11 @@ Unit tests for group storage operations.
 Tests the core CRUD operations for group tags with database stub.
 """
 
+import threading
+import time
+
 import pytest
+from apps.shared.services import group_storage
 from apps.shared.services.group_storage import (
     create_group,
     get_group_by_id,
@@ -13,7 +17,9 @@ from apps.shared.services.group_storage import (
     delete_group,
     get_groups_by_workspace,
     get_group_statistics,
+    apply_membership_edits,
 )
+from apps.shared.services.group_expansion import expand_group_recursive
 
 
 def test_create_group(group_workspace):
@@ -110,6 +116,26 @@ def test_get_groups_by_workspace(group_workspace):
     assert group2 in group_ids
 
 
+def test_get_groups_by_workspace_bulk_matches_single_lookup(nested_groups, group_workspace):
+    """Bulk load uses two queries and matches get_group_by_id, parents included."""
+    from tests.fixtures.database_stub import get_connection
+
+    statements = []
+    get_connection().set_trace_callback(statements.append)
+    try:
+        groups = get_groups_by_workspace(group_workspace['id'])
+    finally:
+        get_connection().set_trace_callback(None)
+
+    assert len(statements) == 2
+    assert {g.id: g for g in groups} == {
+        g.id: get_group_by_id(g.id) for g in groups
+    }
+
+    backend = next(g for g in groups if g.id == nested_groups['backend'])
+    assert nested_groups['engineering'] in backend.parent_group_ids
+
+
 def test_get_group_statistics(sample_group):
     """Test getting group statistics."""
     stats = get_group_statistics(sample_group)
@@ -129,3 +155,136 @@ def test_nested_group_statistics(nested_groups):
     assert eng_stats['total_members'] == 3  # 2 groups + 1 tag
     assert eng_stats['regular_tags'] == 1  # tag-5
     assert eng_stats['nested_groups'] == 2  # backend + frontend
+
+
+def test_apply_membership_edits_batch(nested_groups, group_workspace):
+    """Adds and removes across groups commit together and update expansions."""
+    backend, frontend = nested_groups['backend'], nested_groups['frontend']
+    engineering = nested_groups['engineering']
+    expand_group_recursive(engineering)  # Warm the cache
+
+    result = apply_membership_edits(
+        [
+            (backend, 'tag-go', 'add'),
+            (backend, 'tag-java', 'remove'),
+            (frontend, 'tag-svelte', 'add'),
+            (frontend, 'tag-vue', 'add'),  # Already a member
+            (frontend, 'tag-missing', 'remove'),  # Not a member
+        ],
+        group_workspace['created_by']
+    )
+
+    assert result.success
+    assert result.added == {(backend, 'tag-go'), (frontend, 'tag-svelte')}
+    assert result.removed == {(backend, 'tag-java')}
+    assert get_group_by_id(backend).member_tag_ids == {'tag-python', 'tag-go'}
+    assert expand_group_recursive(engineering) == {
+        'tag-python', 'tag-go', 'tag-react', 'tag-vue', 'tag-svelte', 'tag-5'
+    }
+
+
+def test_apply_membership_edits_rejects_cycle_atomically(nested_groups, group_workspace):
+    """A cycle formed only by combining edits rejects the whole batch."""
+    backend, frontend = nested_groups['backend'], nested_groups['frontend']
+
+    result = apply_membership_edits(
+        [
+            (backend, 'tag-go', 'add'),
+            (backend, frontend, 'add'),
+            (frontend, backend, 'add'),
+        ],
+        group_workspace['created_by']
+    )
+
+    assert not result.success
+    assert 'circular' in result.error
+    assert 'tag-go' not in get_group_by_id(backend).member_tag_ids
+
+
+def test_apply_membership_edits_last_op_wins(nested_groups, group_workspace):
+    """Removing a nesting edge in the same batch allows the reverse edge."""
+    backend, engineering = nested_groups['backend'], nested_groups['engineering']
+
+    result = apply_membership_edits(
+        [
+            (engineering, backend, 'remove'),
+            (backend, engineering, 'add'),
+            (backend, 'tag-go', 'add'),
+            (backend, 'tag-go', 'remove'),
+        ],
+        group_workspace['created_by']
+    )
+
+    assert result.success
+    assert result.added == {(backend, engineering)}
+    assert backend not in get_group_by_id(engineering).member_tag_ids
+    assert 'tag-5' in expand_group_recursive(backend)
+
+
+def test_apply_membership_edits_uses_executemany(sample_group, group_workspace):
+    """Hundreds of members are added with a constant number of statements."""
+    from tests.fixtures.database_stub import get_connection
+
+    statements = []
+    get_connection().set_trace_callback(statements.append)
+    try:
+        result = apply_membership_edits(
+            [(sample_group, f'bulk-{i}', 'add') for i in range(300)],
+            group_workspace['created_by']
+        )
+    finally:
+        get_connection().set_trace_callback(None)
+
+    assert result.success
+    assert len(result.added) == 300
+    assert sum(1 for sql in statements if 'INSERT INTO group_memberships' in sql) == 300
+    assert len(statements) < 320
+
+
+def test_failed_bulk_edit_does_not_leak_into_concurrent_create(sample_group, group_workspace, monkeypatch):
+    """A create racing a failing bulk edit neither commits nor loses its rows."""
+    from tests.fixtures.database_stub import get_connection
+
+    conn = get_connection()
+    conn.execute("""
+        CREATE TRIGGER poison_delete BEFORE DELETE ON group_memberships
+        WHEN OLD.member_tag_id = 'tag-1'
+        BEGIN SELECT RAISE(ABORT, 'poisoned'); END
+    """)
+    rolling_back = threading.Event()
+
+    class SlowRollback:
+        """Shared connection whose rollback lingers, leaving the edit half-done."""
+
+        def __getattr__(self, name):
+            return getattr(conn, name)
+
+        def rollback(self):
+            rolling_back.set()
+            time.sleep(0.1)
+            conn.rollback()
+
+    monkeypatch.setattr(group_storage, "get_connection", SlowRollback)
+
+    results = {}
+
+    def bulk_edit():
+        results['edit'] = apply_membership_edits(
+            [(sample_group, 'tag-4', 'add'), (sample_group, 'tag-1', 'remove')],
+            group_workspace['created_by']
+        )
+
+    def create():
+        assert rolling_back.wait(5)
+        results['group'] = create_group('platform', group_workspace['id'], group_workspace['created_by'])
+
+    threads = [threading.Thread(target=bulk_edit), threading.Thread(target=create)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert not results['edit'].success
+    assert 'poisoned' in results['edit'].error
+    assert get_group_by_id(sample_group).member_tag_ids == {'tag-1', 'tag-2', 'tag-3'}
+    assert get_group_by_id(results['group']).name == 'platform'
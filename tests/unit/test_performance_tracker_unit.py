@@ -0,0 +1,298 @@
+"""
+Unit tests for the adaptive performance tracker's online cost models,
+exploration and per-deployment persistence, and for the telemetry ring
+buffer, histograms and exports.
+"""
+
+import json
+import random
+import threading
+import time
+
+from apps.shared.services import performance_tracker
+from apps.shared.services.performance_tracker import (
+    AdaptivePerformanceTracker,
+    ExecutionContext,
+    LatencyHistogram,
+    OnlineCostModel,
+    PerformanceMetrics,
+    PerformanceTelemetryHook,
+)
+
+
+def _context(cards, result_size=None, operation_type="intersection"):
+    return ExecutionContext(
+        card_count=cards, unique_tags=50, operation_type=operation_type,
+        operation_count=2, result_size=result_size,
+    )
+
+
+def _train(tracker, costs, sizes=(1_000, 10_000, 50_000, 100_000, 200_000), rounds=3):
+    """Feed observations where mode cost = intercept + per_card * cards."""
+    for _ in range(rounds):
+        for cards in sizes:
+            for mode, (intercept, per_card) in costs.items():
+                tracker.record_actual(PerformanceMetrics(
+                    mode=mode, context=_context(cards, result_size=cards // 10),
+                    actual_ms=intercept + per_card * cards,
+                ))
+
+
+def test_cost_model_converges_to_observed_costs():
+    model = OnlineCostModel.from_baseline({"intercept": 0.2, "slope": 0.0015, "tag_factor": 0.01})
+    samples = [(cards, tags) for cards in (100, 5_000, 40_000, 120_000) for tags in (10, 300)]
+
+    for _ in range(5):
+        for cards, tags in samples:
+            context = ExecutionContext(card_count=cards, unique_tags=tags,
+                                       operation_type="union", operation_count=1)
+            model.update(OnlineCostModel.features(context, cards / 2), 3.0 + 0.02 * cards)
+
+    context = ExecutionContext(card_count=80_000, unique_tags=100,
+                               operation_type="union", operation_count=1)
+    assert abs(model.predict(OnlineCostModel.features(context, 40_000)) - 1603.0) < 5.0
+    assert model.observations == 40
+
+
+def test_selection_follows_learned_costs_over_baseline():
+    tracker = AdaptivePerformanceTracker(exploration_rate=0.0)
+    # Baseline believes regular is cheapest for small inputs; measurements disagree
+    _train(tracker, {"regular": (50.0, 0.01), "parallel": (1.0, 0.001)})
+
+    assert tracker.select_best_mode(_context(2_000), ["regular", "parallel"]) == "parallel"
+    assert tracker.confidence > 0.2
+
+
+def test_exploration_tries_least_observed_mode_within_slowdown_bound():
+    tracker = AdaptivePerformanceTracker(exploration_rate=1.0, rng=random.Random(0))
+    _train(tracker, {"regular": (1.0, 0.0), "parallel": (2.0, 0.0), "turbo_bitmap": (500.0, 0.0)})
+
+    modes = ["regular", "parallel", "turbo_bitmap"]
+    # turbo_bitmap is least observed but far too slow to be worth trying
+    assert tracker.select_best_mode(_context(1_000), modes) == "parallel"
+    tracker.exploration_rate = 0.0
+    assert tracker.select_best_mode(_context(1_000), modes) == "regular"
+
+
+def test_learned_model_survives_restart(tmp_path):
+    path = tmp_path / "performance_model.json"
+    tracker = AdaptivePerformanceTracker(model_path=path, exploration_rate=0.0)
+    _train(tracker, {"regular": (50.0, 0.01), "parallel": (1.0, 0.001)})
+    assert tracker.save()
+
+    restarted = AdaptivePerformanceTracker(model_path=path, exploration_rate=0.0)
+
+    assert restarted.confidence == tracker.confidence
+    assert restarted.select_best_mode(_context(2_000), ["regular", "parallel"]) == "parallel"
+    assert restarted.predict_time("regular", _context(5_000)) == tracker.predict_time("regular", _context(5_000))
+
+
+def test_model_from_other_hardware_or_corrupt_file_is_ignored(tmp_path, monkeypatch):
+    path = tmp_path / "performance_model.json"
+    tracker = AdaptivePerformanceTracker(model_path=path)
+    _train(tracker, {"regular": (50.0, 0.01)})
+    tracker.save()
+
+    monkeypatch.setattr(performance_tracker, "deployment_fingerprint", lambda: {"machine": "other"})
+    assert not AdaptivePerformanceTracker(model_path=path).models
+
+    monkeypatch.undo()
+    path.write_text("{not json")
+    fresh = AdaptivePerformanceTracker(model_path=path)
+    assert fresh.confidence == 0.0
+    assert fresh.save()
+    assert json.loads(path.read_text())["models"] == []
+
+
+def test_periodic_save_runs_off_the_request_path(tmp_path, monkeypatch):
+    path = tmp_path / "performance_model.json"
+    tracker = AdaptivePerformanceTracker(model_path=path, exploration_rate=0.0)
+    monkeypatch.setattr(tracker, "SAVE_INTERVAL_SECONDS", 0.0)
+    saving = threading.Event()
+    release = threading.Event()
+    write_model = tracker._write_model
+
+    def slow_write():
+        saving.set()
+        release.wait(5)
+        return write_model()
+
+    monkeypatch.setattr(tracker, "_write_model", slow_write)
+
+    start = time.perf_counter()
+    _train(tracker, {"regular": (5.0, 0.0)}, rounds=1)
+    assert saving.wait(5)
+    assert time.perf_counter() - start < 1.0
+    assert not path.exists()
+
+    release.set()
+    deadline = time.monotonic() + 5
+    while not path.exists() or tracker._save_scheduled:
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+    assert json.loads(path.read_text())["models"]
+
+
+def test_concurrent_saves_leave_a_complete_file(tmp_path):
+    path = tmp_path / "performance_model.json"
+    tracker = AdaptivePerformanceTracker(model_path=path, exploration_rate=0.0)
+    _train(tracker, {"regular": (5.0, 0.0), "parallel": (1.0, 0.0)}, rounds=1)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(tracker.save())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [True] * 8
+    assert len(json.loads(path.read_text())["models"]) == 2
+    assert [p.name for p in tmp_path.iterdir()] == [path.name]
+
+
+def _metrics(mode, actual_ms, operation_type="intersection"):
+    return PerformanceMetrics(mode=mode, context=_context(1_000, operation_type=operation_type),
+                              actual_ms=actual_ms)
+
+
+def test_histogram_quantiles_are_within_bucket_precision():
+    histogram = LatencyHistogram()
+    for value_us in range(1, 100_001):
+        histogram.record(value_us)
+
+    for q, exact in ((0.5, 50_000), (0.99, 99_000), (0.999, 99_900)):
+        assert exact <= histogram.quantile(q) <= exact * 1.035
+    assert histogram.quantile(1.0) == 100_000
+    assert len(histogram.counts) < 500
+
+
+def test_records_are_aggregated_off_the_request_path(tmp_path):
+    hook = PerformanceTelemetryHook(enabled=True, start_drain=False)
+    events = []
+    hook.register_handler(events.append)
+
+    for actual_ms in (1.0, 2.0, 3.0, 100.0):
+        hook.record_execution(_metrics("regular", actual_ms))
+    hook.record_execution(_metrics("parallel", 5.0, operation_type="union"))
+    assert events == []
+
+    assert hook.drain() == 5
+    assert hook.drain() == 0
+    assert [event["actual_ms"] for event in events] == [1.0, 2.0, 3.0, 100.0, 5.0]
+    regular = hook.histograms[("regular", "intersection")]
+    assert (regular.count, regular.max_us) == (4, 100_000)
+    assert 2000 <= regular.quantile(0.5) <= 2070
+
+    text = hook.export_prometheus()
+    assert 'multicardz_operation_duration_seconds_count{mode="parallel",operation="union"} 1' in text
+    assert 'mode="regular",operation="intersection",quantile="0.99"} 0.1\n' in text
+
+    path = tmp_path / "telemetry.jsonl"
+    assert hook.export_jsonl(path) == 2
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert (lines[1]["mode"], lines[1]["count"], lines[1]["p99_ms"]) == ("regular", 4, 100.0)
+    assert {"p50_ms", "p90_ms", "p999_ms"} <= lines[1].keys()
+
+
+def test_ring_overflow_keeps_newest_records_and_counts_drops():
+    hook = PerformanceTelemetryHook(enabled=True, ring_size=100, start_drain=False)
+    assert hook.capacity == 128
+
+    for i in range(300):
+        hook.record_execution(_metrics("regular", float(i)))
+    # Out-of-range fields are dropped without stalling the ring
+    hook.record_execution(PerformanceMetrics(mode="regular", context=_context(2**63), actual_ms=1.0))
+    hook.record_execution(_metrics("regular", 1.0))
+
+    assert hook.drain() == 128
+    histogram = hook.histograms[("regular", "intersection")]
+    assert histogram.max_us == 299_000
+    assert histogram.count + hook.dropped == 302
+
+
+def test_background_drain_and_disabled_hook():
+    hook = PerformanceTelemetryHook(enabled=True)
+    hook.DRAIN_INTERVAL_SECONDS = 0.01
+    hook.record_execution(_metrics("regular", 1.0))
+
+    deadline = time.monotonic() + 5
+    while not hook.histograms and time.monotonic() < deadline:
+        time.sleep(0.01)
+    hook.stop()
+    assert hook.histograms[("regular", "intersection")].count == 1
+
+    disabled = PerformanceTelemetryHook(enabled=False)
+    disabled.record_execution(_metrics("regular", 1.0))
+    assert disabled.drain() == 0
+
+
+def test_record_overhead_is_below_a_microsecond():
+    hook = PerformanceTelemetryHook(enabled=True, start_drain=False)
+    metrics = _metrics("regular", 1.0)
+
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(20_000):
+            hook.record_execution(metrics)
+        best = min(best, (time.perf_counter() - start) / 20_000)
+
+    assert best < 1e-6
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+
+def test_ml_prediction_never_blocks_and_is_reused(monkeypatch):
+    monkeypatch.setenv("MULTICARDZ_ML_ENDPOINT", "http://ml.invalid/predict")
+    hook = PerformanceTelemetryHook(enabled=False)
+    release = threading.Event()
+    requests = []
+
+    def slow_request(mode, context):
+        requests.append(mode)
+        release.wait(5)
+        return 42.0
+
+    monkeypatch.setattr(hook, "_request_prediction", slow_request)
+
+    start = time.perf_counter()
+    assert hook.get_prediction_async("regular", _context(1_000)) is None
+    assert hook.get_prediction_async("regular", _context(1_000)) is None
+    assert time.perf_counter() - start < 0.5
+
+    release.set()
+    _wait_for(lambda: not hook._pending_predictions)
+    assert hook.get_prediction_async("regular", _context(1_000)) == 42.0
+    assert requests == ["regular"]
+
+
+def test_ml_predictions_in_flight_are_capped(monkeypatch):
+    monkeypatch.setenv("MULTICARDZ_ML_ENDPOINT", "http://ml.invalid/predict")
+    hook = PerformanceTelemetryHook(enabled=False)
+    release = threading.Event()
+    monkeypatch.setattr(hook, "_request_prediction", lambda mode, context: release.wait(5) and 1.0)
+
+    for cards in range(1, 11):
+        assert hook.get_prediction_async("regular", _context(cards)) is None
+
+    assert len(hook._pending_predictions) == hook.ML_MAX_PENDING
+    assert hook.dropped_predictions == 10 - hook.ML_MAX_PENDING
+
+    release.set()
+    _wait_for(lambda: not hook._pending_predictions)
+    hook.stop()
+    assert hook.get_prediction_async("regular", _context(99)) is None
+    assert not hook._pending_predictions
+
+
+def test_metrics_route_serves_prometheus_text(test_client):
+    response = test_client.get("/api/telemetry/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE multicardz_operation_duration_seconds summary" in response.text
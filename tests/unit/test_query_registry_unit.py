@@ -0,0 +1,91 @@
+"""
+Unit tests for the named statement registry and pooled execution.
+"""
+
+import sqlite3
+
+import pytest
+
+from apps.shared.repositories.query_registry import (
+    LATENCY_BUCKETS_MS,
+    close_pooled_connections,
+    execute_command,
+    get_slowest_statements,
+    get_statement_stats,
+    pooled_connection,
+    query_all,
+    query_one,
+    register_statement,
+    reset_statement_stats,
+)
+
+INSERT_ITEM = register_statement("test_registry.insert", "INSERT INTO items (id, label) VALUES (?, ?)")
+GET_ITEM = register_statement("test_registry.get", "SELECT id, label FROM items WHERE id = ?")
+LIST_ITEMS = register_statement("test_registry.list", "SELECT id, label FROM items ORDER BY id")
+
+
+@pytest.fixture
+def registry_db(tmp_path):
+    """Fresh database file with clean pool and metrics."""
+    db_path = tmp_path / "registry.db"
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, label TEXT)")
+
+    reset_statement_stats()
+    yield db_path
+    close_pooled_connections(db_path)
+    reset_statement_stats()
+
+
+def test_register_is_idempotent_but_rejects_conflicts():
+    """Re-registering identical SQL is fine; different SQL under one name is not."""
+    assert register_statement("test_registry.get", "SELECT id, label FROM items WHERE id = ?") == GET_ITEM
+
+    with pytest.raises(ValueError, match="already registered"):
+        register_statement("test_registry.get", "SELECT * FROM items")
+
+
+def test_unknown_statement_raises(registry_db):
+    with pytest.raises(KeyError, match="Unknown statement"):
+        query_one("test_registry.missing", (), registry_db)
+
+
+def test_statements_execute_and_return_rows(registry_db):
+    assert execute_command(INSERT_ITEM, (1, "one"), registry_db) == 1
+    execute_command(INSERT_ITEM, (2, "two"), registry_db)
+
+    assert dict(query_one(GET_ITEM, (2,), registry_db)) == {"id": 2, "label": "two"}
+    assert [row["label"] for row in query_all(LIST_ITEMS, (), registry_db)] == ["one", "two"]
+
+
+def test_connections_are_reused(registry_db):
+    """Sequential checkouts reuse the same connection and its statement cache."""
+    with pooled_connection(registry_db) as first:
+        pass
+    with pooled_connection(registry_db) as second:
+        pass
+
+    assert first is second
+
+
+def test_uncommitted_work_is_rolled_back_on_return(registry_db):
+    """A connection returned mid-transaction does not leak writes to the next user."""
+    with pooled_connection(registry_db) as conn:
+        conn.execute("INSERT INTO items (id, label) VALUES (9, 'dangling')")
+
+    assert query_one(GET_ITEM, (9,), registry_db) is None
+
+
+def test_hit_counts_and_histogram(registry_db):
+    execute_command(INSERT_ITEM, (1, "one"), registry_db)
+    for _ in range(5):
+        query_one(GET_ITEM, (1,), registry_db)
+
+    stats = get_statement_stats()
+
+    assert stats[GET_ITEM]["hits"] == 5
+    assert stats[INSERT_ITEM]["hits"] == 1
+    assert sum(stats[GET_ITEM]["histogram"].values()) == 5
+    assert set(stats[GET_ITEM]["histogram"]) == set(LATENCY_BUCKETS_MS)
+    assert stats[GET_ITEM]["p50_ms"] <= stats[GET_ITEM]["p99_ms"]
+    assert {name for name, _ in get_slowest_statements()} == {GET_ITEM, INSERT_ITEM}
@@ -0,0 +1,73 @@
+"""
+Unit tests for paged, chunked resolution of filtered queries.
+
+Server-side matches come from the in-memory bitmap store fixture; the
+browser database is faked to record each statement and answer from a dict.
+"""
+
+import asyncio
+
+import pytest
+
+from apps.shared.services import browser_database
+from apps.shared.services.bitmap_sync import sync_card_bitmaps_batch
+from apps.shared.services.query_router import (
+    RESOLVE_CHUNK_SIZE,
+    route_filtered_query,
+    stream_filtered_query,
+)
+
+
+@pytest.fixture
+def browser_cards(monkeypatch):
+    """Fake browser database holding one row per synced card; records params."""
+    calls = []
+
+    def execute_query(connection, sql, params=None):
+        calls.append(params)
+        card_ids = params[2:]
+        # Reversed: IN lists do not preserve order
+        rows = [{"card_id": card_id, "name": f"name-{card_id}"} for card_id in reversed(card_ids)]
+        return browser_database.QueryResult(success=True, rows=rows, rows_affected=0)
+
+    monkeypatch.setattr(browser_database, "execute_query", execute_query)
+
+    sync_card_bitmaps_batch("ws-1", "user-1", [
+        {"card_id": f"c{i:05d}", "card_bitmap": i, "tag_bitmaps": [1]} for i in range(2500)
+    ])
+    return calls
+
+
+def test_only_requested_page_is_resolved(browser_cards):
+    result = route_filtered_query("ws-1", "user-1", [], limit=50, offset=100)
+
+    assert result.success
+    assert result.total_matches == 2500
+    assert [card["card_id"] for card in result.cards] == [f"c{i:05d}" for i in range(100, 150)]
+    assert len(browser_cards) == 1
+    assert len(browser_cards[0]) == 2 + 50
+
+
+def test_large_pages_use_bounded_in_lists(browser_cards):
+    result = route_filtered_query("ws-1", "user-1", [], limit=2000)
+
+    assert len(result.cards) == 2000
+    assert [card["card_id"] for card in result.cards][-1] == "c01999"
+    assert all(len(params) - 2 <= RESOLVE_CHUNK_SIZE for params in browser_cards)
+    assert len(browser_cards) == 4
+
+
+def test_stream_resolves_pages_lazily(browser_cards):
+    async def first_two_pages():
+        pages = []
+        async for page in stream_filtered_query("ws-1", "user-1", [], page_size=100, offset=2350):
+            pages.append(page)
+            if len(pages) == 2:
+                break
+        return pages
+
+    pages = asyncio.run(first_two_pages())
+
+    assert [page[0]["card_id"] for page in pages] == ["c02350", "c02450"]
+    assert len(pages[1]) == 50
+    assert len(browser_cards) == 2
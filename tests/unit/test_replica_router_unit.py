@@ -0,0 +1,194 @@
+"""
+Unit tests for read-replica routing.
+
+Uses real SQLite files in a temporary directory and a controllable clock
+for the staleness bound.
+"""
+
+import sqlite3
+import time
+
+import pytest
+
+from apps.shared.config import replica_router as replica_router_module
+from apps.shared.config.replica_router import (
+    ReadReplicaRouter,
+    ReplicaRole,
+    execute_routed,
+    is_read_query,
+    replica_paths_for,
+)
+from apps.shared.repositories import query_registry
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def primary(tmp_path):
+    db_path = tmp_path / "primary.db"
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE cards (card_id TEXT PRIMARY KEY, name TEXT)")
+        conn.execute("INSERT INTO cards VALUES ('card-1', 'One')")
+    return db_path
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def router(primary, clock):
+    router = ReadReplicaRouter(
+        primary,
+        replica_paths_for(primary, 2),
+        max_staleness_seconds=5.0,
+        clock=clock,
+        start_refresher=False,
+    )
+    router.refresh_all()
+    return router
+
+
+def _names(router, session_id=None):
+    result = execute_routed(router, "SELECT name FROM cards ORDER BY card_id", session_id=session_id)
+    return result["role"], [row[0] for row in result["rows"]]
+
+
+def test_query_classification():
+    assert is_read_query("SELECT 1")
+    assert is_read_query("  -- leading comment\n select * from cards")
+    assert is_read_query("WITH t AS (SELECT 1) SELECT * FROM t")
+    assert not is_read_query("WITH t AS (SELECT 1) DELETE FROM cards")
+    assert not is_read_query("INSERT INTO cards VALUES ('a', 'b')")
+    assert not is_read_query("PRAGMA journal_mode=WAL")
+
+
+def test_reads_are_served_by_replicas(router):
+    role, names = _names(router)
+
+    assert role == ReplicaRole.REPLICA
+    assert names == ["One"]
+    assert router.get_stats()["replica_reads"] == 1
+
+
+def test_writes_go_to_primary_and_replicas_are_read_only(router, primary):
+    result = execute_routed(router, "INSERT INTO cards VALUES ('card-2', 'Two')")
+    assert result["role"] == ReplicaRole.PRIMARY.value
+
+    with sqlite3.connect(primary) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM cards").fetchone()[0] == 2
+
+    with router.read_connection() as conn:
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM cards")
+
+
+def test_read_your_writes_pins_session(router):
+    execute_routed(router, "INSERT INTO cards VALUES ('card-2', 'Two')", session_id="s1")
+
+    # Writer's session reads the primary until a replica catches up
+    decision = router.route_read("s1")
+    assert decision.role == ReplicaRole.PRIMARY
+    assert decision.reason == "read_your_writes"
+    assert _names(router, "s1") == (ReplicaRole.PRIMARY, ["One", "Two"])
+
+    assert router.refresh_lagging() == 2
+    assert _names(router, "s1") == (ReplicaRole.REPLICA, ["One", "Two"])
+
+
+def test_other_sessions_tolerate_bounded_staleness(router, clock):
+    execute_routed(router, "INSERT INTO cards VALUES ('card-2', 'Two')", session_id="writer")
+
+    # Within the bound another session may read the old snapshot
+    assert _names(router, "reader") == (ReplicaRole.REPLICA, ["One"])
+
+    # Past the bound the primary serves until the replicas are refreshed
+    clock.now += 10
+    assert _names(router, "reader") == (ReplicaRole.PRIMARY, ["One", "Two"])
+
+    router.refresh_lagging()
+    assert _names(router, "reader") == (ReplicaRole.REPLICA, ["One", "Two"])
+
+
+def test_reads_never_refresh_inline(router):
+    execute_routed(router, "INSERT INTO cards VALUES ('card-2', 'Two')", session_id="s1")
+    refreshes = router.get_stats()["refreshes"]
+
+    router.route_read("s1")
+
+    assert router.get_stats()["refreshes"] == refreshes
+
+
+def test_background_refresher_catches_replicas_up(primary):
+    router = ReadReplicaRouter(primary, replica_paths_for(primary, 1), max_staleness_seconds=60)
+    try:
+        router.refresh_all()
+        router.record_write("s1")
+        assert router.route_read("s1").role == ReplicaRole.PRIMARY
+
+        deadline = time.monotonic() + 5
+        while router.route_read("s1").role != ReplicaRole.REPLICA:
+            assert time.monotonic() < deadline, "background refresh did not run"
+            time.sleep(0.01)
+    finally:
+        router.close()
+
+
+def test_stats_report_lag_and_prune_sessions(router):
+    execute_routed(router, "INSERT INTO cards VALUES ('card-2', 'Two')", session_id="s1")
+    stats = router.get_stats()
+    assert stats["write_seq"] == 1
+    assert stats["pinned_sessions"] == 1
+    assert [r["writes_behind"] for r in stats["replicas"]] == [1, 1]
+
+    router.refresh_all()
+    stats = router.get_stats()
+    assert stats["pinned_sessions"] == 0
+    assert [r["writes_behind"] for r in stats["replicas"]] == [0, 0]
+
+
+def test_no_replicas_reads_primary(primary):
+    router = ReadReplicaRouter(primary, [])
+    assert router.route_read().role == ReplicaRole.PRIMARY
+
+
+def test_statement_pool_routes_reads_to_replicas(primary, monkeypatch):
+    monkeypatch.setattr(replica_router_module, "READ_REPLICA_COUNT", 1)
+    monkeypatch.setattr(replica_router_module, "_ROUTERS", {})
+    query_registry.register_statement(
+        "test_replica.count_cards", "SELECT COUNT(*) FROM cards"
+    )
+    query_registry.register_statement(
+        "test_replica.insert_card", "INSERT INTO cards VALUES (?, ?)"
+    )
+
+    router = replica_router_module.get_replica_router(primary, 1)
+    router._start_refresher = False
+    router.refresh_all()
+    try:
+        assert query_registry.query_one("test_replica.count_cards", (), primary)[0] == 1
+        assert router.get_stats()["replica_reads"] == 1
+
+        # The pooled replica connection is read-only, so a refresh owns the file
+        replica = replica_paths_for(primary, 1)[0]
+        with query_registry.pooled_connection(replica, read_only=True) as conn:
+            with pytest.raises(sqlite3.OperationalError, match="readonly"):
+                conn.execute("INSERT INTO cards VALUES ('card-x', 'X')")
+
+        # A write through the pool pins this process's reads to the primary
+        query_registry.execute_command("test_replica.insert_card", ("card-2", "Two"), primary)
+        assert query_registry.query_one("test_replica.count_cards", (), primary)[0] == 2
+        assert router.get_stats()["primary_reads"] == 1
+
+        router.refresh_lagging()
+        assert query_registry.query_one("test_replica.count_cards", (), primary)[0] == 2
+        assert router.get_stats()["replica_reads"] == 2
+    finally:
+        query_registry.close_pooled_connections()
@@ -0,0 +1,321 @@
+"""
+Unit tests for the local SQLite storage strategy (ordinal tag index and
+index snapshot) and the hybrid strategy's background sync queue.
+"""
+
+import sqlite3
+import time
+
+import pytest
+from pyroaring import BitMap
+
+from apps.shared.storage_strategy import (
+    Card,
+    HybridStrategy,
+    LocalSQLiteStrategy,
+    StorageStrategy,
+    SyncWorker,
+)
+
+
+def _card(card_id, *tags, content="body"):
+    return Card(id=card_id, content=content, tags=frozenset(tags), metadata={})
+
+
+@pytest.fixture
+def store(tmp_path):
+    return LocalSQLiteStrategy(tmp_path / "cards.db")
+
+
+def test_tag_queries_return_stable_ordinals(store, tmp_path):
+    store.save_card(_card("a", "x", "y"))
+    store.save_card(_card("b", "x"))
+    store.save_card(_card("c"))
+
+    assert store.get_card_ids(store.get_cards_by_tags(frozenset({"x"}))) == ["a", "b"]
+    assert store.get_card_ids(store.get_cards_by_tags(frozenset({"x", "y"}))) == ["a"]
+    assert store.get_card_ids(store.get_cards_by_tags(frozenset())) == ["a", "b", "c"]
+
+    # Ordinals come from the table, so a fresh process sees the same ones
+    reopened = LocalSQLiteStrategy(tmp_path / "cards.db")
+    assert reopened.get_cards_by_tags(frozenset({"x"})) == store.get_cards_by_tags(frozenset({"x"}))
+
+
+def test_update_moves_card_between_its_tags_only(store):
+    store.save_card(_card("a", "x"))
+    ordinal = store.get_cards_by_tags(frozenset({"x"})).min()
+
+    store.save_card(_card("a", "y"))
+
+    assert store.get_cards_by_tags(frozenset({"x"})) == BitMap()
+    assert list(store.get_cards_by_tags(frozenset({"y"}))) == [ordinal]
+    assert store.get_card_by_id("a").tags == frozenset({"y"})
+
+
+def test_deleted_ordinals_are_not_reused(store):
+    store.save_card(_card("a", "x"))
+    store.save_card(_card("b", "x"))
+    assert store.delete_card("b")
+    assert not store.delete_card("b")
+
+    store.save_card(_card("c", "x"))
+
+    assert list(store.get_cards_by_tags(frozenset({"x"}))) == [1, 3]
+
+
+def test_legacy_table_is_migrated(tmp_path):
+    path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE cards (
+            id TEXT PRIMARY KEY,
+            content TEXT NOT NULL,
+            tags_json TEXT NOT NULL,
+            metadata_json TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        INSERT INTO cards (id, content, tags_json, metadata_json) VALUES ('old', 'body', '["x"]', '{}');
+    """)
+    conn.commit()
+    conn.close()
+
+    store = LocalSQLiteStrategy(path)
+
+    assert store.get_card_ids(store.get_cards_by_tags(frozenset({"x"}))) == ["old"]
+    assert store.get_card_by_id("old").content == "body"
+
+
+def test_open_loads_snapshot_and_replays_newer_changes(tmp_path, monkeypatch):
+    path = tmp_path / "cards.db"
+    store = LocalSQLiteStrategy(path)
+    for i in range(100):
+        store.save_card(_card(f"c{i}", "even" if i % 2 == 0 else "odd"))
+    store.close()
+
+    # Changes after the snapshot, without a clean close
+    store = LocalSQLiteStrategy(path)
+    store.save_card(_card("c0", "odd"))
+    store.delete_card("c1")
+    store.save_card(_card("c2", "odd"))  # retagged, then deleted
+    store.delete_card("c2")
+    store.save_card(_card("new", "even"))
+    store.conn.close()
+
+    statements = []
+    connect = sqlite3.connect
+
+    def traced_connect(*args, **kwargs):
+        conn = connect(*args, **kwargs)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    monkeypatch.setattr(sqlite3, "connect", traced_connect)
+    reopened = LocalSQLiteStrategy(path)
+
+    assert "SELECT ordinal, tags_json FROM cards" not in statements  # no full rebuild
+    even = reopened.get_card_ids(reopened.get_cards_by_tags(frozenset({"even"})))
+    odd = reopened.get_card_ids(reopened.get_cards_by_tags(frozenset({"odd"})))
+    assert even == [f"c{i}" for i in range(4, 100, 2)] + ["new"]
+    assert len(reopened.get_cards_by_tags(frozenset({"even"}))) == len(even)
+    assert odd == ["c0"] + [f"c{i}" for i in range(3, 100, 2)]
+    assert len(reopened.get_cards_by_tags(frozenset())) == 99
+
+
+class FakeCloud(StorageStrategy):
+    """Cloud strategy recording calls; fails while `down` is set."""
+
+    def __init__(self):
+        self.saved = []
+        self.deleted = []
+        self.down = False
+        self.rejected = set()
+
+    def save_card(self, card):
+        if self.down:
+            raise ConnectionError("cloud unavailable")
+        if card.id in self.rejected:
+            raise ValueError(f"cloud rejects {card.id}")
+        self.saved.append(card)
+        return card.id
+
+    def delete_card(self, card_id):
+        if self.down:
+            raise ConnectionError("cloud unavailable")
+        self.deleted.append(card_id)
+        return True
+
+    def can_sync(self):
+        return True
+
+    def get_cards_by_tags(self, filter_tags):
+        return BitMap()
+
+    def get_card_by_id(self, card_id):
+        return None
+
+    def get_all_tags(self):
+        return frozenset()
+
+
+@pytest.fixture
+def hybrid(store):
+    cloud = FakeCloud()
+    strategy = HybridStrategy(store, cloud, start_worker=False)
+    yield strategy, cloud
+    strategy.worker.close()
+
+
+def test_hybrid_queue_coalesces_and_sends_latest_state(hybrid):
+    strategy, cloud = hybrid
+    for version in range(5):
+        strategy.save_card(_card("a", f"v{version}"))
+    strategy.save_card(_card("b", "x"))
+    strategy.delete_card("b")
+
+    assert strategy.sync_metrics().depth == 2
+    assert cloud.saved == []  # nothing sent on the request thread
+
+    assert strategy.worker.run_once() == 2
+    assert [card.tags for card in cloud.saved] == [frozenset({"v4"})]
+    assert cloud.deleted == ["b"]
+    assert strategy.sync_metrics().depth == 0
+
+
+def test_hybrid_queue_backs_off_and_keeps_failed_rows(hybrid):
+    strategy, cloud = hybrid
+    strategy.save_card(_card("a", "x"))
+    cloud.down = True
+
+    assert strategy.worker.run_once() == 0
+    first = strategy.sync_metrics()
+    assert strategy.worker.run_once() == 0
+    second = strategy.sync_metrics()
+
+    assert (first.depth, first.consecutive_failures) == (1, 1)
+    assert second.consecutive_failures == 2
+    assert second.backoff_seconds > 0
+
+    cloud.down = False
+    assert strategy.worker.run_once() == 1
+    assert strategy.sync_metrics().backoff_seconds == 0
+
+
+def test_hybrid_write_and_queue_row_commit_together(hybrid, monkeypatch):
+    strategy, _ = hybrid
+
+    def broken_enqueue(conn, operation, card_id):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(SyncWorker, "enqueue", staticmethod(broken_enqueue))
+    with pytest.raises(sqlite3.OperationalError):
+        strategy.save_card(_card("a", "x"))
+    monkeypatch.undo()
+
+    # Neither the card nor a queue row survived, even after a later commit
+    strategy.save_card(_card("b", "x"))
+    assert strategy.get_card_by_id("a") is None
+    assert strategy.sync_metrics().depth == 1
+
+
+def test_hybrid_queue_rejected_row_does_not_block_and_is_dead_lettered(store):
+    cloud = FakeCloud()
+    strategy = HybridStrategy(store, cloud, start_worker=False)
+    strategy.worker.max_attempts = 3
+    cloud.rejected.add("bad")
+    strategy.save_card(_card("bad", "x"))
+    strategy.save_card(_card("good", "x"))
+
+    assert strategy.worker.run_once() == 0
+    # The failed row now sorts behind rows with fewer attempts
+    assert strategy.worker.run_once() == 1
+    assert [card.id for card in cloud.saved] == ["good"]
+
+    strategy.worker.run_once()
+    strategy.worker.run_once()
+    metrics = strategy.sync_metrics()
+    assert (metrics.depth, metrics.dead_letters) == (0, 1)
+
+    cloud.rejected.clear()
+    assert strategy.worker.requeue_dead_letters() == 1
+    assert strategy.worker.run_once() == 1
+    assert [card.id for card in cloud.saved] == ["good", "bad"]
+    assert strategy.sync_metrics().dead_letters == 0
+    strategy.worker.close()
+
+
+def test_sync_queue_from_before_retry_columns_is_migrated(tmp_path):
+    path = tmp_path / "cards.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute("""
+            CREATE TABLE sync_queue (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                operation TEXT NOT NULL,
+                card_id TEXT NOT NULL,
+                data_json TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        conn.execute("INSERT INTO sync_queue (operation, card_id) VALUES ('delete_card', 'old')")
+
+    cloud = FakeCloud()
+    strategy = HybridStrategy(LocalSQLiteStrategy(path), cloud, start_worker=False)
+    assert strategy.worker.run_once() == 1
+    assert cloud.deleted == ["old"]
+    strategy.close()
+
+
+def test_hybrid_queue_is_durable_and_drained_in_background(tmp_path):
+    path = tmp_path / "cards.db"
+    first = HybridStrategy(LocalSQLiteStrategy(path), FakeCloud(), start_worker=False)
+    first.save_card(_card("a", "x"))
+    first.close()
+
+    cloud = FakeCloud()
+    second = HybridStrategy(LocalSQLiteStrategy(path), cloud)
+    deadline = time.monotonic() + 5
+    while not cloud.saved and time.monotonic() < deadline:
+        second.worker.wake()
+        time.sleep(0.01)
+    second.close()
+
+    assert [card.id for card in cloud.saved] == ["a"]
+
+
+@pytest.fixture
+def encrypted_store(tmp_path):
+    from cryptography.fernet import Fernet
+
+    return LocalSQLiteStrategy(tmp_path / "secure.db", Fernet.generate_key().decode())
+
+
+def test_batch_read_decrypts_lazily(encrypted_store, monkeypatch):
+    for i in range(3):
+        encrypted_store.save_card(_card(f"c{i}", "x", content=f"secret {i}"))
+
+    decrypted = []
+    decrypt = encrypted_store._decrypt_if_needed
+    monkeypatch.setattr(
+        encrypted_store, "_decrypt_if_needed",
+        lambda data: decrypted.append(data) or decrypt(data),
+    )
+
+    cards = encrypted_store.get_cards_by_ids(["c2", "missing", "c0"])
+
+    assert [card.id for card in cards] == ["c2", "c0"]
+    assert cards[0].tags == frozenset({"x"})
+    assert decrypted == []
+    assert cards[0].content == "secret 2"
+    assert cards[0].content == "secret 2"
+    assert len(decrypted) == 1
+    assert cards[0].to_card() == encrypted_store.get_card_by_id("c2")
+
+
+def test_batch_read_decrypts_large_batches_in_parallel(encrypted_store):
+    for i in range(200):
+        encrypted_store.save_card(_card(f"c{i}", content=f"secret {i}"))
+
+    cards = encrypted_store.get_cards_by_ids([f"c{i}" for i in range(200)], with_content=True)
+
+    assert all(card.is_decrypted for card in cards)
+    assert [card.content for card in cards] == [f"secret {i}" for i in range(200)]
@@ -0,0 +1,281 @@
+"""
+Unit tests for the Privacy Mode replica pool and browser sync pipeline.
+
+libsql_experimental is replaced in sys.modules by a stub whose Database
+is a plain SQLite file, so the pipeline runs against real tables.
+"""
+
+import importlib
+import os
+import sqlite3
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+
+class StubDatabase:
+    """libsql.Database stand-in backed by a local SQLite file."""
+
+    def __init__(self, path, sync_url=None, auth_token=None, sync_interval=None, encryption_key=None):
+        self.path = path
+        self.closed = False
+
+    def connect(self):
+        return sqlite3.connect(self.path)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def tpm(monkeypatch, tmp_path):
+    """turso_privacy_manager imported against the libsql stub, in a temp cwd."""
+    stub = types.ModuleType("libsql_experimental")
+    stub.Database = StubDatabase
+    monkeypatch.setitem(sys.modules, "libsql_experimental", stub)
+    monkeypatch.delitem(sys.modules, "apps.shared.services.turso_privacy_manager", raising=False)
+    monkeypatch.chdir(tmp_path)
+
+    module = importlib.import_module("apps.shared.services.turso_privacy_manager")
+    yield module
+    sys.modules.pop("apps.shared.services.turso_privacy_manager", None)
+
+
+@pytest.fixture
+def pool(tpm):
+    pool = tpm.ReplicaPool(max_open=4, idle_timeout=60, start_sweeper=False)
+    yield pool
+    pool.close_all()
+
+
+def _cards(count, prefix="card"):
+    return [
+        {"card_id": f"{prefix}-{i}", "name": f"Card {i}", "tag_bitmaps": [i]}
+        for i in range(count)
+    ]
+
+
+def _failing_stream(cards, fail_after):
+    for i, card in enumerate(cards):
+        if i == fail_after:
+            raise RuntimeError("browser disconnected")
+        yield card
+
+
+def _sync(tpm, pool, cards, sync_id=None):
+    data = {"cards": cards}
+    if sync_id is not None:
+        data["sync_id"] = sync_id
+    return tpm.sync_browser_to_server("u1", "w1", data, pool, chunk_size=2, max_workers=1)
+
+
+def _stored_cards(db_path="data/privacy/u1_w1_replica.db"):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM obfuscated_cards").fetchone()[0]
+
+
+# ============================================================================
+# REPLICA POOL
+# ============================================================================
+
+def _opener(name):
+    return lambda: StubDatabase(f"{name}.db")
+
+
+def test_pool_evicts_least_recently_used_at_capacity(tpm):
+    pool = tpm.ReplicaPool(max_open=2, idle_timeout=60, start_sweeper=False)
+    a = pool.get("a", _opener("a"))
+    pool.get("b", _opener("b"))
+    pool.get("a", _opener("a"))
+
+    pool.get("c", _opener("c"))
+
+    assert "a" in pool and "c" in pool and "b" not in pool
+    assert not a.closed
+    metrics = pool.metrics()
+    assert (metrics.hits, metrics.misses, metrics.capacity_evictions) == (1, 3, 1)
+
+
+def test_pool_closes_idle_handles(tpm):
+    pool = tpm.ReplicaPool(max_open=4, idle_timeout=0.01, start_sweeper=False)
+    handle = pool.get("a", _opener("a"))
+    time.sleep(0.02)
+
+    assert pool.evict_idle() == 1
+    assert handle.closed
+    assert pool.metrics().idle_evictions == 1
+
+
+def test_sweeper_closes_idle_handles_without_new_opens(tpm):
+    pool = tpm.ReplicaPool(max_open=4, idle_timeout=0.01, sweep_interval=0.01)
+    try:
+        handle = pool.get("a", _opener("a"))
+        deadline = time.monotonic() + 5
+        while "a" in pool:
+            assert time.monotonic() < deadline, "sweeper did not run"
+            time.sleep(0.01)
+        assert handle.closed
+    finally:
+        pool.close_all()
+
+
+def test_leased_handles_are_never_evicted(tpm):
+    pool = tpm.ReplicaPool(max_open=1, idle_timeout=0.0, start_sweeper=False)
+
+    with pool.lease("a", _opener("a")) as leased:
+        pool.get("b", _opener("b"))
+        assert pool.evict_idle() == 1  # b only
+        assert "a" in pool and not leased.closed
+        assert pool.metrics().leased_handles == 1
+
+    assert pool.evict_idle() == 1
+    assert leased.closed
+
+
+def test_evicted_handles_close_outside_the_pool_lock(tpm):
+    pool = tpm.ReplicaPool(max_open=1, idle_timeout=0.0, start_sweeper=False)
+    locked_at_close = []
+
+    class LockCheckingDatabase(StubDatabase):
+        def close(self):
+            locked_at_close.append(pool._lock.locked())
+            super().close()
+
+    pool.get("a", lambda: LockCheckingDatabase("a.db"))
+    pool.get("b", lambda: LockCheckingDatabase("b.db"))  # capacity eviction
+    pool.evict_idle()
+
+    assert locked_at_close == [False, False]
+
+
+def test_public_lease_keeps_replica_open_past_idle_timeout(tpm):
+    pool = tpm.ReplicaPool(max_open=1, idle_timeout=0.0, start_sweeper=False)
+
+    with tpm.embedded_replica("u1", "w1", replica_cache=pool) as db:
+        assert pool.evict_idle() == 0
+        tpm.create_embedded_replica("u2", "w2", replica_cache=pool)
+        assert not db.closed
+
+    assert pool.evict_idle() == 2
+    assert db.closed
+
+
+def test_slow_open_does_not_block_other_replicas(tpm):
+    pool = tpm.ReplicaPool(max_open=4, idle_timeout=60, start_sweeper=False)
+    release = threading.Event()
+    opens = []
+
+    def slow_opener():
+        opens.append("slow")
+        release.wait(5)
+        return StubDatabase("slow.db")
+
+    handles = []
+    threads = [
+        threading.Thread(target=lambda: handles.append(pool.get("slow", slow_opener)))
+        for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    while not opens:
+        time.sleep(0.001)
+
+    # The pool lock is free while "slow" opens
+    assert pool.get("fast", _opener("fast")).path == "fast.db"
+
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert opens == ["slow"]
+    assert len(handles) == 3 and len({id(handle) for handle in handles}) == 1
+
+
+def test_failed_open_is_not_pooled(tpm):
+    pool = tpm.ReplicaPool(max_open=4, idle_timeout=60, start_sweeper=False)
+
+    def broken():
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        pool.get("a", broken)
+    assert "a" not in pool
+    assert pool.get("a", _opener("a")).path == "a.db"
+
+
+def test_schema_marker_skips_ddl_on_reopen(tpm, monkeypatch):
+    pool = tpm.ReplicaPool(max_open=1, idle_timeout=60, start_sweeper=False)
+
+    tpm.create_embedded_replica("u1", "w1", replica_cache=pool)
+    tpm.create_embedded_replica("u2", "w2", replica_cache=pool)  # evicts u1
+    tpm.create_embedded_replica("u1", "w1", replica_cache=pool)
+
+    marker = "data/privacy/u1_w1_replica.db.schema"
+    assert open(marker).read() == str(tpm.REPLICA_SCHEMA_VERSION)
+    assert pool.metrics().schema_initializations == 2
+
+    # A schema version bump reruns the DDL once
+    monkeypatch.setattr(tpm, "REPLICA_SCHEMA_VERSION", tpm.REPLICA_SCHEMA_VERSION + 1)
+    tpm.create_embedded_replica("u2", "w2", replica_cache=pool)
+    assert pool.metrics().schema_initializations == 3
+    assert os.path.exists("data/privacy/u2_w2_replica.db.schema")
+
+
+# ============================================================================
+# BROWSER SYNC PIPELINE
+# ============================================================================
+
+def test_sync_writes_all_cards_in_chunks(tpm, pool):
+    result = _sync(tpm, pool, _cards(5))
+
+    assert result["status"] == "success"
+    assert result["synced"] == 5
+    assert result["resumed_from"] == 0
+    assert _stored_cards() == 5
+
+
+def test_explicit_sync_id_resumes_after_interruption(tpm, pool):
+    cards = _cards(6)
+
+    failed = _sync(tpm, pool, _failing_stream(cards, 5), sync_id="sync-1")
+    assert failed["status"] == "error"
+
+    result = _sync(tpm, pool, cards, sync_id="sync-1")
+    assert result["status"] == "success"
+    assert result["resumed_from"] == 4
+    assert result["synced"] == 2
+    assert _stored_cards() == 6
+
+
+def test_sync_without_id_never_skips_cards(tpm, pool):
+    failed = _sync(tpm, pool, _failing_stream(_cards(6), 5))
+    assert failed["status"] == "error"
+
+    # A different payload must not be skipped because of the old checkpoint
+    result = _sync(tpm, pool, _cards(6, prefix="other"))
+    assert result["resumed_from"] == 0
+    assert result["synced"] == 6
+    assert _stored_cards() == 10
+
+
+def test_changed_input_restarts_instead_of_skipping(tpm, pool):
+    _sync(tpm, pool, _failing_stream(_cards(6), 5), sync_id="sync-1")
+
+    result = _sync(tpm, pool, _cards(6, prefix="other"), sync_id="sync-1")
+    assert result["status"] == "success"
+    assert result["resumed_from"] == 0
+    assert result["synced"] == 6
+
+
+def test_changed_one_shot_stream_is_rejected_and_checkpoint_dropped(tpm, pool):
+    _sync(tpm, pool, _failing_stream(_cards(6), 5), sync_id="sync-1")
+
+    rejected = _sync(tpm, pool, iter(_cards(6, prefix="other")), sync_id="sync-1")
+    assert rejected["status"] == "error"
+    assert "checkpoint" in rejected["error"]
+
+    retried = _sync(tpm, pool, iter(_cards(6, prefix="other")), sync_id="sync-1")
+    assert retried["resumed_from"] == 0
+    assert retried["synced"] == 6